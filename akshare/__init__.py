@@ -3106,2527 +3106,2569 @@ if sys.version_info < (3, 9):
 
 del sys
 
-"""
-东方财富网-行情中心-债券市场-质押式回购
-"""
-from akshare.bond.bond_buy_back_em import bond_sh_buy_back_em, bond_sz_buy_back_em, bond_buy_back_hist_em
+import importlib
+from typing import TYPE_CHECKING
+
+from akshare._lazy_index import LAZY_IMPORTS, OPTIONAL_IMPORTS
+
+"""
+按需导入：访问 ak.<接口> 时才导入其所在模块，避免 import akshare 时导入全部子模块（及 py_mini_racer 等依赖）
+接口名称与模块的对应关系见 akshare/_lazy_index.py，由下方 TYPE_CHECKING 中的导入语句生成（python akshare/utils/lazy_index.py）
+"""
+
+
+def __getattr__(name):
+    target = LAZY_IMPORTS.get(name)
+    if target is None:
+        if name.startswith("__"):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        # 兼容以属性方式访问子模块（如 ak.stock_feature）
+        try:
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module_name, _, attr = target.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        if name in OPTIONAL_IMPORTS:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({e})") from None
+        raise
+    value = getattr(module, attr or name)
+    # 写入模块命名空间，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_IMPORTS))
+
+
+# 以下导入语句仅供 IDE 与静态检查使用，运行时不执行；新增接口时在此添加导入语句后重新生成索引
+if TYPE_CHECKING:
+    """
+    东方财富网-行情中心-债券市场-质押式回购
+    """
+    from akshare.bond.bond_buy_back_em import bond_sh_buy_back_em, bond_sz_buy_back_em, bond_buy_back_hist_em
+
+    """
+    东方财富-A股数据-股本结构
+    """
+    from akshare.stock_fundamental.stock_gbjg_em import stock_zh_a_gbjg_em
+
+    """
+    异步接口
+    """
+    from akshare.stock_a.stock_zh_a_spot import stock_zh_a_spot_em
+    from akshare.stock_a.stock_individual_fund_flow_rank import stock_individual_fund_flow_rank
+    from akshare.stock_a.stock_board_concept_name_em import stock_board_concept_name_em
+
+    """
+    雪球-个股-公司概况-公司简介
+    """
+    from akshare.stock_fundamental.stock_basic_info_xq import (
+        stock_individual_basic_info_xq,
+        stock_individual_basic_info_hk_xq,
+        stock_individual_basic_info_us_xq,
+    )
 
-"""
-东方财富-A股数据-股本结构
-"""
-from akshare.stock_fundamental.stock_gbjg_em import stock_zh_a_gbjg_em
+    """
+    新浪财经-行情中心-环球市场
+    """
+    from akshare.index.index_global_sina import index_global_hist_sina, index_global_name_table
+
+    """
+    东方财富网-行情中心-全球指数
+    """
+    from akshare.index.index_global_em import index_global_hist_em, index_global_spot_em
+
+    """
+    东方财富网-行情中心-外汇市场-所有汇率
+    """
+    from akshare.forex.forex_em import forex_hist_em, forex_spot_em
+
+    """
+    东方财富网-行情中心-沪深港通
+    """
+    from akshare.stock.stock_hsgt_em import stock_zh_ah_spot_em, stock_hsgt_sh_hk_spot_em
+
+    """
+    东方财富-美股-财务分析-三大报表
+    """
+    from akshare.stock_fundamental.stock_finance_us_em import (
+        stock_financial_us_report_em,
+        stock_financial_us_analysis_indicator_em,
+    )
 
-"""
-异步接口
-"""
-from akshare.stock_a.stock_zh_a_spot import stock_zh_a_spot_em
-from akshare.stock_a.stock_individual_fund_flow_rank import stock_individual_fund_flow_rank
-from akshare.stock_a.stock_board_concept_name_em import stock_board_concept_name_em
+    """
+    期货行情-内盘-历史行情数据-东财
+    """
+    from akshare.futures.futures_hist_em import futures_hist_table_em, futures_hist_em
+
+    """
+    巨潮资讯-数据中心-专题统计-股东股本-股本变动
+    """
+    from akshare.stock.stock_hold_control_cninfo import stock_hold_change_cninfo
+
+    """
+    基金费率
+    """
+    from akshare.fund.fund_fee_em import fund_fee_em
+
+    """
+    东方财富网-数据中心-估值分析-每日互动-每日互动-估值分析
+    """
+    from akshare.stock_feature.stock_value_em import stock_value_em
+
+    """
+    已实现波动率
+    """
+    from akshare.cal.rv import volatility_yz_rv, rv_from_futures_zh_minute_sina, rv_from_stock_zh_a_hist_min_em
+
+    """
+    QDII
+    """
+    from akshare.qdii.qdii_jsl import qdii_a_index_jsl, qdii_e_index_jsl, qdii_e_comm_jsl
+
+    """
+    财新网-财新数据通
+    """
+    from akshare.stock.stock_news_cx import stock_news_main_cx
+
+    """
+    搜猪-生猪大数据-各省均价实时排行榜
+    """
+    from akshare.spot.spot_hog_soozhu import (
+        spot_hog_soozhu,
+        spot_hog_year_trend_soozhu,
+        spot_hog_lean_price_soozhu,
+        spot_hog_three_way_soozhu,
+        spot_hog_crossbred_soozhu,
+        spot_corn_price_soozhu,
+        spot_soybean_price_soozhu,
+        spot_mixed_feed_soozhu,
+    )
 
-"""
-雪球-个股-公司概况-公司简介
-"""
-from akshare.stock_fundamental.stock_basic_info_xq import (
-    stock_individual_basic_info_xq,
-    stock_individual_basic_info_hk_xq,
-    stock_individual_basic_info_us_xq,
-)
+    """
+    知名港股
+    """
+    from akshare.stock.stock_hk_famous import stock_hk_famous_spot_em
+
+    """
+    同花顺-数据中心-宏观数据-股票筹资
+    """
+    from akshare.economic.macro_finance_ths import macro_stock_finance, macro_rmb_loan, macro_rmb_deposit
+
+    """
+    富途牛牛-主题投资-概念板块-成分股
+    """
+    from akshare.stock_feature.stock_concept_futu import stock_concept_cons_futu
+
+    """
+    商品期权手续费
+    """
+    from akshare.option.option_comm_qihuo import option_comm_info, option_comm_symbol
+
+    """
+    上海证券交易所-产品-股票期权-每日统计
+    """
+    from akshare.option.option_daily_stats_sse_szse import option_daily_stats_sse, option_daily_stats_szse
+
+    """
+    同花顺理财-基金数据-每日净值-ETF
+    """
+    from akshare.fund.fund_etf_ths import fund_etf_spot_ths
+
+    """
+    东方财富网-数据中心-融资融券-融资融券账户统计-两融账户信息
+    """
+    from akshare.stock_feature.stock_margin_em import stock_margin_account_info
+
+    """
+    现货走势
+    """
+    from akshare.spot.spot_price_qh import spot_price_qh, spot_price_table_qh
+
+    """
+    华尔街见闻-日历-宏观
+    """
+    from akshare.economic.macro_info_ws import macro_info_ws
+
+    """
+    数库-A股新闻情绪指数
+    """
+    from akshare.index.index_zh_a_scope import index_news_sentiment_scope
+
+    """
+    申万宏源研究-申万指数-指数发布-基金指数-实时行情
+    """
+    from akshare.index.index_research_fund_sw import index_hist_fund_sw, index_realtime_fund_sw
+
+    """
+    东方财富-财经早餐
+    """
+    from akshare.stock_feature.stock_info import (
+        stock_info_cjzc_em,
+        stock_info_global_em,
+        stock_info_global_ths,
+        stock_info_global_futu,
+        stock_info_global_sina,
+        stock_info_global_cls,
+        stock_info_broker_sina,
+    )
 
-"""
-新浪财经-行情中心-环球市场
-"""
-from akshare.index.index_global_sina import index_global_hist_sina, index_global_name_table
+    """
+    期货交易-参数汇总查询
+    """
+    from akshare.futures_derivative.futures_contract_info_shfe import futures_contract_info_shfe
+    from akshare.futures_derivative.futures_contract_info_dce import futures_contract_info_dce
+    from akshare.futures_derivative.futures_contract_info_czce import futures_contract_info_czce
+    from akshare.futures_derivative.futures_contract_info_gfex import futures_contract_info_gfex
+    from akshare.futures_derivative.futures_contract_info_cffex import futures_contract_info_cffex
+    from akshare.futures_derivative.futures_contract_info_ine import futures_contract_info_ine
+
+    """
+    上海期货交易所-指定交割仓库-库存周报
+    """
+    from akshare.futures.futures_stock_js import futures_stock_shfe_js
+
+    """
+    东方财富-数据中心-沪深港通-市场概括-分时数据
+    """
+    from akshare.stock_feature.stock_hsgt_min_em import stock_hsgt_fund_min_em
+
+    """
+    东方财富网-行情中心-期货市场-国际期货
+    """
+    from akshare.futures.futures_hf_em import futures_global_spot_em, futures_global_hist_em
+
+    """
+    雪球行情数据
+    """
+    from akshare.stock.stock_xq import (
+        stock_individual_spot_xq,
+    )
 
-"""
-东方财富网-行情中心-全球指数
-"""
-from akshare.index.index_global_em import index_global_hist_em, index_global_spot_em
+    """
+    港股盈利预测
+    """
+    from akshare.stock_fundamental.stock_profit_forecast_hk_etnet import stock_hk_profit_forecast_et
+
+    """
+    巨潮资讯-首页-公告查询-信息披露
+    """
+    from akshare.stock_feature.stock_disclosure_cninfo import (
+        stock_zh_a_disclosure_relation_cninfo,
+        stock_zh_a_disclosure_report_cninfo,
+    )
 
-"""
-东方财富网-行情中心-外汇市场-所有汇率
-"""
-from akshare.forex.forex_em import forex_hist_em, forex_spot_em
+    """
+    东财财富-分时数据
+    """
+    from akshare.stock.stock_intraday_sina import stock_intraday_sina
+
+    """
+    股票日行情
+    """
+    from akshare.stock_feature.stock_hist_tx import stock_zh_a_hist_tx
+
+    """
+    筹码分布
+    """
+    from akshare.stock_feature.stock_cyq_em import stock_cyq_em
+
+    """
+    东财财富-分时数据
+    """
+    from akshare.stock.stock_intraday_em import stock_intraday_em
+
+    """
+    美股指数行情
+    """
+    from akshare.index.index_stock_us_sina import index_us_stock_sina
+
+    """
+    董监高及相关人员持股变动
+    """
+    from akshare.stock.stock_share_hold import (
+        stock_share_hold_change_bse,
+        stock_share_hold_change_sse,
+        stock_share_hold_change_szse,
+    )
 
-"""
-东方财富网-行情中心-沪深港通
-"""
-from akshare.stock.stock_hsgt_em import stock_zh_ah_spot_em, stock_hsgt_sh_hk_spot_em
+    """
+    东方财富网-数据中心-研究报告-个股研报
+    """
+    from akshare.stock_feature.stock_research_report_em import stock_research_report_em
+
+    """
+    东方财富网-数据中心-重大合同-重大合同明细
+    """
+    from akshare.stock_feature.stock_zdhtmx_em import stock_zdhtmx_em
+
+    """
+    东方财富网-数据中心-股东大会
+    """
+    from akshare.stock_feature.stock_gddh_em import stock_gddh_em
+
+    """
+    东方财富网-数据中心-股市日历
+    """
+    from akshare.stock.stock_gsrl_em import stock_gsrl_gsdt_em
+
+    """
+    东方财富网-数据中心-特色数据-高管持股
+    """
+    from akshare.stock.stock_hold_control_em import (
+        stock_hold_management_detail_em,
+        stock_hold_management_person_em,
+    )
 
-"""
-东方财富-美股-财务分析-三大报表
-"""
-from akshare.stock_fundamental.stock_finance_us_em import (
-    stock_financial_us_report_em,
-    stock_financial_us_analysis_indicator_em,
-)
+    """
+    新浪财经-债券-可转债
+    """
+    from akshare.bond.bond_cb_sina import bond_cb_profile_sina, bond_cb_summary_sina
+
+    """
+    上证e互动
+    """
+    from akshare.stock_feature.stock_sns_sseinfo import stock_sns_sseinfo
+
+    """
+    互动易-提问与回答
+    """
+    from akshare.stock_feature.stock_irm_cninfo import (
+        stock_irm_cninfo,
+        stock_irm_ans_cninfo,
+    )
 
-"""
-期货行情-内盘-历史行情数据-东财
-"""
-from akshare.futures.futures_hist_em import futures_hist_table_em, futures_hist_em
+    """
+    基金公告-人事公告
+    """
+    from akshare.fund.fund_announcement import fund_announcement_personnel_em
+
+    """
+    新浪财经-ESG评级中心
+    """
+    from akshare.stock_feature.stock_esg_sina import (
+        stock_esg_msci_sina,
+        stock_esg_rft_sina,
+        stock_esg_rate_sina,
+        stock_esg_zd_sina,
+        stock_esg_hz_sina,
+    )
 
-"""
-巨潮资讯-数据中心-专题统计-股东股本-股本变动
-"""
-from akshare.stock.stock_hold_control_cninfo import stock_hold_change_cninfo
+    """
+    LOF 行情数据
+    """
+    from akshare.fund.fund_lof_em import (
+        fund_lof_hist_em,
+        fund_lof_spot_em,
+        fund_lof_hist_min_em,
+    )
 
-"""
-基金费率
-"""
-from akshare.fund.fund_fee_em import fund_fee_em
+    """
+    同花顺-财务指标-主要指标
+    """
+    from akshare.stock_fundamental.stock_finance_ths import (
+        stock_financial_abstract_ths,
+        stock_financial_debt_ths,
+        stock_financial_benefit_ths,
+        stock_financial_cash_ths,
+        stock_management_change_ths,
+        stock_shareholder_change_ths,
+    )
 
-"""
-东方财富网-数据中心-估值分析-每日互动-每日互动-估值分析
-"""
-from akshare.stock_feature.stock_value_em import stock_value_em
+    """
+    港股股票指数数据-新浪-东财
+    """
+    from akshare.index.index_stock_hk import (
+        stock_hk_index_spot_sina,
+        stock_hk_index_daily_em,
+        stock_hk_index_spot_em,
+        stock_hk_index_daily_sina,
+    )
 
-"""
-已实现波动率
-"""
-from akshare.cal.rv import volatility_yz_rv, rv_from_futures_zh_minute_sina, rv_from_stock_zh_a_hist_min_em
+    """
+    同花顺-数据中心-可转债
+    """
+    from akshare.bond.bond_cb_ths import bond_zh_cov_info_ths
+
+    """
+    同花顺-港股-分红派息
+    """
+    from akshare.stock.stock_hk_fhpx_ths import stock_hk_fhpx_detail_ths
+
+    """
+    同花顺-分红融资
+    """
+    from akshare.stock_feature.stock_fhps_ths import stock_fhps_detail_ths
+
+    """
+    东方财富-行情报价
+    """
+    from akshare.stock.stock_ask_bid_em import stock_bid_ask_em
+
+    """
+    同花顺-盈利预测
+    """
+    from akshare.stock_fundamental.stock_profit_forecast_ths import (
+        stock_profit_forecast_ths,
+    )
 
-"""
-QDII
-"""
-from akshare.qdii.qdii_jsl import qdii_a_index_jsl, qdii_e_index_jsl, qdii_e_comm_jsl
+    """
+    期货资讯
+    """
+    from akshare.futures.futures_news_shmet import futures_news_shmet
+
+    """
+    主营介绍
+    """
+    from akshare.stock_fundamental.stock_zyjs_ths import stock_zyjs_ths
+
+    """
+    东方财富-ETF 行情
+    """
+    from akshare.fund.fund_etf_em import (
+        fund_etf_hist_em,
+        fund_etf_hist_min_em,
+        fund_etf_spot_em,
+    )
 
-"""
-财新网-财新数据通
-"""
-from akshare.stock.stock_news_cx import stock_news_main_cx
+    """
+    乐咕乐股-股债利差
+    """
+    from akshare.stock_feature.stock_ebs_lg import stock_ebs_lg
+
+    """
+    乐咕乐股-基金仓位
+    """
+    from akshare.fund.fund_position_lg import (
+        fund_stock_position_lg,
+        fund_balance_position_lg,
+        fund_linghuo_position_lg,
+    )
 
-"""
-搜猪-生猪大数据-各省均价实时排行榜
-"""
-from akshare.spot.spot_hog_soozhu import (
-    spot_hog_soozhu,
-    spot_hog_year_trend_soozhu,
-    spot_hog_lean_price_soozhu,
-    spot_hog_three_way_soozhu,
-    spot_hog_crossbred_soozhu,
-    spot_corn_price_soozhu,
-    spot_soybean_price_soozhu,
-    spot_mixed_feed_soozhu,
-)
+    """
+    乐咕乐股-大盘拥挤度
+    """
+    from akshare.stock_feature.stock_congestion_lg import stock_a_congestion_lg
+
+    """
+    乐咕乐股-股息率-A 股股息率
+    """
+    from akshare.stock_feature.stock_gxl_lg import stock_a_gxl_lg, stock_hk_gxl_lg
+
+    """
+    东方财富-限售解禁股
+    """
+    from akshare.stock_fundamental.stock_restricted_em import (
+        stock_restricted_release_stockholder_em,
+        stock_restricted_release_summary_em,
+        stock_restricted_release_detail_em,
+        stock_restricted_release_queue_em,
+    )
 
-"""
-知名港股
-"""
-from akshare.stock.stock_hk_famous import stock_hk_famous_spot_em
+    """
+    同花顺行业一览表
+    """
+    from akshare.stock_feature.stock_board_industry_ths import (
+        stock_board_industry_summary_ths,
+    )
 
-"""
-同花顺-数据中心-宏观数据-股票筹资
-"""
-from akshare.economic.macro_finance_ths import macro_stock_finance, macro_rmb_loan, macro_rmb_deposit
+    """
+    生猪市场价格指数
+    """
+    from akshare.index.index_hog import index_hog_spot_price
+
+    """
+    债券信息查询
+    """
+    from akshare.bond.bond_info_cm import (
+        bond_info_detail_cm,
+        bond_info_cm,
+        bond_info_cm_query,
+    )
 
-"""
-富途牛牛-主题投资-概念板块-成分股
-"""
-from akshare.stock_feature.stock_concept_futu import stock_concept_cons_futu
+    """
+    申万宏源研究-指数系列
+    """
+    from akshare.index.index_research_sw import (
+        index_realtime_sw,
+        index_hist_sw,
+        index_component_sw,
+        index_min_sw,
+        index_analysis_daily_sw,
+        index_analysis_weekly_sw,
+        index_analysis_monthly_sw,
+        index_analysis_week_month_sw,
+    )
 
-"""
-商品期权手续费
-"""
-from akshare.option.option_comm_qihuo import option_comm_info, option_comm_symbol
+    """
+    50ETF 期权波动率指数
+    """
+    from akshare.index.index_option_qvix import (
+        index_option_50etf_qvix,
+        index_option_300etf_min_qvix,
+        index_option_300etf_qvix,
+        index_option_50etf_min_qvix,
+        index_option_1000index_min_qvix,
+        index_option_1000index_qvix,
+        index_option_100etf_min_qvix,
+        index_option_100etf_qvix,
+        index_option_300index_min_qvix,
+        index_option_300index_qvix,
+        index_option_500etf_min_qvix,
+        index_option_500etf_qvix,
+        index_option_50index_min_qvix,
+        index_option_50index_qvix,
+        index_option_cyb_min_qvix,
+        index_option_cyb_qvix,
+        index_option_kcb_min_qvix,
+        index_option_kcb_qvix,
+    )
 
-"""
-上海证券交易所-产品-股票期权-每日统计
-"""
-from akshare.option.option_daily_stats_sse_szse import option_daily_stats_sse, option_daily_stats_szse
+    """
+    百度股市通-外汇-行情榜单
+    """
+    from akshare.fx.fx_quote_baidu import fx_quote_baidu
+
+    """
+    乐估乐股-底部研究-巴菲特指标
+    """
+    from akshare.stock_feature.stock_buffett_index_lg import stock_buffett_index_lg
+
+    """
+    百度股市通-热搜股票
+    """
+    from akshare.stock.stock_hot_search_baidu import stock_hot_search_baidu
+
+    """
+    百度股市通- A 股或指数-股评-投票
+    """
+    from akshare.stock_feature.stock_zh_vote_baidu import stock_zh_vote_baidu
+
+    """
+    百度股市通-A 股-财务报表-估值数据
+    """
+    from akshare.stock_feature.stock_zh_valuation_baidu import stock_zh_valuation_baidu
+
+    """
+    百度股市通-港股-财务报表-估值数据
+    """
+    from akshare.stock_feature.stock_hk_valuation_baidu import stock_hk_valuation_baidu
+
+    """
+    巨潮资讯-个股-公司概况
+    """
+    from akshare.stock.stock_profile_cninfo import stock_profile_cninfo
+
+    """
+    巨潮资讯-个股-上市相关
+    """
+    from akshare.stock.stock_ipo_summary_cninfo import stock_ipo_summary_cninfo
+
+    """
+    巨潮资讯-数据浏览器-筹资指标-公司配股实施方案
+    """
+    from akshare.stock.stock_allotment_cninfo import stock_allotment_cninfo
+
+    """
+    沪深港股通-参考汇率和结算汇率
+    """
+    from akshare.stock_feature.stock_hsgt_exchange_rate import (
+        stock_sgt_reference_exchange_rate_sse,
+        stock_sgt_settlement_exchange_rate_sse,
+        stock_sgt_reference_exchange_rate_szse,
+        stock_sgt_settlement_exchange_rate_szse,
+    )
 
-"""
-同花顺理财-基金数据-每日净值-ETF
-"""
-from akshare.fund.fund_etf_ths import fund_etf_spot_ths
+    """
+    中国债券信息网-中债指数-中债指数族系-总指数-综合类指数
+    """
+    from akshare.bond.bond_cbond import (
+        bond_new_composite_index_cbond,
+        bond_composite_index_cbond,
+    )
 
-"""
-东方财富网-数据中心-融资融券-融资融券账户统计-两融账户信息
-"""
-from akshare.stock_feature.stock_margin_em import stock_margin_account_info
+    """
+    行业板块
+    """
+    from akshare.stock_feature.stock_classify_sina import stock_classify_sina
+
+    """
+    管理层讨论与分析
+    """
+    from akshare.stock_fundamental.stock_mda_ym import stock_mda_ym
+
+    """
+    主营构成
+    """
+    from akshare.stock_fundamental.stock_zygc import stock_zygc_ym, stock_zygc_em
+
+    """
+    人民币汇率中间价
+    """
+    from akshare.currency.currency_safe import currency_boc_safe
+
+    """
+    期权-上海证券交易所-风险指标
+    """
+    from akshare.option.option_risk_indicator_sse import option_risk_indicator_sse
+
+    """
+    全球宏观事件
+    """
+    from akshare.news.news_baidu import (
+        news_economic_baidu,
+        news_trade_notify_suspend_baidu,
+        news_report_time_baidu,
+        news_trade_notify_dividend_baidu,
+    )
 
-"""
-现货走势
-"""
-from akshare.spot.spot_price_qh import spot_price_qh, spot_price_table_qh
+    """
+    东方财富-股票-财务分析
+    """
+    from akshare.stock_feature.stock_three_report_em import (
+        stock_balance_sheet_by_report_em,
+        stock_balance_sheet_by_yearly_em,
+        stock_profit_sheet_by_report_em,
+        stock_profit_sheet_by_quarterly_em,
+        stock_profit_sheet_by_yearly_em,
+        stock_cash_flow_sheet_by_report_em,
+        stock_cash_flow_sheet_by_quarterly_em,
+        stock_cash_flow_sheet_by_yearly_em,
+        stock_balance_sheet_by_report_delisted_em,
+        stock_profit_sheet_by_report_delisted_em,
+        stock_cash_flow_sheet_by_report_delisted_em,
+    )
 
-"""
-华尔街见闻-日历-宏观
-"""
-from akshare.economic.macro_info_ws import macro_info_ws
+    """
+    内部交易
+    """
+    from akshare.stock_feature.stock_inner_trade_xq import stock_inner_trade_xq
+
+    """
+    股票热度-雪球
+    """
+    from akshare.stock_feature.stock_hot_xq import (
+        stock_hot_deal_xq,
+        stock_hot_follow_xq,
+        stock_hot_tweet_xq,
+    )
 
-"""
-数库-A股新闻情绪指数
-"""
-from akshare.index.index_zh_a_scope import index_news_sentiment_scope
+    """
+    东方财富-股票数据-龙虎榜
+    """
+    from akshare.stock_feature.stock_lhb_em import (
+        stock_lhb_hyyyb_em,
+        stock_lhb_detail_em,
+        stock_lhb_stock_detail_em,
+        stock_lhb_jgmmtj_em,
+        stock_lhb_stock_statistic_em,
+        stock_lhb_stock_detail_date_em,
+        stock_lhb_yybph_em,
+        stock_lhb_jgstatistic_em,
+        stock_lhb_traderstatistic_em,
+    )
 
-"""
-申万宏源研究-申万指数-指数发布-基金指数-实时行情
-"""
-from akshare.index.index_research_fund_sw import index_hist_fund_sw, index_realtime_fund_sw
+    """
+    指数行情数据
+    """
+    from akshare.index.index_zh_em import (
+        index_zh_a_hist,
+        index_zh_a_hist_min_em,
+        index_code_id_map_em,
+    )
 
-"""
-东方财富-财经早餐
-"""
-from akshare.stock_feature.stock_info import (
-    stock_info_cjzc_em,
-    stock_info_global_em,
-    stock_info_global_ths,
-    stock_info_global_futu,
-    stock_info_global_sina,
-    stock_info_global_cls,
-    stock_info_broker_sina,
-)
+    """
+    东方财富个股人气榜-A股
+    """
+    from akshare.stock.stock_hot_rank_em import (
+        stock_hot_rank_detail_em,
+        stock_hot_rank_em,
+        stock_hot_rank_detail_realtime_em,
+        stock_hot_rank_relate_em,
+        stock_hot_keyword_em,
+        stock_hot_rank_latest_em,
+    )
+    from akshare.stock.stock_hot_up_em import stock_hot_up_em
+
+    """
+    东方财富个股人气榜-港股
+    """
+    from akshare.stock.stock_hk_hot_rank_em import (
+        stock_hk_hot_rank_detail_em,
+        stock_hk_hot_rank_latest_em,
+        stock_hk_hot_rank_detail_realtime_em,
+        stock_hk_hot_rank_em,
+    )
 
-"""
-期货交易-参数汇总查询
-"""
-from akshare.futures_derivative.futures_contract_info_shfe import futures_contract_info_shfe
-from akshare.futures_derivative.futures_contract_info_dce import futures_contract_info_dce
-from akshare.futures_derivative.futures_contract_info_czce import futures_contract_info_czce
-from akshare.futures_derivative.futures_contract_info_gfex import futures_contract_info_gfex
-from akshare.futures_derivative.futures_contract_info_cffex import futures_contract_info_cffex
-from akshare.futures_derivative.futures_contract_info_ine import futures_contract_info_ine
+    """
+    财新指数
+    """
+    from akshare.index.index_cx import (
+        index_pmi_com_cx,
+        index_pmi_man_cx,
+        index_pmi_ser_cx,
+        index_dei_cx,
+        index_ii_cx,
+        index_si_cx,
+        index_fi_cx,
+        index_bi_cx,
+        index_ci_cx,
+        index_awpr_cx,
+        index_cci_cx,
+        index_li_cx,
+        index_neaw_cx,
+        index_nei_cx,
+        index_ti_cx,
+        index_ai_cx,
+        index_neei_cx,
+        index_bei_cx,
+        index_qli_cx,
+    )
 
-"""
-上海期货交易所-指定交割仓库-库存周报
-"""
-from akshare.futures.futures_stock_js import futures_stock_shfe_js
+    """
+    期权折溢价分析
+    """
+    from akshare.option.option_premium_analysis_em import (
+        option_premium_analysis_em,
+    )
 
-"""
-东方财富-数据中心-沪深港通-市场概括-分时数据
-"""
-from akshare.stock_feature.stock_hsgt_min_em import stock_hsgt_fund_min_em
+    """
+    期权风险分析
+    """
+    from akshare.option.option_risk_analysis_em import option_risk_analysis_em
+
+    """
+    期权价值分析
+    """
+    from akshare.option.option_value_analysis_em import option_value_analysis_em
+
+    """
+    期权龙虎榜
+    """
+    from akshare.option.option_lhb_em import option_lhb_em
+
+    """
+    东方财富网-数据中心-股东分析
+    """
+    from akshare.stock_feature.stock_gdfx_em import (
+        stock_gdfx_holding_analyse_em,
+        stock_gdfx_free_holding_analyse_em,
+        stock_gdfx_free_top_10_em,
+        stock_gdfx_top_10_em,
+        stock_gdfx_free_holding_detail_em,
+        stock_gdfx_holding_detail_em,
+        stock_gdfx_free_holding_change_em,
+        stock_gdfx_holding_change_em,
+        stock_gdfx_free_holding_statistics_em,
+        stock_gdfx_holding_statistics_em,
+        stock_gdfx_free_holding_teamwork_em,
+        stock_gdfx_holding_teamwork_em,
+    )
 
-"""
-东方财富网-行情中心-期货市场-国际期货
-"""
-from akshare.futures.futures_hf_em import futures_global_spot_em, futures_global_hist_em
+    """
+    中国食糖指数
+    """
+    from akshare.index.index_sugar import (
+        index_sugar_msweet,
+        index_inner_quote_sugar_msweet,
+        index_outer_quote_sugar_msweet,
+    )
 
-"""
-雪球行情数据
-"""
-from akshare.stock.stock_xq import (
-    stock_individual_spot_xq,
-)
+    """
+    东方财富-个股信息
+    """
+    from akshare.stock.stock_info_em import stock_individual_info_em
+
+    """
+    上海黄金交易所-数据资讯-行情走势
+    """
+    from akshare.spot.spot_sge import (
+        spot_hist_sge,
+        spot_symbol_table_sge,
+        spot_silver_benchmark_sge,
+        spot_golden_benchmark_sge,
+        spot_quotations_sge,
+    )
 
-"""
-港股盈利预测
-"""
-from akshare.stock_fundamental.stock_profit_forecast_hk_etnet import stock_hk_profit_forecast_et
+    """
+    股票回购
+    """
+    from akshare.stock.stock_repurchase_em import stock_repurchase_em
+
+    """
+    东方财富-行业板块
+    """
+    from akshare.stock.stock_board_industry_em import (
+        stock_board_industry_cons_em,
+        stock_board_industry_hist_em,
+        stock_board_industry_hist_min_em,
+        stock_board_industry_name_em,
+        stock_board_industry_spot_em,
+    )
 
-"""
-巨潮资讯-首页-公告查询-信息披露
-"""
-from akshare.stock_feature.stock_disclosure_cninfo import (
-    stock_zh_a_disclosure_relation_cninfo,
-    stock_zh_a_disclosure_report_cninfo,
-)
+    """
+    天天基金网-基金数据-规模变动
+    """
+    from akshare.fund.fund_scale_em import (
+        fund_scale_change_em,
+        fund_hold_structure_em,
+    )
 
-"""
-东财财富-分时数据
-"""
-from akshare.stock.stock_intraday_sina import stock_intraday_sina
+    """
+    天天基金网-基金数据-分红送配
+    """
+    from akshare.fund.fund_fhsp_em import fund_cf_em, fund_fh_rank_em, fund_fh_em
+
+    """
+    艺恩-艺人
+    """
+    from akshare.movie.artist_yien import (
+        online_value_artist,
+        business_value_artist,
+    )
 
-"""
-股票日行情
-"""
-from akshare.stock_feature.stock_hist_tx import stock_zh_a_hist_tx
+    """
+    艺恩-视频放映
+    """
+    from akshare.movie.video_yien import video_variety_show, video_tv
+
+    """
+    同花顺-数据中心-技术选股
+    """
+    from akshare.stock_feature.stock_technology_ths import (
+        stock_rank_cxg_ths,
+        stock_rank_cxd_ths,
+        stock_rank_lxsz_ths,
+        stock_rank_lxxd_ths,
+        stock_rank_cxfl_ths,
+        stock_rank_cxsl_ths,
+        stock_rank_xstp_ths,
+        stock_rank_xxtp_ths,
+        stock_rank_ljqd_ths,
+        stock_rank_ljqs_ths,
+        stock_rank_xzjp_ths,
+    )
 
-"""
-筹码分布
-"""
-from akshare.stock_feature.stock_cyq_em import stock_cyq_em
+    """
+    沪深港通持股
+    """
+    from akshare.stock_feature.stock_hsgt_em import (
+        stock_hsgt_individual_em,
+        stock_hsgt_individual_detail_em,
+        stock_hsgt_fund_flow_summary_em,
+    )
 
-"""
-东财财富-分时数据
-"""
-from akshare.stock.stock_intraday_em import stock_intraday_em
+    """
+    基金规模
+    """
+    from akshare.fund.fund_scale_sina import (
+        fund_scale_open_sina,
+        fund_scale_close_sina,
+        fund_scale_structured_sina,
+    )
 
-"""
-美股指数行情
-"""
-from akshare.index.index_stock_us_sina import index_us_stock_sina
+    """
+    巨潮资讯-数据中心-专题统计-基金报表
+    """
+    from akshare.fund.fund_report_cninfo import (
+        fund_report_stock_cninfo,
+        fund_report_industry_allocation_cninfo,
+        fund_report_asset_allocation_cninfo,
+    )
 
-"""
-董监高及相关人员持股变动
-"""
-from akshare.stock.stock_share_hold import (
-    stock_share_hold_change_bse,
-    stock_share_hold_change_sse,
-    stock_share_hold_change_szse,
-)
+    """
+    巨潮资讯-数据中心-专题统计-债券报表-债券发行
+    """
+    from akshare.bond.bond_issue_cninfo import (
+        bond_treasure_issue_cninfo,
+        bond_local_government_issue_cninfo,
+        bond_corporate_issue_cninfo,
+        bond_cov_issue_cninfo,
+        bond_cov_stock_issue_cninfo,
+    )
 
-"""
-东方财富网-数据中心-研究报告-个股研报
-"""
-from akshare.stock_feature.stock_research_report_em import stock_research_report_em
+    """
+    巨潮资讯-数据中心-专题统计-公司治理-股权质押
+    """
+    from akshare.stock.stock_cg_equity_mortgage import (
+        stock_cg_equity_mortgage_cninfo,
+    )
 
-"""
-东方财富网-数据中心-重大合同-重大合同明细
-"""
-from akshare.stock_feature.stock_zdhtmx_em import stock_zdhtmx_em
+    """
+    巨潮资讯-数据中心-专题统计-公司治理-公司诉讼
+    """
+    from akshare.stock.stock_cg_lawsuit import stock_cg_lawsuit_cninfo
+
+    """
+    巨潮资讯-数据中心-专题统计-公司治理-对外担保
+    """
+    from akshare.stock.stock_cg_guarantee import stock_cg_guarantee_cninfo
+
+    """
+    B 股
+    """
+    from akshare.stock.stock_zh_b_sina import (
+        stock_zh_b_spot,
+        stock_zh_b_daily,
+        stock_zh_b_minute,
+    )
 
-"""
-东方财富网-数据中心-股东大会
-"""
-from akshare.stock_feature.stock_gddh_em import stock_gddh_em
+    """
+    期货手续费
+    """
+    from akshare.futures.futures_comm_qihuo import futures_comm_info
+    from akshare.futures.futures_comm_ctp import futures_fees_info
+
+    """
+    实际控制人持股变动
+    """
+    from akshare.stock.stock_hold_control_cninfo import (
+        stock_hold_control_cninfo,
+        stock_hold_management_detail_cninfo,
+    )
 
-"""
-东方财富网-数据中心-股市日历
-"""
-from akshare.stock.stock_gsrl_em import stock_gsrl_gsdt_em
+    """
+    股东人数及持股集中度
+    """
+    from akshare.stock.stock_hold_num_cninfo import stock_hold_num_cninfo
+
+    """
+    新股过会
+    """
+    from akshare.stock.stock_new_cninfo import (
+        stock_new_gh_cninfo,
+        stock_new_ipo_cninfo,
+    )
 
-"""
-东方财富网-数据中心-特色数据-高管持股
-"""
-from akshare.stock.stock_hold_control_em import (
-    stock_hold_management_detail_em,
-    stock_hold_management_person_em,
-)
+    """
+    个股分红
+    """
+    from akshare.stock.stock_dividend_cninfo import stock_dividend_cninfo
+
+    """
+    公司股本变动
+    """
+    from akshare.stock.stock_share_changes_cninfo import stock_share_change_cninfo
+
+    """
+    行业分类数据
+    """
+    from akshare.stock.stock_industry_cninfo import (
+        stock_industry_category_cninfo,
+        stock_industry_change_cninfo,
+    )
 
-"""
-新浪财经-债券-可转债
-"""
-from akshare.bond.bond_cb_sina import bond_cb_profile_sina, bond_cb_summary_sina
+    """
+    行业市盈率
+    """
+    from akshare.stock.stock_industry_pe_cninfo import (
+        stock_industry_pe_ratio_cninfo,
+    )
 
-"""
-上证e互动
-"""
-from akshare.stock_feature.stock_sns_sseinfo import stock_sns_sseinfo
+    """
+    申万宏源行业分类数据
+    """
+
+    from akshare.stock.stock_industry_sw import stock_industry_clf_hist_sw
+
+    """
+    投资评级
+    """
+    from akshare.stock.stock_rank_forecast import stock_rank_forecast_cninfo
+
+    """
+    美股-知名美股
+    """
+    from akshare.stock.stock_us_famous import stock_us_famous_spot_em
+
+    """
+    美股-粉单市场
+    """
+    from akshare.stock.stock_us_pink import stock_us_pink_spot_em
+
+    """
+    REITs
+    """
+    from akshare.reits.reits_basic import reits_realtime_em, reits_hist_em
+
+    """
+    全部 A 股-等权重市盈率、中位数市盈率
+    全部 A 股-等权重、中位数市净率
+    """
+    from akshare.stock_feature.stock_ttm_lyr import stock_a_ttm_lyr
+    from akshare.stock_feature.stock_all_pb import stock_a_all_pb
+
+    """
+    奥运奖牌
+    """
+    from akshare.sport.sport_olympic import sport_olympic_hist
+
+    """
+    宏观-加拿大
+    """
+    from akshare.economic.macro_canada import (
+        macro_canada_cpi_monthly,
+        macro_canada_core_cpi_monthly,
+        macro_canada_bank_rate,
+        macro_canada_core_cpi_yearly,
+        macro_canada_cpi_yearly,
+        macro_canada_gdp_monthly,
+        macro_canada_new_house_rate,
+        macro_canada_retail_rate_monthly,
+        macro_canada_trade,
+        macro_canada_unemployment_rate,
+    )
 
-"""
-互动易-提问与回答
-"""
-from akshare.stock_feature.stock_irm_cninfo import (
-    stock_irm_cninfo,
-    stock_irm_ans_cninfo,
-)
+    """
+    猪肉价格信息
+    """
+    from akshare.futures_derivative.futures_hog import (
+        futures_hog_core,
+        futures_hog_cost,
+        futures_hog_supply,
+    )
 
-"""
-基金公告-人事公告
-"""
-from akshare.fund.fund_announcement import fund_announcement_personnel_em
+    """
+    宏观-澳大利亚
+    """
+    from akshare.economic.macro_australia import (
+        macro_australia_bank_rate,
+        macro_australia_unemployment_rate,
+        macro_australia_trade,
+        macro_australia_cpi_quarterly,
+        macro_australia_cpi_yearly,
+        macro_australia_ppi_quarterly,
+        macro_australia_retail_rate_monthly,
+    )
 
-"""
-新浪财经-ESG评级中心
-"""
-from akshare.stock_feature.stock_esg_sina import (
-    stock_esg_msci_sina,
-    stock_esg_rft_sina,
-    stock_esg_rate_sina,
-    stock_esg_zd_sina,
-    stock_esg_hz_sina,
-)
+    """
+    融资融券-深圳
+    """
+    from akshare.stock_feature.stock_margin_szse import (
+        stock_margin_underlying_info_szse,
+        stock_margin_detail_szse,
+        stock_margin_szse,
+    )
 
-"""
-LOF 行情数据
-"""
-from akshare.fund.fund_lof_em import (
-    fund_lof_hist_em,
-    fund_lof_spot_em,
-    fund_lof_hist_min_em,
-)
+    """
+    英国-宏观
+    """
+    from akshare.economic.macro_uk import (
+        macro_uk_gdp_yearly,
+        macro_uk_gdp_quarterly,
+        macro_uk_retail_yearly,
+        macro_uk_rightmove_monthly,
+        macro_uk_rightmove_yearly,
+        macro_uk_unemployment_rate,
+        macro_uk_halifax_monthly,
+        macro_uk_bank_rate,
+        macro_uk_core_cpi_monthly,
+        macro_uk_core_cpi_yearly,
+        macro_uk_cpi_monthly,
+        macro_uk_cpi_yearly,
+        macro_uk_halifax_yearly,
+        macro_uk_retail_monthly,
+        macro_uk_trade,
+    )
 
-"""
-同花顺-财务指标-主要指标
-"""
-from akshare.stock_fundamental.stock_finance_ths import (
-    stock_financial_abstract_ths,
-    stock_financial_debt_ths,
-    stock_financial_benefit_ths,
-    stock_financial_cash_ths,
-    stock_management_change_ths,
-    stock_shareholder_change_ths,
-)
+    """
+    日本-宏观
+    """
+    from akshare.economic.macro_japan import (
+        macro_japan_bank_rate,
+        macro_japan_core_cpi_yearly,
+        macro_japan_cpi_yearly,
+        macro_japan_head_indicator,
+        macro_japan_unemployment_rate,
+    )
 
-"""
-港股股票指数数据-新浪-东财
-"""
-from akshare.index.index_stock_hk import (
-    stock_hk_index_spot_sina,
-    stock_hk_index_daily_em,
-    stock_hk_index_spot_em,
-    stock_hk_index_daily_sina,
-)
+    """
+    瑞士-宏观
+    """
+    from akshare.economic.macro_swiss import (
+        macro_swiss_trade,
+        macro_swiss_svme,
+        macro_swiss_cpi_yearly,
+        macro_swiss_gbd_yearly,
+        macro_swiss_gbd_bank_rate,
+        macro_swiss_gdp_quarterly,
+    )
 
-"""
-同花顺-数据中心-可转债
-"""
-from akshare.bond.bond_cb_ths import bond_zh_cov_info_ths
+    """
+    东方财富-概念板块
+    """
+    from akshare.stock.stock_board_concept_em import (
+        stock_board_concept_cons_em,
+        stock_board_concept_hist_em,
+        stock_board_concept_hist_min_em,
+        # stock_board_concept_name_em,
+        stock_board_concept_spot_em,
+    )
 
-"""
-同花顺-港股-分红派息
-"""
-from akshare.stock.stock_hk_fhpx_ths import stock_hk_fhpx_detail_ths
+    """
+    德国-经济指标
+    """
+    from akshare.economic.macro_germany import (
+        macro_germany_gdp,
+        macro_germany_ifo,
+        macro_germany_cpi_monthly,
+        macro_germany_retail_sale_monthly,
+        macro_germany_trade_adjusted,
+        macro_germany_retail_sale_yearly,
+        macro_germany_cpi_yearly,
+        macro_germany_zew,
+    )
 
-"""
-同花顺-分红融资
-"""
-from akshare.stock_feature.stock_fhps_ths import stock_fhps_detail_ths
+    """
+    基金规模和规模趋势
+    """
+    from akshare.fund.fund_aum_em import (
+        fund_aum_em,
+        fund_aum_trend_em,
+        fund_aum_hist_em,
+    )
 
-"""
-东方财富-行情报价
-"""
-from akshare.stock.stock_ask_bid_em import stock_bid_ask_em
+    """
+    CME 比特币成交量
+    """
+    from akshare.crypto.crypto_bitcoin_cme import crypto_bitcoin_cme
+
+    """
+    盘口异动
+    """
+    from akshare.stock_feature.stock_pankou_em import (
+        stock_changes_em,
+        stock_board_change_em,
+    )
 
-"""
-同花顺-盈利预测
-"""
-from akshare.stock_fundamental.stock_profit_forecast_ths import (
-    stock_profit_forecast_ths,
-)
+    """
+    A 股东方财富
+    """
+    from akshare.stock_feature.stock_hist_em import (
+        # stock_zh_a_spot_em,
+        stock_bj_a_spot_em,
+        stock_new_a_spot_em,
+        stock_kc_a_spot_em,
+        stock_cy_a_spot_em,
+        stock_sh_a_spot_em,
+        stock_sz_a_spot_em,
+        stock_zh_b_spot_em,
+        stock_zh_a_hist,
+        stock_hk_spot_em,
+        stock_hk_main_board_spot_em,
+        stock_hk_hist,
+        stock_us_spot_em,
+        stock_us_hist,
+        stock_zh_a_hist_min_em,
+        stock_zh_a_hist_pre_min_em,
+        stock_hk_hist_min_em,
+        stock_us_hist_min_em,
+    )
 
-"""
-期货资讯
-"""
-from akshare.futures.futures_news_shmet import futures_news_shmet
+    """
+    中行人民币牌价历史数据查询
+    """
+    from akshare.currency.currency_china_bank_sina import currency_boc_sina
+
+    """
+    期货持仓
+    """
+    from akshare.futures_derivative.futures_cot_sina import futures_hold_pos_sina
+
+    """
+    股东户数
+    """
+    from akshare.stock_feature.stock_gdhs import (
+        stock_zh_a_gdhs,
+        stock_zh_a_gdhs_detail_em,
+    )
 
-"""
-主营介绍
-"""
-from akshare.stock_fundamental.stock_zyjs_ths import stock_zyjs_ths
+    """
+    两网及退市
+    """
+    from akshare.stock.stock_stop import stock_staq_net_stop
+
+    """
+    涨停板行情
+    """
+    from akshare.stock_feature.stock_ztb_em import (
+        stock_zt_pool_em,
+        stock_zt_pool_previous_em,
+        stock_zt_pool_dtgc_em,
+        stock_zt_pool_zbgc_em,
+        stock_zt_pool_strong_em,
+        stock_zt_pool_sub_new_em,
+    )
 
-"""
-东方财富-ETF 行情
-"""
-from akshare.fund.fund_etf_em import (
-    fund_etf_hist_em,
-    fund_etf_hist_min_em,
-    fund_etf_spot_em,
-)
+    """
+    中国-香港-宏观
+    """
+    from akshare.economic.macro_china_hk import (
+        macro_china_hk_cpi,
+        macro_china_hk_cpi_ratio,
+        macro_china_hk_trade_diff_ratio,
+        macro_china_hk_gbp_ratio,
+        macro_china_hk_building_amount,
+        macro_china_hk_building_volume,
+        macro_china_hk_gbp,
+        macro_china_hk_ppi,
+        macro_china_hk_rate_of_unemployment,
+    )
 
-"""
-乐咕乐股-股债利差
-"""
-from akshare.stock_feature.stock_ebs_lg import stock_ebs_lg
+    """
+    增发和配股
+    """
+    from akshare.stock_feature.stock_zf_pg import stock_qbzf_em, stock_pg_em
+
+    """
+    汽车销量
+    """
+    from akshare.other.other_car_gasgoo import car_sale_rank_gasgoo
+    from akshare.other.other_car_cpca import (
+        car_market_cate_cpca,
+        car_market_fuel_cpca,
+        car_market_segment_cpca,
+        car_market_country_cpca,
+        car_market_man_rank_cpca,
+        car_market_total_cpca,
+    )
 
-"""
-乐咕乐股-基金仓位
-"""
-from akshare.fund.fund_position_lg import (
-    fund_stock_position_lg,
-    fund_balance_position_lg,
-    fund_linghuo_position_lg,
-)
+    """
+    中国公路物流运价、运量指数
+    """
+    from akshare.index.index_cflp import index_price_cflp, index_volume_cflp
+
+    """
+    赚钱效应分析
+    """
+    from akshare.stock_feature.stock_market_legu import stock_market_activity_legu
+
+    """
+    浙江省排污权交易指数
+    """
+    from akshare.index.index_eri import index_eri
+
+    """
+    Drewry 集装箱指数
+    """
+    from akshare.index.index_drewry import drewry_wci_index
+
+    """
+    柯桥指数
+    """
+    from akshare.index.index_kq_fz import index_kq_fz
+    from akshare.index.index_kq_ss import index_kq_fashion
+
+    """
+    问财-热门股票
+    """
+    from akshare.stock_feature.stock_wencai import stock_hot_rank_wc
+
+    """
+    新发基金
+    """
+    from akshare.fund.fund_init_em import fund_new_found_em
+
+    """
+    高管持股
+    """
+    from akshare.stock_feature.stock_gdzjc_em import stock_ggcg_em
+
+    """
+    同花顺-数据中心-资金流向-概念资金流
+    """
+    from akshare.stock_feature.stock_fund_flow import (
+        stock_fund_flow_concept,
+        stock_fund_flow_industry,
+        stock_fund_flow_big_deal,
+        stock_fund_flow_individual,
+    )
 
-"""
-乐咕乐股-大盘拥挤度
-"""
-from akshare.stock_feature.stock_congestion_lg import stock_a_congestion_lg
+    """
+    比特币持仓
+    """
+    from akshare.crypto.crypto_hold import crypto_bitcoin_hold_report
+
+    """
+    证券交易营业部排行
+    """
+    from akshare.stock_feature.stock_lh_yybpm import (
+        stock_lh_yyb_capital,
+        stock_lh_yyb_most,
+        stock_lh_yyb_control,
+    )
 
-"""
-乐咕乐股-股息率-A 股股息率
-"""
-from akshare.stock_feature.stock_gxl_lg import stock_a_gxl_lg, stock_hk_gxl_lg
+    """
+    沪深 A 股公告
+    """
+    from akshare.stock_fundamental.stock_notice import stock_notice_report
+
+    """
+    首发企业申报
+    """
+    from akshare.stock_fundamental.stock_ipo_declare import stock_ipo_declare
+
+    """
+    三大报表
+    """
+    from akshare.stock_feature.stock_report_em import (
+        stock_zcfz_em,
+        stock_zcfz_bj_em,
+        stock_lrb_em,
+        stock_xjll_em,
+    )
 
-"""
-东方财富-限售解禁股
-"""
-from akshare.stock_fundamental.stock_restricted_em import (
-    stock_restricted_release_stockholder_em,
-    stock_restricted_release_summary_em,
-    stock_restricted_release_detail_em,
-    stock_restricted_release_queue_em,
-)
+    """
+    业绩报告
+    """
+    from akshare.stock_feature.stock_yjbb_em import stock_yjbb_em
+
+    """
+    同花顺-概念板块
+    """
+    from akshare.stock_feature.stock_board_concept_ths import (
+        stock_board_concept_info_ths,
+        stock_board_concept_summary_ths,
+        stock_board_concept_index_ths,
+        stock_board_concept_name_ths,
+    )
 
-"""
-同花顺行业一览表
-"""
-from akshare.stock_feature.stock_board_industry_ths import (
-    stock_board_industry_summary_ths,
-)
+    """
+    同花顺-行业板块
+    """
+    from akshare.stock_feature.stock_board_industry_ths import (
+        stock_board_industry_name_ths,
+        stock_board_industry_info_ths,
+        stock_board_industry_index_ths,
+        stock_ipo_benefit_ths,
+        stock_xgsr_ths,
+    )
 
-"""
-生猪市场价格指数
-"""
-from akshare.index.index_hog import index_hog_spot_price
+    """
+    分红配送
+    """
+    from akshare.stock_feature.stock_fhps_em import stock_fhps_em, stock_fhps_detail_em
+
+    """
+    中美国债收益率
+    """
+    from akshare.bond.bond_em import bond_zh_us_rate
+
+    """
+    盈利预测
+    """
+    from akshare.stock_fundamental.stock_profit_forecast_em import (
+        stock_profit_forecast_em,
+    )
 
-"""
-债券信息查询
-"""
-from akshare.bond.bond_info_cm import (
-    bond_info_detail_cm,
-    bond_info_cm,
-    bond_info_cm_query,
-)
+    """
+    基金经理
+    """
+    from akshare.fund.fund_manager import fund_manager_em
+
+    """
+    基金评级
+    """
+    from akshare.fund.fund_rating import (
+        fund_rating_sh,
+        fund_rating_zs,
+        fund_rating_ja,
+        fund_rating_all,
+    )
 
-"""
-申万宏源研究-指数系列
-"""
-from akshare.index.index_research_sw import (
-    index_realtime_sw,
-    index_hist_sw,
-    index_component_sw,
-    index_min_sw,
-    index_analysis_daily_sw,
-    index_analysis_weekly_sw,
-    index_analysis_monthly_sw,
-    index_analysis_week_month_sw,
-)
+    """
+    融资融券数据
+    """
+    from akshare.stock_feature.stock_margin_sse import (
+        stock_margin_detail_sse,
+        stock_margin_sse,
+        stock_margin_ratio_pa,
+    )
 
-"""
-50ETF 期权波动率指数
-"""
-from akshare.index.index_option_qvix import (
-    index_option_50etf_qvix,
-    index_option_300etf_min_qvix,
-    index_option_300etf_qvix,
-    index_option_50etf_min_qvix,
-    index_option_1000index_min_qvix,
-    index_option_1000index_qvix,
-    index_option_100etf_min_qvix,
-    index_option_100etf_qvix,
-    index_option_300index_min_qvix,
-    index_option_300index_qvix,
-    index_option_500etf_min_qvix,
-    index_option_500etf_qvix,
-    index_option_50index_min_qvix,
-    index_option_50index_qvix,
-    index_option_cyb_min_qvix,
-    index_option_cyb_qvix,
-    index_option_kcb_min_qvix,
-    index_option_kcb_qvix,
-)
+    """
+    期货交割和期转现
+    """
+    from akshare.futures.futures_to_spot import (
+        futures_to_spot_czce,
+        futures_to_spot_shfe,
+        futures_to_spot_dce,
+        futures_delivery_dce,
+        futures_delivery_shfe,
+        futures_delivery_czce,
+        futures_delivery_match_dce,
+        futures_delivery_match_czce,
+    )
 
-"""
-百度股市通-外汇-行情榜单
-"""
-from akshare.fx.fx_quote_baidu import fx_quote_baidu
+    """
+    基金持仓
+    """
+    from akshare.fund.fund_portfolio_em import (
+        fund_portfolio_hold_em,
+        fund_portfolio_change_em,
+        fund_portfolio_bond_hold_em,
+        fund_portfolio_industry_allocation_em,
+    )
 
-"""
-乐估乐股-底部研究-巴菲特指标
-"""
-from akshare.stock_feature.stock_buffett_index_lg import stock_buffett_index_lg
+    """
+    债券概览
+    """
+    from akshare.bond.bond_summary import (
+        bond_deal_summary_sse,
+        bond_cash_summary_sse,
+    )
 
-"""
-百度股市通-热搜股票
-"""
-from akshare.stock.stock_hot_search_baidu import stock_hot_search_baidu
+    """
+    新闻-个股新闻
+    """
+    from akshare.news.news_stock import stock_news_em
+
+    """
+    股票数据-一致行动人
+    """
+    from akshare.stock_feature.stock_yzxdr_em import stock_yzxdr_em
+
+    """
+    大宗交易
+    """
+    from akshare.stock.stock_dzjy_em import (
+        stock_dzjy_sctj,
+        stock_dzjy_mrmx,
+        stock_dzjy_mrtj,
+        stock_dzjy_hygtj,
+        stock_dzjy_yybph,
+        stock_dzjy_hyyybtj,
+    )
 
-"""
-百度股市通- A 股或指数-股评-投票
-"""
-from akshare.stock_feature.stock_zh_vote_baidu import stock_zh_vote_baidu
+    """
+    国证指数
+    """
+    from akshare.index.index_cni import (
+        index_hist_cni,
+        index_all_cni,
+        index_detail_cni,
+        index_detail_hist_cni,
+        index_detail_hist_adjust_cni,
+    )
 
-"""
-百度股市通-A 股-财务报表-估值数据
-"""
-from akshare.stock_feature.stock_zh_valuation_baidu import stock_zh_valuation_baidu
+    """
+    东方财富-期权
+    """
+    from akshare.option.option_em import option_current_em
+
+    """
+    科创板报告
+    """
+    from akshare.stock.stock_zh_kcb_report import stock_zh_kcb_report_em
+
+    """
+    期货合约详情
+    """
+    from akshare.futures.futures_contract_detail import futures_contract_detail
+
+    """
+    胡润排行榜
+    """
+    from akshare.fortune.fortune_hurun import hurun_rank
+
+    """
+    新财富富豪榜
+    """
+    from akshare.fortune.fortune_xincaifu_500 import xincaifu_rank
+
+    """
+    福布斯中国榜单
+    """
+    from akshare.fortune.fortune_forbes_500 import forbes_rank
+
+    """
+    回购定盘利率
+    """
+    from akshare.rate.repo_rate import repo_rate_hist, repo_rate_query
+
+    """
+    公募基金排行
+    """
+    from akshare.fund.fund_rank_em import (
+        fund_exchange_rank_em,
+        fund_money_rank_em,
+        fund_open_fund_rank_em,
+        fund_hk_rank_em,
+        fund_lcx_rank_em,
+    )
 
-"""
-百度股市通-港股-财务报表-估值数据
-"""
-from akshare.stock_feature.stock_hk_valuation_baidu import stock_hk_valuation_baidu
+    """
+    电影票房
+    """
+    from akshare.movie.movie_yien import (
+        movie_boxoffice_cinema_daily,
+        movie_boxoffice_cinema_weekly,
+        movie_boxoffice_weekly,
+        movie_boxoffice_daily,
+        movie_boxoffice_monthly,
+        movie_boxoffice_realtime,
+        movie_boxoffice_yearly,
+        movie_boxoffice_yearly_first_week,
+    )
 
-"""
-巨潮资讯-个股-公司概况
-"""
-from akshare.stock.stock_profile_cninfo import stock_profile_cninfo
+    """
+    新闻联播文字稿
+    """
+    from akshare.news.news_cctv import news_cctv
 
-"""
-巨潮资讯-个股-上市相关
-"""
-from akshare.stock.stock_ipo_summary_cninfo import stock_ipo_summary_cninfo
+    """
+    债券收盘收益率曲线历史数据
+    """
+    from akshare.bond.bond_china_money import (
+        bond_china_close_return,
+        macro_china_bond_public,
+        macro_china_swap_rate,
+        bond_china_close_return_map,
 
-"""
-巨潮资讯-数据浏览器-筹资指标-公司配股实施方案
-"""
-from akshare.stock.stock_allotment_cninfo import stock_allotment_cninfo
+    )
 
-"""
-沪深港股通-参考汇率和结算汇率
-"""
-from akshare.stock_feature.stock_hsgt_exchange_rate import (
-    stock_sgt_reference_exchange_rate_sse,
-    stock_sgt_settlement_exchange_rate_sse,
-    stock_sgt_reference_exchange_rate_szse,
-    stock_sgt_settlement_exchange_rate_szse,
-)
+    """
+    COMEX黄金-白银库存
+    """
+    from akshare.futures.futures_comex_em import futures_comex_inventory
+
+    """
+    A 股-特别标的
+    """
+    from akshare.stock.stock_zh_a_special import (
+        stock_zh_a_new,
+        stock_zh_a_st_em,
+        stock_zh_a_new_em,
+        stock_zh_a_stop_em,
+    )
 
-"""
-中国债券信息网-中债指数-中债指数族系-总指数-综合类指数
-"""
-from akshare.bond.bond_cbond import (
-    bond_new_composite_index_cbond,
-    bond_composite_index_cbond,
-)
+    """
+    东方财富-注册制审核
+    """
+    from akshare.stock_fundamental.stock_register_em import (
+        stock_register_kcb,
+        stock_register_cyb,
+        stock_register_bj,
+        stock_register_db,
+        stock_register_sh,
+        stock_register_sz
+    )
 
-"""
-行业板块
-"""
-from akshare.stock_feature.stock_classify_sina import stock_classify_sina
+    """
+    新浪财经-龙虎榜
+    """
+    from akshare.stock_feature.stock_lhb_sina import (
+        stock_lhb_detail_daily_sina,
+        stock_lhb_ggtj_sina,
+        stock_lhb_jgmx_sina,
+        stock_lhb_jgzz_sina,
+        stock_lhb_yytj_sina,
+    )
 
-"""
-管理层讨论与分析
-"""
-from akshare.stock_fundamental.stock_mda_ym import stock_mda_ym
-
-"""
-主营构成
-"""
-from akshare.stock_fundamental.stock_zygc import stock_zygc_ym, stock_zygc_em
-
-"""
-人民币汇率中间价
-"""
-from akshare.currency.currency_safe import currency_boc_safe
-
-"""
-期权-上海证券交易所-风险指标
-"""
-from akshare.option.option_risk_indicator_sse import option_risk_indicator_sse
-
-"""
-全球宏观事件
-"""
-from akshare.news.news_baidu import (
-    news_economic_baidu,
-    news_trade_notify_suspend_baidu,
-    news_report_time_baidu,
-    news_trade_notify_dividend_baidu,
-)
-
-"""
-东方财富-股票-财务分析
-"""
-from akshare.stock_feature.stock_three_report_em import (
-    stock_balance_sheet_by_report_em,
-    stock_balance_sheet_by_yearly_em,
-    stock_profit_sheet_by_report_em,
-    stock_profit_sheet_by_quarterly_em,
-    stock_profit_sheet_by_yearly_em,
-    stock_cash_flow_sheet_by_report_em,
-    stock_cash_flow_sheet_by_quarterly_em,
-    stock_cash_flow_sheet_by_yearly_em,
-    stock_balance_sheet_by_report_delisted_em,
-    stock_profit_sheet_by_report_delisted_em,
-    stock_cash_flow_sheet_by_report_delisted_em,
-)
-
-"""
-内部交易
-"""
-from akshare.stock_feature.stock_inner_trade_xq import stock_inner_trade_xq
-
-"""
-股票热度-雪球
-"""
-from akshare.stock_feature.stock_hot_xq import (
-    stock_hot_deal_xq,
-    stock_hot_follow_xq,
-    stock_hot_tweet_xq,
-)
-
-"""
-东方财富-股票数据-龙虎榜
-"""
-from akshare.stock_feature.stock_lhb_em import (
-    stock_lhb_hyyyb_em,
-    stock_lhb_detail_em,
-    stock_lhb_stock_detail_em,
-    stock_lhb_jgmmtj_em,
-    stock_lhb_stock_statistic_em,
-    stock_lhb_stock_detail_date_em,
-    stock_lhb_yybph_em,
-    stock_lhb_jgstatistic_em,
-    stock_lhb_traderstatistic_em,
-)
-
-"""
-指数行情数据
-"""
-from akshare.index.index_zh_em import (
-    index_zh_a_hist,
-    index_zh_a_hist_min_em,
-    index_code_id_map_em,
-)
-
-"""
-东方财富个股人气榜-A股
-"""
-from akshare.stock.stock_hot_rank_em import (
-    stock_hot_rank_detail_em,
-    stock_hot_rank_em,
-    stock_hot_rank_detail_realtime_em,
-    stock_hot_rank_relate_em,
-    stock_hot_keyword_em,
-    stock_hot_rank_latest_em,
-)
-from akshare.stock.stock_hot_up_em import stock_hot_up_em
-
-"""
-东方财富个股人气榜-港股
-"""
-from akshare.stock.stock_hk_hot_rank_em import (
-    stock_hk_hot_rank_detail_em,
-    stock_hk_hot_rank_latest_em,
-    stock_hk_hot_rank_detail_realtime_em,
-    stock_hk_hot_rank_em,
-)
-
-"""
-财新指数
-"""
-from akshare.index.index_cx import (
-    index_pmi_com_cx,
-    index_pmi_man_cx,
-    index_pmi_ser_cx,
-    index_dei_cx,
-    index_ii_cx,
-    index_si_cx,
-    index_fi_cx,
-    index_bi_cx,
-    index_ci_cx,
-    index_awpr_cx,
-    index_cci_cx,
-    index_li_cx,
-    index_neaw_cx,
-    index_nei_cx,
-    index_ti_cx,
-    index_ai_cx,
-    index_neei_cx,
-    index_bei_cx,
-    index_qli_cx,
-)
-
-"""
-期权折溢价分析
-"""
-from akshare.option.option_premium_analysis_em import (
-    option_premium_analysis_em,
-)
-
-"""
-期权风险分析
-"""
-from akshare.option.option_risk_analysis_em import option_risk_analysis_em
-
-"""
-期权价值分析
-"""
-from akshare.option.option_value_analysis_em import option_value_analysis_em
-
-"""
-期权龙虎榜
-"""
-from akshare.option.option_lhb_em import option_lhb_em
-
-"""
-东方财富网-数据中心-股东分析
-"""
-from akshare.stock_feature.stock_gdfx_em import (
-    stock_gdfx_holding_analyse_em,
-    stock_gdfx_free_holding_analyse_em,
-    stock_gdfx_free_top_10_em,
-    stock_gdfx_top_10_em,
-    stock_gdfx_free_holding_detail_em,
-    stock_gdfx_holding_detail_em,
-    stock_gdfx_free_holding_change_em,
-    stock_gdfx_holding_change_em,
-    stock_gdfx_free_holding_statistics_em,
-    stock_gdfx_holding_statistics_em,
-    stock_gdfx_free_holding_teamwork_em,
-    stock_gdfx_holding_teamwork_em,
-)
-
-"""
-中国食糖指数
-"""
-from akshare.index.index_sugar import (
-    index_sugar_msweet,
-    index_inner_quote_sugar_msweet,
-    index_outer_quote_sugar_msweet,
-)
-
-"""
-东方财富-个股信息
-"""
-from akshare.stock.stock_info_em import stock_individual_info_em
-
-"""
-上海黄金交易所-数据资讯-行情走势
-"""
-from akshare.spot.spot_sge import (
-    spot_hist_sge,
-    spot_symbol_table_sge,
-    spot_silver_benchmark_sge,
-    spot_golden_benchmark_sge,
-    spot_quotations_sge,
-)
-
-"""
-股票回购
-"""
-from akshare.stock.stock_repurchase_em import stock_repurchase_em
-
-"""
-东方财富-行业板块
-"""
-from akshare.stock.stock_board_industry_em import (
-    stock_board_industry_cons_em,
-    stock_board_industry_hist_em,
-    stock_board_industry_hist_min_em,
-    stock_board_industry_name_em,
-    stock_board_industry_spot_em,
-)
-
-"""
-天天基金网-基金数据-规模变动
-"""
-from akshare.fund.fund_scale_em import (
-    fund_scale_change_em,
-    fund_hold_structure_em,
-)
-
-"""
-天天基金网-基金数据-分红送配
-"""
-from akshare.fund.fund_fhsp_em import fund_cf_em, fund_fh_rank_em, fund_fh_em
-
-"""
-艺恩-艺人
-"""
-from akshare.movie.artist_yien import (
-    online_value_artist,
-    business_value_artist,
-)
-
-"""
-艺恩-视频放映
-"""
-from akshare.movie.video_yien import video_variety_show, video_tv
-
-"""
-同花顺-数据中心-技术选股
-"""
-from akshare.stock_feature.stock_technology_ths import (
-    stock_rank_cxg_ths,
-    stock_rank_cxd_ths,
-    stock_rank_lxsz_ths,
-    stock_rank_lxxd_ths,
-    stock_rank_cxfl_ths,
-    stock_rank_cxsl_ths,
-    stock_rank_xstp_ths,
-    stock_rank_xxtp_ths,
-    stock_rank_ljqd_ths,
-    stock_rank_ljqs_ths,
-    stock_rank_xzjp_ths,
-)
-
-"""
-沪深港通持股
-"""
-from akshare.stock_feature.stock_hsgt_em import (
-    stock_hsgt_individual_em,
-    stock_hsgt_individual_detail_em,
-    stock_hsgt_fund_flow_summary_em,
-)
-
-"""
-基金规模
-"""
-from akshare.fund.fund_scale_sina import (
-    fund_scale_open_sina,
-    fund_scale_close_sina,
-    fund_scale_structured_sina,
-)
-
-"""
-巨潮资讯-数据中心-专题统计-基金报表
-"""
-from akshare.fund.fund_report_cninfo import (
-    fund_report_stock_cninfo,
-    fund_report_industry_allocation_cninfo,
-    fund_report_asset_allocation_cninfo,
-)
-
-"""
-巨潮资讯-数据中心-专题统计-债券报表-债券发行
-"""
-from akshare.bond.bond_issue_cninfo import (
-    bond_treasure_issue_cninfo,
-    bond_local_government_issue_cninfo,
-    bond_corporate_issue_cninfo,
-    bond_cov_issue_cninfo,
-    bond_cov_stock_issue_cninfo,
-)
-
-"""
-巨潮资讯-数据中心-专题统计-公司治理-股权质押
-"""
-from akshare.stock.stock_cg_equity_mortgage import (
-    stock_cg_equity_mortgage_cninfo,
-)
-
-"""
-巨潮资讯-数据中心-专题统计-公司治理-公司诉讼
-"""
-from akshare.stock.stock_cg_lawsuit import stock_cg_lawsuit_cninfo
-
-"""
-巨潮资讯-数据中心-专题统计-公司治理-对外担保
-"""
-from akshare.stock.stock_cg_guarantee import stock_cg_guarantee_cninfo
-
-"""
-B 股
-"""
-from akshare.stock.stock_zh_b_sina import (
-    stock_zh_b_spot,
-    stock_zh_b_daily,
-    stock_zh_b_minute,
-)
-
-"""
-期货手续费
-"""
-from akshare.futures.futures_comm_qihuo import futures_comm_info
-from akshare.futures.futures_comm_ctp import futures_fees_info
-
-"""
-实际控制人持股变动
-"""
-from akshare.stock.stock_hold_control_cninfo import (
-    stock_hold_control_cninfo,
-    stock_hold_management_detail_cninfo,
-)
-
-"""
-股东人数及持股集中度
-"""
-from akshare.stock.stock_hold_num_cninfo import stock_hold_num_cninfo
-
-"""
-新股过会
-"""
-from akshare.stock.stock_new_cninfo import (
-    stock_new_gh_cninfo,
-    stock_new_ipo_cninfo,
-)
-
-"""
-个股分红
-"""
-from akshare.stock.stock_dividend_cninfo import stock_dividend_cninfo
-
-"""
-公司股本变动
-"""
-from akshare.stock.stock_share_changes_cninfo import stock_share_change_cninfo
-
-"""
-行业分类数据
-"""
-from akshare.stock.stock_industry_cninfo import (
-    stock_industry_category_cninfo,
-    stock_industry_change_cninfo,
-)
-
-"""
-行业市盈率
-"""
-from akshare.stock.stock_industry_pe_cninfo import (
-    stock_industry_pe_ratio_cninfo,
-)
-
-"""
-申万宏源行业分类数据
-"""
-
-from akshare.stock.stock_industry_sw import stock_industry_clf_hist_sw
-
-"""
-投资评级
-"""
-from akshare.stock.stock_rank_forecast import stock_rank_forecast_cninfo
-
-"""
-美股-知名美股
-"""
-from akshare.stock.stock_us_famous import stock_us_famous_spot_em
-
-"""
-美股-粉单市场
-"""
-from akshare.stock.stock_us_pink import stock_us_pink_spot_em
-
-"""
-REITs
-"""
-from akshare.reits.reits_basic import reits_realtime_em, reits_hist_em
-
-"""
-全部 A 股-等权重市盈率、中位数市盈率
-全部 A 股-等权重、中位数市净率
-"""
-from akshare.stock_feature.stock_ttm_lyr import stock_a_ttm_lyr
-from akshare.stock_feature.stock_all_pb import stock_a_all_pb
-
-"""
-奥运奖牌
-"""
-from akshare.sport.sport_olympic import sport_olympic_hist
-
-"""
-宏观-加拿大
-"""
-from akshare.economic.macro_canada import (
-    macro_canada_cpi_monthly,
-    macro_canada_core_cpi_monthly,
-    macro_canada_bank_rate,
-    macro_canada_core_cpi_yearly,
-    macro_canada_cpi_yearly,
-    macro_canada_gdp_monthly,
-    macro_canada_new_house_rate,
-    macro_canada_retail_rate_monthly,
-    macro_canada_trade,
-    macro_canada_unemployment_rate,
-)
-
-"""
-猪肉价格信息
-"""
-from akshare.futures_derivative.futures_hog import (
-    futures_hog_core,
-    futures_hog_cost,
-    futures_hog_supply,
-)
-
-"""
-宏观-澳大利亚
-"""
-from akshare.economic.macro_australia import (
-    macro_australia_bank_rate,
-    macro_australia_unemployment_rate,
-    macro_australia_trade,
-    macro_australia_cpi_quarterly,
-    macro_australia_cpi_yearly,
-    macro_australia_ppi_quarterly,
-    macro_australia_retail_rate_monthly,
-)
-
-"""
-融资融券-深圳
-"""
-from akshare.stock_feature.stock_margin_szse import (
-    stock_margin_underlying_info_szse,
-    stock_margin_detail_szse,
-    stock_margin_szse,
-)
-
-"""
-英国-宏观
-"""
-from akshare.economic.macro_uk import (
-    macro_uk_gdp_yearly,
-    macro_uk_gdp_quarterly,
-    macro_uk_retail_yearly,
-    macro_uk_rightmove_monthly,
-    macro_uk_rightmove_yearly,
-    macro_uk_unemployment_rate,
-    macro_uk_halifax_monthly,
-    macro_uk_bank_rate,
-    macro_uk_core_cpi_monthly,
-    macro_uk_core_cpi_yearly,
-    macro_uk_cpi_monthly,
-    macro_uk_cpi_yearly,
-    macro_uk_halifax_yearly,
-    macro_uk_retail_monthly,
-    macro_uk_trade,
-)
-
-"""
-日本-宏观
-"""
-from akshare.economic.macro_japan import (
-    macro_japan_bank_rate,
-    macro_japan_core_cpi_yearly,
-    macro_japan_cpi_yearly,
-    macro_japan_head_indicator,
-    macro_japan_unemployment_rate,
-)
-
-"""
-瑞士-宏观
-"""
-from akshare.economic.macro_swiss import (
-    macro_swiss_trade,
-    macro_swiss_svme,
-    macro_swiss_cpi_yearly,
-    macro_swiss_gbd_yearly,
-    macro_swiss_gbd_bank_rate,
-    macro_swiss_gdp_quarterly,
-)
-
-"""
-东方财富-概念板块
-"""
-from akshare.stock.stock_board_concept_em import (
-    stock_board_concept_cons_em,
-    stock_board_concept_hist_em,
-    stock_board_concept_hist_min_em,
-    # stock_board_concept_name_em,
-    stock_board_concept_spot_em,
-)
-
-"""
-德国-经济指标
-"""
-from akshare.economic.macro_germany import (
-    macro_germany_gdp,
-    macro_germany_ifo,
-    macro_germany_cpi_monthly,
-    macro_germany_retail_sale_monthly,
-    macro_germany_trade_adjusted,
-    macro_germany_retail_sale_yearly,
-    macro_germany_cpi_yearly,
-    macro_germany_zew,
-)
-
-"""
-基金规模和规模趋势
-"""
-from akshare.fund.fund_aum_em import (
-    fund_aum_em,
-    fund_aum_trend_em,
-    fund_aum_hist_em,
-)
-
-"""
-CME 比特币成交量
-"""
-from akshare.crypto.crypto_bitcoin_cme import crypto_bitcoin_cme
-
-"""
-盘口异动
-"""
-from akshare.stock_feature.stock_pankou_em import (
-    stock_changes_em,
-    stock_board_change_em,
-)
-
-"""
-A 股东方财富
-"""
-from akshare.stock_feature.stock_hist_em import (
-    # stock_zh_a_spot_em,
-    stock_bj_a_spot_em,
-    stock_new_a_spot_em,
-    stock_kc_a_spot_em,
-    stock_cy_a_spot_em,
-    stock_sh_a_spot_em,
-    stock_sz_a_spot_em,
-    stock_zh_b_spot_em,
-    stock_zh_a_hist,
-    stock_hk_spot_em,
-    stock_hk_main_board_spot_em,
-    stock_hk_hist,
-    stock_us_spot_em,
-    stock_us_hist,
-    stock_zh_a_hist_min_em,
-    stock_zh_a_hist_pre_min_em,
-    stock_hk_hist_min_em,
-    stock_us_hist_min_em,
-)
-
-"""
-中行人民币牌价历史数据查询
-"""
-from akshare.currency.currency_china_bank_sina import currency_boc_sina
-
-"""
-期货持仓
-"""
-from akshare.futures_derivative.futures_cot_sina import futures_hold_pos_sina
-
-"""
-股东户数
-"""
-from akshare.stock_feature.stock_gdhs import (
-    stock_zh_a_gdhs,
-    stock_zh_a_gdhs_detail_em,
-)
-
-"""
-两网及退市
-"""
-from akshare.stock.stock_stop import stock_staq_net_stop
-
-"""
-涨停板行情
-"""
-from akshare.stock_feature.stock_ztb_em import (
-    stock_zt_pool_em,
-    stock_zt_pool_previous_em,
-    stock_zt_pool_dtgc_em,
-    stock_zt_pool_zbgc_em,
-    stock_zt_pool_strong_em,
-    stock_zt_pool_sub_new_em,
-)
-
-"""
-中国-香港-宏观
-"""
-from akshare.economic.macro_china_hk import (
-    macro_china_hk_cpi,
-    macro_china_hk_cpi_ratio,
-    macro_china_hk_trade_diff_ratio,
-    macro_china_hk_gbp_ratio,
-    macro_china_hk_building_amount,
-    macro_china_hk_building_volume,
-    macro_china_hk_gbp,
-    macro_china_hk_ppi,
-    macro_china_hk_rate_of_unemployment,
-)
-
-"""
-增发和配股
-"""
-from akshare.stock_feature.stock_zf_pg import stock_qbzf_em, stock_pg_em
-
-"""
-汽车销量
-"""
-from akshare.other.other_car_gasgoo import car_sale_rank_gasgoo
-from akshare.other.other_car_cpca import (
-    car_market_cate_cpca,
-    car_market_fuel_cpca,
-    car_market_segment_cpca,
-    car_market_country_cpca,
-    car_market_man_rank_cpca,
-    car_market_total_cpca,
-)
-
-"""
-中国公路物流运价、运量指数
-"""
-from akshare.index.index_cflp import index_price_cflp, index_volume_cflp
-
-"""
-赚钱效应分析
-"""
-from akshare.stock_feature.stock_market_legu import stock_market_activity_legu
-
-"""
-浙江省排污权交易指数
-"""
-from akshare.index.index_eri import index_eri
-
-"""
-Drewry 集装箱指数
-"""
-from akshare.index.index_drewry import drewry_wci_index
-
-"""
-柯桥指数
-"""
-from akshare.index.index_kq_fz import index_kq_fz
-from akshare.index.index_kq_ss import index_kq_fashion
-
-"""
-问财-热门股票
-"""
-from akshare.stock_feature.stock_wencai import stock_hot_rank_wc
-
-"""
-新发基金
-"""
-from akshare.fund.fund_init_em import fund_new_found_em
-
-"""
-高管持股
-"""
-from akshare.stock_feature.stock_gdzjc_em import stock_ggcg_em
-
-"""
-同花顺-数据中心-资金流向-概念资金流
-"""
-from akshare.stock_feature.stock_fund_flow import (
-    stock_fund_flow_concept,
-    stock_fund_flow_industry,
-    stock_fund_flow_big_deal,
-    stock_fund_flow_individual,
-)
-
-"""
-比特币持仓
-"""
-from akshare.crypto.crypto_hold import crypto_bitcoin_hold_report
-
-"""
-证券交易营业部排行
-"""
-from akshare.stock_feature.stock_lh_yybpm import (
-    stock_lh_yyb_capital,
-    stock_lh_yyb_most,
-    stock_lh_yyb_control,
-)
-
-"""
-沪深 A 股公告
-"""
-from akshare.stock_fundamental.stock_notice import stock_notice_report
-
-"""
-首发企业申报
-"""
-from akshare.stock_fundamental.stock_ipo_declare import stock_ipo_declare
-
-"""
-三大报表
-"""
-from akshare.stock_feature.stock_report_em import (
-    stock_zcfz_em,
-    stock_zcfz_bj_em,
-    stock_lrb_em,
-    stock_xjll_em,
-)
-
-"""
-业绩报告
-"""
-from akshare.stock_feature.stock_yjbb_em import stock_yjbb_em
-
-"""
-同花顺-概念板块
-"""
-from akshare.stock_feature.stock_board_concept_ths import (
-    stock_board_concept_info_ths,
-    stock_board_concept_summary_ths,
-    stock_board_concept_index_ths,
-    stock_board_concept_name_ths,
-)
-
-"""
-同花顺-行业板块
-"""
-from akshare.stock_feature.stock_board_industry_ths import (
-    stock_board_industry_name_ths,
-    stock_board_industry_info_ths,
-    stock_board_industry_index_ths,
-    stock_ipo_benefit_ths,
-    stock_xgsr_ths,
-)
-
-"""
-分红配送
-"""
-from akshare.stock_feature.stock_fhps_em import stock_fhps_em, stock_fhps_detail_em
-
-"""
-中美国债收益率
-"""
-from akshare.bond.bond_em import bond_zh_us_rate
-
-"""
-盈利预测
-"""
-from akshare.stock_fundamental.stock_profit_forecast_em import (
-    stock_profit_forecast_em,
-)
-
-"""
-基金经理
-"""
-from akshare.fund.fund_manager import fund_manager_em
-
-"""
-基金评级
-"""
-from akshare.fund.fund_rating import (
-    fund_rating_sh,
-    fund_rating_zs,
-    fund_rating_ja,
-    fund_rating_all,
-)
-
-"""
-融资融券数据
-"""
-from akshare.stock_feature.stock_margin_sse import (
-    stock_margin_detail_sse,
-    stock_margin_sse,
-    stock_margin_ratio_pa,
-)
-
-"""
-期货交割和期转现
-"""
-from akshare.futures.futures_to_spot import (
-    futures_to_spot_czce,
-    futures_to_spot_shfe,
-    futures_to_spot_dce,
-    futures_delivery_dce,
-    futures_delivery_shfe,
-    futures_delivery_czce,
-    futures_delivery_match_dce,
-    futures_delivery_match_czce,
-)
-
-"""
-基金持仓
-"""
-from akshare.fund.fund_portfolio_em import (
-    fund_portfolio_hold_em,
-    fund_portfolio_change_em,
-    fund_portfolio_bond_hold_em,
-    fund_portfolio_industry_allocation_em,
-)
-
-"""
-债券概览
-"""
-from akshare.bond.bond_summary import (
-    bond_deal_summary_sse,
-    bond_cash_summary_sse,
-)
-
-"""
-新闻-个股新闻
-"""
-from akshare.news.news_stock import stock_news_em
-
-"""
-股票数据-一致行动人
-"""
-from akshare.stock_feature.stock_yzxdr_em import stock_yzxdr_em
-
-"""
-大宗交易
-"""
-from akshare.stock.stock_dzjy_em import (
-    stock_dzjy_sctj,
-    stock_dzjy_mrmx,
-    stock_dzjy_mrtj,
-    stock_dzjy_hygtj,
-    stock_dzjy_yybph,
-    stock_dzjy_hyyybtj,
-)
-
-"""
-国证指数
-"""
-from akshare.index.index_cni import (
-    index_hist_cni,
-    index_all_cni,
-    index_detail_cni,
-    index_detail_hist_cni,
-    index_detail_hist_adjust_cni,
-)
-
-"""
-东方财富-期权
-"""
-from akshare.option.option_em import option_current_em
-
-"""
-科创板报告
-"""
-from akshare.stock.stock_zh_kcb_report import stock_zh_kcb_report_em
-
-"""
-期货合约详情
-"""
-from akshare.futures.futures_contract_detail import futures_contract_detail
-
-"""
-胡润排行榜
-"""
-from akshare.fortune.fortune_hurun import hurun_rank
-
-"""
-新财富富豪榜
-"""
-from akshare.fortune.fortune_xincaifu_500 import xincaifu_rank
-
-"""
-福布斯中国榜单
-"""
-from akshare.fortune.fortune_forbes_500 import forbes_rank
-
-"""
-回购定盘利率
-"""
-from akshare.rate.repo_rate import repo_rate_hist, repo_rate_query
-
-"""
-公募基金排行
-"""
-from akshare.fund.fund_rank_em import (
-    fund_exchange_rank_em,
-    fund_money_rank_em,
-    fund_open_fund_rank_em,
-    fund_hk_rank_em,
-    fund_lcx_rank_em,
-)
-
-"""
-电影票房
-"""
-from akshare.movie.movie_yien import (
-    movie_boxoffice_cinema_daily,
-    movie_boxoffice_cinema_weekly,
-    movie_boxoffice_weekly,
-    movie_boxoffice_daily,
-    movie_boxoffice_monthly,
-    movie_boxoffice_realtime,
-    movie_boxoffice_yearly,
-    movie_boxoffice_yearly_first_week,
-)
-
-"""
-新闻联播文字稿
-"""
-from akshare.news.news_cctv import news_cctv
-
-"""
-债券收盘收益率曲线历史数据
-"""
-from akshare.bond.bond_china_money import (
-    bond_china_close_return,
-    macro_china_bond_public,
-    macro_china_swap_rate,
-    bond_china_close_return_map,
-
-)
-
-"""
-COMEX黄金-白银库存
-"""
-from akshare.futures.futures_comex_em import futures_comex_inventory
-
-"""
-A 股-特别标的
-"""
-from akshare.stock.stock_zh_a_special import (
-    stock_zh_a_new,
-    stock_zh_a_st_em,
-    stock_zh_a_new_em,
-    stock_zh_a_stop_em,
-)
-
-"""
-东方财富-注册制审核
-"""
-from akshare.stock_fundamental.stock_register_em import (
-    stock_register_kcb,
-    stock_register_cyb,
-    stock_register_bj,
-    stock_register_db,
-    stock_register_sh,
-    stock_register_sz
-)
-
-"""
-新浪财经-龙虎榜
-"""
-from akshare.stock_feature.stock_lhb_sina import (
-    stock_lhb_detail_daily_sina,
-    stock_lhb_ggtj_sina,
-    stock_lhb_jgmx_sina,
-    stock_lhb_jgzz_sina,
-    stock_lhb_yytj_sina,
-)
-
-"""
-中证指数
-"""
-from akshare.index.index_stock_zh_csindex import (
-    stock_zh_index_hist_csindex,
-    stock_zh_index_value_csindex,
-)
-
-"""
-股票基金持仓数据
-"""
-from akshare.stock.stock_fund_hold import (
-    stock_report_fund_hold,
-    stock_report_fund_hold_detail,
-)
-
-"""
-期货分钟数据
-"""
-from akshare.futures.futures_zh_sina import (
-    futures_zh_minute_sina,
-    futures_zh_daily_sina,
-    futures_zh_realtime,
-    futures_symbol_mark,
-    match_main_contract,
-    futures_zh_spot,
-)
-
-"""
-股票财务报告预约披露
-"""
-from akshare.stock_feature.stock_yjyg_cninfo import stock_report_disclosure
-
-"""
-基金行情
-"""
-from akshare.fund.fund_etf_sina import (
-    fund_etf_hist_sina,
-    fund_etf_category_sina,
-    fund_etf_dividend_sina,
-)
-
-"""
-交易日历
-"""
-from akshare.tool.trade_date_hist import tool_trade_date_hist_sina
-
-"""
-commodity option
-"""
-from akshare.option.option_commodity_sina import (
-    option_commodity_contract_table_sina,
-    option_commodity_contract_sina,
-    option_commodity_hist_sina,
-)
-
-"""
-A 股PE和PB
-"""
-from akshare.stock_feature.stock_a_pe_and_pb import (
-    stock_market_pb_lg,
-    stock_index_pb_lg,
-    stock_market_pe_lg,
-    stock_index_pe_lg,
-)
-from akshare.stock_feature.stock_a_indicator import (
-    stock_a_indicator_lg,
-    stock_hk_indicator_eniu,
-)
-from akshare.stock_feature.stock_a_high_low import stock_a_high_low_statistics
-from akshare.stock_feature.stock_a_below_net_asset_statistics import (
-    stock_a_below_net_asset_statistics,
-)
-
-"""
-彭博亿万富豪指数
-"""
-from akshare.fortune.fortune_bloomberg import (
-    index_bloomberg_billionaires,
-    index_bloomberg_billionaires_hist,
-)
-
-"""
-stock-券商业绩月报
-"""
-from akshare.stock_feature.stock_qsjy_em import stock_qsjy_em
-
-"""
-futures-warehouse-receipt
-"""
-from akshare.futures.futures_warehouse_receipt import (
-    futures_czce_warehouse_receipt,
-    futures_dce_warehouse_receipt,
-    futures_shfe_warehouse_receipt,
-    futures_gfex_warehouse_receipt,
-)
-
-"""
-stock-js
-"""
-from akshare.stock.stock_us_js import stock_price_js
-
-"""
-stock-summary
-"""
-from akshare.stock.stock_summary import (
-    stock_sse_summary,
-    stock_szse_summary,
-    stock_sse_deal_daily,
-    stock_szse_area_summary,
-    stock_szse_sector_summary,
-)
-
-"""
-股票-机构推荐池
-"""
-from akshare.stock_fundamental.stock_recommend import (
-    stock_institute_recommend,
-    stock_institute_recommend_detail,
-)
-
-"""
-股票-机构持股
-"""
-from akshare.stock_fundamental.stock_hold import (
-    stock_institute_hold_detail,
-    stock_institute_hold,
-)
-
-"""
-stock-info
-"""
-from akshare.stock.stock_info import (
-    stock_info_sh_delist,
-    stock_info_sz_delist,
-    stock_info_a_code_name,
-    stock_info_sh_name_code,
-    stock_info_bj_name_code,
-    stock_info_sz_name_code,
-    stock_info_sz_change_name,
-    stock_info_change_name,
-)
-
-"""
-stock-sector
-"""
-from akshare.stock.stock_industry import stock_sector_spot, stock_sector_detail
-
-"""
-stock-fundamental
-"""
-from akshare.stock_fundamental.stock_finance_sina import (
-    stock_financial_abstract,
-    stock_financial_report_sina,
-    stock_financial_analysis_indicator,
-    stock_add_stock,
-    stock_ipo_info,
-    stock_history_dividend_detail,
-    stock_history_dividend,
-    stock_circulate_stock_holder,
-    stock_restricted_release_queue_sina,
-    stock_fund_stock_holder,
-    stock_main_stock_holder,
-)
-
-"""
-stock-HK-fundamental
-"""
-from akshare.stock_fundamental.stock_finance_hk_em import (
-    stock_financial_hk_analysis_indicator_em,
-    stock_financial_hk_report_em,
-)
-
-"""
-stock_fund
-"""
-from akshare.stock.stock_fund_em import (
-    stock_individual_fund_flow,
-    stock_market_fund_flow,
-    stock_sector_fund_flow_rank,
-    # stock_individual_fund_flow_rank,
-    stock_sector_fund_flow_summary,
-    stock_sector_fund_flow_hist,
-    stock_concept_fund_flow_hist,
-    stock_main_fund_flow,
-)
-
-"""
-air-quality
-"""
-from akshare.air.air_zhenqi import (
-    air_quality_hist,
-    air_quality_rank,
-    air_quality_watch_point,
-    air_city_table,
-)
-
-"""
-hf
-"""
-from akshare.hf.hf_sp500 import hf_sp_500
-
-"""
-stock_yjyg_em
-"""
-from akshare.stock_feature.stock_yjyg_em import (
-    stock_yjyg_em,
-    stock_yysj_em,
-    stock_yjkb_em,
-)
-
-"""
-stock
-"""
-from akshare.stock_feature.stock_dxsyl_em import (
-    stock_dxsyl_em,
-    stock_xgsglb_em,
-)
-
-"""
-article
-"""
-from akshare.article.fred_md import fred_md, fred_qd
-
-"""
-中证商品指数
-"""
-from akshare.futures.futures_index_ccidx import (
-    futures_index_min_ccidx,
-    futures_index_ccidx,
-)
-
-"""
-futures_em_spot_stock
-"""
-from akshare.futures.futures_spot_stock_em import futures_spot_stock
-
-"""
-energy_oil
-"""
-from akshare.energy.energy_oil_em import energy_oil_detail, energy_oil_hist
-
-"""
-futures-foreign
-"""
-from akshare.futures.futures_foreign import (
-    futures_foreign_detail,
-    futures_foreign_hist,
-)
-
-"""
-stock-em-tfp
-"""
-from akshare.stock_feature.stock_tfp_em import stock_tfp_em
-
-"""
-stock-em-hsgt
-"""
-from akshare.stock_feature.stock_hsgt_em import (
-    stock_hk_ggt_components_em,
-    stock_hsgt_hold_stock_em,
-    stock_hsgt_hist_em,
-    stock_hsgt_institution_statistics_em,
-    stock_hsgt_stock_statistics_em,
-    stock_hsgt_board_rank_em,
-)
-
-"""
-stock-em-comment
-"""
-from akshare.stock_feature.stock_comment_em import (
-    stock_comment_em,
-    stock_comment_detail_zlkp_jgcyd_em,
-    stock_comment_detail_scrd_focus_em,
-    stock_comment_detail_zhpj_lspf_em,
-    stock_comment_detail_scrd_desire_em,
-    stock_comment_detail_scrd_cost_em,
-    stock_comment_detail_scrd_desire_daily_em,
-)
-
-"""
-stock-em-analyst
-"""
-from akshare.stock_feature.stock_analyst_em import (
-    stock_analyst_detail_em,
-    stock_analyst_rank_em,
-)
-
-"""
-新加坡期货交易所
-"""
-from akshare.futures.futures_settlement_price_sgx import futures_settlement_price_sgx
-
-"""
-currency interface
-"""
-from akshare.currency.currency import (
-    currency_convert,
-    currency_currencies,
-    currency_history,
-    currency_latest,
-    currency_time_series,
-)
-
-"""
-知识图谱
-"""
-from akshare.nlp.nlp_interface import nlp_ownthink, nlp_answer
-
-"""
-微博舆情报告
-"""
-from akshare.stock.stock_weibo_nlp import (
-    stock_js_weibo_nlp_time,
-    stock_js_weibo_report,
-)
+    """
+    中证指数
+    """
+    from akshare.index.index_stock_zh_csindex import (
+        stock_zh_index_hist_csindex,
+        stock_zh_index_value_csindex,
+    )
 
-"""
-金融期权-新浪
-"""
-from akshare.option.option_finance_sina import (
-    option_cffex_sz50_list_sina,
-    option_cffex_sz50_spot_sina,
-    option_cffex_sz50_daily_sina,
-    option_cffex_hs300_list_sina,
-    option_cffex_hs300_spot_sina,
-    option_cffex_hs300_daily_sina,
-    option_cffex_zz1000_list_sina,
-    option_cffex_zz1000_spot_sina,
-    option_cffex_zz1000_daily_sina,
-    option_sse_list_sina,
-    option_sse_expire_day_sina,
-    option_sse_codes_sina,
-    option_sse_spot_price_sina,
-    option_sse_underlying_spot_price_sina,
-    option_sse_greeks_sina,
-    option_sse_minute_sina,
-    option_sse_daily_sina,
-    option_finance_minute_sina,
-    option_minute_em,
-)
+    """
+    股票基金持仓数据
+    """
+    from akshare.stock.stock_fund_hold import (
+        stock_report_fund_hold,
+        stock_report_fund_hold_detail,
+    )
 
-"""
-债券-沪深债券
-"""
-from akshare.bond.bond_zh_sina import bond_zh_hs_daily, bond_zh_hs_spot
-from akshare.bond.bond_zh_cov import (
-    bond_zh_hs_cov_daily,
-    bond_zh_hs_cov_spot,
-    bond_cov_comparison,
-    bond_zh_cov,
-    bond_zh_cov_info,
-    bond_zh_hs_cov_min,
-    bond_zh_hs_cov_pre_min,
-    bond_zh_cov_value_analysis,
-)
-from akshare.bond.bond_convert import (
-    bond_cb_jsl,
-    bond_cb_adj_logs_jsl,
-    bond_cb_index_jsl,
-    bond_cb_redeem_jsl,
-)
+    """
+    期货分钟数据
+    """
+    from akshare.futures.futures_zh_sina import (
+        futures_zh_minute_sina,
+        futures_zh_daily_sina,
+        futures_zh_realtime,
+        futures_symbol_mark,
+        match_main_contract,
+        futures_zh_spot,
+    )
 
-"""
-基金数据接口
-"""
-from akshare.fund.fund_em import (
-    fund_open_fund_daily_em,
-    fund_open_fund_info_em,
-    fund_etf_fund_daily_em,
-    fund_etf_fund_info_em,
-    fund_financial_fund_daily_em,
-    fund_financial_fund_info_em,
-    fund_name_em,
-    fund_info_index_em,
-    fund_graded_fund_daily_em,
-    fund_graded_fund_info_em,
-    fund_money_fund_daily_em,
-    fund_money_fund_info_em,
-    fund_value_estimation_em,
-    fund_hk_fund_hist_em,
-    fund_purchase_em,
-)
+    """
+    股票财务报告预约披露
+    """
+    from akshare.stock_feature.stock_yjyg_cninfo import stock_report_disclosure
+
+    """
+    基金行情
+    """
+    from akshare.fund.fund_etf_sina import (
+        fund_etf_hist_sina,
+        fund_etf_category_sina,
+        fund_etf_dividend_sina,
+    )
 
-"""
-百度迁徙地图接口
-"""
-from akshare.event.migration import (
-    migration_area_baidu,
-    migration_scale_baidu,
-)
+    """
+    交易日历
+    """
+    from akshare.tool.trade_date_hist import tool_trade_date_hist_sina
+
+    """
+    commodity option
+    """
+    from akshare.option.option_commodity_sina import (
+        option_commodity_contract_table_sina,
+        option_commodity_contract_sina,
+        option_commodity_hist_sina,
+    )
 
-"""
-英为财情-外汇-货币对历史数据
-"""
-from akshare.fx.currency_investing import (
-    currency_pair_map,
-)
+    """
+    A 股PE和PB
+    """
+    from akshare.stock_feature.stock_a_pe_and_pb import (
+        stock_market_pb_lg,
+        stock_index_pb_lg,
+        stock_market_pe_lg,
+        stock_index_pe_lg,
+    )
+    from akshare.stock_feature.stock_a_indicator import (
+        stock_a_indicator_lg,
+        stock_hk_indicator_eniu,
+    )
+    from akshare.stock_feature.stock_a_high_low import stock_a_high_low_statistics
+    from akshare.stock_feature.stock_a_below_net_asset_statistics import (
+        stock_a_below_net_asset_statistics,
+    )
 
-"""
-商品期权-郑州商品交易所-期权-历史数据
-"""
-from akshare.option.option_czce import option_czce_hist
+    """
+    彭博亿万富豪指数
+    """
+    from akshare.fortune.fortune_bloomberg import (
+        index_bloomberg_billionaires,
+        index_bloomberg_billionaires_hist,
+    )
 
-"""
-宏观-经济数据-银行间拆借利率
-"""
-from akshare.interest_rate.interbank_rate_em import rate_interbank
+    """
+    stock-券商业绩月报
+    """
+    from akshare.stock_feature.stock_qsjy_em import stock_qsjy_em
+
+    """
+    futures-warehouse-receipt
+    """
+    from akshare.futures.futures_warehouse_receipt import (
+        futures_czce_warehouse_receipt,
+        futures_dce_warehouse_receipt,
+        futures_shfe_warehouse_receipt,
+        futures_gfex_warehouse_receipt,
+    )
 
-"""
-金十数据中心-外汇情绪
-"""
-from akshare.economic.macro_other import macro_fx_sentiment
+    """
+    stock-js
+    """
+    from akshare.stock.stock_us_js import stock_price_js
+
+    """
+    stock-summary
+    """
+    from akshare.stock.stock_summary import (
+        stock_sse_summary,
+        stock_szse_summary,
+        stock_sse_deal_daily,
+        stock_szse_area_summary,
+        stock_szse_sector_summary,
+    )
 
-"""
-金十数据中心-经济指标-欧元区
-"""
-from akshare.economic.macro_euro import (
-    macro_euro_gdp_yoy,
-    macro_euro_cpi_mom,
-    macro_euro_cpi_yoy,
-    macro_euro_current_account_mom,
-    macro_euro_employment_change_qoq,
-    macro_euro_industrial_production_mom,
-    macro_euro_manufacturing_pmi,
-    macro_euro_ppi_mom,
-    macro_euro_retail_sales_mom,
-    macro_euro_sentix_investor_confidence,
-    macro_euro_services_pmi,
-    macro_euro_trade_balance,
-    macro_euro_unemployment_rate_mom,
-    macro_euro_zew_economic_sentiment,
-    macro_euro_lme_holding,
-    macro_euro_lme_stock,
-)
+    """
+    股票-机构推荐池
+    """
+    from akshare.stock_fundamental.stock_recommend import (
+        stock_institute_recommend,
+        stock_institute_recommend_detail,
+    )
 
-"""
-金十数据中心-经济指标-央行利率-主要央行利率
-"""
-from akshare.economic.macro_bank import (
-    macro_bank_australia_interest_rate,
-    macro_bank_brazil_interest_rate,
-    macro_bank_brazil_interest_rate,
-    macro_bank_china_interest_rate,
-    macro_bank_english_interest_rate,
-    macro_bank_euro_interest_rate,
-    macro_bank_india_interest_rate,
-    macro_bank_japan_interest_rate,
-    macro_bank_newzealand_interest_rate,
-    macro_bank_russia_interest_rate,
-    macro_bank_switzerland_interest_rate,
-    macro_bank_usa_interest_rate,
-)
+    """
+    股票-机构持股
+    """
+    from akshare.stock_fundamental.stock_hold import (
+        stock_institute_hold_detail,
+        stock_institute_hold,
+    )
 
-"""
-义乌小商品指数
-"""
-from akshare.index.index_yw import index_yw
+    """
+    stock-info
+    """
+    from akshare.stock.stock_info import (
+        stock_info_sh_delist,
+        stock_info_sz_delist,
+        stock_info_a_code_name,
+        stock_info_sh_name_code,
+        stock_info_bj_name_code,
+        stock_info_sz_name_code,
+        stock_info_sz_change_name,
+        stock_info_change_name,
+    )
 
-"""
-股票指数-股票指数-成份股
-"""
-from akshare.index.index_cons import (
-    index_stock_info,
-    index_stock_cons,
-    index_stock_cons_sina,
-    index_stock_cons_csindex,
-    index_stock_cons_weight_csindex,
-    stock_a_code_to_symbol,
-)
+    """
+    stock-sector
+    """
+    from akshare.stock.stock_industry import stock_sector_spot, stock_sector_detail
+
+    """
+    stock-fundamental
+    """
+    from akshare.stock_fundamental.stock_finance_sina import (
+        stock_financial_abstract,
+        stock_financial_report_sina,
+        stock_financial_analysis_indicator,
+        stock_add_stock,
+        stock_ipo_info,
+        stock_history_dividend_detail,
+        stock_history_dividend,
+        stock_circulate_stock_holder,
+        stock_restricted_release_queue_sina,
+        stock_fund_stock_holder,
+        stock_main_stock_holder,
+    )
 
-"""
-东方财富-股票账户
-"""
-from akshare.stock_feature.stock_account_em import stock_account_statistics_em
+    """
+    stock-HK-fundamental
+    """
+    from akshare.stock_fundamental.stock_finance_hk_em import (
+        stock_financial_hk_analysis_indicator_em,
+        stock_financial_hk_report_em,
+    )
 
-"""
-期货规则
-"""
-from akshare.futures.futures_rule import futures_rule
+    """
+    stock_fund
+    """
+    from akshare.stock.stock_fund_em import (
+        stock_individual_fund_flow,
+        stock_market_fund_flow,
+        stock_sector_fund_flow_rank,
+        # stock_individual_fund_flow_rank,
+        stock_sector_fund_flow_summary,
+        stock_sector_fund_flow_hist,
+        stock_concept_fund_flow_hist,
+        stock_main_fund_flow,
+    )
 
-"""
-东方财富-商誉专题
-"""
-from akshare.stock_feature.stock_sy_em import (
-    stock_sy_profile_em,
-    stock_sy_yq_em,
-    stock_sy_jz_em,
-    stock_sy_em,
-    stock_sy_hy_em,
-)
+    """
+    air-quality
+    """
+    from akshare.air.air_zhenqi import (
+        air_quality_hist,
+        air_quality_rank,
+        air_quality_watch_point,
+        air_city_table,
+    )
 
-"""
-东方财富-股票质押
-"""
-from akshare.stock_feature.stock_gpzy_em import (
-    stock_gpzy_pledge_ratio_em,
-    stock_gpzy_profile_em,
-    stock_gpzy_distribute_statistics_bank_em,
-    stock_gpzy_distribute_statistics_company_em,
-    stock_gpzy_industry_data_em,
-    stock_gpzy_pledge_ratio_detail_em,
-)
+    """
+    hf
+    """
+    from akshare.hf.hf_sp500 import hf_sp_500
+
+    """
+    stock_yjyg_em
+    """
+    from akshare.stock_feature.stock_yjyg_em import (
+        stock_yjyg_em,
+        stock_yysj_em,
+        stock_yjkb_em,
+    )
 
-"""
-东方财富-机构调研
-"""
-from akshare.stock_feature.stock_jgdy_em import (
-    stock_jgdy_tj_em,
-    stock_jgdy_detail_em,
-)
+    """
+    stock
+    """
+    from akshare.stock_feature.stock_dxsyl_em import (
+        stock_dxsyl_em,
+        stock_xgsglb_em,
+    )
 
-"""
-新浪主力连续接口
-"""
-from akshare.futures_derivative.futures_index_sina import (
-    futures_main_sina,
-    futures_display_main_sina,
-)
+    """
+    article
+    """
+    from akshare.article.fred_md import fred_md, fred_qd
+
+    """
+    中证商品指数
+    """
+    from akshare.futures.futures_index_ccidx import (
+        futures_index_min_ccidx,
+        futures_index_ccidx,
+    )
 
-"""
-中国宏观杠杆率数据
-"""
-from akshare.economic.marco_cnbs import macro_cnbs
+    """
+    futures_em_spot_stock
+    """
+    from akshare.futures.futures_spot_stock_em import futures_spot_stock
+
+    """
+    energy_oil
+    """
+    from akshare.energy.energy_oil_em import energy_oil_detail, energy_oil_hist
+
+    """
+    futures-foreign
+    """
+    from akshare.futures.futures_foreign import (
+        futures_foreign_detail,
+        futures_foreign_hist,
+    )
 
-"""
-大宗商品-现货价格指数
-"""
-from akshare.index.index_spot import spot_goods
+    """
+    stock-em-tfp
+    """
+    from akshare.stock_feature.stock_tfp_em import stock_tfp_em
+
+    """
+    stock-em-hsgt
+    """
+    from akshare.stock_feature.stock_hsgt_em import (
+        stock_hk_ggt_components_em,
+        stock_hsgt_hold_stock_em,
+        stock_hsgt_hist_em,
+        stock_hsgt_institution_statistics_em,
+        stock_hsgt_stock_statistics_em,
+        stock_hsgt_board_rank_em,
+    )
 
-"""
-成本-世界各大城市生活成本
-"""
-from akshare.cost.cost_living import cost_living
+    """
+    stock-em-comment
+    """
+    from akshare.stock_feature.stock_comment_em import (
+        stock_comment_em,
+        stock_comment_detail_zlkp_jgcyd_em,
+        stock_comment_detail_scrd_focus_em,
+        stock_comment_detail_zhpj_lspf_em,
+        stock_comment_detail_scrd_desire_em,
+        stock_comment_detail_scrd_cost_em,
+        stock_comment_detail_scrd_desire_daily_em,
+    )
 
-"""
-能源-碳排放权
-"""
-from akshare.energy.energy_carbon import (
-    energy_carbon_domestic,
-    energy_carbon_bj,
-    energy_carbon_eu,
-    energy_carbon_gz,
-    energy_carbon_hb,
-    energy_carbon_sz,
-)
+    """
+    stock-em-analyst
+    """
+    from akshare.stock_feature.stock_analyst_em import (
+        stock_analyst_detail_em,
+        stock_analyst_rank_em,
+    )
 
-"""
-中国证券投资基金业协会-信息公示
-"""
-from akshare.fund.fund_amac import (
-    amac_manager_info,
-    amac_member_info,
-    amac_member_sub_info,
-    amac_aoin_info,
-    amac_fund_account_info,
-    amac_fund_info,
-    amac_fund_sub_info,
-    amac_futures_info,
-    amac_manager_cancelled_info,
-    amac_securities_info,
-    amac_fund_abs,
-    amac_manager_classify_info,
-    amac_person_fund_org_list,
-    amac_person_bond_org_list,
-)
+    """
+    新加坡期货交易所
+    """
+    from akshare.futures.futures_settlement_price_sgx import futures_settlement_price_sgx
+
+    """
+    currency interface
+    """
+    from akshare.currency.currency import (
+        currency_convert,
+        currency_currencies,
+        currency_history,
+        currency_latest,
+        currency_time_series,
+    )
 
-"""
-申万行业一级
-"""
-from akshare.index.index_sw import (
-    sw_index_third_cons,
-    sw_index_first_info,
-    sw_index_second_info,
-    sw_index_third_info,
-)
+    """
+    知识图谱
+    """
+    from akshare.nlp.nlp_interface import nlp_ownthink, nlp_answer
+
+    """
+    微博舆情报告
+    """
+    from akshare.stock.stock_weibo_nlp import (
+        stock_js_weibo_nlp_time,
+        stock_js_weibo_report,
+    )
 
-"""
-经济政策不确定性指数
-"""
-from akshare.article.epu_index import article_epu_index
+    """
+    金融期权-新浪
+    """
+    from akshare.option.option_finance_sina import (
+        option_cffex_sz50_list_sina,
+        option_cffex_sz50_spot_sina,
+        option_cffex_sz50_daily_sina,
+        option_cffex_hs300_list_sina,
+        option_cffex_hs300_spot_sina,
+        option_cffex_hs300_daily_sina,
+        option_cffex_zz1000_list_sina,
+        option_cffex_zz1000_spot_sina,
+        option_cffex_zz1000_daily_sina,
+        option_sse_list_sina,
+        option_sse_expire_day_sina,
+        option_sse_codes_sina,
+        option_sse_spot_price_sina,
+        option_sse_underlying_spot_price_sina,
+        option_sse_greeks_sina,
+        option_sse_minute_sina,
+        option_sse_daily_sina,
+        option_finance_minute_sina,
+        option_minute_em,
+    )
 
-"""
-空气-河北
-"""
-from akshare.air.air_hebei import air_quality_hebei
+    """
+    债券-沪深债券
+    """
+    from akshare.bond.bond_zh_sina import bond_zh_hs_daily, bond_zh_hs_spot
+    from akshare.bond.bond_zh_cov import (
+        bond_zh_hs_cov_daily,
+        bond_zh_hs_cov_spot,
+        bond_cov_comparison,
+        bond_zh_cov,
+        bond_zh_cov_info,
+        bond_zh_hs_cov_min,
+        bond_zh_hs_cov_pre_min,
+        bond_zh_cov_value_analysis,
+    )
+    from akshare.bond.bond_convert import (
+        bond_cb_jsl,
+        bond_cb_adj_logs_jsl,
+        bond_cb_index_jsl,
+        bond_cb_redeem_jsl,
+    )
 
-"""
-日出和日落
-"""
-from akshare.air.sunrise_tad import sunrise_daily, sunrise_monthly
+    """
+    基金数据接口
+    """
+    from akshare.fund.fund_em import (
+        fund_open_fund_daily_em,
+        fund_open_fund_info_em,
+        fund_etf_fund_daily_em,
+        fund_etf_fund_info_em,
+        fund_financial_fund_daily_em,
+        fund_financial_fund_info_em,
+        fund_name_em,
+        fund_info_index_em,
+        fund_graded_fund_daily_em,
+        fund_graded_fund_info_em,
+        fund_money_fund_daily_em,
+        fund_money_fund_info_em,
+        fund_value_estimation_em,
+        fund_hk_fund_hist_em,
+        fund_purchase_em,
+    )
 
-"""
-新浪-指数实时行情和历史行情
-"""
-from akshare.stock.stock_zh_a_tick_tx import (
-    stock_zh_a_tick_tx_js,
-)
+    """
+    百度迁徙地图接口
+    """
+    from akshare.event.migration import (
+        migration_area_baidu,
+        migration_scale_baidu,
+    )
 
-"""
-新浪-指数实时行情和历史行情
-"""
-from akshare.index.index_stock_zh import (
-    stock_zh_index_daily,
-    stock_zh_index_spot_sina,
-    stock_zh_index_spot_em,
-    stock_zh_index_daily_tx,
-    stock_zh_index_daily_em,
-)
+    """
+    英为财情-外汇-货币对历史数据
+    """
+    from akshare.fx.currency_investing import (
+        currency_pair_map,
+    )
 
-"""
-外盘期货实时行情
-"""
-from akshare.futures.futures_hq_sina import (
-    futures_foreign_commodity_realtime,
-    futures_foreign_commodity_subscribe_exchange_symbol,
-    futures_hq_subscribe_exchange_symbol,
-)
+    """
+    商品期权-郑州商品交易所-期权-历史数据
+    """
+    from akshare.option.option_czce import option_czce_hist
+
+    """
+    宏观-经济数据-银行间拆借利率
+    """
+    from akshare.interest_rate.interbank_rate_em import rate_interbank
+
+    """
+    金十数据中心-外汇情绪
+    """
+    from akshare.economic.macro_other import macro_fx_sentiment
+
+    """
+    金十数据中心-经济指标-欧元区
+    """
+    from akshare.economic.macro_euro import (
+        macro_euro_gdp_yoy,
+        macro_euro_cpi_mom,
+        macro_euro_cpi_yoy,
+        macro_euro_current_account_mom,
+        macro_euro_employment_change_qoq,
+        macro_euro_industrial_production_mom,
+        macro_euro_manufacturing_pmi,
+        macro_euro_ppi_mom,
+        macro_euro_retail_sales_mom,
+        macro_euro_sentix_investor_confidence,
+        macro_euro_services_pmi,
+        macro_euro_trade_balance,
+        macro_euro_unemployment_rate_mom,
+        macro_euro_zew_economic_sentiment,
+        macro_euro_lme_holding,
+        macro_euro_lme_stock,
+    )
 
-"""
-FF多因子数据接口
-"""
-from akshare.article.ff_factor import article_ff_crr
+    """
+    金十数据中心-经济指标-央行利率-主要央行利率
+    """
+    from akshare.economic.macro_bank import (
+        macro_bank_australia_interest_rate,
+        macro_bank_brazil_interest_rate,
+        macro_bank_brazil_interest_rate,
+        macro_bank_china_interest_rate,
+        macro_bank_english_interest_rate,
+        macro_bank_euro_interest_rate,
+        macro_bank_india_interest_rate,
+        macro_bank_japan_interest_rate,
+        macro_bank_newzealand_interest_rate,
+        macro_bank_russia_interest_rate,
+        macro_bank_switzerland_interest_rate,
+        macro_bank_usa_interest_rate,
+    )
 
-"""
-Realized Library 接口
-"""
-from akshare.article.risk_rv import (
-    article_oman_rv,
-    article_oman_rv_short,
-    article_rlab_rv,
-)
+    """
+    义乌小商品指数
+    """
+    from akshare.index.index_yw import index_yw
+
+    """
+    股票指数-股票指数-成份股
+    """
+    from akshare.index.index_cons import (
+        index_stock_info,
+        index_stock_cons,
+        index_stock_cons_sina,
+        index_stock_cons_csindex,
+        index_stock_cons_weight_csindex,
+        stock_a_code_to_symbol,
+    )
 
-"""
-银保监分局本级行政处罚数据
-"""
-from akshare.bank.bank_cbirc_2020 import bank_fjcf_table_detail
+    """
+    东方财富-股票账户
+    """
+    from akshare.stock_feature.stock_account_em import stock_account_statistics_em
+
+    """
+    期货规则
+    """
+    from akshare.futures.futures_rule import futures_rule
+
+    """
+    东方财富-商誉专题
+    """
+    from akshare.stock_feature.stock_sy_em import (
+        stock_sy_profile_em,
+        stock_sy_yq_em,
+        stock_sy_jz_em,
+        stock_sy_em,
+        stock_sy_hy_em,
+    )
 
-"""
-科创板股票
-"""
-from akshare.stock.stock_zh_kcb_sina import (
-    stock_zh_kcb_spot,
-    stock_zh_kcb_daily,
-)
+    """
+    东方财富-股票质押
+    """
+    from akshare.stock_feature.stock_gpzy_em import (
+        stock_gpzy_pledge_ratio_em,
+        stock_gpzy_profile_em,
+        stock_gpzy_distribute_statistics_bank_em,
+        stock_gpzy_distribute_statistics_company_em,
+        stock_gpzy_industry_data_em,
+        stock_gpzy_pledge_ratio_detail_em,
+    )
 
-"""
-A股
-"""
-from akshare.stock.stock_zh_a_sina import (
-    stock_zh_a_spot,
-    stock_zh_a_daily,
-    stock_zh_a_minute,
-    stock_zh_a_cdr_daily,
-)
+    """
+    东方财富-机构调研
+    """
+    from akshare.stock_feature.stock_jgdy_em import (
+        stock_jgdy_tj_em,
+        stock_jgdy_detail_em,
+    )
 
-"""
-A+H股
-"""
-from akshare.stock.stock_zh_ah_tx import (
-    stock_zh_ah_spot,
-    stock_zh_ah_daily,
-    stock_zh_ah_name,
-)
+    """
+    新浪主力连续接口
+    """
+    from akshare.futures_derivative.futures_index_sina import (
+        futures_main_sina,
+        futures_display_main_sina,
+    )
 
-"""
-加密货币
-"""
-from akshare.economic.macro_other import crypto_js_spot
+    """
+    中国宏观杠杆率数据
+    """
+    from akshare.economic.marco_cnbs import macro_cnbs
+
+    """
+    大宗商品-现货价格指数
+    """
+    from akshare.index.index_spot import spot_goods
+
+    """
+    成本-世界各大城市生活成本
+    """
+    from akshare.cost.cost_living import cost_living
+
+    """
+    能源-碳排放权
+    """
+    from akshare.energy.energy_carbon import (
+        energy_carbon_domestic,
+        energy_carbon_bj,
+        energy_carbon_eu,
+        energy_carbon_gz,
+        energy_carbon_hb,
+        energy_carbon_sz,
+    )
 
-"""
-金融期权
-"""
-from akshare.option.option_finance import (
-    option_finance_board,
-    option_finance_sse_underlying,
-)
+    """
+    中国证券投资基金业协会-信息公示
+    """
+    from akshare.fund.fund_amac import (
+        amac_manager_info,
+        amac_member_info,
+        amac_member_sub_info,
+        amac_aoin_info,
+        amac_fund_account_info,
+        amac_fund_info,
+        amac_fund_sub_info,
+        amac_futures_info,
+        amac_manager_cancelled_info,
+        amac_securities_info,
+        amac_fund_abs,
+        amac_manager_classify_info,
+        amac_person_fund_org_list,
+        amac_person_bond_org_list,
+    )
 
-"""
-新浪-美股实时行情数据和历史行情数据(前复权)
-"""
-from akshare.stock.stock_us_sina import (
-    stock_us_daily,
-    stock_us_spot,
-    get_us_stock_name,
-)
+    """
+    申万行业一级
+    """
+    from akshare.index.index_sw import (
+        sw_index_third_cons,
+        sw_index_first_info,
+        sw_index_second_info,
+        sw_index_third_info,
+    )
 
-"""
-新浪-港股实时行情数据和历史数据(前复权和后复权因子)
-"""
-from akshare.stock.stock_hk_sina import stock_hk_daily, stock_hk_spot
+    """
+    经济政策不确定性指数
+    """
+    from akshare.article.epu_index import article_epu_index
+
+    """
+    空气-河北
+    """
+    from akshare.air.air_hebei import air_quality_hebei
+
+    """
+    日出和日落
+    """
+    from akshare.air.sunrise_tad import sunrise_daily, sunrise_monthly
+
+    """
+    新浪-指数实时行情和历史行情
+    """
+    from akshare.stock.stock_zh_a_tick_tx import (
+        stock_zh_a_tick_tx_js,
+    )
 
-"""
-生意社-商品与期货-现期图数据
-"""
-from akshare.futures_derivative.futures_spot_sys import futures_spot_sys
+    """
+    新浪-指数实时行情和历史行情
+    """
+    from akshare.index.index_stock_zh import (
+        stock_zh_index_daily,
+        stock_zh_index_spot_sina,
+        stock_zh_index_spot_em,
+        stock_zh_index_daily_tx,
+        stock_zh_index_daily_em,
+    )
 
-"""
-全球宏观-机构宏观
-"""
-from akshare.economic.macro_constitute import (
-    macro_cons_gold,
-    macro_cons_silver,
-    macro_cons_opec_month,
-)
+    """
+    外盘期货实时行情
+    """
+    from akshare.futures.futures_hq_sina import (
+        futures_foreign_commodity_realtime,
+        futures_foreign_commodity_subscribe_exchange_symbol,
+        futures_hq_subscribe_exchange_symbol,
+    )
 
-"""
-全球宏观-美国宏观
-"""
-from akshare.economic.macro_usa import (
-    macro_usa_eia_crude_rate,
-    macro_usa_non_farm,
-    macro_usa_unemployment_rate,
-    macro_usa_adp_employment,
-    macro_usa_core_pce_price,
-    macro_usa_cpi_monthly,
-    macro_usa_cpi_yoy,
-    macro_usa_crude_inner,
-    macro_usa_gdp_monthly,
-    macro_usa_initial_jobless,
-    macro_usa_lmci,
-    macro_usa_api_crude_stock,
-    macro_usa_building_permits,
-    macro_usa_business_inventories,
-    macro_usa_cb_consumer_confidence,
-    macro_usa_core_cpi_monthly,
-    macro_usa_core_ppi,
-    macro_usa_current_account,
-    macro_usa_durable_goods_orders,
-    macro_usa_trade_balance,
-    macro_usa_spcs20,
-    macro_usa_services_pmi,
-    macro_usa_rig_count,
-    macro_usa_retail_sales,
-    macro_usa_real_consumer_spending,
-    macro_usa_ppi,
-    macro_usa_pmi,
-    macro_usa_personal_spending,
-    macro_usa_pending_home_sales,
-    macro_usa_nfib_small_business,
-    macro_usa_new_home_sales,
-    macro_usa_nahb_house_market_index,
-    macro_usa_michigan_consumer_sentiment,
-    macro_usa_exist_home_sales,
-    macro_usa_export_price,
-    macro_usa_factory_orders,
-    macro_usa_house_price_index,
-    macro_usa_house_starts,
-    macro_usa_import_price,
-    macro_usa_industrial_production,
-    macro_usa_ism_non_pmi,
-    macro_usa_ism_pmi,
-    macro_usa_job_cuts,
-    macro_usa_cftc_nc_holding,
-    macro_usa_cftc_c_holding,
-    macro_usa_cftc_merchant_currency_holding,
-    macro_usa_cftc_merchant_goods_holding,
-    macro_usa_cme_merchant_goods_holding,
-    macro_usa_phs,
-)
+    """
+    FF多因子数据接口
+    """
+    from akshare.article.ff_factor import article_ff_crr
+
+    """
+    Realized Library 接口
+    """
+    from akshare.article.risk_rv import (
+        article_oman_rv,
+        article_oman_rv_short,
+        article_rlab_rv,
+    )
 
-"""
-全球宏观-中国宏观
-"""
-from akshare.economic.macro_china import (
-    macro_china_bank_financing,
-    macro_china_insurance_income,
-    macro_china_mobile_number,
-    macro_china_vegetable_basket,
-    macro_china_agricultural_product,
-    macro_china_agricultural_index,
-    macro_china_energy_index,
-    macro_china_commodity_price_index,
-    macro_global_sox_index,
-    macro_china_yw_electronic_index,
-    macro_china_construction_index,
-    macro_china_construction_price_index,
-    macro_china_lpi_index,
-    macro_china_bdti_index,
-    macro_china_bsi_index,
-    macro_china_cpi_monthly,
-    macro_china_cpi_yearly,
-    macro_china_m2_yearly,
-    macro_china_fx_reserves_yearly,
-    macro_china_cx_pmi_yearly,
-    macro_china_pmi_yearly,
-    macro_china_daily_energy,
-    macro_china_non_man_pmi,
-    macro_china_rmb,
-    macro_china_gdp_yearly,
-    macro_china_shrzgm,
-    macro_china_ppi_yearly,
-    macro_china_cx_services_pmi_yearly,
-    macro_china_market_margin_sh,
-    macro_china_market_margin_sz,
-    macro_china_au_report,
-    macro_china_exports_yoy,
-    macro_china_hk_market_info,
-    macro_china_imports_yoy,
-    macro_china_trade_balance,
-    macro_china_shibor_all,
-    macro_china_industrial_production_yoy,
-    macro_china_gyzjz,
-    macro_china_lpr,
-    macro_china_new_house_price,
-    macro_china_enterprise_boom_index,
-    macro_china_national_tax_receipts,
-    macro_china_new_financial_credit,
-    macro_china_fx_gold,
-    macro_china_money_supply,
-    macro_china_stock_market_cap,
-    macro_china_cpi,
-    macro_china_gdp,
-    macro_china_ppi,
-    macro_china_pmi,
-    macro_china_gdzctz,
-    macro_china_hgjck,
-    macro_china_czsr,
-    macro_china_whxd,
-    macro_china_wbck,
-    macro_china_xfzxx,
-    macro_china_reserve_requirement_ratio,
-    macro_china_consumer_goods_retail,
-    macro_china_society_electricity,
-    macro_china_society_traffic_volume,
-    macro_china_postal_telecommunicational,
-    macro_china_international_tourism_fx,
-    macro_china_passenger_load_factor,
-    macro_china_freight_index,
-    macro_china_central_bank_balance,
-    macro_china_insurance,
-    macro_china_supply_of_money,
-    macro_china_foreign_exchange_gold,
-    macro_china_retail_price_index,
-    macro_china_real_estate,
-    macro_china_qyspjg,
-    macro_china_fdi,
-    macro_shipping_bci,
-    macro_shipping_bcti,
-    macro_shipping_bdi,
-    macro_shipping_bpi,
-    macro_china_urban_unemployment,
-)
+    """
+    银保监分局本级行政处罚数据
+    """
+    from akshare.bank.bank_cbirc_2020 import bank_fjcf_table_detail
+
+    """
+    科创板股票
+    """
+    from akshare.stock.stock_zh_kcb_sina import (
+        stock_zh_kcb_spot,
+        stock_zh_kcb_daily,
+    )
 
-"""
-全球宏观-中国宏观-国家统计局
-"""
-from akshare.economic.macro_china_nbs import (
-    macro_china_nbs_nation,
-    macro_china_nbs_region
-)
+    """
+    A股
+    """
+    from akshare.stock.stock_zh_a_sina import (
+        stock_zh_a_spot,
+        stock_zh_a_daily,
+        stock_zh_a_minute,
+        stock_zh_a_cdr_daily,
+    )
 
-"""
-外汇
-"""
-from akshare.fx.fx_quote import fx_pair_quote, fx_spot_quote, fx_swap_quote
+    """
+    A+H股
+    """
+    from akshare.stock.stock_zh_ah_tx import (
+        stock_zh_ah_spot,
+        stock_zh_ah_daily,
+        stock_zh_ah_name,
+    )
 
-"""
-债券行情
-"""
-from akshare.bond.bond_china import (
-    bond_spot_quote,
-    bond_spot_deal,
-    bond_china_yield,
-)
+    """
+    加密货币
+    """
+    from akshare.economic.macro_other import crypto_js_spot
+
+    """
+    金融期权
+    """
+    from akshare.option.option_finance import (
+        option_finance_board,
+        option_finance_sse_underlying,
+    )
 
-"""
-商品期权
-"""
-from akshare.option.option_commodity import (
-    option_dce_daily,
-    option_czce_daily,
-    option_shfe_daily,
-    option_gfex_vol_daily,
-    option_gfex_daily,
-)
+    """
+    新浪-美股实时行情数据和历史行情数据(前复权)
+    """
+    from akshare.stock.stock_us_sina import (
+        stock_us_daily,
+        stock_us_spot,
+        get_us_stock_name,
+    )
 
-"""
-99期货-期货库存数据
-"""
-from akshare.futures.futures_inventory_99 import futures_inventory_99
+    """
+    新浪-港股实时行情数据和历史数据(前复权和后复权因子)
+    """
+    from akshare.stock.stock_hk_sina import stock_hk_daily, stock_hk_spot
+
+    """
+    生意社-商品与期货-现期图数据
+    """
+    from akshare.futures_derivative.futures_spot_sys import futures_spot_sys
+
+    """
+    全球宏观-机构宏观
+    """
+    from akshare.economic.macro_constitute import (
+        macro_cons_gold,
+        macro_cons_silver,
+        macro_cons_opec_month,
+    )
 
-"""
-东方财富-期货库存数据
-"""
-from akshare.futures.futures_inventory_em import futures_inventory_em
+    """
+    全球宏观-美国宏观
+    """
+    from akshare.economic.macro_usa import (
+        macro_usa_eia_crude_rate,
+        macro_usa_non_farm,
+        macro_usa_unemployment_rate,
+        macro_usa_adp_employment,
+        macro_usa_core_pce_price,
+        macro_usa_cpi_monthly,
+        macro_usa_cpi_yoy,
+        macro_usa_crude_inner,
+        macro_usa_gdp_monthly,
+        macro_usa_initial_jobless,
+        macro_usa_lmci,
+        macro_usa_api_crude_stock,
+        macro_usa_building_permits,
+        macro_usa_business_inventories,
+        macro_usa_cb_consumer_confidence,
+        macro_usa_core_cpi_monthly,
+        macro_usa_core_ppi,
+        macro_usa_current_account,
+        macro_usa_durable_goods_orders,
+        macro_usa_trade_balance,
+        macro_usa_spcs20,
+        macro_usa_services_pmi,
+        macro_usa_rig_count,
+        macro_usa_retail_sales,
+        macro_usa_real_consumer_spending,
+        macro_usa_ppi,
+        macro_usa_pmi,
+        macro_usa_personal_spending,
+        macro_usa_pending_home_sales,
+        macro_usa_nfib_small_business,
+        macro_usa_new_home_sales,
+        macro_usa_nahb_house_market_index,
+        macro_usa_michigan_consumer_sentiment,
+        macro_usa_exist_home_sales,
+        macro_usa_export_price,
+        macro_usa_factory_orders,
+        macro_usa_house_price_index,
+        macro_usa_house_starts,
+        macro_usa_import_price,
+        macro_usa_industrial_production,
+        macro_usa_ism_non_pmi,
+        macro_usa_ism_pmi,
+        macro_usa_job_cuts,
+        macro_usa_cftc_nc_holding,
+        macro_usa_cftc_c_holding,
+        macro_usa_cftc_merchant_currency_holding,
+        macro_usa_cftc_merchant_goods_holding,
+        macro_usa_cme_merchant_goods_holding,
+        macro_usa_phs,
+    )
 
-"""
-中国银行间市场交易商协会
-"""
-from akshare.bond.bond_nafmii import bond_debt_nafmii
+    """
+    全球宏观-中国宏观
+    """
+    from akshare.economic.macro_china import (
+        macro_china_bank_financing,
+        macro_china_insurance_income,
+        macro_china_mobile_number,
+        macro_china_vegetable_basket,
+        macro_china_agricultural_product,
+        macro_china_agricultural_index,
+        macro_china_energy_index,
+        macro_china_commodity_price_index,
+        macro_global_sox_index,
+        macro_china_yw_electronic_index,
+        macro_china_construction_index,
+        macro_china_construction_price_index,
+        macro_china_lpi_index,
+        macro_china_bdti_index,
+        macro_china_bsi_index,
+        macro_china_cpi_monthly,
+        macro_china_cpi_yearly,
+        macro_china_m2_yearly,
+        macro_china_fx_reserves_yearly,
+        macro_china_cx_pmi_yearly,
+        macro_china_pmi_yearly,
+        macro_china_daily_energy,
+        macro_china_non_man_pmi,
+        macro_china_rmb,
+        macro_china_gdp_yearly,
+        macro_china_shrzgm,
+        macro_china_ppi_yearly,
+        macro_china_cx_services_pmi_yearly,
+        macro_china_market_margin_sh,
+        macro_china_market_margin_sz,
+        macro_china_au_report,
+        macro_china_exports_yoy,
+        macro_china_hk_market_info,
+        macro_china_imports_yoy,
+        macro_china_trade_balance,
+        macro_china_shibor_all,
+        macro_china_industrial_production_yoy,
+        macro_china_gyzjz,
+        macro_china_lpr,
+        macro_china_new_house_price,
+        macro_china_enterprise_boom_index,
+        macro_china_national_tax_receipts,
+        macro_china_new_financial_credit,
+        macro_china_fx_gold,
+        macro_china_money_supply,
+        macro_china_stock_market_cap,
+        macro_china_cpi,
+        macro_china_gdp,
+        macro_china_ppi,
+        macro_china_pmi,
+        macro_china_gdzctz,
+        macro_china_hgjck,
+        macro_china_czsr,
+        macro_china_whxd,
+        macro_china_wbck,
+        macro_china_xfzxx,
+        macro_china_reserve_requirement_ratio,
+        macro_china_consumer_goods_retail,
+        macro_china_society_electricity,
+        macro_china_society_traffic_volume,
+        macro_china_postal_telecommunicational,
+        macro_china_international_tourism_fx,
+        macro_china_passenger_load_factor,
+        macro_china_freight_index,
+        macro_china_central_bank_balance,
+        macro_china_insurance,
+        macro_china_supply_of_money,
+        macro_china_foreign_exchange_gold,
+        macro_china_retail_price_index,
+        macro_china_real_estate,
+        macro_china_qyspjg,
+        macro_china_fdi,
+        macro_shipping_bci,
+        macro_shipping_bcti,
+        macro_shipping_bdi,
+        macro_shipping_bpi,
+        macro_china_urban_unemployment,
+    )
 
-"""
-奇货可查-工具模块
-"""
-from akshare.qhkc_web.qhkc_tool import qhkc_tool_foreign, qhkc_tool_gdp
+    """
+    全球宏观-中国宏观-国家统计局
+    """
+    from akshare.economic.macro_china_nbs import (
+        macro_china_nbs_nation,
+        macro_china_nbs_region
+    )
 
-"""
-奇货可查-指数模块
-"""
-from akshare.qhkc_web.qhkc_index import (
-    get_qhkc_index,
-    get_qhkc_index_trend,
-    get_qhkc_index_profit_loss,
-)
+    """
+    外汇
+    """
+    from akshare.fx.fx_quote import fx_pair_quote, fx_spot_quote, fx_swap_quote
+
+    """
+    债券行情
+    """
+    from akshare.bond.bond_china import (
+        bond_spot_quote,
+        bond_spot_deal,
+        bond_china_yield,
+    )
 
-"""
-奇货可查-资金模块
-"""
-from akshare.qhkc_web.qhkc_fund import (
-    get_qhkc_fund_money_change,
-    get_qhkc_fund_bs,
-    get_qhkc_fund_position,
-)
+    """
+    商品期权
+    """
+    from akshare.option.option_commodity import (
+        option_dce_daily,
+        option_czce_daily,
+        option_shfe_daily,
+        option_gfex_vol_daily,
+        option_gfex_daily,
+    )
 
-"""
-大宗商品现货价格及基差
-"""
-from akshare.futures.futures_basis import (
-    futures_spot_price_daily,
-    futures_spot_price,
-    futures_spot_price_previous,
-)
+    """
+    99期货-期货库存数据
+    """
+    from akshare.futures.futures_inventory_99 import futures_inventory_99
+
+    """
+    东方财富-期货库存数据
+    """
+    from akshare.futures.futures_inventory_em import futures_inventory_em
+
+    """
+    中国银行间市场交易商协会
+    """
+    from akshare.bond.bond_nafmii import bond_debt_nafmii
+
+    """
+    奇货可查-工具模块
+    """
+    from akshare.qhkc_web.qhkc_tool import qhkc_tool_foreign, qhkc_tool_gdp
+
+    """
+    奇货可查-指数模块
+    """
+    from akshare.qhkc_web.qhkc_index import (
+        get_qhkc_index,
+        get_qhkc_index_trend,
+        get_qhkc_index_profit_loss,
+    )
 
-"""
-期货持仓成交排名数据
-"""
-from akshare.futures.cot import (
-    get_rank_sum_daily,
-    get_rank_sum,
-    get_shfe_rank_table,
-    get_czce_rank_table,
-    get_dce_rank_table,
-    get_cffex_rank_table,
-    futures_dce_position_rank,
-    futures_dce_position_rank_other,
-    futures_gfex_position_rank,
-)
+    """
+    奇货可查-资金模块
+    """
+    from akshare.qhkc_web.qhkc_fund import (
+        get_qhkc_fund_money_change,
+        get_qhkc_fund_bs,
+        get_qhkc_fund_position,
+    )
 
-"""
-大宗商品期货仓单数据
-"""
-from akshare.futures.receipt import get_receipt
+    """
+    大宗商品现货价格及基差
+    """
+    from akshare.futures.futures_basis import (
+        futures_spot_price_daily,
+        futures_spot_price,
+        futures_spot_price_previous,
+    )
 
-"""
-大宗商品期货展期收益率数据
-"""
-from akshare.futures.futures_roll_yield import (
-    get_roll_yield_bar,
-    get_roll_yield,
-)
+    """
+    期货持仓成交排名数据
+    """
+    from akshare.futures.cot import (
+        get_rank_sum_daily,
+        get_rank_sum,
+        get_shfe_rank_table,
+        get_czce_rank_table,
+        get_dce_rank_table,
+        get_cffex_rank_table,
+        futures_dce_position_rank,
+        futures_dce_position_rank_other,
+        futures_gfex_position_rank,
+    )
 
-"""
-交易所日线行情数据
-"""
-from akshare.futures.futures_daily_bar import (
-    get_cffex_daily,
-    get_czce_daily,
-    get_shfe_daily,
-    get_dce_daily,
-    get_futures_daily,
-    get_ine_daily,
-    get_gfex_daily,
-)
+    """
+    大宗商品期货仓单数据
+    """
+    from akshare.futures.receipt import get_receipt
+
+    """
+    大宗商品期货展期收益率数据
+    """
+    from akshare.futures.futures_roll_yield import (
+        get_roll_yield_bar,
+        get_roll_yield,
+    )
 
-"""
-雪球基金数据
-"""
-from akshare.fund.fund_xq import (
-    fund_individual_basic_info_xq,
-    fund_individual_achievement_xq,
-    fund_individual_analysis_xq,
-    fund_individual_profit_probability_xq,
-    fund_individual_detail_info_xq,
-    fund_individual_detail_hold_xq,
-)
+    """
+    交易所日线行情数据
+    """
+    from akshare.futures.futures_daily_bar import (
+        get_cffex_daily,
+        get_czce_daily,
+        get_shfe_daily,
+        get_dce_daily,
+        get_futures_daily,
+        get_ine_daily,
+        get_gfex_daily,
+    )
 
-"""
-异常处理模块
-"""
-from .exceptions import (
-    AkshareException,
-    APIError,
-    DataParsingError,
-    InvalidParameterError,
-    NetworkError,
-    RateLimitError,
-)
+    """
+    雪球基金数据
+    """
+    from akshare.fund.fund_xq import (
+        fund_individual_basic_info_xq,
+        fund_individual_achievement_xq,
+        fund_individual_analysis_xq,
+        fund_individual_profit_probability_xq,
+        fund_individual_detail_info_xq,
+        fund_individual_detail_hold_xq,
+    )
 
-"""
-Pro API 设置
-"""
-from akshare.pro.data_pro import pro_api
-from akshare.utils.token_process import set_token, get_token
+    """
+    异常处理模块
+    """
+    from .exceptions import (
+        AkshareException,
+        APIError,
+        DataParsingError,
+        InvalidParameterError,
+        NetworkError,
+        RateLimitError,
+    )
 
-"""
-AKQMT 设置
-"""
-try:
-    from akqmt import xt_api
-except ImportError as e:
-    pass
+    """
+    Pro API 设置
+    """
+    from akshare.pro.data_pro import pro_api
+    from akshare.utils.token_process import set_token, get_token
+
+    """
+    AKQMT 设置
+    """
+    try:
+        from akqmt import xt_api
+    except ImportError as e:
+        pass
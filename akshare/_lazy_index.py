@@ -0,0 +1,1059 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+Desc: 由 python akshare/utils/lazy_index.py 根据 akshare/__init__.py 中 TYPE_CHECKING 下的导入语句生成，请勿手动修改
+LAZY_IMPORTS: 接口名称 -> 所在模块（导入时重命名的为 "模块:原名称"）
+OPTIONAL_IMPORTS: 来自可选依赖的名称，依赖未安装时访问抛出 AttributeError
+"""
+
+LAZY_IMPORTS = {
+    "bond_sh_buy_back_em": "akshare.bond.bond_buy_back_em",
+    "bond_sz_buy_back_em": "akshare.bond.bond_buy_back_em",
+    "bond_buy_back_hist_em": "akshare.bond.bond_buy_back_em",
+    "stock_zh_a_gbjg_em": "akshare.stock_fundamental.stock_gbjg_em",
+    "stock_zh_a_spot_em": "akshare.stock_a.stock_zh_a_spot",
+    "stock_individual_fund_flow_rank": "akshare.stock_a.stock_individual_fund_flow_rank",
+    "stock_board_concept_name_em": "akshare.stock_a.stock_board_concept_name_em",
+    "stock_individual_basic_info_xq": "akshare.stock_fundamental.stock_basic_info_xq",
+    "stock_individual_basic_info_hk_xq": "akshare.stock_fundamental.stock_basic_info_xq",
+    "stock_individual_basic_info_us_xq": "akshare.stock_fundamental.stock_basic_info_xq",
+    "index_global_hist_sina": "akshare.index.index_global_sina",
+    "index_global_name_table": "akshare.index.index_global_sina",
+    "index_global_hist_em": "akshare.index.index_global_em",
+    "index_global_spot_em": "akshare.index.index_global_em",
+    "forex_hist_em": "akshare.forex.forex_em",
+    "forex_spot_em": "akshare.forex.forex_em",
+    "stock_zh_ah_spot_em": "akshare.stock.stock_hsgt_em",
+    "stock_hsgt_sh_hk_spot_em": "akshare.stock.stock_hsgt_em",
+    "stock_financial_us_report_em": "akshare.stock_fundamental.stock_finance_us_em",
+    "stock_financial_us_analysis_indicator_em": "akshare.stock_fundamental.stock_finance_us_em",
+    "futures_hist_table_em": "akshare.futures.futures_hist_em",
+    "futures_hist_em": "akshare.futures.futures_hist_em",
+    "stock_hold_change_cninfo": "akshare.stock.stock_hold_control_cninfo",
+    "fund_fee_em": "akshare.fund.fund_fee_em",
+    "stock_value_em": "akshare.stock_feature.stock_value_em",
+    "volatility_yz_rv": "akshare.cal.rv",
+    "rv_from_futures_zh_minute_sina": "akshare.cal.rv",
+    "rv_from_stock_zh_a_hist_min_em": "akshare.cal.rv",
+    "qdii_a_index_jsl": "akshare.qdii.qdii_jsl",
+    "qdii_e_index_jsl": "akshare.qdii.qdii_jsl",
+    "qdii_e_comm_jsl": "akshare.qdii.qdii_jsl",
+    "stock_news_main_cx": "akshare.stock.stock_news_cx",
+    "spot_hog_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_hog_year_trend_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_hog_lean_price_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_hog_three_way_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_hog_crossbred_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_corn_price_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_soybean_price_soozhu": "akshare.spot.spot_hog_soozhu",
+    "spot_mixed_feed_soozhu": "akshare.spot.spot_hog_soozhu",
+    "stock_hk_famous_spot_em": "akshare.stock.stock_hk_famous",
+    "macro_stock_finance": "akshare.economic.macro_finance_ths",
+    "macro_rmb_loan": "akshare.economic.macro_finance_ths",
+    "macro_rmb_deposit": "akshare.economic.macro_finance_ths",
+    "stock_concept_cons_futu": "akshare.stock_feature.stock_concept_futu",
+    "option_comm_info": "akshare.option.option_comm_qihuo",
+    "option_comm_symbol": "akshare.option.option_comm_qihuo",
+    "option_daily_stats_sse": "akshare.option.option_daily_stats_sse_szse",
+    "option_daily_stats_szse": "akshare.option.option_daily_stats_sse_szse",
+    "fund_etf_spot_ths": "akshare.fund.fund_etf_ths",
+    "stock_margin_account_info": "akshare.stock_feature.stock_margin_em",
+    "spot_price_qh": "akshare.spot.spot_price_qh",
+    "spot_price_table_qh": "akshare.spot.spot_price_qh",
+    "macro_info_ws": "akshare.economic.macro_info_ws",
+    "index_news_sentiment_scope": "akshare.index.index_zh_a_scope",
+    "index_hist_fund_sw": "akshare.index.index_research_fund_sw",
+    "index_realtime_fund_sw": "akshare.index.index_research_fund_sw",
+    "stock_info_cjzc_em": "akshare.stock_feature.stock_info",
+    "stock_info_global_em": "akshare.stock_feature.stock_info",
+    "stock_info_global_ths": "akshare.stock_feature.stock_info",
+    "stock_info_global_futu": "akshare.stock_feature.stock_info",
+    "stock_info_global_sina": "akshare.stock_feature.stock_info",
+    "stock_info_global_cls": "akshare.stock_feature.stock_info",
+    "stock_info_broker_sina": "akshare.stock_feature.stock_info",
+    "futures_contract_info_shfe": "akshare.futures_derivative.futures_contract_info_shfe",
+    "futures_contract_info_dce": "akshare.futures_derivative.futures_contract_info_dce",
+    "futures_contract_info_czce": "akshare.futures_derivative.futures_contract_info_czce",
+    "futures_contract_info_gfex": "akshare.futures_derivative.futures_contract_info_gfex",
+    "futures_contract_info_cffex": "akshare.futures_derivative.futures_contract_info_cffex",
+    "futures_contract_info_ine": "akshare.futures_derivative.futures_contract_info_ine",
+    "futures_stock_shfe_js": "akshare.futures.futures_stock_js",
+    "stock_hsgt_fund_min_em": "akshare.stock_feature.stock_hsgt_min_em",
+    "futures_global_spot_em": "akshare.futures.futures_hf_em",
+    "futures_global_hist_em": "akshare.futures.futures_hf_em",
+    "stock_individual_spot_xq": "akshare.stock.stock_xq",
+    "stock_hk_profit_forecast_et": "akshare.stock_fundamental.stock_profit_forecast_hk_etnet",
+    "stock_zh_a_disclosure_relation_cninfo": "akshare.stock_feature.stock_disclosure_cninfo",
+    "stock_zh_a_disclosure_report_cninfo": "akshare.stock_feature.stock_disclosure_cninfo",
+    "stock_intraday_sina": "akshare.stock.stock_intraday_sina",
+    "stock_zh_a_hist_tx": "akshare.stock_feature.stock_hist_tx",
+    "stock_cyq_em": "akshare.stock_feature.stock_cyq_em",
+    "stock_intraday_em": "akshare.stock.stock_intraday_em",
+    "index_us_stock_sina": "akshare.index.index_stock_us_sina",
+    "stock_share_hold_change_bse": "akshare.stock.stock_share_hold",
+    "stock_share_hold_change_sse": "akshare.stock.stock_share_hold",
+    "stock_share_hold_change_szse": "akshare.stock.stock_share_hold",
+    "stock_research_report_em": "akshare.stock_feature.stock_research_report_em",
+    "stock_zdhtmx_em": "akshare.stock_feature.stock_zdhtmx_em",
+    "stock_gddh_em": "akshare.stock_feature.stock_gddh_em",
+    "stock_gsrl_gsdt_em": "akshare.stock.stock_gsrl_em",
+    "stock_hold_management_detail_em": "akshare.stock.stock_hold_control_em",
+    "stock_hold_management_person_em": "akshare.stock.stock_hold_control_em",
+    "bond_cb_profile_sina": "akshare.bond.bond_cb_sina",
+    "bond_cb_summary_sina": "akshare.bond.bond_cb_sina",
+    "stock_sns_sseinfo": "akshare.stock_feature.stock_sns_sseinfo",
+    "stock_irm_cninfo": "akshare.stock_feature.stock_irm_cninfo",
+    "stock_irm_ans_cninfo": "akshare.stock_feature.stock_irm_cninfo",
+    "fund_announcement_personnel_em": "akshare.fund.fund_announcement",
+    "stock_esg_msci_sina": "akshare.stock_feature.stock_esg_sina",
+    "stock_esg_rft_sina": "akshare.stock_feature.stock_esg_sina",
+    "stock_esg_rate_sina": "akshare.stock_feature.stock_esg_sina",
+    "stock_esg_zd_sina": "akshare.stock_feature.stock_esg_sina",
+    "stock_esg_hz_sina": "akshare.stock_feature.stock_esg_sina",
+    "fund_lof_hist_em": "akshare.fund.fund_lof_em",
+    "fund_lof_spot_em": "akshare.fund.fund_lof_em",
+    "fund_lof_hist_min_em": "akshare.fund.fund_lof_em",
+    "stock_financial_abstract_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_financial_debt_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_financial_benefit_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_financial_cash_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_management_change_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_shareholder_change_ths": "akshare.stock_fundamental.stock_finance_ths",
+    "stock_hk_index_spot_sina": "akshare.index.index_stock_hk",
+    "stock_hk_index_daily_em": "akshare.index.index_stock_hk",
+    "stock_hk_index_spot_em": "akshare.index.index_stock_hk",
+    "stock_hk_index_daily_sina": "akshare.index.index_stock_hk",
+    "bond_zh_cov_info_ths": "akshare.bond.bond_cb_ths",
+    "stock_hk_fhpx_detail_ths": "akshare.stock.stock_hk_fhpx_ths",
+    "stock_fhps_detail_ths": "akshare.stock_feature.stock_fhps_ths",
+    "stock_bid_ask_em": "akshare.stock.stock_ask_bid_em",
+    "stock_profit_forecast_ths": "akshare.stock_fundamental.stock_profit_forecast_ths",
+    "futures_news_shmet": "akshare.futures.futures_news_shmet",
+    "stock_zyjs_ths": "akshare.stock_fundamental.stock_zyjs_ths",
+    "fund_etf_hist_em": "akshare.fund.fund_etf_em",
+    "fund_etf_hist_min_em": "akshare.fund.fund_etf_em",
+    "fund_etf_spot_em": "akshare.fund.fund_etf_em",
+    "stock_ebs_lg": "akshare.stock_feature.stock_ebs_lg",
+    "fund_stock_position_lg": "akshare.fund.fund_position_lg",
+    "fund_balance_position_lg": "akshare.fund.fund_position_lg",
+    "fund_linghuo_position_lg": "akshare.fund.fund_position_lg",
+    "stock_a_congestion_lg": "akshare.stock_feature.stock_congestion_lg",
+    "stock_a_gxl_lg": "akshare.stock_feature.stock_gxl_lg",
+    "stock_hk_gxl_lg": "akshare.stock_feature.stock_gxl_lg",
+    "stock_restricted_release_stockholder_em": "akshare.stock_fundamental.stock_restricted_em",
+    "stock_restricted_release_summary_em": "akshare.stock_fundamental.stock_restricted_em",
+    "stock_restricted_release_detail_em": "akshare.stock_fundamental.stock_restricted_em",
+    "stock_restricted_release_queue_em": "akshare.stock_fundamental.stock_restricted_em",
+    "stock_board_industry_summary_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "index_hog_spot_price": "akshare.index.index_hog",
+    "bond_info_detail_cm": "akshare.bond.bond_info_cm",
+    "bond_info_cm": "akshare.bond.bond_info_cm",
+    "bond_info_cm_query": "akshare.bond.bond_info_cm",
+    "index_realtime_sw": "akshare.index.index_research_sw",
+    "index_hist_sw": "akshare.index.index_research_sw",
+    "index_component_sw": "akshare.index.index_research_sw",
+    "index_min_sw": "akshare.index.index_research_sw",
+    "index_analysis_daily_sw": "akshare.index.index_research_sw",
+    "index_analysis_weekly_sw": "akshare.index.index_research_sw",
+    "index_analysis_monthly_sw": "akshare.index.index_research_sw",
+    "index_analysis_week_month_sw": "akshare.index.index_research_sw",
+    "index_option_50etf_qvix": "akshare.index.index_option_qvix",
+    "index_option_300etf_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_300etf_qvix": "akshare.index.index_option_qvix",
+    "index_option_50etf_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_1000index_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_1000index_qvix": "akshare.index.index_option_qvix",
+    "index_option_100etf_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_100etf_qvix": "akshare.index.index_option_qvix",
+    "index_option_300index_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_300index_qvix": "akshare.index.index_option_qvix",
+    "index_option_500etf_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_500etf_qvix": "akshare.index.index_option_qvix",
+    "index_option_50index_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_50index_qvix": "akshare.index.index_option_qvix",
+    "index_option_cyb_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_cyb_qvix": "akshare.index.index_option_qvix",
+    "index_option_kcb_min_qvix": "akshare.index.index_option_qvix",
+    "index_option_kcb_qvix": "akshare.index.index_option_qvix",
+    "fx_quote_baidu": "akshare.fx.fx_quote_baidu",
+    "stock_buffett_index_lg": "akshare.stock_feature.stock_buffett_index_lg",
+    "stock_hot_search_baidu": "akshare.stock.stock_hot_search_baidu",
+    "stock_zh_vote_baidu": "akshare.stock_feature.stock_zh_vote_baidu",
+    "stock_zh_valuation_baidu": "akshare.stock_feature.stock_zh_valuation_baidu",
+    "stock_hk_valuation_baidu": "akshare.stock_feature.stock_hk_valuation_baidu",
+    "stock_profile_cninfo": "akshare.stock.stock_profile_cninfo",
+    "stock_ipo_summary_cninfo": "akshare.stock.stock_ipo_summary_cninfo",
+    "stock_allotment_cninfo": "akshare.stock.stock_allotment_cninfo",
+    "stock_sgt_reference_exchange_rate_sse": "akshare.stock_feature.stock_hsgt_exchange_rate",
+    "stock_sgt_settlement_exchange_rate_sse": "akshare.stock_feature.stock_hsgt_exchange_rate",
+    "stock_sgt_reference_exchange_rate_szse": "akshare.stock_feature.stock_hsgt_exchange_rate",
+    "stock_sgt_settlement_exchange_rate_szse": "akshare.stock_feature.stock_hsgt_exchange_rate",
+    "bond_new_composite_index_cbond": "akshare.bond.bond_cbond",
+    "bond_composite_index_cbond": "akshare.bond.bond_cbond",
+    "stock_classify_sina": "akshare.stock_feature.stock_classify_sina",
+    "stock_mda_ym": "akshare.stock_fundamental.stock_mda_ym",
+    "stock_zygc_ym": "akshare.stock_fundamental.stock_zygc",
+    "stock_zygc_em": "akshare.stock_fundamental.stock_zygc",
+    "currency_boc_safe": "akshare.currency.currency_safe",
+    "option_risk_indicator_sse": "akshare.option.option_risk_indicator_sse",
+    "news_economic_baidu": "akshare.news.news_baidu",
+    "news_trade_notify_suspend_baidu": "akshare.news.news_baidu",
+    "news_report_time_baidu": "akshare.news.news_baidu",
+    "news_trade_notify_dividend_baidu": "akshare.news.news_baidu",
+    "stock_balance_sheet_by_report_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_balance_sheet_by_yearly_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_profit_sheet_by_report_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_profit_sheet_by_quarterly_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_profit_sheet_by_yearly_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_cash_flow_sheet_by_report_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_cash_flow_sheet_by_quarterly_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_cash_flow_sheet_by_yearly_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_balance_sheet_by_report_delisted_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_profit_sheet_by_report_delisted_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_cash_flow_sheet_by_report_delisted_em": "akshare.stock_feature.stock_three_report_em",
+    "stock_inner_trade_xq": "akshare.stock_feature.stock_inner_trade_xq",
+    "stock_hot_deal_xq": "akshare.stock_feature.stock_hot_xq",
+    "stock_hot_follow_xq": "akshare.stock_feature.stock_hot_xq",
+    "stock_hot_tweet_xq": "akshare.stock_feature.stock_hot_xq",
+    "stock_lhb_hyyyb_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_detail_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_stock_detail_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_jgmmtj_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_stock_statistic_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_stock_detail_date_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_yybph_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_jgstatistic_em": "akshare.stock_feature.stock_lhb_em",
+    "stock_lhb_traderstatistic_em": "akshare.stock_feature.stock_lhb_em",
+    "index_zh_a_hist": "akshare.index.index_zh_em",
+    "index_zh_a_hist_min_em": "akshare.index.index_zh_em",
+    "index_code_id_map_em": "akshare.index.index_zh_em",
+    "stock_hot_rank_detail_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_rank_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_rank_detail_realtime_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_rank_relate_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_keyword_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_rank_latest_em": "akshare.stock.stock_hot_rank_em",
+    "stock_hot_up_em": "akshare.stock.stock_hot_up_em",
+    "stock_hk_hot_rank_detail_em": "akshare.stock.stock_hk_hot_rank_em",
+    "stock_hk_hot_rank_latest_em": "akshare.stock.stock_hk_hot_rank_em",
+    "stock_hk_hot_rank_detail_realtime_em": "akshare.stock.stock_hk_hot_rank_em",
+    "stock_hk_hot_rank_em": "akshare.stock.stock_hk_hot_rank_em",
+    "index_pmi_com_cx": "akshare.index.index_cx",
+    "index_pmi_man_cx": "akshare.index.index_cx",
+    "index_pmi_ser_cx": "akshare.index.index_cx",
+    "index_dei_cx": "akshare.index.index_cx",
+    "index_ii_cx": "akshare.index.index_cx",
+    "index_si_cx": "akshare.index.index_cx",
+    "index_fi_cx": "akshare.index.index_cx",
+    "index_bi_cx": "akshare.index.index_cx",
+    "index_ci_cx": "akshare.index.index_cx",
+    "index_awpr_cx": "akshare.index.index_cx",
+    "index_cci_cx": "akshare.index.index_cx",
+    "index_li_cx": "akshare.index.index_cx",
+    "index_neaw_cx": "akshare.index.index_cx",
+    "index_nei_cx": "akshare.index.index_cx",
+    "index_ti_cx": "akshare.index.index_cx",
+    "index_ai_cx": "akshare.index.index_cx",
+    "index_neei_cx": "akshare.index.index_cx",
+    "index_bei_cx": "akshare.index.index_cx",
+    "index_qli_cx": "akshare.index.index_cx",
+    "option_premium_analysis_em": "akshare.option.option_premium_analysis_em",
+    "option_risk_analysis_em": "akshare.option.option_risk_analysis_em",
+    "option_value_analysis_em": "akshare.option.option_value_analysis_em",
+    "option_lhb_em": "akshare.option.option_lhb_em",
+    "stock_gdfx_holding_analyse_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_holding_analyse_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_top_10_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_top_10_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_holding_detail_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_holding_detail_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_holding_change_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_holding_change_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_holding_statistics_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_holding_statistics_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_free_holding_teamwork_em": "akshare.stock_feature.stock_gdfx_em",
+    "stock_gdfx_holding_teamwork_em": "akshare.stock_feature.stock_gdfx_em",
+    "index_sugar_msweet": "akshare.index.index_sugar",
+    "index_inner_quote_sugar_msweet": "akshare.index.index_sugar",
+    "index_outer_quote_sugar_msweet": "akshare.index.index_sugar",
+    "stock_individual_info_em": "akshare.stock.stock_info_em",
+    "spot_hist_sge": "akshare.spot.spot_sge",
+    "spot_symbol_table_sge": "akshare.spot.spot_sge",
+    "spot_silver_benchmark_sge": "akshare.spot.spot_sge",
+    "spot_golden_benchmark_sge": "akshare.spot.spot_sge",
+    "spot_quotations_sge": "akshare.spot.spot_sge",
+    "stock_repurchase_em": "akshare.stock.stock_repurchase_em",
+    "stock_board_industry_cons_em": "akshare.stock.stock_board_industry_em",
+    "stock_board_industry_hist_em": "akshare.stock.stock_board_industry_em",
+    "stock_board_industry_hist_min_em": "akshare.stock.stock_board_industry_em",
+    "stock_board_industry_name_em": "akshare.stock.stock_board_industry_em",
+    "stock_board_industry_spot_em": "akshare.stock.stock_board_industry_em",
+    "fund_scale_change_em": "akshare.fund.fund_scale_em",
+    "fund_hold_structure_em": "akshare.fund.fund_scale_em",
+    "fund_cf_em": "akshare.fund.fund_fhsp_em",
+    "fund_fh_rank_em": "akshare.fund.fund_fhsp_em",
+    "fund_fh_em": "akshare.fund.fund_fhsp_em",
+    "online_value_artist": "akshare.movie.artist_yien",
+    "business_value_artist": "akshare.movie.artist_yien",
+    "video_variety_show": "akshare.movie.video_yien",
+    "video_tv": "akshare.movie.video_yien",
+    "stock_rank_cxg_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_cxd_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_lxsz_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_lxxd_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_cxfl_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_cxsl_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_xstp_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_xxtp_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_ljqd_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_ljqs_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_rank_xzjp_ths": "akshare.stock_feature.stock_technology_ths",
+    "stock_hsgt_individual_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_individual_detail_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_fund_flow_summary_em": "akshare.stock_feature.stock_hsgt_em",
+    "fund_scale_open_sina": "akshare.fund.fund_scale_sina",
+    "fund_scale_close_sina": "akshare.fund.fund_scale_sina",
+    "fund_scale_structured_sina": "akshare.fund.fund_scale_sina",
+    "fund_report_stock_cninfo": "akshare.fund.fund_report_cninfo",
+    "fund_report_industry_allocation_cninfo": "akshare.fund.fund_report_cninfo",
+    "fund_report_asset_allocation_cninfo": "akshare.fund.fund_report_cninfo",
+    "bond_treasure_issue_cninfo": "akshare.bond.bond_issue_cninfo",
+    "bond_local_government_issue_cninfo": "akshare.bond.bond_issue_cninfo",
+    "bond_corporate_issue_cninfo": "akshare.bond.bond_issue_cninfo",
+    "bond_cov_issue_cninfo": "akshare.bond.bond_issue_cninfo",
+    "bond_cov_stock_issue_cninfo": "akshare.bond.bond_issue_cninfo",
+    "stock_cg_equity_mortgage_cninfo": "akshare.stock.stock_cg_equity_mortgage",
+    "stock_cg_lawsuit_cninfo": "akshare.stock.stock_cg_lawsuit",
+    "stock_cg_guarantee_cninfo": "akshare.stock.stock_cg_guarantee",
+    "stock_zh_b_spot": "akshare.stock.stock_zh_b_sina",
+    "stock_zh_b_daily": "akshare.stock.stock_zh_b_sina",
+    "stock_zh_b_minute": "akshare.stock.stock_zh_b_sina",
+    "futures_comm_info": "akshare.futures.futures_comm_qihuo",
+    "futures_fees_info": "akshare.futures.futures_comm_ctp",
+    "stock_hold_control_cninfo": "akshare.stock.stock_hold_control_cninfo",
+    "stock_hold_management_detail_cninfo": "akshare.stock.stock_hold_control_cninfo",
+    "stock_hold_num_cninfo": "akshare.stock.stock_hold_num_cninfo",
+    "stock_new_gh_cninfo": "akshare.stock.stock_new_cninfo",
+    "stock_new_ipo_cninfo": "akshare.stock.stock_new_cninfo",
+    "stock_dividend_cninfo": "akshare.stock.stock_dividend_cninfo",
+    "stock_share_change_cninfo": "akshare.stock.stock_share_changes_cninfo",
+    "stock_industry_category_cninfo": "akshare.stock.stock_industry_cninfo",
+    "stock_industry_change_cninfo": "akshare.stock.stock_industry_cninfo",
+    "stock_industry_pe_ratio_cninfo": "akshare.stock.stock_industry_pe_cninfo",
+    "stock_industry_clf_hist_sw": "akshare.stock.stock_industry_sw",
+    "stock_rank_forecast_cninfo": "akshare.stock.stock_rank_forecast",
+    "stock_us_famous_spot_em": "akshare.stock.stock_us_famous",
+    "stock_us_pink_spot_em": "akshare.stock.stock_us_pink",
+    "reits_realtime_em": "akshare.reits.reits_basic",
+    "reits_hist_em": "akshare.reits.reits_basic",
+    "stock_a_ttm_lyr": "akshare.stock_feature.stock_ttm_lyr",
+    "stock_a_all_pb": "akshare.stock_feature.stock_all_pb",
+    "sport_olympic_hist": "akshare.sport.sport_olympic",
+    "macro_canada_cpi_monthly": "akshare.economic.macro_canada",
+    "macro_canada_core_cpi_monthly": "akshare.economic.macro_canada",
+    "macro_canada_bank_rate": "akshare.economic.macro_canada",
+    "macro_canada_core_cpi_yearly": "akshare.economic.macro_canada",
+    "macro_canada_cpi_yearly": "akshare.economic.macro_canada",
+    "macro_canada_gdp_monthly": "akshare.economic.macro_canada",
+    "macro_canada_new_house_rate": "akshare.economic.macro_canada",
+    "macro_canada_retail_rate_monthly": "akshare.economic.macro_canada",
+    "macro_canada_trade": "akshare.economic.macro_canada",
+    "macro_canada_unemployment_rate": "akshare.economic.macro_canada",
+    "futures_hog_core": "akshare.futures_derivative.futures_hog",
+    "futures_hog_cost": "akshare.futures_derivative.futures_hog",
+    "futures_hog_supply": "akshare.futures_derivative.futures_hog",
+    "macro_australia_bank_rate": "akshare.economic.macro_australia",
+    "macro_australia_unemployment_rate": "akshare.economic.macro_australia",
+    "macro_australia_trade": "akshare.economic.macro_australia",
+    "macro_australia_cpi_quarterly": "akshare.economic.macro_australia",
+    "macro_australia_cpi_yearly": "akshare.economic.macro_australia",
+    "macro_australia_ppi_quarterly": "akshare.economic.macro_australia",
+    "macro_australia_retail_rate_monthly": "akshare.economic.macro_australia",
+    "stock_margin_underlying_info_szse": "akshare.stock_feature.stock_margin_szse",
+    "stock_margin_detail_szse": "akshare.stock_feature.stock_margin_szse",
+    "stock_margin_szse": "akshare.stock_feature.stock_margin_szse",
+    "macro_uk_gdp_yearly": "akshare.economic.macro_uk",
+    "macro_uk_gdp_quarterly": "akshare.economic.macro_uk",
+    "macro_uk_retail_yearly": "akshare.economic.macro_uk",
+    "macro_uk_rightmove_monthly": "akshare.economic.macro_uk",
+    "macro_uk_rightmove_yearly": "akshare.economic.macro_uk",
+    "macro_uk_unemployment_rate": "akshare.economic.macro_uk",
+    "macro_uk_halifax_monthly": "akshare.economic.macro_uk",
+    "macro_uk_bank_rate": "akshare.economic.macro_uk",
+    "macro_uk_core_cpi_monthly": "akshare.economic.macro_uk",
+    "macro_uk_core_cpi_yearly": "akshare.economic.macro_uk",
+    "macro_uk_cpi_monthly": "akshare.economic.macro_uk",
+    "macro_uk_cpi_yearly": "akshare.economic.macro_uk",
+    "macro_uk_halifax_yearly": "akshare.economic.macro_uk",
+    "macro_uk_retail_monthly": "akshare.economic.macro_uk",
+    "macro_uk_trade": "akshare.economic.macro_uk",
+    "macro_japan_bank_rate": "akshare.economic.macro_japan",
+    "macro_japan_core_cpi_yearly": "akshare.economic.macro_japan",
+    "macro_japan_cpi_yearly": "akshare.economic.macro_japan",
+    "macro_japan_head_indicator": "akshare.economic.macro_japan",
+    "macro_japan_unemployment_rate": "akshare.economic.macro_japan",
+    "macro_swiss_trade": "akshare.economic.macro_swiss",
+    "macro_swiss_svme": "akshare.economic.macro_swiss",
+    "macro_swiss_cpi_yearly": "akshare.economic.macro_swiss",
+    "macro_swiss_gbd_yearly": "akshare.economic.macro_swiss",
+    "macro_swiss_gbd_bank_rate": "akshare.economic.macro_swiss",
+    "macro_swiss_gdp_quarterly": "akshare.economic.macro_swiss",
+    "stock_board_concept_cons_em": "akshare.stock.stock_board_concept_em",
+    "stock_board_concept_hist_em": "akshare.stock.stock_board_concept_em",
+    "stock_board_concept_hist_min_em": "akshare.stock.stock_board_concept_em",
+    "stock_board_concept_spot_em": "akshare.stock.stock_board_concept_em",
+    "macro_germany_gdp": "akshare.economic.macro_germany",
+    "macro_germany_ifo": "akshare.economic.macro_germany",
+    "macro_germany_cpi_monthly": "akshare.economic.macro_germany",
+    "macro_germany_retail_sale_monthly": "akshare.economic.macro_germany",
+    "macro_germany_trade_adjusted": "akshare.economic.macro_germany",
+    "macro_germany_retail_sale_yearly": "akshare.economic.macro_germany",
+    "macro_germany_cpi_yearly": "akshare.economic.macro_germany",
+    "macro_germany_zew": "akshare.economic.macro_germany",
+    "fund_aum_em": "akshare.fund.fund_aum_em",
+    "fund_aum_trend_em": "akshare.fund.fund_aum_em",
+    "fund_aum_hist_em": "akshare.fund.fund_aum_em",
+    "crypto_bitcoin_cme": "akshare.crypto.crypto_bitcoin_cme",
+    "stock_changes_em": "akshare.stock_feature.stock_pankou_em",
+    "stock_board_change_em": "akshare.stock_feature.stock_pankou_em",
+    "stock_bj_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_new_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_kc_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_cy_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_sh_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_sz_a_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_zh_b_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_zh_a_hist": "akshare.stock_feature.stock_hist_em",
+    "stock_hk_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_hk_main_board_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_hk_hist": "akshare.stock_feature.stock_hist_em",
+    "stock_us_spot_em": "akshare.stock_feature.stock_hist_em",
+    "stock_us_hist": "akshare.stock_feature.stock_hist_em",
+    "stock_zh_a_hist_min_em": "akshare.stock_feature.stock_hist_em",
+    "stock_zh_a_hist_pre_min_em": "akshare.stock_feature.stock_hist_em",
+    "stock_hk_hist_min_em": "akshare.stock_feature.stock_hist_em",
+    "stock_us_hist_min_em": "akshare.stock_feature.stock_hist_em",
+    "currency_boc_sina": "akshare.currency.currency_china_bank_sina",
+    "futures_hold_pos_sina": "akshare.futures_derivative.futures_cot_sina",
+    "stock_zh_a_gdhs": "akshare.stock_feature.stock_gdhs",
+    "stock_zh_a_gdhs_detail_em": "akshare.stock_feature.stock_gdhs",
+    "stock_staq_net_stop": "akshare.stock.stock_stop",
+    "stock_zt_pool_em": "akshare.stock_feature.stock_ztb_em",
+    "stock_zt_pool_previous_em": "akshare.stock_feature.stock_ztb_em",
+    "stock_zt_pool_dtgc_em": "akshare.stock_feature.stock_ztb_em",
+    "stock_zt_pool_zbgc_em": "akshare.stock_feature.stock_ztb_em",
+    "stock_zt_pool_strong_em": "akshare.stock_feature.stock_ztb_em",
+    "stock_zt_pool_sub_new_em": "akshare.stock_feature.stock_ztb_em",
+    "macro_china_hk_cpi": "akshare.economic.macro_china_hk",
+    "macro_china_hk_cpi_ratio": "akshare.economic.macro_china_hk",
+    "macro_china_hk_trade_diff_ratio": "akshare.economic.macro_china_hk",
+    "macro_china_hk_gbp_ratio": "akshare.economic.macro_china_hk",
+    "macro_china_hk_building_amount": "akshare.economic.macro_china_hk",
+    "macro_china_hk_building_volume": "akshare.economic.macro_china_hk",
+    "macro_china_hk_gbp": "akshare.economic.macro_china_hk",
+    "macro_china_hk_ppi": "akshare.economic.macro_china_hk",
+    "macro_china_hk_rate_of_unemployment": "akshare.economic.macro_china_hk",
+    "stock_qbzf_em": "akshare.stock_feature.stock_zf_pg",
+    "stock_pg_em": "akshare.stock_feature.stock_zf_pg",
+    "car_sale_rank_gasgoo": "akshare.other.other_car_gasgoo",
+    "car_market_cate_cpca": "akshare.other.other_car_cpca",
+    "car_market_fuel_cpca": "akshare.other.other_car_cpca",
+    "car_market_segment_cpca": "akshare.other.other_car_cpca",
+    "car_market_country_cpca": "akshare.other.other_car_cpca",
+    "car_market_man_rank_cpca": "akshare.other.other_car_cpca",
+    "car_market_total_cpca": "akshare.other.other_car_cpca",
+    "index_price_cflp": "akshare.index.index_cflp",
+    "index_volume_cflp": "akshare.index.index_cflp",
+    "stock_market_activity_legu": "akshare.stock_feature.stock_market_legu",
+    "index_eri": "akshare.index.index_eri",
+    "drewry_wci_index": "akshare.index.index_drewry",
+    "index_kq_fz": "akshare.index.index_kq_fz",
+    "index_kq_fashion": "akshare.index.index_kq_ss",
+    "stock_hot_rank_wc": "akshare.stock_feature.stock_wencai",
+    "fund_new_found_em": "akshare.fund.fund_init_em",
+    "stock_ggcg_em": "akshare.stock_feature.stock_gdzjc_em",
+    "stock_fund_flow_concept": "akshare.stock_feature.stock_fund_flow",
+    "stock_fund_flow_industry": "akshare.stock_feature.stock_fund_flow",
+    "stock_fund_flow_big_deal": "akshare.stock_feature.stock_fund_flow",
+    "stock_fund_flow_individual": "akshare.stock_feature.stock_fund_flow",
+    "crypto_bitcoin_hold_report": "akshare.crypto.crypto_hold",
+    "stock_lh_yyb_capital": "akshare.stock_feature.stock_lh_yybpm",
+    "stock_lh_yyb_most": "akshare.stock_feature.stock_lh_yybpm",
+    "stock_lh_yyb_control": "akshare.stock_feature.stock_lh_yybpm",
+    "stock_notice_report": "akshare.stock_fundamental.stock_notice",
+    "stock_ipo_declare": "akshare.stock_fundamental.stock_ipo_declare",
+    "stock_zcfz_em": "akshare.stock_feature.stock_report_em",
+    "stock_zcfz_bj_em": "akshare.stock_feature.stock_report_em",
+    "stock_lrb_em": "akshare.stock_feature.stock_report_em",
+    "stock_xjll_em": "akshare.stock_feature.stock_report_em",
+    "stock_yjbb_em": "akshare.stock_feature.stock_yjbb_em",
+    "stock_board_concept_info_ths": "akshare.stock_feature.stock_board_concept_ths",
+    "stock_board_concept_summary_ths": "akshare.stock_feature.stock_board_concept_ths",
+    "stock_board_concept_index_ths": "akshare.stock_feature.stock_board_concept_ths",
+    "stock_board_concept_name_ths": "akshare.stock_feature.stock_board_concept_ths",
+    "stock_board_industry_name_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "stock_board_industry_info_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "stock_board_industry_index_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "stock_ipo_benefit_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "stock_xgsr_ths": "akshare.stock_feature.stock_board_industry_ths",
+    "stock_fhps_em": "akshare.stock_feature.stock_fhps_em",
+    "stock_fhps_detail_em": "akshare.stock_feature.stock_fhps_em",
+    "bond_zh_us_rate": "akshare.bond.bond_em",
+    "stock_profit_forecast_em": "akshare.stock_fundamental.stock_profit_forecast_em",
+    "fund_manager_em": "akshare.fund.fund_manager",
+    "fund_rating_sh": "akshare.fund.fund_rating",
+    "fund_rating_zs": "akshare.fund.fund_rating",
+    "fund_rating_ja": "akshare.fund.fund_rating",
+    "fund_rating_all": "akshare.fund.fund_rating",
+    "stock_margin_detail_sse": "akshare.stock_feature.stock_margin_sse",
+    "stock_margin_sse": "akshare.stock_feature.stock_margin_sse",
+    "stock_margin_ratio_pa": "akshare.stock_feature.stock_margin_sse",
+    "futures_to_spot_czce": "akshare.futures.futures_to_spot",
+    "futures_to_spot_shfe": "akshare.futures.futures_to_spot",
+    "futures_to_spot_dce": "akshare.futures.futures_to_spot",
+    "futures_delivery_dce": "akshare.futures.futures_to_spot",
+    "futures_delivery_shfe": "akshare.futures.futures_to_spot",
+    "futures_delivery_czce": "akshare.futures.futures_to_spot",
+    "futures_delivery_match_dce": "akshare.futures.futures_to_spot",
+    "futures_delivery_match_czce": "akshare.futures.futures_to_spot",
+    "fund_portfolio_hold_em": "akshare.fund.fund_portfolio_em",
+    "fund_portfolio_change_em": "akshare.fund.fund_portfolio_em",
+    "fund_portfolio_bond_hold_em": "akshare.fund.fund_portfolio_em",
+    "fund_portfolio_industry_allocation_em": "akshare.fund.fund_portfolio_em",
+    "bond_deal_summary_sse": "akshare.bond.bond_summary",
+    "bond_cash_summary_sse": "akshare.bond.bond_summary",
+    "stock_news_em": "akshare.news.news_stock",
+    "stock_yzxdr_em": "akshare.stock_feature.stock_yzxdr_em",
+    "stock_dzjy_sctj": "akshare.stock.stock_dzjy_em",
+    "stock_dzjy_mrmx": "akshare.stock.stock_dzjy_em",
+    "stock_dzjy_mrtj": "akshare.stock.stock_dzjy_em",
+    "stock_dzjy_hygtj": "akshare.stock.stock_dzjy_em",
+    "stock_dzjy_yybph": "akshare.stock.stock_dzjy_em",
+    "stock_dzjy_hyyybtj": "akshare.stock.stock_dzjy_em",
+    "index_hist_cni": "akshare.index.index_cni",
+    "index_all_cni": "akshare.index.index_cni",
+    "index_detail_cni": "akshare.index.index_cni",
+    "index_detail_hist_cni": "akshare.index.index_cni",
+    "index_detail_hist_adjust_cni": "akshare.index.index_cni",
+    "option_current_em": "akshare.option.option_em",
+    "stock_zh_kcb_report_em": "akshare.stock.stock_zh_kcb_report",
+    "futures_contract_detail": "akshare.futures.futures_contract_detail",
+    "hurun_rank": "akshare.fortune.fortune_hurun",
+    "xincaifu_rank": "akshare.fortune.fortune_xincaifu_500",
+    "forbes_rank": "akshare.fortune.fortune_forbes_500",
+    "repo_rate_hist": "akshare.rate.repo_rate",
+    "repo_rate_query": "akshare.rate.repo_rate",
+    "fund_exchange_rank_em": "akshare.fund.fund_rank_em",
+    "fund_money_rank_em": "akshare.fund.fund_rank_em",
+    "fund_open_fund_rank_em": "akshare.fund.fund_rank_em",
+    "fund_hk_rank_em": "akshare.fund.fund_rank_em",
+    "fund_lcx_rank_em": "akshare.fund.fund_rank_em",
+    "movie_boxoffice_cinema_daily": "akshare.movie.movie_yien",
+    "movie_boxoffice_cinema_weekly": "akshare.movie.movie_yien",
+    "movie_boxoffice_weekly": "akshare.movie.movie_yien",
+    "movie_boxoffice_daily": "akshare.movie.movie_yien",
+    "movie_boxoffice_monthly": "akshare.movie.movie_yien",
+    "movie_boxoffice_realtime": "akshare.movie.movie_yien",
+    "movie_boxoffice_yearly": "akshare.movie.movie_yien",
+    "movie_boxoffice_yearly_first_week": "akshare.movie.movie_yien",
+    "news_cctv": "akshare.news.news_cctv",
+    "bond_china_close_return": "akshare.bond.bond_china_money",
+    "macro_china_bond_public": "akshare.bond.bond_china_money",
+    "macro_china_swap_rate": "akshare.bond.bond_china_money",
+    "bond_china_close_return_map": "akshare.bond.bond_china_money",
+    "futures_comex_inventory": "akshare.futures.futures_comex_em",
+    "stock_zh_a_new": "akshare.stock.stock_zh_a_special",
+    "stock_zh_a_st_em": "akshare.stock.stock_zh_a_special",
+    "stock_zh_a_new_em": "akshare.stock.stock_zh_a_special",
+    "stock_zh_a_stop_em": "akshare.stock.stock_zh_a_special",
+    "stock_register_kcb": "akshare.stock_fundamental.stock_register_em",
+    "stock_register_cyb": "akshare.stock_fundamental.stock_register_em",
+    "stock_register_bj": "akshare.stock_fundamental.stock_register_em",
+    "stock_register_db": "akshare.stock_fundamental.stock_register_em",
+    "stock_register_sh": "akshare.stock_fundamental.stock_register_em",
+    "stock_register_sz": "akshare.stock_fundamental.stock_register_em",
+    "stock_lhb_detail_daily_sina": "akshare.stock_feature.stock_lhb_sina",
+    "stock_lhb_ggtj_sina": "akshare.stock_feature.stock_lhb_sina",
+    "stock_lhb_jgmx_sina": "akshare.stock_feature.stock_lhb_sina",
+    "stock_lhb_jgzz_sina": "akshare.stock_feature.stock_lhb_sina",
+    "stock_lhb_yytj_sina": "akshare.stock_feature.stock_lhb_sina",
+    "stock_zh_index_hist_csindex": "akshare.index.index_stock_zh_csindex",
+    "stock_zh_index_value_csindex": "akshare.index.index_stock_zh_csindex",
+    "stock_report_fund_hold": "akshare.stock.stock_fund_hold",
+    "stock_report_fund_hold_detail": "akshare.stock.stock_fund_hold",
+    "futures_zh_minute_sina": "akshare.futures.futures_zh_sina",
+    "futures_zh_daily_sina": "akshare.futures.futures_zh_sina",
+    "futures_zh_realtime": "akshare.futures.futures_zh_sina",
+    "futures_symbol_mark": "akshare.futures.futures_zh_sina",
+    "match_main_contract": "akshare.futures.futures_zh_sina",
+    "futures_zh_spot": "akshare.futures.futures_zh_sina",
+    "stock_report_disclosure": "akshare.stock_feature.stock_yjyg_cninfo",
+    "fund_etf_hist_sina": "akshare.fund.fund_etf_sina",
+    "fund_etf_category_sina": "akshare.fund.fund_etf_sina",
+    "fund_etf_dividend_sina": "akshare.fund.fund_etf_sina",
+    "tool_trade_date_hist_sina": "akshare.tool.trade_date_hist",
+    "option_commodity_contract_table_sina": "akshare.option.option_commodity_sina",
+    "option_commodity_contract_sina": "akshare.option.option_commodity_sina",
+    "option_commodity_hist_sina": "akshare.option.option_commodity_sina",
+    "stock_market_pb_lg": "akshare.stock_feature.stock_a_pe_and_pb",
+    "stock_index_pb_lg": "akshare.stock_feature.stock_a_pe_and_pb",
+    "stock_market_pe_lg": "akshare.stock_feature.stock_a_pe_and_pb",
+    "stock_index_pe_lg": "akshare.stock_feature.stock_a_pe_and_pb",
+    "stock_a_indicator_lg": "akshare.stock_feature.stock_a_indicator",
+    "stock_hk_indicator_eniu": "akshare.stock_feature.stock_a_indicator",
+    "stock_a_high_low_statistics": "akshare.stock_feature.stock_a_high_low",
+    "stock_a_below_net_asset_statistics": "akshare.stock_feature.stock_a_below_net_asset_statistics",
+    "index_bloomberg_billionaires": "akshare.fortune.fortune_bloomberg",
+    "index_bloomberg_billionaires_hist": "akshare.fortune.fortune_bloomberg",
+    "stock_qsjy_em": "akshare.stock_feature.stock_qsjy_em",
+    "futures_czce_warehouse_receipt": "akshare.futures.futures_warehouse_receipt",
+    "futures_dce_warehouse_receipt": "akshare.futures.futures_warehouse_receipt",
+    "futures_shfe_warehouse_receipt": "akshare.futures.futures_warehouse_receipt",
+    "futures_gfex_warehouse_receipt": "akshare.futures.futures_warehouse_receipt",
+    "stock_price_js": "akshare.stock.stock_us_js",
+    "stock_sse_summary": "akshare.stock.stock_summary",
+    "stock_szse_summary": "akshare.stock.stock_summary",
+    "stock_sse_deal_daily": "akshare.stock.stock_summary",
+    "stock_szse_area_summary": "akshare.stock.stock_summary",
+    "stock_szse_sector_summary": "akshare.stock.stock_summary",
+    "stock_institute_recommend": "akshare.stock_fundamental.stock_recommend",
+    "stock_institute_recommend_detail": "akshare.stock_fundamental.stock_recommend",
+    "stock_institute_hold_detail": "akshare.stock_fundamental.stock_hold",
+    "stock_institute_hold": "akshare.stock_fundamental.stock_hold",
+    "stock_info_sh_delist": "akshare.stock.stock_info",
+    "stock_info_sz_delist": "akshare.stock.stock_info",
+    "stock_info_a_code_name": "akshare.stock.stock_info",
+    "stock_info_sh_name_code": "akshare.stock.stock_info",
+    "stock_info_bj_name_code": "akshare.stock.stock_info",
+    "stock_info_sz_name_code": "akshare.stock.stock_info",
+    "stock_info_sz_change_name": "akshare.stock.stock_info",
+    "stock_info_change_name": "akshare.stock.stock_info",
+    "stock_sector_spot": "akshare.stock.stock_industry",
+    "stock_sector_detail": "akshare.stock.stock_industry",
+    "stock_financial_abstract": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_financial_report_sina": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_financial_analysis_indicator": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_add_stock": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_ipo_info": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_history_dividend_detail": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_history_dividend": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_circulate_stock_holder": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_restricted_release_queue_sina": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_fund_stock_holder": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_main_stock_holder": "akshare.stock_fundamental.stock_finance_sina",
+    "stock_financial_hk_analysis_indicator_em": "akshare.stock_fundamental.stock_finance_hk_em",
+    "stock_financial_hk_report_em": "akshare.stock_fundamental.stock_finance_hk_em",
+    "stock_individual_fund_flow": "akshare.stock.stock_fund_em",
+    "stock_market_fund_flow": "akshare.stock.stock_fund_em",
+    "stock_sector_fund_flow_rank": "akshare.stock.stock_fund_em",
+    "stock_sector_fund_flow_summary": "akshare.stock.stock_fund_em",
+    "stock_sector_fund_flow_hist": "akshare.stock.stock_fund_em",
+    "stock_concept_fund_flow_hist": "akshare.stock.stock_fund_em",
+    "stock_main_fund_flow": "akshare.stock.stock_fund_em",
+    "air_quality_hist": "akshare.air.air_zhenqi",
+    "air_quality_rank": "akshare.air.air_zhenqi",
+    "air_quality_watch_point": "akshare.air.air_zhenqi",
+    "air_city_table": "akshare.air.air_zhenqi",
+    "hf_sp_500": "akshare.hf.hf_sp500",
+    "stock_yjyg_em": "akshare.stock_feature.stock_yjyg_em",
+    "stock_yysj_em": "akshare.stock_feature.stock_yjyg_em",
+    "stock_yjkb_em": "akshare.stock_feature.stock_yjyg_em",
+    "stock_dxsyl_em": "akshare.stock_feature.stock_dxsyl_em",
+    "stock_xgsglb_em": "akshare.stock_feature.stock_dxsyl_em",
+    "fred_md": "akshare.article.fred_md",
+    "fred_qd": "akshare.article.fred_md",
+    "futures_index_min_ccidx": "akshare.futures.futures_index_ccidx",
+    "futures_index_ccidx": "akshare.futures.futures_index_ccidx",
+    "futures_spot_stock": "akshare.futures.futures_spot_stock_em",
+    "energy_oil_detail": "akshare.energy.energy_oil_em",
+    "energy_oil_hist": "akshare.energy.energy_oil_em",
+    "futures_foreign_detail": "akshare.futures.futures_foreign",
+    "futures_foreign_hist": "akshare.futures.futures_foreign",
+    "stock_tfp_em": "akshare.stock_feature.stock_tfp_em",
+    "stock_hk_ggt_components_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_hold_stock_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_hist_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_institution_statistics_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_stock_statistics_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_hsgt_board_rank_em": "akshare.stock_feature.stock_hsgt_em",
+    "stock_comment_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_zlkp_jgcyd_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_scrd_focus_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_zhpj_lspf_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_scrd_desire_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_scrd_cost_em": "akshare.stock_feature.stock_comment_em",
+    "stock_comment_detail_scrd_desire_daily_em": "akshare.stock_feature.stock_comment_em",
+    "stock_analyst_detail_em": "akshare.stock_feature.stock_analyst_em",
+    "stock_analyst_rank_em": "akshare.stock_feature.stock_analyst_em",
+    "futures_settlement_price_sgx": "akshare.futures.futures_settlement_price_sgx",
+    "currency_convert": "akshare.currency.currency",
+    "currency_currencies": "akshare.currency.currency",
+    "currency_history": "akshare.currency.currency",
+    "currency_latest": "akshare.currency.currency",
+    "currency_time_series": "akshare.currency.currency",
+    "nlp_ownthink": "akshare.nlp.nlp_interface",
+    "nlp_answer": "akshare.nlp.nlp_interface",
+    "stock_js_weibo_nlp_time": "akshare.stock.stock_weibo_nlp",
+    "stock_js_weibo_report": "akshare.stock.stock_weibo_nlp",
+    "option_cffex_sz50_list_sina": "akshare.option.option_finance_sina",
+    "option_cffex_sz50_spot_sina": "akshare.option.option_finance_sina",
+    "option_cffex_sz50_daily_sina": "akshare.option.option_finance_sina",
+    "option_cffex_hs300_list_sina": "akshare.option.option_finance_sina",
+    "option_cffex_hs300_spot_sina": "akshare.option.option_finance_sina",
+    "option_cffex_hs300_daily_sina": "akshare.option.option_finance_sina",
+    "option_cffex_zz1000_list_sina": "akshare.option.option_finance_sina",
+    "option_cffex_zz1000_spot_sina": "akshare.option.option_finance_sina",
+    "option_cffex_zz1000_daily_sina": "akshare.option.option_finance_sina",
+    "option_sse_list_sina": "akshare.option.option_finance_sina",
+    "option_sse_expire_day_sina": "akshare.option.option_finance_sina",
+    "option_sse_codes_sina": "akshare.option.option_finance_sina",
+    "option_sse_spot_price_sina": "akshare.option.option_finance_sina",
+    "option_sse_underlying_spot_price_sina": "akshare.option.option_finance_sina",
+    "option_sse_greeks_sina": "akshare.option.option_finance_sina",
+    "option_sse_minute_sina": "akshare.option.option_finance_sina",
+    "option_sse_daily_sina": "akshare.option.option_finance_sina",
+    "option_finance_minute_sina": "akshare.option.option_finance_sina",
+    "option_minute_em": "akshare.option.option_finance_sina",
+    "bond_zh_hs_daily": "akshare.bond.bond_zh_sina",
+    "bond_zh_hs_spot": "akshare.bond.bond_zh_sina",
+    "bond_zh_hs_cov_daily": "akshare.bond.bond_zh_cov",
+    "bond_zh_hs_cov_spot": "akshare.bond.bond_zh_cov",
+    "bond_cov_comparison": "akshare.bond.bond_zh_cov",
+    "bond_zh_cov": "akshare.bond.bond_zh_cov",
+    "bond_zh_cov_info": "akshare.bond.bond_zh_cov",
+    "bond_zh_hs_cov_min": "akshare.bond.bond_zh_cov",
+    "bond_zh_hs_cov_pre_min": "akshare.bond.bond_zh_cov",
+    "bond_zh_cov_value_analysis": "akshare.bond.bond_zh_cov",
+    "bond_cb_jsl": "akshare.bond.bond_convert",
+    "bond_cb_adj_logs_jsl": "akshare.bond.bond_convert",
+    "bond_cb_index_jsl": "akshare.bond.bond_convert",
+    "bond_cb_redeem_jsl": "akshare.bond.bond_convert",
+    "fund_open_fund_daily_em": "akshare.fund.fund_em",
+    "fund_open_fund_info_em": "akshare.fund.fund_em",
+    "fund_etf_fund_daily_em": "akshare.fund.fund_em",
+    "fund_etf_fund_info_em": "akshare.fund.fund_em",
+    "fund_financial_fund_daily_em": "akshare.fund.fund_em",
+    "fund_financial_fund_info_em": "akshare.fund.fund_em",
+    "fund_name_em": "akshare.fund.fund_em",
+    "fund_info_index_em": "akshare.fund.fund_em",
+    "fund_graded_fund_daily_em": "akshare.fund.fund_em",
+    "fund_graded_fund_info_em": "akshare.fund.fund_em",
+    "fund_money_fund_daily_em": "akshare.fund.fund_em",
+    "fund_money_fund_info_em": "akshare.fund.fund_em",
+    "fund_value_estimation_em": "akshare.fund.fund_em",
+    "fund_hk_fund_hist_em": "akshare.fund.fund_em",
+    "fund_purchase_em": "akshare.fund.fund_em",
+    "migration_area_baidu": "akshare.event.migration",
+    "migration_scale_baidu": "akshare.event.migration",
+    "currency_pair_map": "akshare.fx.currency_investing",
+    "option_czce_hist": "akshare.option.option_czce",
+    "rate_interbank": "akshare.interest_rate.interbank_rate_em",
+    "macro_fx_sentiment": "akshare.economic.macro_other",
+    "macro_euro_gdp_yoy": "akshare.economic.macro_euro",
+    "macro_euro_cpi_mom": "akshare.economic.macro_euro",
+    "macro_euro_cpi_yoy": "akshare.economic.macro_euro",
+    "macro_euro_current_account_mom": "akshare.economic.macro_euro",
+    "macro_euro_employment_change_qoq": "akshare.economic.macro_euro",
+    "macro_euro_industrial_production_mom": "akshare.economic.macro_euro",
+    "macro_euro_manufacturing_pmi": "akshare.economic.macro_euro",
+    "macro_euro_ppi_mom": "akshare.economic.macro_euro",
+    "macro_euro_retail_sales_mom": "akshare.economic.macro_euro",
+    "macro_euro_sentix_investor_confidence": "akshare.economic.macro_euro",
+    "macro_euro_services_pmi": "akshare.economic.macro_euro",
+    "macro_euro_trade_balance": "akshare.economic.macro_euro",
+    "macro_euro_unemployment_rate_mom": "akshare.economic.macro_euro",
+    "macro_euro_zew_economic_sentiment": "akshare.economic.macro_euro",
+    "macro_euro_lme_holding": "akshare.economic.macro_euro",
+    "macro_euro_lme_stock": "akshare.economic.macro_euro",
+    "macro_bank_australia_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_brazil_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_china_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_english_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_euro_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_india_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_japan_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_newzealand_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_russia_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_switzerland_interest_rate": "akshare.economic.macro_bank",
+    "macro_bank_usa_interest_rate": "akshare.economic.macro_bank",
+    "index_yw": "akshare.index.index_yw",
+    "index_stock_info": "akshare.index.index_cons",
+    "index_stock_cons": "akshare.index.index_cons",
+    "index_stock_cons_sina": "akshare.index.index_cons",
+    "index_stock_cons_csindex": "akshare.index.index_cons",
+    "index_stock_cons_weight_csindex": "akshare.index.index_cons",
+    "stock_a_code_to_symbol": "akshare.index.index_cons",
+    "stock_account_statistics_em": "akshare.stock_feature.stock_account_em",
+    "futures_rule": "akshare.futures.futures_rule",
+    "stock_sy_profile_em": "akshare.stock_feature.stock_sy_em",
+    "stock_sy_yq_em": "akshare.stock_feature.stock_sy_em",
+    "stock_sy_jz_em": "akshare.stock_feature.stock_sy_em",
+    "stock_sy_em": "akshare.stock_feature.stock_sy_em",
+    "stock_sy_hy_em": "akshare.stock_feature.stock_sy_em",
+    "stock_gpzy_pledge_ratio_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_gpzy_profile_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_gpzy_distribute_statistics_bank_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_gpzy_distribute_statistics_company_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_gpzy_industry_data_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_gpzy_pledge_ratio_detail_em": "akshare.stock_feature.stock_gpzy_em",
+    "stock_jgdy_tj_em": "akshare.stock_feature.stock_jgdy_em",
+    "stock_jgdy_detail_em": "akshare.stock_feature.stock_jgdy_em",
+    "futures_main_sina": "akshare.futures_derivative.futures_index_sina",
+    "futures_display_main_sina": "akshare.futures_derivative.futures_index_sina",
+    "macro_cnbs": "akshare.economic.marco_cnbs",
+    "spot_goods": "akshare.index.index_spot",
+    "cost_living": "akshare.cost.cost_living",
+    "energy_carbon_domestic": "akshare.energy.energy_carbon",
+    "energy_carbon_bj": "akshare.energy.energy_carbon",
+    "energy_carbon_eu": "akshare.energy.energy_carbon",
+    "energy_carbon_gz": "akshare.energy.energy_carbon",
+    "energy_carbon_hb": "akshare.energy.energy_carbon",
+    "energy_carbon_sz": "akshare.energy.energy_carbon",
+    "amac_manager_info": "akshare.fund.fund_amac",
+    "amac_member_info": "akshare.fund.fund_amac",
+    "amac_member_sub_info": "akshare.fund.fund_amac",
+    "amac_aoin_info": "akshare.fund.fund_amac",
+    "amac_fund_account_info": "akshare.fund.fund_amac",
+    "amac_fund_info": "akshare.fund.fund_amac",
+    "amac_fund_sub_info": "akshare.fund.fund_amac",
+    "amac_futures_info": "akshare.fund.fund_amac",
+    "amac_manager_cancelled_info": "akshare.fund.fund_amac",
+    "amac_securities_info": "akshare.fund.fund_amac",
+    "amac_fund_abs": "akshare.fund.fund_amac",
+    "amac_manager_classify_info": "akshare.fund.fund_amac",
+    "amac_person_fund_org_list": "akshare.fund.fund_amac",
+    "amac_person_bond_org_list": "akshare.fund.fund_amac",
+    "sw_index_third_cons": "akshare.index.index_sw",
+    "sw_index_first_info": "akshare.index.index_sw",
+    "sw_index_second_info": "akshare.index.index_sw",
+    "sw_index_third_info": "akshare.index.index_sw",
+    "article_epu_index": "akshare.article.epu_index",
+    "air_quality_hebei": "akshare.air.air_hebei",
+    "sunrise_daily": "akshare.air.sunrise_tad",
+    "sunrise_monthly": "akshare.air.sunrise_tad",
+    "stock_zh_a_tick_tx_js": "akshare.stock.stock_zh_a_tick_tx",
+    "stock_zh_index_daily": "akshare.index.index_stock_zh",
+    "stock_zh_index_spot_sina": "akshare.index.index_stock_zh",
+    "stock_zh_index_spot_em": "akshare.index.index_stock_zh",
+    "stock_zh_index_daily_tx": "akshare.index.index_stock_zh",
+    "stock_zh_index_daily_em": "akshare.index.index_stock_zh",
+    "futures_foreign_commodity_realtime": "akshare.futures.futures_hq_sina",
+    "futures_foreign_commodity_subscribe_exchange_symbol": "akshare.futures.futures_hq_sina",
+    "futures_hq_subscribe_exchange_symbol": "akshare.futures.futures_hq_sina",
+    "article_ff_crr": "akshare.article.ff_factor",
+    "article_oman_rv": "akshare.article.risk_rv",
+    "article_oman_rv_short": "akshare.article.risk_rv",
+    "article_rlab_rv": "akshare.article.risk_rv",
+    "bank_fjcf_table_detail": "akshare.bank.bank_cbirc_2020",
+    "stock_zh_kcb_spot": "akshare.stock.stock_zh_kcb_sina",
+    "stock_zh_kcb_daily": "akshare.stock.stock_zh_kcb_sina",
+    "stock_zh_a_spot": "akshare.stock.stock_zh_a_sina",
+    "stock_zh_a_daily": "akshare.stock.stock_zh_a_sina",
+    "stock_zh_a_minute": "akshare.stock.stock_zh_a_sina",
+    "stock_zh_a_cdr_daily": "akshare.stock.stock_zh_a_sina",
+    "stock_zh_ah_spot": "akshare.stock.stock_zh_ah_tx",
+    "stock_zh_ah_daily": "akshare.stock.stock_zh_ah_tx",
+    "stock_zh_ah_name": "akshare.stock.stock_zh_ah_tx",
+    "crypto_js_spot": "akshare.economic.macro_other",
+    "option_finance_board": "akshare.option.option_finance",
+    "option_finance_sse_underlying": "akshare.option.option_finance",
+    "stock_us_daily": "akshare.stock.stock_us_sina",
+    "stock_us_spot": "akshare.stock.stock_us_sina",
+    "get_us_stock_name": "akshare.stock.stock_us_sina",
+    "stock_hk_daily": "akshare.stock.stock_hk_sina",
+    "stock_hk_spot": "akshare.stock.stock_hk_sina",
+    "futures_spot_sys": "akshare.futures_derivative.futures_spot_sys",
+    "macro_cons_gold": "akshare.economic.macro_constitute",
+    "macro_cons_silver": "akshare.economic.macro_constitute",
+    "macro_cons_opec_month": "akshare.economic.macro_constitute",
+    "macro_usa_eia_crude_rate": "akshare.economic.macro_usa",
+    "macro_usa_non_farm": "akshare.economic.macro_usa",
+    "macro_usa_unemployment_rate": "akshare.economic.macro_usa",
+    "macro_usa_adp_employment": "akshare.economic.macro_usa",
+    "macro_usa_core_pce_price": "akshare.economic.macro_usa",
+    "macro_usa_cpi_monthly": "akshare.economic.macro_usa",
+    "macro_usa_cpi_yoy": "akshare.economic.macro_usa",
+    "macro_usa_crude_inner": "akshare.economic.macro_usa",
+    "macro_usa_gdp_monthly": "akshare.economic.macro_usa",
+    "macro_usa_initial_jobless": "akshare.economic.macro_usa",
+    "macro_usa_lmci": "akshare.economic.macro_usa",
+    "macro_usa_api_crude_stock": "akshare.economic.macro_usa",
+    "macro_usa_building_permits": "akshare.economic.macro_usa",
+    "macro_usa_business_inventories": "akshare.economic.macro_usa",
+    "macro_usa_cb_consumer_confidence": "akshare.economic.macro_usa",
+    "macro_usa_core_cpi_monthly": "akshare.economic.macro_usa",
+    "macro_usa_core_ppi": "akshare.economic.macro_usa",
+    "macro_usa_current_account": "akshare.economic.macro_usa",
+    "macro_usa_durable_goods_orders": "akshare.economic.macro_usa",
+    "macro_usa_trade_balance": "akshare.economic.macro_usa",
+    "macro_usa_spcs20": "akshare.economic.macro_usa",
+    "macro_usa_services_pmi": "akshare.economic.macro_usa",
+    "macro_usa_rig_count": "akshare.economic.macro_usa",
+    "macro_usa_retail_sales": "akshare.economic.macro_usa",
+    "macro_usa_real_consumer_spending": "akshare.economic.macro_usa",
+    "macro_usa_ppi": "akshare.economic.macro_usa",
+    "macro_usa_pmi": "akshare.economic.macro_usa",
+    "macro_usa_personal_spending": "akshare.economic.macro_usa",
+    "macro_usa_pending_home_sales": "akshare.economic.macro_usa",
+    "macro_usa_nfib_small_business": "akshare.economic.macro_usa",
+    "macro_usa_new_home_sales": "akshare.economic.macro_usa",
+    "macro_usa_nahb_house_market_index": "akshare.economic.macro_usa",
+    "macro_usa_michigan_consumer_sentiment": "akshare.economic.macro_usa",
+    "macro_usa_exist_home_sales": "akshare.economic.macro_usa",
+    "macro_usa_export_price": "akshare.economic.macro_usa",
+    "macro_usa_factory_orders": "akshare.economic.macro_usa",
+    "macro_usa_house_price_index": "akshare.economic.macro_usa",
+    "macro_usa_house_starts": "akshare.economic.macro_usa",
+    "macro_usa_import_price": "akshare.economic.macro_usa",
+    "macro_usa_industrial_production": "akshare.economic.macro_usa",
+    "macro_usa_ism_non_pmi": "akshare.economic.macro_usa",
+    "macro_usa_ism_pmi": "akshare.economic.macro_usa",
+    "macro_usa_job_cuts": "akshare.economic.macro_usa",
+    "macro_usa_cftc_nc_holding": "akshare.economic.macro_usa",
+    "macro_usa_cftc_c_holding": "akshare.economic.macro_usa",
+    "macro_usa_cftc_merchant_currency_holding": "akshare.economic.macro_usa",
+    "macro_usa_cftc_merchant_goods_holding": "akshare.economic.macro_usa",
+    "macro_usa_cme_merchant_goods_holding": "akshare.economic.macro_usa",
+    "macro_usa_phs": "akshare.economic.macro_usa",
+    "macro_china_bank_financing": "akshare.economic.macro_china",
+    "macro_china_insurance_income": "akshare.economic.macro_china",
+    "macro_china_mobile_number": "akshare.economic.macro_china",
+    "macro_china_vegetable_basket": "akshare.economic.macro_china",
+    "macro_china_agricultural_product": "akshare.economic.macro_china",
+    "macro_china_agricultural_index": "akshare.economic.macro_china",
+    "macro_china_energy_index": "akshare.economic.macro_china",
+    "macro_china_commodity_price_index": "akshare.economic.macro_china",
+    "macro_global_sox_index": "akshare.economic.macro_china",
+    "macro_china_yw_electronic_index": "akshare.economic.macro_china",
+    "macro_china_construction_index": "akshare.economic.macro_china",
+    "macro_china_construction_price_index": "akshare.economic.macro_china",
+    "macro_china_lpi_index": "akshare.economic.macro_china",
+    "macro_china_bdti_index": "akshare.economic.macro_china",
+    "macro_china_bsi_index": "akshare.economic.macro_china",
+    "macro_china_cpi_monthly": "akshare.economic.macro_china",
+    "macro_china_cpi_yearly": "akshare.economic.macro_china",
+    "macro_china_m2_yearly": "akshare.economic.macro_china",
+    "macro_china_fx_reserves_yearly": "akshare.economic.macro_china",
+    "macro_china_cx_pmi_yearly": "akshare.economic.macro_china",
+    "macro_china_pmi_yearly": "akshare.economic.macro_china",
+    "macro_china_daily_energy": "akshare.economic.macro_china",
+    "macro_china_non_man_pmi": "akshare.economic.macro_china",
+    "macro_china_rmb": "akshare.economic.macro_china",
+    "macro_china_gdp_yearly": "akshare.economic.macro_china",
+    "macro_china_shrzgm": "akshare.economic.macro_china",
+    "macro_china_ppi_yearly": "akshare.economic.macro_china",
+    "macro_china_cx_services_pmi_yearly": "akshare.economic.macro_china",
+    "macro_china_market_margin_sh": "akshare.economic.macro_china",
+    "macro_china_market_margin_sz": "akshare.economic.macro_china",
+    "macro_china_au_report": "akshare.economic.macro_china",
+    "macro_china_exports_yoy": "akshare.economic.macro_china",
+    "macro_china_hk_market_info": "akshare.economic.macro_china",
+    "macro_china_imports_yoy": "akshare.economic.macro_china",
+    "macro_china_trade_balance": "akshare.economic.macro_china",
+    "macro_china_shibor_all": "akshare.economic.macro_china",
+    "macro_china_industrial_production_yoy": "akshare.economic.macro_china",
+    "macro_china_gyzjz": "akshare.economic.macro_china",
+    "macro_china_lpr": "akshare.economic.macro_china",
+    "macro_china_new_house_price": "akshare.economic.macro_china",
+    "macro_china_enterprise_boom_index": "akshare.economic.macro_china",
+    "macro_china_national_tax_receipts": "akshare.economic.macro_china",
+    "macro_china_new_financial_credit": "akshare.economic.macro_china",
+    "macro_china_fx_gold": "akshare.economic.macro_china",
+    "macro_china_money_supply": "akshare.economic.macro_china",
+    "macro_china_stock_market_cap": "akshare.economic.macro_china",
+    "macro_china_cpi": "akshare.economic.macro_china",
+    "macro_china_gdp": "akshare.economic.macro_china",
+    "macro_china_ppi": "akshare.economic.macro_china",
+    "macro_china_pmi": "akshare.economic.macro_china",
+    "macro_china_gdzctz": "akshare.economic.macro_china",
+    "macro_china_hgjck": "akshare.economic.macro_china",
+    "macro_china_czsr": "akshare.economic.macro_china",
+    "macro_china_whxd": "akshare.economic.macro_china",
+    "macro_china_wbck": "akshare.economic.macro_china",
+    "macro_china_xfzxx": "akshare.economic.macro_china",
+    "macro_china_reserve_requirement_ratio": "akshare.economic.macro_china",
+    "macro_china_consumer_goods_retail": "akshare.economic.macro_china",
+    "macro_china_society_electricity": "akshare.economic.macro_china",
+    "macro_china_society_traffic_volume": "akshare.economic.macro_china",
+    "macro_china_postal_telecommunicational": "akshare.economic.macro_china",
+    "macro_china_international_tourism_fx": "akshare.economic.macro_china",
+    "macro_china_passenger_load_factor": "akshare.economic.macro_china",
+    "macro_china_freight_index": "akshare.economic.macro_china",
+    "macro_china_central_bank_balance": "akshare.economic.macro_china",
+    "macro_china_insurance": "akshare.economic.macro_china",
+    "macro_china_supply_of_money": "akshare.economic.macro_china",
+    "macro_china_foreign_exchange_gold": "akshare.economic.macro_china",
+    "macro_china_retail_price_index": "akshare.economic.macro_china",
+    "macro_china_real_estate": "akshare.economic.macro_china",
+    "macro_china_qyspjg": "akshare.economic.macro_china",
+    "macro_china_fdi": "akshare.economic.macro_china",
+    "macro_shipping_bci": "akshare.economic.macro_china",
+    "macro_shipping_bcti": "akshare.economic.macro_china",
+    "macro_shipping_bdi": "akshare.economic.macro_china",
+    "macro_shipping_bpi": "akshare.economic.macro_china",
+    "macro_china_urban_unemployment": "akshare.economic.macro_china",
+    "macro_china_nbs_nation": "akshare.economic.macro_china_nbs",
+    "macro_china_nbs_region": "akshare.economic.macro_china_nbs",
+    "fx_pair_quote": "akshare.fx.fx_quote",
+    "fx_spot_quote": "akshare.fx.fx_quote",
+    "fx_swap_quote": "akshare.fx.fx_quote",
+    "bond_spot_quote": "akshare.bond.bond_china",
+    "bond_spot_deal": "akshare.bond.bond_china",
+    "bond_china_yield": "akshare.bond.bond_china",
+    "option_dce_daily": "akshare.option.option_commodity",
+    "option_czce_daily": "akshare.option.option_commodity",
+    "option_shfe_daily": "akshare.option.option_commodity",
+    "option_gfex_vol_daily": "akshare.option.option_commodity",
+    "option_gfex_daily": "akshare.option.option_commodity",
+    "futures_inventory_99": "akshare.futures.futures_inventory_99",
+    "futures_inventory_em": "akshare.futures.futures_inventory_em",
+    "bond_debt_nafmii": "akshare.bond.bond_nafmii",
+    "qhkc_tool_foreign": "akshare.qhkc_web.qhkc_tool",
+    "qhkc_tool_gdp": "akshare.qhkc_web.qhkc_tool",
+    "get_qhkc_index": "akshare.qhkc_web.qhkc_index",
+    "get_qhkc_index_trend": "akshare.qhkc_web.qhkc_index",
+    "get_qhkc_index_profit_loss": "akshare.qhkc_web.qhkc_index",
+    "get_qhkc_fund_money_change": "akshare.qhkc_web.qhkc_fund",
+    "get_qhkc_fund_bs": "akshare.qhkc_web.qhkc_fund",
+    "get_qhkc_fund_position": "akshare.qhkc_web.qhkc_fund",
+    "futures_spot_price_daily": "akshare.futures.futures_basis",
+    "futures_spot_price": "akshare.futures.futures_basis",
+    "futures_spot_price_previous": "akshare.futures.futures_basis",
+    "get_rank_sum_daily": "akshare.futures.cot",
+    "get_rank_sum": "akshare.futures.cot",
+    "get_shfe_rank_table": "akshare.futures.cot",
+    "get_czce_rank_table": "akshare.futures.cot",
+    "get_dce_rank_table": "akshare.futures.cot",
+    "get_cffex_rank_table": "akshare.futures.cot",
+    "futures_dce_position_rank": "akshare.futures.cot",
+    "futures_dce_position_rank_other": "akshare.futures.cot",
+    "futures_gfex_position_rank": "akshare.futures.cot",
+    "get_receipt": "akshare.futures.receipt",
+    "get_roll_yield_bar": "akshare.futures.futures_roll_yield",
+    "get_roll_yield": "akshare.futures.futures_roll_yield",
+    "get_cffex_daily": "akshare.futures.futures_daily_bar",
+    "get_czce_daily": "akshare.futures.futures_daily_bar",
+    "get_shfe_daily": "akshare.futures.futures_daily_bar",
+    "get_dce_daily": "akshare.futures.futures_daily_bar",
+    "get_futures_daily": "akshare.futures.futures_daily_bar",
+    "get_ine_daily": "akshare.futures.futures_daily_bar",
+    "get_gfex_daily": "akshare.futures.futures_daily_bar",
+    "fund_individual_basic_info_xq": "akshare.fund.fund_xq",
+    "fund_individual_achievement_xq": "akshare.fund.fund_xq",
+    "fund_individual_analysis_xq": "akshare.fund.fund_xq",
+    "fund_individual_profit_probability_xq": "akshare.fund.fund_xq",
+    "fund_individual_detail_info_xq": "akshare.fund.fund_xq",
+    "fund_individual_detail_hold_xq": "akshare.fund.fund_xq",
+    "AkshareException": "akshare.exceptions",
+    "APIError": "akshare.exceptions",
+    "DataParsingError": "akshare.exceptions",
+    "InvalidParameterError": "akshare.exceptions",
+    "NetworkError": "akshare.exceptions",
+    "RateLimitError": "akshare.exceptions",
+    "pro_api": "akshare.pro.data_pro",
+    "set_token": "akshare.utils.token_process",
+    "get_token": "akshare.utils.token_process",
+    "xt_api": "akqmt",
+}
+
+OPTIONAL_IMPORTS = frozenset(["xt_api"])
@@ -11,12 +11,12 @@ import math
 import time
 
 import pandas as pd
-import requests
 
 from akshare.economic.cons import (
     JS_CHINA_ENERGY_DAILY_URL,
 )
 from akshare.utils import demjson
+from akshare.utils.context import get_session
 from akshare.utils.tqdm import get_tqdm
 
 
@@ -41,7 +41,7 @@ def __macro_china_base_func(symbol: str, params: dict) -> pd.DataFrame:
     params = params
     big_df = pd.DataFrame()
     while True:
-        r = requests.get(url, params=params, headers=headers)
+        r = get_session().get(url, params=params, headers=headers)
         data_json = r.json()
         if not data_json["data"]["values"]:
             break
@@ -106,7 +106,7 @@ def macro_china_qyspjg() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.rename(
@@ -200,7 +200,7 @@ def macro_china_fdi() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -241,7 +241,7 @@ def macro_china_shrzgm() -> pd.DataFrame:
     :rtype: pandas.DataFrame
     """
     url = "http://data.mofcom.gov.cn/datamofcom/front/gnmy/shrzgmQuery"
-    r = requests.post(url)
+    r = get_session().post(url)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json)
     temp_df.columns = [
@@ -309,7 +309,7 @@ def macro_china_urban_unemployment() -> pd.DataFrame:
         "k1": "1691326382042",
         "h": "1",
     }
-    r = requests.get(url, params=params, verify=False)
+    r = get_session().get(url, params=params, verify=False)
     r.encoding = "utf-8"
     data_json = r.json()
     value_list = [item["data"]["data"] for item in data_json["returndata"]["datanodes"]]
@@ -617,7 +617,7 @@ def macro_china_shibor_all() -> pd.DataFrame:
 
     t = time.time()
     params = {"_": t}
-    res = requests.get(
+    res = get_session().get(
         url="https://cdn.jin10.com/data_center/reports/il_1.json", params=params
     )
     json_data = res.json()
@@ -663,7 +663,7 @@ def macro_china_hk_market_info() -> pd.DataFrame:
 
     t = time.time()
     params = {"_": t}
-    res = requests.get(
+    res = get_session().get(
         url="https://cdn.jin10.com/data_center/reports/il_2.json", params=params
     )
     json_data = res.json()
@@ -704,7 +704,7 @@ def macro_china_daily_energy() -> pd.DataFrame:
     :return: pandas.DataFrame
     """
     t = time.time()
-    res = requests.get(
+    res = get_session().get(
         JS_CHINA_ENERGY_DAILY_URL.format(
             str(int(round(t * 1000))), str(int(round(t * 1000)) + 90)
         )
@@ -736,7 +736,7 @@ def macro_china_rmb() -> pd.DataFrame:
     """
     t = time.time()
     params = {"_": t}
-    res = requests.get(
+    res = get_session().get(
         "https://cdn.jin10.com/data_center/reports/exchange_rate.json",
         params=params,
     )
@@ -843,7 +843,7 @@ def macro_china_market_margin_sz() -> pd.DataFrame:
     """
     t = time.time()
     params = {"_": t}
-    res = requests.get(
+    res = get_session().get(
         url="https://cdn.jin10.com/data_center/reports/fs_2.json", params=params
     )
     json_data = res.json()
@@ -875,7 +875,7 @@ def macro_china_market_margin_sh() -> pd.DataFrame:
     url = "https://cdn.jin10.com/data_center/reports/fs_1.json"
     t = time.time()
     params = {"_": t}
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     json_data = r.json()
     temp_df = pd.DataFrame(json_data["values"]).T
     temp_df.reset_index(inplace=True)
@@ -908,7 +908,7 @@ def macro_china_au_report() -> pd.DataFrame:
     """
     t = time.time()
     params = {"_": t}
-    res = requests.get(
+    res = get_session().get(
         url="https://cdn.jin10.com/data_center/reports/sge.json", params=params
     )
     json_data = res.json()
@@ -983,14 +983,14 @@ def macro_china_lpr() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat(objs=[big_df, temp_df], ignore_index=True)
@@ -1035,7 +1035,7 @@ def macro_china_new_house_price(
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -1107,7 +1107,7 @@ def macro_china_enterprise_boom_index() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -1174,7 +1174,7 @@ def macro_china_national_tax_receipts() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -1208,7 +1208,7 @@ def macro_china_bank_financing() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -1254,7 +1254,7 @@ def macro_china_insurance_income() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -1300,7 +1300,7 @@ def macro_china_mobile_number() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.drop_duplicates(inplace=True)
@@ -1347,14 +1347,14 @@ def macro_china_vegetable_basket() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1402,14 +1402,14 @@ def macro_china_agricultural_product() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1457,14 +1457,14 @@ def macro_china_agricultural_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1512,14 +1512,14 @@ def macro_china_energy_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1567,14 +1567,14 @@ def macro_china_commodity_price_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1622,14 +1622,14 @@ def macro_global_sox_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1677,14 +1677,14 @@ def macro_china_yw_electronic_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1735,14 +1735,14 @@ def macro_china_construction_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat(objs=[big_df, temp_df], ignore_index=True)
@@ -1790,14 +1790,14 @@ def macro_china_construction_price_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1845,14 +1845,14 @@ def macro_china_lpi_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1900,14 +1900,14 @@ def macro_china_bdti_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -1955,14 +1955,14 @@ def macro_china_bsi_index() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -2010,14 +2010,14 @@ def _em_macro_1(em_id) -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
@@ -2111,7 +2111,7 @@ def macro_china_new_financial_credit() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -2163,7 +2163,7 @@ def macro_china_fx_gold() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params, headers=headers)
+    r = get_session().get(url, params=params, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2226,7 +2226,7 @@ def macro_china_stock_market_cap() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params, headers=headers)
+    r = get_session().get(url, params=params, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2311,7 +2311,7 @@ def macro_china_money_supply() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2395,7 +2395,7 @@ def macro_china_cpi() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2469,7 +2469,7 @@ def macro_china_gdp() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2545,7 +2545,7 @@ def macro_china_ppi() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2590,7 +2590,7 @@ def macro_china_pmi() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -2642,7 +2642,7 @@ def macro_china_gdzctz() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -2693,7 +2693,7 @@ def macro_china_hgjck() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.rename(
@@ -2782,7 +2782,7 @@ def macro_china_czsr() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -2835,7 +2835,7 @@ def macro_china_whxd() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -2884,7 +2884,7 @@ def macro_china_wbck() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -2936,7 +2936,7 @@ def macro_china_xfzxx() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
 
@@ -3019,7 +3019,7 @@ def macro_china_gyzjz() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -3065,7 +3065,7 @@ def macro_china_reserve_requirement_ratio() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -3153,7 +3153,7 @@ def macro_china_consumer_goods_retail() -> pd.DataFrame:
         "pageNo": "1",
         "pageNum": "1",
     }
-    r = requests.get(url, params=params, headers=headers)
+    r = get_session().get(url, params=params, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["result"]["data"])
     temp_df.columns = [
@@ -3198,14 +3198,14 @@ def macro_china_society_electricity() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
     big_df = pd.DataFrame(data_json["data"])
     for i in range(1, page_num):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3251,7 +3251,7 @@ def macro_china_society_traffic_volume() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3259,7 +3259,7 @@ def macro_china_society_traffic_volume() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num), leave=False):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"]["非累计"])
@@ -3309,7 +3309,7 @@ def macro_china_postal_telecommunicational() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3317,7 +3317,7 @@ def macro_china_postal_telecommunicational() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num), leave=False):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"]["非累计"])
@@ -3343,7 +3343,7 @@ def macro_china_international_tourism_fx() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3351,7 +3351,7 @@ def macro_china_international_tourism_fx() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3377,7 +3377,7 @@ def macro_china_passenger_load_factor() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3385,7 +3385,7 @@ def macro_china_passenger_load_factor() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3411,7 +3411,7 @@ def _macro_china_freight_index() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3419,7 +3419,7 @@ def _macro_china_freight_index() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3443,7 +3443,7 @@ def macro_china_freight_index() -> pd.DataFrame:
         "num": 5000,
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     columns_list = r.content.decode("gbk").split("\n")[2].split(", ")
     columns_list = [item.strip() for item in columns_list]
     content_list = r.content.decode("gbk").split("\n")[3:]
@@ -3488,7 +3488,7 @@ def macro_china_central_bank_balance() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3496,7 +3496,7 @@ def macro_china_central_bank_balance() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3522,7 +3522,7 @@ def macro_china_insurance() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3530,7 +3530,7 @@ def macro_china_insurance() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3556,7 +3556,7 @@ def macro_china_supply_of_money() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3564,7 +3564,7 @@ def macro_china_supply_of_money() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num)):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3590,7 +3590,7 @@ def macro_china_foreign_exchange_gold() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3598,7 +3598,7 @@ def macro_china_foreign_exchange_gold() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num), leave=False):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3625,7 +3625,7 @@ def macro_china_retail_price_index() -> pd.DataFrame:
         "num": "31",
         "condition": "",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -3])
     page_num = math.ceil(int(data_json["count"]) / 31)
@@ -3633,7 +3633,7 @@ def macro_china_retail_price_index() -> pd.DataFrame:
     tqdm = get_tqdm()
     for i in tqdm(range(1, page_num), leave=False):
         params.update({"from": i * 31})
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         data_json = demjson.decode(data_text[data_text.find("{") : -3])
         temp_df = pd.DataFrame(data_json["data"])
@@ -3670,14 +3670,14 @@ def macro_china_real_estate() -> pd.DataFrame:
         "source": "WEB",
         "client": "WEB",
     }
-    r = requests.get(url, params=params, headers=headers)
+    r = get_session().get(url, params=params, headers=headers)
     data_json = r.json()
     total_page = data_json["result"]["pages"]
     big_df = pd.DataFrame()
     tqdm = get_tqdm()
     for page in tqdm(range(1, total_page + 1), leave=False):
         params.update({"pageNumber": page})
-        r = requests.get(url, params=params, headers=headers)
+        r = get_session().get(url, params=params, headers=headers)
         data_json = r.json()
         temp_df = pd.DataFrame(data_json["result"]["data"])
         big_df = pd.concat([big_df, temp_df], ignore_index=True)
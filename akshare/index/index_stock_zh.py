@@ -12,7 +12,6 @@ import re
 
 import pandas as pd
 import py_mini_racer
-import requests
 
 from akshare.index.cons import (
     zh_sina_index_stock_payload,
@@ -22,6 +21,7 @@ from akshare.index.cons import (
 )
 from akshare.stock.cons import hk_js_decode
 from akshare.utils import demjson
+from akshare.utils.context import get_session
 from akshare.utils.func import fetch_paginated_data
 from akshare.utils.tqdm import get_tqdm
 
@@ -47,7 +47,7 @@ def get_zh_index_page_count() -> int:
     :return: 需要抓取的指数的总页数
     :rtype: int
     """
-    res = requests.get(zh_sina_index_stock_count_url)
+    res = get_session().get(zh_sina_index_stock_count_url)
     page_count = int(re.findall(re.compile(r"\d+"), res.text)[0]) / 80
     if isinstance(page_count, int):
         return page_count
@@ -69,7 +69,7 @@ def stock_zh_index_spot_sina() -> pd.DataFrame:
     tqdm = get_tqdm()
     for page in tqdm(range(1, page_count + 1), leave=False):
         zh_sina_stock_payload_copy.update({"page": page})
-        res = requests.get(zh_sina_index_stock_url, params=zh_sina_stock_payload_copy)
+        res = get_session().get(zh_sina_index_stock_url, params=zh_sina_stock_payload_copy)
         data_json = demjson.decode(res.text)
         big_df = pd.concat(objs=[big_df, pd.DataFrame(data_json)], ignore_index=True)
     big_df = big_df.map(_replace_comma)
@@ -149,7 +149,7 @@ def __stock_zh_main_spot_em() -> pd.DataFrame:
         "fields": "f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f12,f13,f14,f15,f16,f17,f18,f20,f21,"
         "f23,f24,f25,f26,f22,f11,f62,f128,f136,f115,f152",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["data"]["diff"])
     temp_df.reset_index(inplace=True)
@@ -300,7 +300,7 @@ def stock_zh_index_daily(symbol: str = "sh000922") -> pd.DataFrame:
     :rtype: pandas.DataFrame
     """
     params = {"d": "2020_2_4"}
-    res = requests.get(zh_sina_index_stock_hist_url.format(symbol), params=params)
+    res = get_session().get(zh_sina_index_stock_hist_url.format(symbol), params=params)
     js_code = py_mini_racer.MiniRacer()
     js_code.eval(hk_js_decode)
     dict_list = js_code.call(
@@ -332,7 +332,7 @@ def get_tx_start_year(symbol: str = "sh000919") -> pd.DataFrame:
         "_var": "trend_qfq",
         "r": "0.3506048543943414",
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     if not demjson.decode(data_text[data_text.find("={") + 1 :])["data"]:
         url = "https://proxy.finance.qq.com/ifzqgtimg/appstock/app/newfqkline/get"
@@ -341,7 +341,7 @@ def get_tx_start_year(symbol: str = "sh000919") -> pd.DataFrame:
             "param": f"{symbol},day,,,320,qfq",
             "r": "0.751892490072597",
         }
-        r = requests.get(url, params=params)
+        r = get_session().get(url, params=params)
         data_text = r.text
         start_date = demjson.decode(data_text[data_text.find("={") + 1 :])["data"][
             symbol
@@ -374,7 +374,7 @@ def stock_zh_index_daily_tx(symbol: str = "sz980017") -> pd.DataFrame:
             "param": f"{symbol},day,{year}-01-01,{year + 1}-12-31,640,qfq",
             "r": "0.8205512681390605",
         }
-        res = requests.get(url, params=params)
+        res = get_session().get(url, params=params)
         text = res.text
         try:
             inner_temp_df = pd.DataFrame(
@@ -437,7 +437,7 @@ def stock_zh_index_daily_em(
         "beg": start_date,
         "end": end_date,
     }
-    r = requests.get(url, params=params)
+    r = get_session().get(url, params=params)
     data_text = r.text
     data_json = demjson.decode(data_text[data_text.find("{") : -2])
     temp_df = pd.DataFrame([item.split(",") for item in data_json["data"]["klines"]])
@@ -1,6 +1,5 @@
 import time
 
-import requests
 from requests.exceptions import RequestException
 
 from akshare.exceptions import NetworkError, APIError, RateLimitError, DataParsingError
@@ -25,7 +24,7 @@ def make_request_with_retry_json(
         proxies = config.proxies
     for attempt in range(max_retries):
         try:
-            response = requests.get(
+            response = config.get_session().get(
                 url, params=params, headers=headers, proxies=proxies
             )
             if response.status_code == 200:
@@ -80,7 +79,7 @@ def make_request_with_retry_text(
         proxies = config.proxies
     for attempt in range(max_retries):
         try:
-            response = requests.get(
+            response = config.get_session().get(
                 url, params=params, headers=headers, proxies=proxies
             )
             if response.status_code == 200:
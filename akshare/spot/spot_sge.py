@@ -9,9 +9,9 @@ https://www.sge.com.cn/sjzx/mrhq
 """
 
 import pandas as pd
-import requests
 
 from akshare.utils.cons import headers
+from akshare.utils.context import get_session
 
 
 def spot_symbol_table_sge() -> pd.DataFrame:
@@ -83,7 +83,7 @@ def spot_quotations_sge(symbol: str = "Au99.99") -> pd.DataFrame:
         "Chrome/107.0.0.0 Safari/537.36",
         "X-Requested-With": "XMLHttpRequest",
     }
-    r = requests.get(url, data=payload, headers=headers)
+    r = get_session().get(url, data=payload, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(
         {
@@ -132,7 +132,7 @@ def spot_hist_sge(symbol: str = "Au99.99") -> pd.DataFrame:
         "Chrome/107.0.0.0 Safari/537.36",
         "X-Requested-With": "XMLHttpRequest",
     }
-    r = requests.post(url, data=payload, headers=headers)
+    r = get_session().post(url, data=payload, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["time"])
     temp_df.columns = [
@@ -160,7 +160,7 @@ def spot_golden_benchmark_sge() -> pd.DataFrame:
     """
     url = "https://www.sge.com.cn/graph/DayilyJzj"
     payload = {}
-    r = requests.post(url, data=payload, headers=headers)
+    r = get_session().post(url, data=payload, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["wp"])
     temp_df.columns = [
@@ -191,7 +191,7 @@ def spot_silver_benchmark_sge() -> pd.DataFrame:
     """
     url = "https://www.sge.com.cn/graph/DayilyShsilverJzj"
     payload = {}
-    r = requests.post(url, data=payload, headers=headers)
+    r = get_session().post(url, data=payload, headers=headers)
     data_json = r.json()
     temp_df = pd.DataFrame(data_json["wp"])
     temp_df.columns = [
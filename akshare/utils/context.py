@@ -1,3 +1,12 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
 class AkshareConfig:
     _instance = None
 
@@ -5,6 +14,16 @@ class AkshareConfig:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.proxies = None
+            cls._instance.rate_limiter = None
+            cls._instance.response_cache = None
+            cls._instance.session = None
+            cls._instance.session_options = {
+                "pool_connections": 16,
+                "pool_maxsize": 32,
+                "page_concurrency": 4,
+                "page_retries": 3,
+            }
+            cls._instance.session_lock = threading.Lock()
         return cls._instance
 
     @classmethod
@@ -15,8 +34,130 @@ class AkshareConfig:
     def get_proxies(cls):
         return cls().proxies
 
+    @classmethod
+    def set_rate_limiter(cls, rate_limiter):
+        """
+        设置按域名限流的对象，需提供 limit(host) 上下文管理器
+        设置后所有经 requests 发出的请求（包括 requests.get 等快捷函数）都会在发送前经过限流
+        """
+        if rate_limiter is not None:
+            _install_send_hook()
+        cls().rate_limiter = rate_limiter
+
+    @classmethod
+    def get_rate_limiter(cls):
+        return cls().rate_limiter
+
+    @classmethod
+    def set_response_cache(cls, response_cache):
+        """
+        设置响应缓存对象，需提供 get(request) -> Response | None 与 put(request, response) 方法
+        命中缓存的请求直接返回缓存的响应，不经过限流也不发出网络请求
+        """
+        if response_cache is not None:
+            _install_send_hook()
+        cls().response_cache = response_cache
+
+    @classmethod
+    def get_response_cache(cls):
+        return cls().response_cache
+
+    @classmethod
+    def set_session_options(cls, pool_connections=None, pool_maxsize=None, page_concurrency=None, page_retries=None):
+        """
+        设置共享 Session 的连接池大小：pool_connections 为缓存的域名连接池个数，pool_maxsize 为每个域名保持的连接数
+        （线程并发请求同一域名时应不小于线程数），修改后下次获取 Session 时重建
+        page_concurrency / page_retries 为分页接口（fetch_paginated_data）并发获取的页数与单页的最大尝试次数，
+        page_concurrency 为 1 时逐页顺序获取
+        """
+        instance = cls()
+        with instance.session_lock:
+            pool_changed = False
+            for key, value in (("pool_connections", pool_connections), ("pool_maxsize", pool_maxsize)):
+                if value is not None and value != instance.session_options[key]:
+                    instance.session_options[key] = value
+                    pool_changed = True
+            if page_concurrency is not None:
+                instance.session_options["page_concurrency"] = max(int(page_concurrency), 1)
+            if page_retries is not None:
+                instance.session_options["page_retries"] = max(int(page_retries), 1)
+            if pool_changed:
+                instance._close_session()
+
+    @classmethod
+    def get_session(cls):
+        """
+        获取进程内共享的 requests.Session，复用 TCP/TLS 连接（keep-alive）
+        Session 不保存 cookie，与每次调用 requests.get 的行为一致
+        """
+        instance = cls()
+        session = instance.session
+        if session is not None:
+            return session
+        with instance.session_lock:
+            if instance.session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(
+                    pool_connections=instance.session_options["pool_connections"],
+                    pool_maxsize=instance.session_options["pool_maxsize"],
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                instance.session = session
+            return instance.session
+
+    def _close_session(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def _reset_after_fork(self):
+        """fork 得到的子进程不能复用父进程的连接，丢弃 Session（不关闭，避免影响父进程的 socket）"""
+        self.session = None
+        self.session_lock = threading.Lock()
+
 
 config = AkshareConfig()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=config._reset_after_fork)
+
+_original_send = None
+_hook_lock = threading.Lock()
+_local = threading.local()
+
+
+def _hooked_send(session, request, **kwargs):
+    # 重定向时 send 会被递归调用，外层请求已处理缓存与限流，内层直接发送，避免并发上限为 1 时死锁
+    if getattr(_local, "in_send", False):
+        return _original_send(session, request, **kwargs)
+    response_cache = config.response_cache
+    if response_cache is not None and not kwargs.get("stream"):
+        response = response_cache.get(request)
+        if response is not None:
+            return response
+    _local.in_send = True
+    try:
+        rate_limiter = config.rate_limiter
+        if rate_limiter is None:
+            response = _original_send(session, request, **kwargs)
+        else:
+            with rate_limiter.limit(urlsplit(request.url).hostname):
+                response = _original_send(session, request, **kwargs)
+    finally:
+        _local.in_send = False
+    if response_cache is not None and not kwargs.get("stream"):
+        response_cache.put(request, response)
+    return response
+
+
+def _install_send_hook():
+    """替换 requests.Session.send 以接入响应缓存与限流，仅安装一次"""
+    global _original_send
+    with _hook_lock:
+        if _original_send is None:
+            _original_send = requests.Session.send
+            requests.Session.send = _hooked_send
 
 
 # 导出 set_proxies 函数
@@ -28,6 +169,22 @@ def get_proxies():
     return config.get_proxies()
 
 
+def set_rate_limiter(rate_limiter):
+    config.set_rate_limiter(rate_limiter)
+
+
+def set_response_cache(response_cache):
+    config.set_response_cache(response_cache)
+
+
+def get_session():
+    return config.get_session()
+
+
+def set_session_options(pool_connections=None, pool_maxsize=None, page_concurrency=None, page_retries=None):
+    config.set_session_options(pool_connections, pool_maxsize, page_concurrency, page_retries)
+
+
 class ProxyContext:
     def __init__(self, proxies):
         self.proxies = proxies
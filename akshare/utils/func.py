@@ -5,15 +5,38 @@ Desc: 通用帮助函数
 """
 
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
 import pandas as pd
-import requests
+from requests.exceptions import RequestException
 
+from akshare.utils.context import config, get_session
 from akshare.utils.tqdm import get_tqdm
 
 
-def fetch_paginated_data(url: str, base_params: Dict, timeout: int = 15):
+def _fetch_page_json(session, url: str, params: Dict, timeout: int, max_retries: int) -> Dict:
+    """
+    获取单页数据，失败时按指数退避重试
+    """
+    retry_delay = 1
+    for attempt in range(max_retries):
+        try:
+            r = session.get(url, params=params, timeout=timeout)
+            data_json = r.json()
+            # data 为 null（如被限流时）视为失败并重试
+            if not isinstance(data_json.get("data"), dict) or "diff" not in data_json["data"]:
+                raise ValueError(f"Unexpected page content: {r.text[:200]}")
+            return data_json
+        except (RequestException, ValueError):
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(retry_delay)
+            retry_delay *= 2
+
+
+def fetch_paginated_data(url: str, base_params: Dict, timeout: int = 15, max_workers: int = None):
     """
     东方财富-分页获取数据并合并结果
     https://quote.eastmoney.com/f1.html?newcode=0.000001
@@ -23,14 +46,20 @@ def fetch_paginated_data(url: str, base_params: Dict, timeout: int = 15):
     :type base_params: dict
     :param timeout: 请求超时时间
     :type timeout: str
+    :param max_workers: 并发获取的页数，默认使用 AkshareConfig 中的 page_concurrency，为 1 时逐页顺序获取
+    :type max_workers: int
     :return: 合并后的数据
     :rtype: pandas.DataFrame
     """
+    options = config.session_options
+    max_workers = max_workers or options["page_concurrency"]
+    max_retries = options["page_retries"]
     # 复制参数以避免修改原始参数
     params = base_params.copy()
+    # 使用共享 Session 复用连接，避免每一页都重新建立 TCP/TLS 连接
+    session = get_session()
     # 获取第一页数据，用于确定分页信息
-    r = requests.get(url, params=params, timeout=timeout)
-    data_json = r.json()
+    data_json = _fetch_page_json(session, url, params, timeout, max_retries)
     # 计算分页信息
     per_page_num = len(data_json["data"]["diff"])
     total_page = math.ceil(data_json["data"]["total"] / per_page_num)
@@ -40,13 +69,21 @@ def fetch_paginated_data(url: str, base_params: Dict, timeout: int = 15):
     temp_list.append(pd.DataFrame(data_json["data"]["diff"]))
     # 获取进度条
     tqdm = get_tqdm()
-    # 获取剩余页面数据
-    for page in tqdm(range(2, total_page + 1), leave=False):
-        params.update({"pn": page})
-        r = requests.get(url, params=params, timeout=timeout)
-        data_json = r.json()
-        inner_temp_df = pd.DataFrame(data_json["data"]["diff"])
-        temp_list.append(inner_temp_df)
+    # 获取剩余页面数据，每页使用独立的参数副本；并发获取时 map 按页码顺序返回结果
+    page_params = [dict(params, pn=page) for page in range(2, total_page + 1)]
+
+    def fetch_page(inner_params):
+        return _fetch_page_json(session, url, inner_params, timeout, max_retries)
+
+    if max_workers > 1 and len(page_params) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(page_params))) as executor:
+            pages = tqdm(executor.map(fetch_page, page_params), total=len(page_params), leave=False)
+            for data_json in pages:
+                temp_list.append(pd.DataFrame(data_json["data"]["diff"]))
+    else:
+        for inner_params in tqdm(page_params, leave=False):
+            data_json = fetch_page(inner_params)
+            temp_list.append(pd.DataFrame(data_json["data"]["diff"]))
     # 合并所有数据
     temp_df = pd.concat(temp_list, ignore_index=True)
     temp_df["f3"] = pd.to_numeric(temp_df["f3"], errors="coerce")
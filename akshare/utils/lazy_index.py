@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+Date: 2026/10/18
+Desc: 生成 akshare/_lazy_index.py（接口名称 -> 所在模块的索引，供 akshare 包按需导入）
+索引来源为 akshare/__init__.py 中 `if TYPE_CHECKING:` 下的导入语句；新增接口时在其中添加导入语句后重新生成：
+    python akshare/utils/lazy_index.py           # 重新生成索引文件
+    python akshare/utils/lazy_index.py --check   # 仅检查索引是否与导入语句一致
+"""
+
+import ast
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INIT_PATH = os.path.join(PACKAGE_DIR, "__init__.py")
+INDEX_PATH = os.path.join(PACKAGE_DIR, "_lazy_index.py")
+
+HEADER = '''#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+Desc: 由 python akshare/utils/lazy_index.py 根据 akshare/__init__.py 中 TYPE_CHECKING 下的导入语句生成，请勿手动修改
+LAZY_IMPORTS: 接口名称 -> 所在模块（导入时重命名的为 "模块:原名称"）
+OPTIONAL_IMPORTS: 来自可选依赖的名称，依赖未安装时访问抛出 AttributeError
+"""
+'''
+
+
+def _resolve_module(node: ast.ImportFrom) -> str:
+    if node.level == 0:
+        return node.module
+    if node.level > 1:
+        raise ValueError(f"akshare/__init__.py 中不支持的相对导入（第 {node.lineno} 行）")
+    return f"akshare.{node.module}" if node.module else "akshare"
+
+
+def _collect(statements, imports: dict, optional: set, in_try: bool = False):
+    for node in statements:
+        if isinstance(node, ast.ImportFrom):
+            module = _resolve_module(node)
+            for alias in node.names:
+                name = alias.asname or alias.name
+                # 与原先的顺序导入一致，同名时后导入的覆盖先导入的
+                imports.pop(name, None)
+                imports[name] = module if alias.asname is None else f"{module}:{alias.name}"
+                if in_try:
+                    optional.add(name)
+        elif isinstance(node, ast.Try):
+            _collect(node.body, imports, optional, in_try=True)
+
+
+def build_index(init_path: str = INIT_PATH):
+    with open(init_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imports, optional = {}, set()
+    for node in tree.body:
+        if isinstance(node, ast.If) and isinstance(node.test, ast.Name) and node.test.id == "TYPE_CHECKING":
+            _collect(node.body, imports, optional)
+    return imports, optional
+
+
+def render(imports: dict, optional: set) -> str:
+    lines = [HEADER, "LAZY_IMPORTS = {"]
+    lines += [f"    {name!r}: {module!r}," for name, module in imports.items()]
+    lines += ["}", "", f"OPTIONAL_IMPORTS = frozenset({sorted(optional)!r})", ""]
+    return "\n".join(lines).replace("'", '"')
+
+
+def main(check: bool = False) -> int:
+    content = render(*build_index())
+    current = open(INDEX_PATH, encoding="utf-8").read() if os.path.exists(INDEX_PATH) else None
+    if check:
+        print("索引与导入语句一致" if current == content else "索引已过期，请重新生成")
+        return 0 if current == content else 1
+    if current != content:
+        with open(INDEX_PATH, "w", encoding="utf-8") as f:
+            f.write(content)
+    print(f"已生成 {INDEX_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(check="--check" in sys.argv[1:]))
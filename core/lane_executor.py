@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.logger import get_logger
+from core.resource_manager import ResourceManager
+
+logger = get_logger("Scheduler")
+
+'''
+task执行通道（lane）的执行器，由 Scheduler 统一创建，所有 PipelineExecutor 共享
+- process: 进程池，用于CPU密集型任务（如财报转换、绘图）
+- thread: 线程池，用于网络请求等I/O密集型任务（akshare数据获取），并发数可远大于进程数
+- async: 单线程事件循环，用于协程任务，并发数由信号量限制
+各通道大小可在 resource_conf.json 的 "executor" 字段中配置
+'''
+
+DEFAULT_LANE_CONFIG = {
+    "process_workers": 16,
+    "thread_workers": 32,
+    "async_concurrency": 256,
+}
+
+
+class AsyncLaneExecutor:
+    """在后台线程中运行事件循环，提供与 concurrent.futures.Executor 一致的 submit / shutdown 接口"""
+    def __init__(self, max_concurrency: int = 256):
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = None
+        self.max_concurrency = max_concurrency
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            self.loop.run_forever()
+        finally:
+            # 事件循环停止后（shutdown 中已等待所有协程结束）在本线程关闭，wait=False 时同样会被关闭
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    async def _run_limited(self, coro_func, args):
+        async with self.semaphore:
+            return await coro_func(*args)
+
+    async def _drain(self, cancel_futures):
+        """在事件循环线程中执行：取消（或等待）所有协程，使其 CancelledError 处理与 Future 回调得以执行，然后停止事件循环"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if cancel_futures:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    def submit(self, coro_func, *args):
+        """提交协程函数，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(self._run_limited(coro_func, args), self.loop)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        if self.loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(cancel_futures), self.loop)
+        except RuntimeError:
+            # 事件循环已在关闭中
+            pass
+        if wait:
+            self.thread.join()
+
+
+def build_lane_executors(resource_conf):
+    """根据资源配置创建各通道的执行器，配置缺失时使用默认大小"""
+    lane_config = dict(DEFAULT_LANE_CONFIG)
+    try:
+        lane_config.update(ResourceManager.load_config(resource_conf).get("executor", {}))
+    except Exception as e:
+        logger.warning(f"Failed to load executor config, using defaults: {e}")
+
+    return {
+        "process": ProcessPoolExecutor(max_workers=lane_config["process_workers"], initializer=ResourceManager.init_worker),
+        "thread": ThreadPoolExecutor(max_workers=lane_config["thread_workers"], thread_name_prefix="task_io"),
+        "async": AsyncLaneExecutor(max_concurrency=lane_config["async_concurrency"]),
+    }
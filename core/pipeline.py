@@ -1,11 +1,16 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty, Queue
 
 import tasks
 from core.logger import get_logger
-from core.taskNode import TaskNode
+from core.shared_frame import SharedFrameHandle, SharedFrameStore, iter_frame_handles
+from core.taskNode import TaskNode, next_state_version
+
+# 执行线程在没有任何事件时的兜底重新扫描间隔（秒），正常情况下由状态通知唤醒
+RESCAN_INTERVAL = 30
 
 
 class Pipeline:
@@ -23,6 +28,8 @@ class Pipeline:
         self.retry_interval = pipeline_conf.get("retry_interval")
         self.max_retry_times = pipeline_conf.get("max_retry_times")
         self.retry_times = 0
+        self.status_listeners = []              # 状态变化回调 listener(pipeline, task, old_status, new_status)，task为None表示pipeline自身
+        self.state_version = next_state_version()
         self.status = 'hanging'
         self.last_exit = None
         self.task_map = {}
@@ -45,6 +52,7 @@ class Pipeline:
                 glob_params=self.glob_param,
                 retry_interval=task_conf.get("retry_interval", 60),
             )
+            task.status_listener = self._on_task_status_change
             self.task_map[task_name] = task
 
         # 加载完所有的task之后来初始化每一个task的dependency，此处的字典传递的为一个引用，所以需要使用深度复制
@@ -52,9 +60,36 @@ class Pipeline:
             task = self.task_map[task_conf.get("name")]
             task.set_dependencies(task_conf.get("dependencies", {}), self.task_map)
             
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, new_status):
+        old_status = getattr(self, "_status", None)
+        self._status = new_status
+        self.state_version = next_state_version()
+        if old_status != new_status:
+            self._notify(None, old_status, new_status)
+
+    def add_status_listener(self, listener):
+        """注册pipeline与其task的状态变化监听者"""
+        self.status_listeners.append(listener)
+
+    def _notify(self, task, old_status, new_status):
+        for listener in self.status_listeners:
+            try:
+                listener(self, task, old_status, new_status)
+            except Exception as e:
+                self.logger.error(f"Status listener of pipeline '{self.name}' failed: {e}")
+
+    def _on_task_status_change(self, task, old_status, new_status):
+        self._notify(task, old_status, new_status)
+
     def _build_task_glob_param(self, pipeline_conf):
         glob_param = {}
         glob_param["save_path"] = pipeline_conf.get("save_path", "./cache/")
+        glob_param["parquet_path"] = pipeline_conf.get("parquet_path", "./data/parquet")
             
         return glob_param
             
@@ -74,16 +109,46 @@ class Pipeline:
             return True
         if self.last_exit:
             elapsed = (now - self.last_exit).total_seconds() / 60
-            if elapsed < self.launch_interval_minutes:
+            if elapsed < (self.launch_interval_minutes or 0):
                 return False
         if self.daily_launch_times and len(self.daily_launch_times) > 0:
             now_str = now.strftime('%H:%M')
             return now_str in self.daily_launch_times
 
         return True
+
+    def get_next_launch_time(self):
+        """
+        返回 get_if_can_start_now 下一次为 True 的时间（datetime），用于调度器设置定时唤醒
+        launch_interval_minutes 限制最早启动时间，daily_launch_times 限制启动所在的分钟
+        """
+        now = datetime.now()
+        if self.last_exit is None:
+            return now
+        earliest = max(now, self.last_exit + timedelta(minutes=self.launch_interval_minutes or 0))
+        if not self.daily_launch_times:
+            return earliest
+
+        # 在 earliest 当天与次日中寻找第一个不早于 earliest 所在分钟的启动时刻
+        earliest_minute = earliest.replace(second=0, microsecond=0)
+        candidates = []
+        for day_offset in (0, 1):
+            day = earliest_minute + timedelta(days=day_offset)
+            for launch_time in self.daily_launch_times:
+                hour, minute = map(int, launch_time.split(":"))
+                candidate = day.replace(hour=hour, minute=minute)
+                if candidate >= earliest_minute:
+                    candidates.append(candidate)
+        if not candidates:
+            return earliest
+        return max(min(candidates), earliest)
     
-    def get_state(self):
-        """返回当前流水线的状态字典，并调用所有task的get_state。"""
+    def get_latest_version(self):
+        """pipeline 自身与其所有task中最新的状态版本号"""
+        return max([self.state_version] + [task.state_version for task in list(self.task_map.values())])
+
+    def get_state(self, since=None):
+        """返回当前流水线的状态字典，并调用task的get_state；since 不为空时只包含状态版本号大于 since 的task"""
         # 格式化 last_exit 时间，以确保可以被 JSON 序列化
         last_exit_iso = self.last_exit.isoformat() if self.last_exit else None
         
@@ -92,9 +157,11 @@ class Pipeline:
             "status": self.status,
             "last_exit": last_exit_iso,
             "multi_launch": self.multi_launch,
+            "version": self.state_version,
             "tasks": {
                 task_name: task_node.get_state()
-                for task_name, task_node in self.task_map.items()
+                for task_name, task_node in list(self.task_map.items())
+                if since is None or task_node.state_version > since
             }
         }
         
@@ -148,6 +215,7 @@ class Pipeline:
         )
 
         # 添加到 task_map
+        task.status_listener = self._on_task_status_change
         self.task_map[task_name] = task
         task.dep_map = task_json.get("dependencies", {})
         for dep_task_name in task.dep_map.keys():
@@ -156,8 +224,10 @@ class Pipeline:
                 task.dependencies.add(dep_task)
             else:
                 raise ValueError(f"Dependency task '{dep_task_name}' not found when adding task '{task_name}'.")
+        task.mark_state_changed()
 
         self.logger.info(f"Dynamically added task '{task_name}' to pipeline '{self.name}'.")
+        self._notify(task, None, task.status)
 
     
 class PipelineExecutor:
@@ -170,8 +240,13 @@ class PipelineExecutor:
     python中存在GIL（global interpreter locker），保证同一进程同一时间仅会编译一个字节码，也就导致了多线程变为了伪多线程
     但多进程并不受GIL的影响 -> 将 ThreadPoolExecutor 换成 ProcessPoolExecutor
     '''
-    def __init__(self, pipeline: 'Pipeline', resource_conf, dynamic_loader, executor=None, debug=True):
+    def __init__(self, pipeline: 'Pipeline', resource_conf, dynamic_loader, executor=None, debug=True, lane_executors=None, frame_store=None):
         self.executor = executor if executor else ProcessPoolExecutor(max_workers=5)
+        # 执行通道 -> 执行器（由 Scheduler 共享），未提供的通道回退到进程池
+        self.lane_executors = lane_executors or {}
+        # 进程通道task之间以共享内存句柄传递 DataFrame 结果，段文件的引用计数由 Scheduler 共享的 frame_store 管理
+        self.frame_store = frame_store or SharedFrameStore()
+        self.future_inputs = {}                 # future -> 提交时参数中的句柄，task执行结束后释放引用
         self.pipeline = pipeline
         self.resource_conf = resource_conf
         self.running = False
@@ -180,7 +255,17 @@ class PipelineExecutor:
         
         self.debug = debug
         self.dynamic_loader = dynamic_loader
+        # 完成队列：进程池回调放入已完成的 future，外部状态变化（task重试、动态注册等）放入 None 以触发重新扫描
+        self.done_queue = Queue()
+        self.pipeline.add_status_listener(self._on_status_change)
         
+    def _on_status_change(self, pipeline, task, old_status, new_status):
+        """task被外部重置为pending、被强制结束或被动态添加时，唤醒执行线程重新扫描可执行的task"""
+        if task is None or not self.running:
+            return
+        if new_status == "pending" or old_status in (None, "failed"):
+            self.done_queue.put(None)
+
     def run(self):
         """用于外部启动某个pipeline的执行器"""
         self.running = True
@@ -189,74 +274,147 @@ class PipelineExecutor:
     def stop(self):
         """用于线程外部终止该进程的情况"""
         self.running = False
+        self.done_queue.put(None)
         self.executor.shutdown(wait=True)
 
+    def _build_dependents(self):
+        """构建 task -> 依赖该 task 的后继 task 列表（用于依赖计数）"""
+        dependents = {task: [] for task in self.pipeline.get_all_tasks()}
+        for task in dependents:
+            for dep in task.dependencies:
+                dependents.setdefault(dep, []).append(task)
+        return dependents
+
+    def _submit(self, task, futures):
+        """按 task 的执行通道提交到对应执行器，完成回调只负责将 future 放入完成队列，由执行线程统一处理"""
+        with task.lock:
+            if task.status != "pending":
+                return
+            task.status = "running"
+            if task.dep_map is not None:
+                task.set_task_params_base_on_dep()
+        task_class, name_id, params, glob_params = task.get_executor_args()
+        inputs = list(iter_frame_handles(params))
+        for handle in inputs:
+            self.frame_store.acquire(handle)
+        lane_executor = self.lane_executors.get(task_class.execution_lane)
+        if lane_executor is None or task_class.execution_lane == "process":
+            future = (lane_executor or self.executor).submit(TaskNode.static_execute_shared, task_class, self.resource_conf, name_id, params, glob_params,
+                                                             self.frame_store.segment_dir, self.frame_store.min_bytes)
+        elif task_class.execution_lane == "async":
+            future = lane_executor.submit(TaskNode.static_execute_async, task_class, self.resource_conf, name_id, dict(params), glob_params)
+        else:
+            # 线程通道与主进程共享内存，复制参数避免task执行时修改pipeline中保存的配置
+            future = lane_executor.submit(TaskNode.static_execute, task_class, self.resource_conf, name_id, dict(params), glob_params)
+        futures[future] = task
+        self.future_inputs[future] = inputs
+        future.add_done_callback(self.done_queue.put)
+
+    def _set_result(self, task, data):
+        """保存task结果：共享内存中的结果由task持有一个引用，替换或清空结果时释放旧结果的引用"""
+        if isinstance(task.result, SharedFrameHandle):
+            self.frame_store.release(task.result)
+        if isinstance(data, SharedFrameHandle):
+            self.frame_store.acquire(data)
+        task.result = data
+
+    def _release_consumed(self, task, dependents):
+        """临时pipeline中，依赖的所有后继均已完成后即释放其共享内存中的结果"""
+        if not self.pipeline.if_tmp:
+            return
+        for dep in task.dependencies:
+            if isinstance(dep.result, SharedFrameHandle) and all(t.status == "success" for t in dependents.get(dep, [])):
+                with dep.lock:
+                    self._set_result(dep, None)
+
+    def _handle_result(self, task, future):
+        """处理已完成的 task 的结果，返回 task 是否执行成功"""
+        try:
+            result = future.result()
+            if result["status"] == "success":
+                with task.lock:
+                    task.status = "success"
+                    if len(result["data"]) > 1:
+                        self._set_result(task, result["data"])
+                    elif isinstance(result["data"], SharedFrameHandle):
+                        # 不保存的结果直接删除段文件
+                        self.frame_store.release(result["data"])
+                    if "next_tasks" in result:
+                        self.dynamic_loader.register_new_task(result.get("next_tasks"))
+                    if "next_pipelines" in result:
+                        self.dynamic_loader.register_new_pipeline(result.get("next_pipelines"))              
+                    self.logger.info(f"Task '{task.name_id}' completed.")
+                    if self.debug:
+                        self.logger.info(f"Task '{task.name_id}' output: {result['data']}")
+                return True
+            else:
+                with task.lock:
+                    # 先记录失败时间再修改状态，调度器依据该时间设置重试定时器
+                    task.last_failed_time = time.time()
+                    task.retry_times += 1
+                    task.status = "failed"
+                    self.logger.error(f"Task '{task.name_id}' failed with error: {result['error']}")
+        except Exception as e:
+            with task.lock:
+                task.last_failed_time = time.time()
+                task.status = "failed"
+                self.logger.error(f"Task '{task.name_id}' failed: {e}")
+        return False
+
     def _safe_run(self):
-        """使用多进程执行task -> ProcessPoolExecutor适合在CPU 密集型或长耗时任务（如图像处理、模型推理）上使用，而非I/O密集型任务"""
+        """
+        使用多进程执行task -> ProcessPoolExecutor适合在CPU 密集型或长耗时任务（如图像处理、模型推理）上使用，而非I/O密集型任务
+        基于依赖计数调度：每个task记录未完成依赖数，某个task完成后立即提交其依赖已全部完成的后继task，不再等待整批task结束
+        被外部重置为pending的失败task与动态注册的task会通过状态通知唤醒执行线程并重新扫描补充提交
+        """
         try:
+            futures = {}
+            dependents = self._build_dependents()
+            for task in self.pipeline.get_ready_tasks():
+                self._submit(task, futures)
+
             # 主线程启动
             while self.running:
-                # get all ready tasks for main and sub pipelines
-                ready_tasks = self.pipeline.get_ready_tasks()
-                futures = {}
-
-                for task in ready_tasks:
-                    with task.lock:
-                        task.status = "running"
-                        if task.dep_map is not None:
-                            task.set_task_params_base_on_dep()
-                    task_class, name_id, params, glob_params = task.get_executor_args()
-                    future = self.executor.submit(TaskNode.static_execute, task_class, self.resource_conf, name_id, params, glob_params)
-                    futures[future] = task
-                    
-                # TODO: 目前不完全确定以下进程池中的task并行执行是否优化了运行效率
-                for future in as_completed(futures):
-                    task = futures[future]
-                    try:
-                        result = future.result()
-                        if result["status"] == "success":
-                            with task.lock:
-                                task.status = "success"
-                                if len(result["data"]) > 1:
-                                    task.result = result["data"] 
-                                if "next_tasks" in result:
-                                    self.dynamic_loader.register_new_task(result.get("next_tasks"))
-                                if "next_pipelines" in result:
-                                    self.dynamic_loader.register_new_pipeline(result.get("next_pipelines"))              
-                                self.logger.info(f"Task '{task.name_id}' completed.")
-                                if self.debug:
-                                    self.logger.info(f"Task '{task.name_id}' output: {result['data']}")
-                        else:
-                            with task.lock:
-                                task.status = "failed"
-                                task.last_failed_time = time.time()
-                                task.retry_times += 1
-                                self.logger.error(f"Task '{task.name_id}' failed with error: {result['error']}")
-                    except Exception as e:
-                        with task.lock:
-                            task.status = "failed"
-                            task.last_failed_time = time.time()
-                            self.logger.error(f"Task '{task.name_id}' failed: {e}")
-                            
                 # 判断是否所的任务都实现了（包括动态注册文件中）
-                if not self.pipeline.get_if_has_pending_tasks():
+                if not futures and not self.pipeline.get_if_has_pending_tasks():
                     self.running = False
+                    break
 
-                time.sleep(1)
+                try:
+                    future = self.done_queue.get(timeout=RESCAN_INTERVAL)
+                except Empty:
+                    future = None
+
+                if future is not None and future in futures:
+                    task = futures.pop(future)
+                    for handle in self.future_inputs.pop(future, []):
+                        self.frame_store.release(handle)
+                    if self._handle_result(task, future):
+                        self._release_consumed(task, dependents)
+                        # 依赖计数：仅检查当前task的后继，所有依赖均已完成时立即提交
+                        for successor in dependents.get(task, []):
+                            if successor.get_if_ready():
+                                self._submit(successor, futures)
+                elif future is None:
+                    # 动态注册task后重建依赖关系，并补充提交被重置为pending的task
+                    if len(dependents) != len(self.pipeline.task_map):
+                        dependents = self._build_dependents()
+                    for task in self.pipeline.get_ready_tasks():
+                        self._submit(task, futures)
             self.logger.info(f"Finish {self.pipeline.name}")
         except Exception as e:
-            self.pipeline.status = "fail"
             self.pipeline.retry_times += 1
             self.pipeline.last_exit = datetime.now()
+            self.pipeline.status = "fail"
             self.logger.exception(f"{self.pipeline.name} crashed with error", exc_info=e)
         finally:
-            # 清理临时资源
+            # 清理临时资源（状态最后修改，保证调度器收到通知时 last_exit 已更新）
             self.running = False
-            self.pipeline.status = "success"
             self.pipeline.retry_times = 0
             self.pipeline.last_exit = datetime.now()
             
             if self.pipeline.if_tmp:
                 for _, task in self.pipeline.task_map.items():
-                    task.result = None
-            self.logger.info(f"terminate {self.pipeline.name}")
\ No newline at end of file
+                    self._set_result(task, None)
+            self.pipeline.status = "success"
+            self.logger.info(f"terminate {self.pipeline.name}")
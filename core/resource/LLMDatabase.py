@@ -1,160 +1,377 @@
+import io
 import json
+import re
+import struct
+import threading
 import psycopg2
+import psycopg2.extras
 import numpy as np
+from contextlib import contextmanager
 from typing import Dict, Optional, List
+from sqlalchemy import create_engine
 
 from core.logger import get_logger
-logger = get_logger("ResourceManager") 
+from core.resource.database_table import VectorRecord
+logger = get_logger("ResourceManager")
 
+'''
+长期记忆向量库（pgvector）：
+- 所有记忆保存在同一张 vector_record 表中（ORM 见 database_table.VectorRecord），以 (memory_type, stock_symbol) 区分，
+  表按 memory_type 分区，各分区在首次使用时创建；所有 VectorDatabase 共用 VectorDatabaseManager 中的一个连接池
+- insert 使用 execute_values 批量写入，单次写入条数达到 COPY_MIN_ROWS 时改用二进制 COPY FROM STDIN（向量直接由 numpy 编码，不经过文本格式化）
+- 分区行数达到 index_config["min_rows"] 后自动在该分区上创建 ANN 索引（HNSW 或 IVFFlat，距离与查询所用的 <-> 一致为 L2），
+  IVFFlat 的聚类数依赖建索引时的数据量，行数增长到建索引时的 rebuild_growth 倍后重建索引
+- search 按 memory_type（分区裁剪）、stock_code、metadata（JSONB @>）过滤：
+  指定 stock_code 时单只股票的记录较少，禁用 ANN 索引扫描，由 (memory_type, stock_symbol) 索引取出后精确排序；
+  否则使用分区上的 ANN 索引，ef_search（HNSW）/ probes（IVFFlat）可按次指定，以 SET LOCAL 只作用于当前查询事务
+'''
 
-# PGVector 统一向量数据库管理器
+# 单次写入行数达到该值时使用二进制 COPY，否则使用 execute_values
+COPY_MIN_ROWS = 100
+
+DEFAULT_INDEX_CONFIG = {
+    "type": "hnsw",             # hnsw / ivfflat / none
+    "min_rows": 10000,          # 行数达到该值后创建索引，数据量较小时顺序扫描已足够快且结果精确
+    "m": 16,                    # HNSW 每个节点的最大连接数
+    "ef_construction": 64,      # HNSW 建索引时的候选列表大小
+    "lists": None,              # IVFFlat 聚类数，为空时按行数计算（100 万行以内 rows / 1000，以上 sqrt(rows)）
+    "rebuild_growth": 4,        # IVFFlat 行数增长到建索引时的该倍数后重建
+    "ef_search": 40,            # HNSW 查询时的候选列表大小，越大召回率越高、查询越慢
+    "probes": 10,               # IVFFlat 查询时扫描的聚类数
+    "maintenance_work_mem": None,   # 建索引时的 maintenance_work_mem（如 "512MB"），为空时使用数据库默认值
+}
+
+TABLE_NAME = VectorRecord.__tablename__
+# memory_type 用于拼接分区表名，只允许小写字母、数字与下划线
+MEMORY_TYPE_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,29}$")
+
+
+def _vector_literal(embedding) -> str:
+    """转换为 pgvector 的文本格式 [x1,x2,...]，比逐元素适配为 ARRAY 更快"""
+    return "[" + ",".join(map(str, np.asarray(embedding, dtype=np.float32).tolist())) + "]"
+
+
+def _copy_field(value: Optional[str]) -> bytes:
+    """COPY 二进制格式中的文本字段：长度(int32) + UTF-8 内容，NULL 为长度 -1"""
+    if value is None:
+        return struct.pack(">i", -1)
+    value = value.encode("utf-8")
+    return struct.pack(">i", len(value)) + value
+
+
+class MemoryPartition:
+    """单个 memory_type 分区的行数与 ANN 索引状态"""
+    def __init__(self, memory_type: str, row_count: int, index_type: Optional[str], index_lists: Optional[int]):
+        self.memory_type = memory_type
+        self.table_name = f"{TABLE_NAME}_{memory_type}"
+        self.index_name = f"{self.table_name}_embedding_idx"
+        self.row_count = row_count          # 在本进程内增量维护，仅在首次使用时统计一次
+        self.index_type = index_type
+        self.index_lists = index_lists
+        self.lock = threading.Lock()
+
+
+# PGVector 中某一类记忆（memory_type）下某只股票的记忆视图，本身不持有连接
 class VectorDatabase:
-    def __init__(self, dim: int, table_name: str, db_params: Optional[dict] = None):
-        self.dim = dim
-        self.table_name = table_name
-        self.db_params = db_params
+    def __init__(self, manager: "VectorDatabaseManager", memory_type: str, stock_code: str):
+        self.manager = manager
+        self.memory_type = memory_type
+        self.stock_code = str(stock_code)
 
-        assert db_params is not None
-        self.connect = psycopg2.connect(**db_params)
-        self.cursor = self.connect.cursor()
-        
     def insert(self, embeddings: List[np.ndarray], texts: List[str], metadatas: List[dict]):
         """
         用于更新向量数据库
         """
-        assert len(embeddings) == len(texts) == len(metadatas), "List lengths must match"
+        self.manager.insert(self.memory_type, self.stock_code, embeddings, texts, metadatas)
+
+    def search(self, query_vec: np.ndarray, top_k: int = 5, metadata: Optional[dict] = None,
+               ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[dict]:
+        return self.manager.search(query_vec, top_k, self.memory_type, self.stock_code, metadata, ef_search=ef_search, probes=probes)
 
-        sql = f"""INSERT INTO {self.table_name} (embedding, content, metadata) VALUES (%s, %s, %s)"""
-        for emb, text, meta in zip(embeddings, texts, metadatas):
-            self.cursor.execute(sql, (emb.tolist(), text, json.dumps(meta)))
-        self.connect.commit()
-        
     # TODO: 该函数需要进一步的修改，以保证长期记忆返回的有效性
-    def get_history(self, query: str, top_k: int = 5) -> List[str]:
+    def get_history(self, query: str, top_k: int = 5, metadata: Optional[dict] = None) -> List[str]:
         """
         使用嵌入向量检索与 query 最相关的文本内容，用于拼接上下文 history
         """
         from utils.embedding_module import embed_text
 
-        query_vec = embed_text(query)
-        results = []
-
-        sql = f"""
-        SELECT embedding, content, metadata FROM {self.table_name}
-        ORDER BY embedding <-> %s::vector
-        LIMIT %s;
-        """
-        self.cursor.execute(sql, (query_vec.tolist(), top_k))
-        rows = self.cursor.fetchall()
-        for row in rows:
-            item = {
-                "embedding": np.array(row[0]),  # VECTOR 类型
-                "content": row[1],              # TEXT 类型
-                "metadata": row[2]              # JSONB 类型
-            }
-            results.append(item)
-
+        results = self.search(embed_text(query), top_k, metadata)
         return [r["content"] for r in results if r["content"]]
-    
+
     def close(self):
-        self.cursor.close()
-        self.connect.close()
-    
+        """连接由 VectorDatabaseManager 的连接池统一管理，此处无需释放"""
+        pass
+
 
 class VectorDatabaseManager:
     """
-    统一封装向量管理器，支持PGVector
+    统一封装向量管理器，支持PGVector：管理 vector_record 表及其分区、共享连接池与 ANN 索引
     """
 
-    def __init__(self, dim: int, db_params: Optional[dict] = None):
+    def __init__(self, dim: int, db_params: Optional[dict] = None, index_config: Optional[dict] = None,
+                 pool_size: int = 5, max_overflow: int = 10):
         self.dim = dim
         self.db_params = db_params
-        
-        self.vector_database_cache: Dict[str, VectorDatabase] = {}  # 长期数据库缓存
+        self.index_config = {**DEFAULT_INDEX_CONFIG, **(index_config or {})}
+        self.partitions: Dict[str, MemoryPartition] = {}
+        self._lock = threading.Lock()
 
         assert db_params is not None
-        self.connect = psycopg2.connect(**db_params)
-        self.cursor = self.connect.cursor()
-
-    def check_table_exists(self, table_name: str) -> bool:
-        self.cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_name=%s
-            );
-        """, (table_name,))
-        return self.cursor.fetchone()[0]
-        
-    def create_table(self, table_name: str) -> VectorDatabase:
-        myDatabase = None
+        table_dim = VectorRecord.__table__.c.embedding.type.dim
+        if dim != table_dim:
+            raise ValueError(f"Embedding dim {dim} does not match {TABLE_NAME}.embedding dim {table_dim}")
+        # 连接参数与 psycopg2.connect 一致，由 SQLAlchemy 的连接池复用连接
+        self.engine = create_engine(
+            "postgresql+psycopg2://",
+            connect_args=db_params,
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+        )
+        self.ensure_schema()
+
+    @contextmanager
+    def cursor(self):
+        """从连接池取出连接，正常结束时提交，异常时回滚，最后归还连接"""
+        connection = self.engine.raw_connection()
         try:
+            with connection.cursor() as cursor:
+                yield cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def ensure_schema(self):
+        with self.cursor() as cursor:
             # 先启用 pgvector 扩展
-            self.cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-            self.connect.commit()  # 提交事务
-
-            # 创建表，假设向量维度dim=384
-            create_table_sql = f"""
-            CREATE TABLE {table_name} (
-                id SERIAL PRIMARY KEY,
-                embedding VECTOR({self.dim}),
-                content TEXT,
-                metadata JSONB,
-                created_at TIMESTAMP DEFAULT now()
-            );
-            """
-            self.cursor.execute(create_table_sql)
-            self.connect.commit()
-            
-            myDatabase = VectorDatabase(self.dim, table_name, self.db_params)
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        VectorRecord.__table__.create(self.engine, checkfirst=True)
+
+    def get_partition(self, memory_type: str) -> MemoryPartition:
+        """获取 memory_type 对应的分区，不存在则创建"""
+        partition = self.partitions.get(memory_type)
+        if partition is not None:
+            return partition
+        if not MEMORY_TYPE_PATTERN.match(memory_type):
+            raise ValueError(f"Invalid memory_type '{memory_type}'")
+
+        with self._lock:
+            if memory_type in self.partitions:
+                return self.partitions[memory_type]
+            table_name = f"{TABLE_NAME}_{memory_type}"
+            with self.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table_name} PARTITION OF {TABLE_NAME} FOR VALUES IN (%s)",
+                    (memory_type,),
+                )
+            with self.cursor() as cursor:
+                cursor.execute(f"SELECT count(*) FROM {table_name}")
+                row_count = cursor.fetchone()[0]
+                cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", (f"{table_name}_embedding_idx",))
+                row = cursor.fetchone()
+            index_type, index_lists = None, None
+            if row is not None:
+                # 读取已有的向量索引类型与 IVFFlat 聚类数
+                index_type = "hnsw" if "USING hnsw" in row[0] else "ivfflat"
+                lists = re.search(r"lists='?(\d+)", row[0])
+                index_lists = int(lists.group(1)) if lists else None
+            partition = MemoryPartition(memory_type, row_count, index_type, index_lists)
+            self.partitions[memory_type] = partition
+            return partition
+
+    def insert(self, memory_type: str, stock_code: str, embeddings: List[np.ndarray], texts: List[str], metadatas: List[dict]):
+        assert len(embeddings) == len(texts) == len(metadatas), "List lengths must match"
+        if len(texts) == 0:
+            return
+        partition = self.get_partition(memory_type)
+        stock_code = str(stock_code)
+
+        with self.cursor() as cursor:
+            if len(texts) >= COPY_MIN_ROWS:
+                self._copy_rows(cursor, memory_type, stock_code, embeddings, texts, metadatas)
+            else:
+                rows = [(memory_type, stock_code, _vector_literal(emb), text, json.dumps(meta, ensure_ascii=False))
+                        for emb, text, meta in zip(embeddings, texts, metadatas)]
+                sql = f"INSERT INTO {TABLE_NAME} (memory_type, stock_symbol, embedding, content, params) VALUES %s"
+                psycopg2.extras.execute_values(cursor, sql, rows, template="(%s, %s, %s::vector, %s, %s::jsonb)", page_size=1000)
+        with partition.lock:
+            partition.row_count += len(texts)
+        self.ensure_index(memory_type)
+
+    def _copy_rows(self, cursor, memory_type, stock_code, embeddings, texts, metadatas):
+        """
+        以 COPY 二进制格式写入：每行为 字段数(int16)，之后每个字段为 长度(int32) + 内容，均为大端序
+        vector 字段内容为 dim(int16) + 保留位(int16) + dim 个 float4，jsonb 字段内容为版本号 1 + JSON 文本
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), self.dim)
+        head = np.zeros(len(texts), dtype=[("length", ">i4"), ("dim", ">i2"), ("unused", ">i2"), ("values", ">f4", (self.dim,))])
+        head["length"] = 4 + 4 * self.dim
+        head["dim"] = self.dim
+        head["values"] = vectors
+        head_bytes = head.tobytes()
+        size = head.itemsize
+        # 同一批写入的 memory_type 与 stock_symbol 相同，每行的前缀一致
+        prefix = struct.pack(">h", 5) + _copy_field(memory_type) + _copy_field(stock_code)
+
+        # 文件头：签名 + flags(int32) + 头部扩展长度(int32)，文件尾：-1(int16)
+        parts = [b"PGCOPY\n\xff\r\n\x00", struct.pack(">ii", 0, 0)]
+        for i, (text, meta) in enumerate(zip(texts, metadatas)):
+            parts.append(prefix)
+            parts.append(head_bytes[i * size:(i + 1) * size])
+            parts.append(_copy_field(text))
+            meta = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            parts.append(struct.pack(">ib", len(meta) + 1, 1))
+            parts.append(meta)
+        parts.append(struct.pack(">h", -1))
+        columns = "memory_type, stock_symbol, embedding, content, params"
+        cursor.copy_expert(f"COPY {TABLE_NAME} ({columns}) FROM STDIN WITH (FORMAT binary)", io.BytesIO(b"".join(parts)))
+
+    def _ivfflat_lists(self, rows: int) -> int:
+        if self.index_config.get("lists"):
+            return int(self.index_config["lists"])
+        if rows <= 1_000_000:
+            return max(1, rows // 1000)
+        return int(np.sqrt(rows))
+
+    def ensure_index(self, memory_type: str, force: bool = False):
+        """
+        分区行数达到阈值且尚无索引时创建索引；IVFFlat 在数据量增长后重建（聚类中心由建索引时的数据决定，数据分布变化后召回率下降）
+        force 为 True 时忽略行数阈值立即（重新）创建
+        """
+        index_type = self.index_config.get("type", "hnsw")
+        if index_type not in ("hnsw", "ivfflat"):
+            return
+        partition = self.get_partition(memory_type)
+        with partition.lock:
+            if partition.index_type is None:
+                if not force and partition.row_count < self.index_config["min_rows"]:
+                    return
+            elif not force:
+                if partition.index_type != "ivfflat" or self.index_config.get("lists"):
+                    return
+                if partition.row_count < partition.index_lists * 1000 * self.index_config["rebuild_growth"]:
+                    return
+
+            if index_type == "hnsw":
+                options = f"m = {int(self.index_config['m'])}, ef_construction = {int(self.index_config['ef_construction'])}"
+                lists = None
+            else:
+                lists = self._ivfflat_lists(partition.row_count)
+                options = f"lists = {lists}"
+            try:
+                with self.cursor() as cursor:
+                    if self.index_config.get("maintenance_work_mem"):
+                        cursor.execute("SET LOCAL maintenance_work_mem = %s", (self.index_config["maintenance_work_mem"],))
+                    cursor.execute(f"DROP INDEX IF EXISTS {partition.index_name}")
+                    cursor.execute(f"CREATE INDEX {partition.index_name} ON {partition.table_name} USING {index_type} (embedding vector_l2_ops) WITH ({options})")
+            except Exception as e:
+                logger.error(f"Failed to build {index_type} index on {partition.table_name}: {e}")
+                return
+            partition.index_type, partition.index_lists = index_type, lists
+            logger.info(f"Built {index_type} index on {partition.table_name} ({partition.row_count} rows, {options})")
+
+    def search(self, query_vec: np.ndarray, top_k: int = 5, memory_type: str = "stock", stock_code: Optional[str] = None,
+               metadata: Optional[dict] = None, exact: Optional[bool] = None,
+               ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[dict]:
+        """
+        返回 memory_type 分区中与 query_vec 最近的 top_k 条记录，可按 stock_code 与 metadata（包含关系）过滤
+        exact 为空时，指定 stock_code 则精确检索，否则使用 ANN 索引（先取近邻再过滤，metadata 过滤条件较严格时返回条数可能少于 top_k）
+        ef_search / probes 为空时使用 index_config 中的默认值
+        """
+        partition = self.get_partition(memory_type)
+        if exact is None:
+            exact = stock_code is not None
+        conditions, params = ["memory_type = %s"], [memory_type]
+        if stock_code is not None:
+            conditions.append("stock_symbol = %s")
+            params.append(str(stock_code))
+        if metadata:
+            conditions.append("params @> %s::jsonb")
+            params.append(json.dumps(metadata, ensure_ascii=False))
+        sql = f"""
+        SELECT embedding, content, params, stock_symbol FROM {TABLE_NAME}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY embedding <-> %s::vector
+        LIMIT %s;
+        """
+        with self.cursor() as cursor:
+            # SET LOCAL 只在当前事务内生效，查询结束后提交事务即恢复
+            if exact:
+                # ANN 索引只支持 index scan，关闭后由过滤条件上的 bitmap 扫描取出候选行再精确排序
+                cursor.execute("SET LOCAL enable_indexscan = off")
+            elif partition.index_type == "hnsw":
+                cursor.execute("SET LOCAL hnsw.ef_search = %s", (max(top_k, int(ef_search or self.index_config["ef_search"])),))
+            elif partition.index_type == "ivfflat":
+                cursor.execute("SET LOCAL ivfflat.probes = %s", (int(probes or self.index_config["probes"]),))
+            cursor.execute(sql, (*params, _vector_literal(query_vec), top_k))
+            rows = cursor.fetchall()
+
+        results = []
+        for row in rows:
+            item = {
+                "embedding": np.array(json.loads(row[0]), dtype=np.float32),  # VECTOR 类型（文本格式）
+                "content": row[1],              # TEXT 类型
+                "metadata": row[2],             # JSONB 类型
+                "stock_code": row[3],
+            }
+            results.append(item)
+        return results
+
+    # 向量表为共享表，返回的 VectorDatabase 不持有连接，无需缓存
+    def get_table(self, stock_code: str, memory_type: str = "stock") -> VectorDatabase:
+        self.get_partition(memory_type)
+        return VectorDatabase(self, memory_type, stock_code)
+
+    def ping(self) -> bool:
+        try:
+            with self.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
         except Exception as e:
-            print(f"database init fail: {e}")
-            
-        return myDatabase
-    
-    # 不存在则创建，存在则直接返回
-    def get_table(self, table_name: str) -> VectorDatabase:
-        vectorDB = None
-        if table_name in self.vector_database_cache:
-            return self.vector_database_cache[table_name]
-        elif not self.check_table_exists(table_name):
-            vectorDB = self.create_table(table_name)
-            logger.info(f"股票 {table_name} 的PGVector表 {table_name} 创建成功")
-        else:
-            vectorDB = VectorDatabase(self.dim, table_name, self.db_params)
-            
-        # TODO: 此处可能需要使用FIFO
-        self.vector_database_cache[table_name] = vectorDB
-        return vectorDB
+            logger.error(f"Ping failed: {e}")
+            return False
+
+    def dispose(self, close: bool = True):
+        """释放连接池，close=False 时仅丢弃连接而不关闭（用于 fork 后的子进程）"""
+        self.engine.dispose(close=close)
 
     def close(self):
-        self.cursor.close()
-        self.connect.close()
+        self.dispose()
 
 
 # TODO: 此处可能会新增多个数据库的接口
 class StockMemoryManager:
     """
-    管理每一只股票对应的长期向量数据库
+    管理每一只股票对应的长期记忆（均保存在 vector_record 表中）
     """
 
-    def __init__(self, db_params: dict, dim: int = 384):
+    def __init__(self, db_params: dict, dim: int = 384, index_config: Optional[dict] = None,
+                 pool_size: int = 5, max_overflow: int = 10):
         self.db_params = db_params
         self.dim = dim
-        self.vector_database_managers = VectorDatabaseManager(dim=self.dim, db_params=self.db_params)
-        
+        self.vector_database_managers = VectorDatabaseManager(
+            dim=self.dim, db_params=self.db_params, index_config=index_config,
+            pool_size=pool_size, max_overflow=max_overflow,
+        )
+
     def get_vector_database(self, stock_code: str, memory_type: str = "stock") -> VectorDatabase:
         vectorDB = None
-        
+
         try:
-            # TODO: 此处命名规则需要修改
-            table_name = memory_type + '_' + stock_code
-            vectorDB = self.vector_database_managers.get_table(table_name)
+            vectorDB = self.vector_database_managers.get_table(stock_code, memory_type)
         except Exception as e:
             logger.error(f"fail to load vector database: {e}")
-        
+
         return vectorDB
 
+    def ping(self) -> bool:
+        return self.vector_database_managers.ping()
+
+    def dispose(self, close: bool = True):
+        self.vector_database_managers.dispose(close=close)
+
     def close_all(self):
-        for manager in self.vector_managers.values():
-            manager.close()
-        self.vector_managers.clear()
\ No newline at end of file
+        self.dispose()
@@ -1,23 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from urllib.parse import urlparse
 from langchain.llms.base import LLM
 from langchain.memory import ConversationBufferMemory
 from langchain.chains.summarize import load_summarize_chain
 from langchain.docstore.document import Document
 from langchain.text_splitter import CharacterTextSplitter
 from pydantic import PrivateAttr
-from pydantic import PrivateAttr
 from typing import Dict, Any, Optional, List
 from openai import OpenAI
 from duckduckgo_search import DDGS
 from langchain.prompts import PromptTemplate
 
+from core.logger import get_logger
+from utils.token_utils import count_tokens, pack_by_tokens, split_by_tokens, truncate_by_tokens
+
+logger = get_logger("ResourceManager")
+
 
 '''
 自定义平台的大模型的接口类，其集成短期记忆、长期记忆、联网搜索功能
 以下类由于继承了longchain的base类，所以需要使用如下的方式进行初始化？？
+
+长文本分析支持两种方式：
+- refine_chat: LangChain 的 refine 链，N 个文档依次调用 N 次模型
+- map_reduce_chat: 按 token 预算将文档切分 / 合并为若干块，并发分析各块（map），再将分析结果按 token 预算分组并发合并，
+  逐层归并直到只剩一个结果（reduce），耗时约为 (1 + 归并层数) 次请求
+并发请求数由 max_concurrency 限制；设置 rate_limiter 后，请求期间还会占用 endpoint 域名的跨进程并发槽位（resource_conf 中 rate_limiter.hosts）
+每次 refine_chat / map_reduce_chat 的返回结果中包含 report：各次请求的阶段、耗时与 token 用量
+设置 response_cache（LLMResponseCache）后，相同（或语义相近）的 prompt 直接返回缓存的回答，report 中记录命中类型与节省的 token
 '''
+
+DEFAULT_MAP_PROMPT = PromptTemplate(
+    template="""
+    您是一位专业的投资分析师。以下是与用户问题相关的部分资料，请提取其中与问题相关的关键数据、指标变化与趋势，并给出简要分析。
+
+    用户问题: {question}
+
+    资料内容:
+    {text}
+    """,
+    input_variables=["text", "question"],
+)
+
+DEFAULT_COMBINE_PROMPT = PromptTemplate(
+    template="""
+    您是一位专业的投资分析师。以下是针对不同资料的分析结果（或原始资料），请将其整合为一份逻辑连贯、结构化的完整报告，保留所有关键数据，并对不同资料之间的关联与矛盾进行对比分析。
+
+    用户问题: {question}
+
+    分析结果:
+    {text}
+    """,
+    input_variables=["text", "question"],
+)
+
+# 单次请求输入部分的最小 token 预算，低于该值说明 context_tokens / max_tokens 配置不合理
+MIN_INPUT_TOKENS = 256
 class AILLM(LLM):
     _client: OpenAI = PrivateAttr()
     _search_tool: Optional[DDGS] = PrivateAttr(default=None)
+    _rate_limiter: Any = PrivateAttr(default=None)
+    _response_cache: Any = PrivateAttr(default=None)
+    _calls: List[dict] = PrivateAttr(default_factory=list)
+    _calls_lock: Any = PrivateAttr(default_factory=threading.Lock)
 
     # 参数
     api_key: str
@@ -26,6 +75,9 @@ class AILLM(LLM):
     temperature: float
     max_tokens: int
 
+    max_concurrency: int = 4            # map_reduce_chat 中同时进行的请求数
+    context_tokens: int = 8192          # 模型上下文长度（输入 + 输出 token）
+
     use_short_term_memory: bool = False
     short_term_memory: Optional[ConversationBufferMemory] = None
 
@@ -55,35 +107,131 @@ class AILLM(LLM):
         except Exception as e:
             return f"联网搜索失败: {e}"
 
+    def set_rate_limiter(self, rate_limiter):
+        """设置按域名的限流器（HostRateLimiter），每次请求期间占用 endpoint 域名的并发槽位"""
+        self._rate_limiter = rate_limiter
+
+    def set_response_cache(self, response_cache):
+        """设置回答缓存（LLMResponseCache），请求前先查询缓存，请求成功后写入缓存"""
+        self._response_cache = response_cache
+
+    def _record(self, record: dict):
+        with self._calls_lock:
+            self._calls.append(record)
+        logger.debug(f"LLM call {record}")
+
+    def _complete(self, prompt: str, stage: str = "chat", round_index: int = 0) -> str:
+        """发送一次请求（或命中缓存），并记录该次请求的阶段、耗时与 token 用量"""
+        cache = self._response_cache
+        if cache is not None:
+            # 语义缓存只在同一模型参数、同一股票、同一阶段内匹配
+            cache_key = cache.make_key(self.model_name, self.temperature, self.max_tokens, prompt)
+            cache_scope = f"{self.model_name}|{self.temperature}|{self.stock_code}|{stage}"
+            start = time.perf_counter()
+            # 缓存不可用（如数据库被锁、向量化失败）时直接请求模型，不影响本次调用
+            try:
+                cached = cache.get(cache_key, cache_scope, prompt)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed, calling the model directly: {e}")
+                cached = None
+            if cached is not None:
+                output_text, hit_type, saved_tokens = cached
+                self._record({
+                    "stage": stage,
+                    "round": round_index,
+                    "latency": round(time.perf_counter() - start, 3),
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cache": hit_type,
+                    "saved_tokens": saved_tokens,
+                })
+                return output_text
+
+        host = urlparse(self.endpoint_url).hostname
+        limit = self._rate_limiter.limit(host) if self._rate_limiter is not None else nullcontext()
+        try:
+            with limit:
+                start = time.perf_counter()
+                completion = self._client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {
+                            'role': 'user',
+                            'content': prompt
+                        }
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                latency = time.perf_counter() - start
+
+            output_data = completion.model_dump()
+            output_text = output_data["choices"][0]["message"]["content"]
+
+        except Exception as e:
+            raise RuntimeError(f"调用大模型API失败: {e}")
+
+        # 接口未返回 usage 时按估算值记录
+        usage = output_data.get("usage") or {}
+        record = {
+            "stage": stage,
+            "round": round_index,
+            "latency": round(latency, 3),
+            "prompt_tokens": usage.get("prompt_tokens", count_tokens(prompt)),
+            "completion_tokens": usage.get("completion_tokens", count_tokens(output_text)),
+        }
+        self._record(record)
+        if cache is not None:
+            try:
+                cache.put(cache_key, cache_scope, prompt, output_text, record["prompt_tokens"], record["completion_tokens"])
+            except Exception as e:
+                logger.warning(f"LLM cache store failed, response not cached: {e}")
+        return output_text
+
     def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
         """
         这个方法是 LangChain LLM 基类的核心，因此其签名需要与基类保持一致。
         我们假设 LangChain 的 chain 已经构建好了完整的 prompt，
         并将其作为唯一的 prompt 参数传递进来。
         """
-        
-        try:
-            completion = self._client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            print(completion.usage)
+        return self._complete(prompt)
 
-            output_data = completion.model_dump()
-            output_text = output_data["choices"][0]["message"]["content"]
+    def _start_report(self) -> float:
+        with self._calls_lock:
+            self._calls = []
+        return time.perf_counter()
 
-            return output_text
+    def _build_report(self, mode: str, start: float) -> Dict[str, Any]:
+        """汇总自 _start_report 以来的请求记录"""
+        with self._calls_lock:
+            calls = list(self._calls)
+        prompt_tokens = sum(c["prompt_tokens"] for c in calls)
+        completion_tokens = sum(c["completion_tokens"] for c in calls)
+        report = {
+            "mode": mode,
+            "wall_time": round(time.perf_counter() - start, 3),
+            "calls": len(calls),
+            # 经 _call 发出的请求（如 refine 链）依次执行，每次请求为一轮；并发请求按 round 计
+            "rounds": sum(c["stage"] == "chat" for c in calls) + len({c["round"] for c in calls if c["stage"] != "chat"}),
+            "call_latency_sum": round(sum(c["latency"] for c in calls), 3),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cache_hits": sum(1 for c in calls if c.get("cache")),
+            "saved_tokens": sum(c.get("saved_tokens", 0) for c in calls),
+            "details": calls,
+        }
+        logger.info(f"{mode}: {report['calls']} calls in {report['rounds']} rounds, wall {report['wall_time']}s, "
+                    f"sum of call latency {report['call_latency_sum']}s, {report['total_tokens']} tokens, "
+                    f"{report['cache_hits']} cache hits ({report['saved_tokens']} tokens saved)")
+        return report
 
-        except Exception as e:
-            raise RuntimeError(f"调用大模型API失败: {e}")
+    def chat_batch(self, prompts: List[str], stage: str = "chat") -> List[str]:
+        """并发发送多条相互独立的请求（同时进行的请求数不超过 max_concurrency），按输入顺序返回结果"""
+        if len(prompts) <= 1:
+            return [self._complete(prompt, stage) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(prompts))) as pool:
+            return list(pool.map(partial(self._complete, stage=stage), prompts))
 
     def chat(self, prompt: str, context: str) -> str:
         """
@@ -121,19 +269,18 @@ class AILLM(LLM):
         else:
             raise TypeError("long_context 必须是字符串 (str) 或字典 (Dict[str, str]) 类型")
 
-        # 3. 加载 Refine 链
+        # 3. 加载 Refine 链（未指定的 prompt 使用 LangChain 的默认模板）
+        prompts = {"question_prompt": initial_prompt, "refine_prompt": refine_prompt}
         refine_chain = load_summarize_chain(
             self,
             chain_type="refine",
             verbose=False, # 设置为 True 可查看详细处理过程
-            question_prompt=initial_prompt,
-            refine_prompt=refine_prompt,
+            **{k: v for k, v in prompts.items() if v is not None},
         )
 
         # 4. 执行链并获取结果
         try:
-            val = refine_chain.llm_chain.llm.max_tokens
-            print(val)
+            start = self._start_report()
             refined_result = refine_chain.run(input_documents=docs, question=user_prompt)
             # Refine 链的运行结果即为最终答案，我们将其保存到短期记忆
             if self.short_term_memory is not None:
@@ -141,10 +288,88 @@ class AILLM(LLM):
                     {"input": initial_prompt},
                     {"output": refined_result}
                 )
-            return {"status": "success", "data": refined_result, "error": None}
+            return {"status": "success", "data": refined_result, "error": None, "report": self._build_report("refine", start)}
         except Exception as e:
             raise RuntimeError(f"使用 Refine 链处理长文本失败: {e}")
 
+    def input_budget(self, user_prompt: str, prompt: Optional[PromptTemplate] = None) -> int:
+        """单次请求中可用于资料内容的 token 数：上下文长度 - 输出上限 - 模板（默认为 map 阶段模板）与问题本身"""
+        prompt = prompt or DEFAULT_MAP_PROMPT
+        budget = self.context_tokens - self.max_tokens - count_tokens(prompt.format(text="", question=user_prompt))
+        if budget < MIN_INPUT_TOKENS:
+            raise ValueError(f"context_tokens ({self.context_tokens}) 过小，扣除 max_tokens ({self.max_tokens}) 与提示词后仅剩 {budget} token")
+        return budget
+
+    def map_reduce_chat(self, user_prompt: str, long_context, map_prompt: Optional[PromptTemplate] = None,
+                        combine_prompt: Optional[PromptTemplate] = None) -> Dict[str, Any]:
+        """
+        使用并发的 map-reduce 处理超长文本输入。
+
+        :param user_prompt: 用户的原始问题。
+        :param long_context: 需要处理的超长文本内容，字符串或 {资料名: 内容} 字典。
+        :return: 包含最终报告与请求报告（report）的字典。
+        """
+        map_prompt = map_prompt or DEFAULT_MAP_PROMPT
+        combine_prompt = combine_prompt or DEFAULT_COMBINE_PROMPT
+        if isinstance(long_context, str):
+            texts = [long_context]
+        elif isinstance(long_context, dict):
+            texts = []
+            for data_name, data_content in long_context.items():
+                if not isinstance(data_content, str):
+                    raise TypeError(f"字典中的值必须为字符串，但 {data_name} 的值为 {type(data_content)}")
+                texts.append(f"【{data_name}】\n{data_content}")
+        else:
+            raise TypeError("long_context 必须是字符串 (str) 或字典 (Dict[str, str]) 类型")
+
+        start = self._start_report()
+        map_budget = self.input_budget(user_prompt, map_prompt)
+        combine_budget = self.input_budget(user_prompt, combine_prompt)
+        # 过长的资料按段落切分，较短的相邻资料合并到同一块中，以减少请求次数
+        pieces = [piece for text in texts for piece in split_by_tokens(text, map_budget)]
+        chunks = pack_by_tokens(pieces, map_budget)
+
+        def combine(group, round_index):
+            return self._complete(combine_prompt.format(text="\n\n".join(group), question=user_prompt), "reduce", round_index)
+
+        def fit(results, max_tokens):
+            # 超出预算的分析结果截断，保证合并请求不超过 combine_budget
+            fitted = [truncate_by_tokens(text, max_tokens) for text in results]
+            truncated = sum(a is not b for a, b in zip(results, fitted))
+            if truncated:
+                logger.warning(f"map_reduce: truncated {truncated} partial results to {max_tokens} tokens before combining")
+            return fitted
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                if len(chunks) == 1 and count_tokens(chunks[0]) <= combine_budget:
+                    # 全部资料可放入一次请求，直接生成最终报告
+                    result = combine(chunks, 0)
+                else:
+                    results = list(pool.map(lambda chunk: self._complete(map_prompt.format(text=chunk, question=user_prompt), "map", 0), chunks))
+                    round_index = 1
+                    while True:
+                        results = fit(results, combine_budget)
+                        groups = pack_by_tokens(results, combine_budget, separator="\n\n")
+                        if len(groups) == 1:
+                            result = combine([groups[0]], round_index)
+                            break
+                        if len(groups) == len(results):
+                            # 每个分析结果都超过预算的一半时，截断到一半后两两合并，保证每层结果数减少
+                            results = fit(results, (combine_budget - count_tokens("\n\n")) // 2)
+                            groups = pack_by_tokens(results, combine_budget, separator="\n\n")
+                        results = list(pool.map(partial(lambda group, r: combine([group], r), r=round_index), groups))
+                        round_index += 1
+        except Exception as e:
+            raise RuntimeError(f"使用 map-reduce 处理长文本失败: {e}")
+
+        if self.short_term_memory is not None:
+            self.short_term_memory.save_context(
+                {"input": user_prompt},
+                {"output": result}
+            )
+        return {"status": "success", "data": result, "error": None, "report": self._build_report("map_reduce", start)}
+
     def clear_memory(self):
         if self.short_term_memory is not None:
             self.short_term_memory.clear()
@@ -1,4 +1,5 @@
-from sqlalchemy import ForeignKey, create_engine, Column, String, Integer, Float, JSON, Text, TIMESTAMP, func, MetaData, PrimaryKeyConstraint
+from sqlalchemy import ForeignKey, create_engine, Column, String, Integer, BigInteger, Float, JSON, Text, TIMESTAMP, func, MetaData, PrimaryKeyConstraint, Index, Sequence
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from pgvector.sqlalchemy import Vector        # sqlalchemy的vector支持需要下载源码并手动编译
@@ -16,7 +17,6 @@ class StockInfo(Base):
     update_time = Column(TIMESTAMP)
     
     components = relationship("SectorComponent", back_populates="stock", cascade="all, delete-orphan")
-    vectors = relationship("VectorRecord", back_populates="stock", cascade="all, delete-orphan")
 
 # 指数 / 板块基础信息
 class SectorInfo(Base):
@@ -38,16 +38,26 @@ class SectorComponent(Base):
     stock = relationship("StockInfo", back_populates="components")
     
 # -------------------------- 向量主表，其对应了股票的向量数据库，用于大模型记忆与检索 ------------------------- # 
+# 所有长期记忆保存在同一张表中，以 (memory_type, stock_symbol) 区分，按 memory_type 分区（LIST），各分区由 VectorDatabaseManager 按需创建
+# stock_symbol 不限于 stock_info 中的股票（如板块、市场等记忆），故不设外键
+vector_record_id_seq = Sequence('vector_record_id_seq')
+
 class VectorRecord(Base):
     __tablename__ = 'vector_record'
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    stock_symbol = Column(String(20), ForeignKey('stock_info.symbol'), nullable=False)
-    embedding = Column(Vector)
+    id = Column(BigInteger, vector_record_id_seq, server_default=vector_record_id_seq.next_value(), nullable=False)
+    memory_type = Column(String(30), nullable=False)
+    stock_symbol = Column(String(20), nullable=False)
+    embedding = Column(Vector(384))                     # 与 all-MiniLM-L6-v2 的输出维度一致，ANN 索引要求固定维度
     content = Column(Text)
-    params = Column(JSON)
+    params = Column(JSONB)                              # 元数据，检索时以 @> 过滤
     created_at = Column(TIMESTAMP, server_default=func.now())
 
-    stock = relationship("StockInfo", back_populates="vectors")
+    __table_args__ = (
+        PrimaryKeyConstraint('memory_type', 'id', name='vector_record_pk'),
+        Index('ix_vector_record_stock', 'memory_type', 'stock_symbol'),
+        Index('ix_vector_record_params', 'params', postgresql_using='gin', postgresql_ops={'params': 'jsonb_path_ops'}),
+        {'postgresql_partition_by': 'LIST (memory_type)'},
+    )
 
 # 每日板块指数信息(东方财富自定义板块 + 大盘指数)
 class RealtimeSector(Base):
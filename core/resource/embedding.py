@@ -0,0 +1,324 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+from queue import Empty, Queue
+
+import numpy as np
+
+from core.logger import get_logger
+from utils.embedding_module import DEFAULT_MODEL_NAME, EMBEDDING_DIM, encode_texts, get_embedding_model
+
+logger = get_logger("ResourceManager")
+
+'''
+文本向量化服务：
+- EmbeddingCache: 以 (模型名, 文本内容) 哈希为键的磁盘缓存，每个向量一个文件，总大小超过上限时按最近访问时间（mtime）淘汰
+- MicroBatcher: 将同一进程内多个线程的并发请求合并为一次模型调用（模型编码期间到达的请求组成下一个批次）
+- EmbeddingServer: 可选的独立向量化进程（Unix socket），所有进程池 worker 共用一份模型，各进程的请求在该进程内合并批次
+- EmbeddingService: 对外接口 embed_texts，先查缓存，未命中的文本去重后交给向量化进程（已启用时）或本进程的 MicroBatcher
+'''
+
+# 向量化进程不可用时，在该时间（秒）内不再尝试连接，直接在本进程编码
+SERVER_RETRY_INTERVAL = 30
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str = "./cache/embedding", max_size_mb: float = 128, model_name: str = DEFAULT_MODEL_NAME):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.model_name = model_name
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_size = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith(".emb"))
+
+    def _path(self, text: str) -> str:
+        key = hashlib.sha1(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".emb")
+
+    def get(self, text: str):
+        path = self._path(text)
+        try:
+            with open(path, "rb") as f:
+                vector = np.frombuffer(f.read(), dtype=np.float32)
+        except FileNotFoundError:
+            vector = None
+        else:
+            # 更新访问时间，用于 LRU 淘汰
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector
+
+    def put(self, text: str, vector: np.ndarray):
+        path = self._path(text)
+        data = np.asarray(vector, dtype=np.float32).tobytes()
+        # 先写入临时文件再替换，避免其他进程读到不完整的文件
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_size += len(data)
+            need_evict = self._total_size > self.max_size
+        if need_evict:
+            self._evict()
+
+    def _evict(self):
+        """按 mtime 从旧到新删除缓存文件，直到总大小低于上限的 90%（重新扫描目录，以包含其他进程写入的文件）"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".emb"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+            total_size = sum(size for _, size, _ in entries)
+            target = self.max_size * 0.9
+            for _, size, path in entries:
+                if total_size <= target:
+                    break
+                try:
+                    os.remove(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+            self._total_size = total_size
+        logger.info(f"Embedding cache evicted to {total_size / 1024 / 1024:.2f} MB, stats: {self.stats()}")
+
+    def stats(self) -> dict:
+        """当前进程内的命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size_mb": round(self._total_size / 1024 / 1024, 2),
+        }
+
+
+class MicroBatcher:
+    """
+    后台线程从请求队列中取出所有已到达的请求合并编码；max_wait_ms 大于 0 时，批次不足 batch_size 条文本时最多再等待该时间
+    """
+    def __init__(self, encode, batch_size: int = 64, max_wait_ms: float = 0):
+        self.encode_func = encode
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = Queue()
+        self.batches = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def encode(self, texts: list) -> np.ndarray:
+        future = Future()
+        self.queue.put((list(texts), future))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="EmbeddingBatcher")
+                self._thread.start()
+        return future.result()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        count = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.batch_size:
+            try:
+                timeout = deadline - time.monotonic()
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except Empty:
+                break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = self.encode_func(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+# ---------------------------- 独立向量化进程 ----------------------------
+def _handle_connection(conn, batcher):
+    with conn:
+        while True:
+            try:
+                texts = conn.recv()
+            except (EOFError, OSError):
+                break
+            try:
+                conn.send(("ok", batcher.encode(texts)))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+def _serve(address, model_name, batch_size, max_wait_ms):
+    """向量化进程入口：每个客户端连接一个线程，所有连接共用一个 MicroBatcher"""
+    listener = Listener(address, family="AF_UNIX")
+    # 连接上传输的是 pickle 数据，仅允许当前用户访问
+    os.chmod(address, 0o600)
+    get_embedding_model(model_name)
+    batcher = MicroBatcher(lambda texts: encode_texts(texts, model_name, batch_size), batch_size, max_wait_ms)
+    while True:
+        conn = listener.accept()
+        threading.Thread(target=_handle_connection, args=(conn, batcher), daemon=True).start()
+
+
+class EmbeddingServer:
+    """由 Scheduler 启动的向量化进程，已有其他进程在同一地址提供服务时直接复用"""
+    def __init__(self, address: str, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = 64, max_wait_ms: float = 0):
+        self.address = os.path.abspath(address)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_wait_ms = max_wait_ms
+        self.process = None
+
+    @classmethod
+    def from_config(cls, resource_conf):
+        """读取资源配置 "embedding" 字段，未启用 server 时返回 None"""
+        from core.resource_manager import ResourceManager
+        try:
+            config = ResourceManager.load_config(resource_conf).get("embedding", {})
+        except Exception as e:
+            logger.warning(f"Failed to load embedding config, embedding server disabled: {e}")
+            return None
+        if not config.get("server", False):
+            return None
+        return cls(
+            address=config.get("server_address", "./cache/embedding/server.sock"),
+            model_name=config.get("model_name", DEFAULT_MODEL_NAME),
+            batch_size=config.get("batch_size", 64),
+            max_wait_ms=config.get("max_wait_ms", 0),
+        )
+
+    def is_serving(self) -> bool:
+        try:
+            Client(self.address, family="AF_UNIX").close()
+            return True
+        except (OSError, EOFError):
+            return False
+
+    def start(self, timeout: float = 10):
+        if self.is_serving():
+            logger.info(f"Embedding server already running at {self.address}")
+            return
+        os.makedirs(os.path.dirname(self.address), exist_ok=True)
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        # 使用 spawn 启动，不继承 Scheduler 进程中的线程与连接
+        self.process = get_context("spawn").Process(
+            target=_serve, args=(self.address, self.model_name, self.batch_size, self.max_wait_ms),
+            daemon=True, name="EmbeddingServer",
+        )
+        self.process.start()
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(self.address) and self.process.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not self.process.is_alive():
+            # 启动失败时各进程在 EmbeddingService 中回退为本进程编码
+            logger.error(f"Embedding server exited with code {self.process.exitcode}, falling back to in-process encoding")
+            self.process = None
+            return
+        logger.info(f"Embedding server started at {self.address} (pid {self.process.pid})")
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.terminate()
+        self.process.join(timeout=5)
+        self.process = None
+        try:
+            os.remove(self.address)
+        except FileNotFoundError:
+            pass
+
+
+class EmbeddingService:
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, dim: int = EMBEDDING_DIM, cache_dir: str = "./cache/embedding",
+                 max_size_mb: float = 128, batch_size: int = 64, max_wait_ms: float = 0, server_address: str = None):
+        self.model_name = model_name
+        self.dim = dim
+        self.cache = EmbeddingCache(cache_dir, max_size_mb, model_name) if cache_dir else None
+        self.batcher = MicroBatcher(lambda texts: encode_texts(texts, model_name, batch_size), batch_size, max_wait_ms)
+        self.server_address = os.path.abspath(server_address) if server_address else None
+        self._local = threading.local()
+        self._server_retry_at = 0.0
+
+    def embed_texts(self, texts: list) -> np.ndarray:
+        """返回 (文本数, dim) 的向量，空文本为零向量；重复文本只编码一次"""
+        texts = ["" if text is None else str(text) for text in texts]
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        positions = {}
+        for i, text in enumerate(texts):
+            if text:
+                positions.setdefault(text, []).append(i)
+        missing = []
+        for text, rows in positions.items():
+            vector = self.cache.get(text) if self.cache is not None else None
+            if vector is None:
+                missing.append(text)
+            else:
+                result[rows] = vector
+        if missing:
+            vectors = self._encode(missing)
+            for text, vector in zip(missing, vectors):
+                result[positions[text]] = vector
+                if self.cache is not None:
+                    self.cache.put(text, vector)
+        return result
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self.embed_texts([text])[0]
+
+    def _encode(self, texts: list) -> np.ndarray:
+        if self.server_address and time.monotonic() >= self._server_retry_at:
+            try:
+                return self._remote_encode(texts)
+            except (OSError, EOFError) as e:
+                logger.warning(f"Embedding server unavailable, encoding in process {os.getpid()}: {e}")
+                self._local.conn = None
+                self._server_retry_at = time.monotonic() + SERVER_RETRY_INTERVAL
+        return self.batcher.encode(texts)
+
+    def _remote_encode(self, texts: list) -> np.ndarray:
+        # 每个线程一个连接，并发请求在向量化进程中合并批次
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.server_address, family="AF_UNIX")
+        conn.send(texts)
+        status, payload = conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Embedding server failed: {payload}")
+        return payload
+
+    def stats(self) -> dict:
+        return {"batches": self.batcher.batches, **(self.cache.stats() if self.cache is not None else {})}
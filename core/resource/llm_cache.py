@@ -0,0 +1,188 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from core.logger import get_logger
+from utils.token_utils import count_tokens
+
+logger = get_logger("ResourceManager")
+
+'''
+大模型回答的缓存，保存在 SQLite 文件中（多进程共享，WAL 模式），分两级：
+- 精确缓存：以 (模型, temperature, max_tokens, prompt) 的哈希为键，prompt 完全一致时直接返回已保存的回答
+- 语义缓存（可选，semantic=True）：prompt 向量与同一 scope 内已保存的 prompt 向量的余弦相似度不低于 semantic_threshold 时返回其回答
+  scope 由调用方指定（AILLM 中为 模型 / temperature / 股票代码 / 请求阶段），不同股票、不同阶段的回答不会互相命中；
+  句向量模型只编码文本开头的约 256 个 token，超过 semantic_max_tokens 的 prompt 差异可能出现在截断部分，因此不参与语义缓存
+缓存条目 ttl 秒后失效；条目数超过 max_entries 时删除过期条目与最早写入的条目（保留 90%）
+stats() 返回当前进程内的命中统计（精确 / 语义命中、未命中、命中率、节省的 token 数）
+'''
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_response (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    response TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    embedding BLOB,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_response_scope ON llm_response (scope, expires_at);
+"""
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = "./cache/llm/responses.db", ttl: float = 86400, max_entries: int = 10000,
+                 semantic: bool = False, semantic_threshold: float = 0.97, semantic_max_tokens: int = 256,
+                 embedding=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic = semantic and embedding is not None
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_tokens = semantic_max_tokens
+        self.embedding = embedding
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._vectors = {}          # {scope: (rowid 上限, [key], 向量矩阵, [过期时间])}，按 rowid 增量加载
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程一个连接；WAL 模式下多进程可同时读，写入互斥
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, temperature, max_tokens, prompt: str) -> str:
+        raw = f"{model}\n{temperature}\n{max_tokens}\n{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _use_semantic(self, prompt: str) -> bool:
+        return self.semantic and count_tokens(prompt) <= self.semantic_max_tokens
+
+    def get(self, key: str, scope: str, prompt: str):
+        """
+        返回 (回答, 命中类型, 原请求的 token 数) 或 None，命中类型为 "exact" / "semantic"
+        """
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT response, prompt_tokens, completion_tokens FROM llm_response WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        hit_type = "exact" if row is not None else None
+        if row is None and self._use_semantic(prompt):
+            row = self._semantic_lookup(scope, self.embedding.embed_text(prompt), now)
+            hit_type = "semantic" if row is not None else None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            if hit_type == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            self.saved_tokens += row[1] + row[2]
+        return row[0], hit_type, row[1] + row[2]
+
+    def _semantic_lookup(self, scope: str, vector: np.ndarray, now: float):
+        conn = self._connect()
+        with self._lock:
+            last_rowid, keys, matrix, expires = self._vectors.get(scope, (0, [], np.zeros((0, len(vector)), dtype=np.float32), []))
+            rows = conn.execute(
+                "SELECT rowid, key, embedding, expires_at FROM llm_response WHERE scope = ? AND rowid > ? AND embedding IS NOT NULL ORDER BY rowid",
+                (scope, last_rowid)
+            ).fetchall()
+            if rows:
+                last_rowid = rows[-1][0]
+                keys = keys + [r[1] for r in rows]
+                matrix = np.vstack([matrix] + [np.frombuffer(r[2], dtype=np.float32)[None, :] for r in rows])
+                expires = expires + [r[3] for r in rows]
+                self._vectors[scope] = (last_rowid, keys, matrix, expires)
+        if not keys:
+            return None
+        # 向量已归一化，内积即余弦相似度；过期条目不参与比较
+        scores = matrix @ vector
+        scores[np.asarray(expires) <= now] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] < self.semantic_threshold:
+            return None
+        # 条目可能已被其他进程清理，此时视为未命中
+        return conn.execute(
+            "SELECT response, prompt_tokens, completion_tokens FROM llm_response WHERE key = ? AND expires_at > ?", (keys[best], now)
+        ).fetchone()
+
+    def put(self, key: str, scope: str, prompt: str, response: str, prompt_tokens: int, completion_tokens: int):
+        if not response:
+            return
+        embedding = None
+        if self._use_semantic(prompt):
+            embedding = np.asarray(self.embedding.embed_text(prompt), dtype=np.float32).tobytes()
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            # 先删除再插入，使更新后的条目获得新的 rowid，以便其他进程增量加载向量
+            conn.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO llm_response (key, scope, response, prompt_tokens, completion_tokens, embedding, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, response, prompt_tokens, completion_tokens, embedding, now, now + self.ttl)
+            )
+        self._prune(conn, now)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        count = conn.execute("SELECT count(*) FROM llm_response").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # 清理到 max_entries 的 90%，避免此后每次写入都触发清理
+        keep = int(self.max_entries * 0.9)
+        with conn:
+            conn.execute("DELETE FROM llm_response WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_response WHERE rowid IN (SELECT rowid FROM llm_response ORDER BY created_at LIMIT max(0, (SELECT count(*) FROM llm_response) - ?))",
+                (keep,)
+            )
+        # 已删除条目的向量在查询时按 key 回表确认，这里只需丢弃本进程的向量以免内存增长
+        with self._lock:
+            self._vectors.clear()
+        logger.info(f"LLM response cache pruned to {keep} entries")
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM llm_response")
+        with self._lock:
+            self._vectors.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "saved_tokens": self.saved_tokens,
+            }
+
+    def ping(self) -> bool:
+        try:
+            self._connect().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
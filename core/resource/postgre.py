@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.orm import sessionmaker
 from core.logger import get_logger
 
@@ -30,8 +30,12 @@ class PostgresDBManager:
     def ping(self):
         try:
             with self.engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
             logger.error(f"Ping failed: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def dispose(self, close: bool = True):
+        """释放连接池，close=False 时仅丢弃连接而不关闭（用于 fork 后的子进程）"""
+        self.engine.dispose(close=close)
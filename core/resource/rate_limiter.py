@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为进程内限流
+    fcntl = None
+
+logger = get_logger("ResourceManager")
+
+
+class FileLock:
+    """基于 flock 的跨进程互斥锁（同一进程内不同线程分别打开文件，同样互斥）"""
+    def __init__(self, path: str):
+        self.path = path
+        self.thread_lock = threading.Lock()
+
+    @contextmanager
+    def hold(self):
+        if fcntl is None:
+            with self.thread_lock:
+                yield
+            return
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class TokenBucket:
+    """
+    令牌桶，状态（剩余令牌数, 上次更新时间）保存在文件中，由所有 worker 进程共享
+    采用预约方式：加锁取令牌后立即释放锁，令牌不足时令牌数记为负数，调用方在锁外等待对应时间
+    """
+    def __init__(self, state_path: str, rate: float, burst: float):
+        self.state_path = state_path
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.lock = FileLock(state_path + ".lock")
+
+    def _read_state(self, now):
+        try:
+            with open(self.state_path, "r") as f:
+                tokens, last_time = f.read().split()
+            return float(tokens), float(last_time)
+        except (FileNotFoundError, ValueError):
+            return self.burst, now
+
+    def acquire(self):
+        """取一个令牌，返回实际等待的秒数"""
+        with self.lock.hold():
+            now = time.time()
+            tokens, last_time = self._read_state(now)
+            tokens = min(self.burst, tokens + max(now - last_time, 0) * self.rate) - 1
+            with open(self.state_path, "w") as f:
+                f.write(f"{tokens} {now}")
+        wait = -tokens / self.rate if tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class ConcurrencySlots:
+    """跨进程的并发上限：每个槽位对应一个锁文件，持有非阻塞 flock 即占用该槽位，进程异常退出时锁自动释放"""
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path_prefix: str, max_concurrency: int):
+        self.paths = [f"{path_prefix}.slot{i}" for i in range(max_concurrency)]
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @contextmanager
+    def hold(self):
+        # 先用进程内信号量排队，避免同一进程的线程反复轮询锁文件
+        with self.semaphore:
+            if fcntl is None:
+                yield
+                return
+            while True:
+                for path in self.paths:
+                    f = open(path, "a+")
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        f.close()
+                        continue
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+                        f.close()
+                    return
+                time.sleep(self.POLL_INTERVAL)
+
+    def try_acquire(self):
+        """非阻塞地占用一个槽位并一直持有（用于长期存活的资源，如浏览器），成功时返回需传给 release 的句柄，否则返回 None"""
+        if not self.semaphore.acquire(blocking=False):
+            return None
+        if fcntl is None:
+            return True
+        for path in self.paths:
+            f = open(path, "a+")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return f
+            except OSError:
+                f.close()
+        self.semaphore.release()
+        return None
+
+    def release(self, handle):
+        if handle is not True:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+        self.semaphore.release()
+
+
+class HostRateLimiter:
+    """
+    按域名进行限流与并发控制，配置示例（rate 为每秒请求数，burst 为令牌桶容量，max_concurrency 为同时进行的请求数）:
+    "hosts": {"push2.eastmoney.com": {"rate": 5, "burst": 5, "max_concurrency": 4}}
+    域名按后缀匹配（82.push2.eastmoney.com 使用 push2.eastmoney.com 的配置），未匹配的域名不限流，除非配置了 "default"
+    """
+    def __init__(self, hosts: dict, state_dir: str = "./cache/rate_limit", default: dict = None):
+        self.hosts = hosts or {}
+        self.default = default
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def _match(self, host: str):
+        """返回匹配到的配置名与配置，优先匹配最长的域名后缀"""
+        labels = host.split(".")
+        for i in range(len(labels)):
+            suffix = ".".join(labels[i:])
+            if suffix in self.hosts:
+                return suffix, self.hosts[suffix]
+        if self.default:
+            return "default", self.default
+        return None, None
+
+    def _get_limits(self, host: str):
+        with self._lock:
+            if host in self._limits:
+                return self._limits[host]
+            key, conf = self._match(host)
+            limits = None
+            if conf is not None:
+                path_prefix = os.path.join(self.state_dir, key)
+                bucket = TokenBucket(path_prefix + ".bucket", conf["rate"], conf.get("burst", conf["rate"])) if conf.get("rate") else None
+                slots = ConcurrencySlots(path_prefix, conf["max_concurrency"]) if conf.get("max_concurrency") else None
+                limits = (bucket, slots)
+            self._limits[host] = limits
+            return limits
+
+    @contextmanager
+    def limit(self, host: str):
+        """在请求期间占用该域名的并发槽位，并在发出请求前取得令牌"""
+        limits = self._get_limits(host or "")
+        if limits is None:
+            yield
+            return
+        bucket, slots = limits
+        if slots is None:
+            if bucket:
+                bucket.acquire()
+            yield
+            return
+        with slots.hold():
+            if bucket:
+                bucket.acquire()
+            yield
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from core.logger import get_logger
+
+logger = get_logger("ResourceManager")
+
+
+class ResponseCache:
+    """
+    akshare HTTP 响应的磁盘缓存，以 (请求方法, URL含参数, 请求体) 为键，每个响应保存为 cache_dir 下的一个文件
+    rules 按顺序匹配请求 URL（正则），ttl 为缓存秒数，或为 "bar"：
+    按 A 股交易时段划分时间段（09:30-11:30、13:00-15:00 内每 BAR_MINUTES 分钟一段，集合竞价、午休、收盘后至次日开盘前各为一段），
+    进入下一时间段后失效
+    未匹配任何规则的请求不缓存；缓存总大小超过 max_size_mb 时按最近访问时间（文件 mtime）淘汰
+    """
+    BAR_MINUTES = 30
+
+    def __init__(self, rules: list, cache_dir: str = "./cache/http", max_size_mb: float = 256):
+        self.rules = [(re.compile(rule["pattern"]), rule["ttl"]) for rule in rules or []]
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_size = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith(".cache"))
+
+    def _match_ttl(self, url: str):
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def _path(self, request):
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key = hashlib.sha1(request.method.encode() + b" " + request.url.encode("utf-8") + b"\n" + body).hexdigest()
+        return os.path.join(self.cache_dir, key + ".cache")
+
+    @classmethod
+    def bar_key(cls, now: datetime = None) -> str:
+        """当前时间所在的时间段，以时间段的起点表示"""
+        now = now or datetime.now()
+        minutes = now.hour * 60 + now.minute
+        if minutes < 9 * 60 + 15:
+            # 次日开盘前沿用前一天收盘后的时间段
+            return (now - timedelta(days=1)).strftime("%Y-%m-%d") + " 15:00"
+        if minutes < 9 * 60 + 30:
+            start = 9 * 60 + 15
+        elif minutes < 11 * 60 + 30:
+            start = 9 * 60 + 30 + (minutes - 9 * 60 - 30) // cls.BAR_MINUTES * cls.BAR_MINUTES
+        elif minutes < 13 * 60:
+            start = 11 * 60 + 30
+        elif minutes < 15 * 60:
+            start = 13 * 60 + (minutes - 13 * 60) // cls.BAR_MINUTES * cls.BAR_MINUTES
+        else:
+            start = 15 * 60
+        return now.strftime("%Y-%m-%d") + f" {start // 60:02d}:{start % 60:02d}"
+
+    @classmethod
+    def _is_fresh(cls, entry) -> bool:
+        if entry["ttl"] == "bar":
+            return entry["bar"] == cls.bar_key()
+        return time.time() - entry["stored_at"] < entry["ttl"]
+
+    def get(self, request):
+        if self._match_ttl(request.url) is None:
+            return None
+        path = self._path(request)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            entry = None
+        if entry is None or not self._is_fresh(entry):
+            with self._lock:
+                self.misses += 1
+            return None
+        # 更新访问时间，用于 LRU 淘汰
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return self._build_response(request, entry)
+
+    def put(self, request, response):
+        ttl = self._match_ttl(request.url)
+        if ttl is None or response.status_code != 200:
+            return
+        entry = {
+            "ttl": ttl,
+            "bar": self.bar_key(),
+            "stored_at": time.time(),
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "content": response.content,
+            "encoding": response.encoding,
+            "url": response.url,
+        }
+        path = self._path(request)
+        # 先写入临时文件再替换，避免其他进程读到不完整的文件
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_size += size
+            need_evict = self._total_size > self.max_size
+        if need_evict:
+            self._evict()
+
+    def _evict(self):
+        """按 mtime 从旧到新删除缓存文件，直到总大小低于上限的 90%（重新扫描目录，以包含其他进程写入的文件）"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".cache"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+            total_size = sum(size for _, size, _ in entries)
+            target = self.max_size * 0.9
+            for _, size, path in entries:
+                if total_size <= target:
+                    break
+                try:
+                    os.remove(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+            self._total_size = total_size
+        logger.info(f"Response cache evicted to {total_size / 1024 / 1024:.2f} MB, stats: {self.stats()}")
+
+    @staticmethod
+    def _build_response(request, entry):
+        response = Response()
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["content"]
+        response.encoding = entry["encoding"]
+        response.url = entry["url"]
+        response.request = request
+        response.elapsed = timedelta(0)
+        response.from_cache = True
+        return response
+
+    def stats(self) -> dict:
+        """当前进程内的命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size_mb": round(self._total_size / 1024 / 1024, 2),
+        }
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".cache"):
+                    os.remove(entry.path)
+            self._total_size = 0
@@ -1,24 +1,51 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 
 from core.logger import get_logger
+from core.resource.rate_limiter import ConcurrencySlots
 
 logger = get_logger("ResourceManager")
 
+'''
+无头浏览器资源：
+- BingSearcher: 单个 Chrome 浏览器的封装，转发 driver 的方法，并统计加载的页面数
+- BrowserPool: 进程内复用的浏览器池，task 通过 browser() 借出浏览器，用完后归还：
+  - 归还时关闭多余的标签页、回到空白页，下次借出时复用同一标签页，不再每次启动 Chrome
+  - 所有 worker 进程的浏览器总数不超过 max_browsers（每个浏览器存活期间占用一个跨进程的槽位文件锁，进程异常退出时自动释放）
+  - 空闲超过 idle_timeout 秒的浏览器被关闭并释放槽位，供其他进程使用
+  - 加载页面数达到 max_pages、task 中出现 WebDriverException 或归还时已无响应的浏览器被关闭，下次借出时重新启动
+'''
+
+
+def create_chrome_driver(driver_path: str, page_load_timeout: float = None):
+    service = Service(executable_path=driver_path, log_path=os.devnull)
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    driver = webdriver.Chrome(service=service, options=options)
+    if page_load_timeout:
+        driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
 
-# 浏览器资源初始化  
+# 浏览器资源初始化
 class BingSearcher:
-    def __init__(self, driver_path: str):
-        service = Service(executable_path=driver_path, log_path=os.devnull)
-        options = Options()
-        options.add_argument("--headless")  
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--log-level=3")
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        self.driver = webdriver.Chrome(service=service, options=options)
+    def __init__(self, driver_path: str = None, driver=None, page_load_timeout: float = None):
+        self.driver = driver if driver is not None else create_chrome_driver(driver_path, page_load_timeout)
+        self.pages = 0              # 已加载的页面数，用于浏览器池按页面数回收
+        self.broken = False         # 出现 WebDriverException 后标记，归还时关闭
+        self.last_used = time.monotonic()
+        self.slot = None            # 所占用的跨进程槽位
 
     def close(self):
         """关闭浏览器"""
@@ -26,6 +53,7 @@ class BingSearcher:
 
     # 将 driver 的 get 方法暴露出来
     def get(self, url: str):
+        self.pages += 1
         return self.driver.get(url)
 
     # 如果你还需要支持其他方法，比如 find_element 等，可以继续包装
@@ -35,6 +63,150 @@ class BingSearcher:
     def find_elements(self, *args, **kwargs):
         return self.driver.find_elements(*args, **kwargs)
 
+    def reset(self):
+        """关闭多余的标签页并回到空白页，使下一个 task 从干净的标签页开始"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.get("about:blank")
+
     # 也可以实现 __getattr__ 自动转发所有 driver 的方法（更通用）
     def __getattr__(self, item):
-        return getattr(self.driver, item)
\ No newline at end of file
+        return getattr(self.driver, item)
+
+
+class BrowserPool:
+    def __init__(self, driver_path: str, max_browsers: int = 4, idle_timeout: float = 300, max_pages: int = 200,
+                 page_load_timeout: float = 30, checkout_timeout: float = 120, state_dir: str = "./cache/browser_pool",
+                 driver_factory=None):
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        # driver_factory 用于替换 Chrome（如测试时使用其他实现），默认按 driver_path 启动无头 Chrome
+        self.driver_factory = driver_factory or (lambda: create_chrome_driver(driver_path, page_load_timeout))
+        os.makedirs(state_dir, exist_ok=True)
+        self.slots = ConcurrencySlots(os.path.join(state_dir, "browser"), max_browsers)
+        self._idle = []             # 空闲的浏览器，后归还的先借出（保持少数浏览器常用，其余尽快空闲超时）
+        self._in_use = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.launched = 0
+        self.recycled = 0
+        self.checkouts = 0
+        self._reaper = threading.Thread(target=self._reap_loop, name="browser-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _launch(self, slot) -> BingSearcher:
+        try:
+            browser = BingSearcher(driver=self.driver_factory())
+        except Exception:
+            self.slots.release(slot)
+            raise
+        browser.slot = slot
+        with self._cond:
+            self.launched += 1
+        logger.info(f"Browser launched in process {os.getpid()} ({self.launched} launched)")
+        return browser
+
+    def _quit(self, browser: BingSearcher):
+        try:
+            browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to quit browser: {e}")
+        finally:
+            self.slots.release(browser.slot)
+
+    def acquire(self, timeout: float = None) -> BingSearcher:
+        """借出一个浏览器：优先复用空闲浏览器，其次在全局槽位未满时启动新浏览器，否则等待归还或其他进程释放槽位"""
+        deadline = time.monotonic() + (self.checkout_timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("BrowserPool is closed")
+                if self._idle:
+                    browser = self._idle.pop()
+                    self._in_use.add(browser)
+                    self.checkouts += 1
+                    return browser
+                slot = self.slots.try_acquire()
+                if slot is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser available within {timeout or self.checkout_timeout}s")
+                    # 本进程归还时被唤醒；其他进程释放槽位无法通知，按间隔重试
+                    self._cond.wait(min(remaining, 0.2))
+                    continue
+            # 启动浏览器耗时数秒，在锁外进行
+            browser = self._launch(slot)
+            with self._cond:
+                self._in_use.add(browser)
+                self.checkouts += 1
+            return browser
+
+    def release(self, browser: BingSearcher):
+        """归还浏览器；已损坏、达到页面数上限或无法重置的浏览器直接关闭"""
+        recycle = browser.broken or browser.pages >= self.max_pages
+        if not recycle:
+            try:
+                browser.reset()
+            except Exception as e:
+                logger.warning(f"Browser reset failed, recycling: {e}")
+                recycle = True
+        with self._cond:
+            self._in_use.discard(browser)
+            if not recycle and not self._closed:
+                browser.last_used = time.monotonic()
+                self._idle.append(browser)
+                self._cond.notify()
+                return
+            if recycle:
+                self.recycled += 1
+            self._cond.notify()
+        self._quit(browser)
+
+    @contextmanager
+    def browser(self, timeout: float = None):
+        browser = self.acquire(timeout)
+        try:
+            yield browser
+        except WebDriverException:
+            # 浏览器可能已崩溃（或页面加载超时），归还时关闭
+            browser.broken = True
+            raise
+        finally:
+            self.release(browser)
+
+    def _reap_loop(self):
+        interval = max(min(self.idle_timeout / 2, 30), 0.05)
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._closed, timeout=interval):
+                    return
+                now = time.monotonic()
+                expired = [b for b in self._idle if now - b.last_used >= self.idle_timeout]
+                self._idle = [b for b in self._idle if b not in expired]
+            for browser in expired:
+                self._quit(browser)
+            if expired:
+                logger.info(f"Closed {len(expired)} idle browsers in process {os.getpid()}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "launched": self.launched,
+                "recycled": self.recycled,
+                "checkouts": self.checkouts,
+            }
+
+    def close_all(self):
+        """关闭空闲的浏览器；借出中的浏览器在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for browser in idle:
+            self._quit(browser)
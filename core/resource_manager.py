@@ -1,11 +1,20 @@
 # resource_manager.py
+import hashlib
 import os
 import json
+import threading
+import time
+from multiprocessing import util
 from core.logger import get_logger
 from core.resource.agent import AILLM
+from core.resource.embedding import EmbeddingService
 from core.resource.LLMDatabase import StockMemoryManager
 from core.resource.postgre import PostgresDBManager
-from core.resource.searcher import BingSearcher
+from core.resource.rate_limiter import HostRateLimiter
+from core.resource.llm_cache import LLMResponseCache
+from core.resource.response_cache import ResponseCache
+from core.resource.searcher import BingSearcher, BrowserPool
+from utils.embedding_module import get_default_service
 
 logger = get_logger("ResourceManager")
 
@@ -13,6 +22,10 @@ logger = get_logger("ResourceManager")
 无需实例化 ResourceManager 对象，该类提供静态方法用于资源初始化，工厂方法被保存在FACTORY_REGISTRY中
 调用方法：传入函数名（注册在工厂方法列表中） + 配置文件
 llm = ResourceManager.create("LLM", resource_config)
+
+对于可在同一进程内复用的资源（如数据库连接池），使用 get 获取进程级缓存实例：
+db_manager = ResourceManager.get("postgres", resource_config)
+缓存以 (资源名, 配置哈希) 为键，首次调用时才会创建（连接与表结构反射每个进程仅执行一次）
 """
 
 def create_postgres(config: dict):
@@ -38,6 +51,23 @@ def create_searcher(config: dict):
     )
 
 
+def create_browser_pool(config: dict):
+    if "searcher" not in config:
+        raise ValueError("Missing 'searcher' in resource config")
+    
+    searcher_config = config.get("searcher", {})
+    pool_config = searcher_config.get("pool", {})
+    return BrowserPool(
+        driver_path=searcher_config.get("driver_path"),
+        max_browsers=pool_config.get("max_browsers", 4),
+        idle_timeout=pool_config.get("idle_timeout", 300),
+        max_pages=pool_config.get("max_pages", 200),
+        page_load_timeout=pool_config.get("page_load_timeout", 30),
+        checkout_timeout=pool_config.get("checkout_timeout", 120),
+        state_dir=pool_config.get("state_dir", "./cache/browser_pool"),
+    )
+
+
 def create_LLMDatabase(config: dict):
     if "LLMMemoryManager" not in config:
         raise ValueError("Missing 'LLMMemoryManager' in resource config")
@@ -46,6 +76,9 @@ def create_LLMDatabase(config: dict):
     return StockMemoryManager(
         db_params=LLMMemoryManager_config.get("db_params"),
         dim=LLMMemoryManager_config.get("dim"),
+        index_config=LLMMemoryManager_config.get("index"),
+        pool_size=LLMMemoryManager_config.get("pool_size", 5),
+        max_overflow=LLMMemoryManager_config.get("max_overflow", 10),
     )
 
 
@@ -61,24 +94,213 @@ def create_agent(config: dict):
         temperature=AILLM_config.get("temperature"),
         max_tokens=AILLM_config.get("max_tokens"),
         use_short_term_memory=AILLM_config.get("use_short_term_memory"),
+        max_concurrency=AILLM_config.get("max_concurrency", 4),
+        context_tokens=AILLM_config.get("context_tokens", 8192),
+    )
+
+
+def create_rate_limiter(config: dict):
+    if "rate_limiter" not in config:
+        raise ValueError("Missing 'rate_limiter' in resource config")
+    
+    rate_limiter_config = config.get("rate_limiter", {})
+    return HostRateLimiter(
+        hosts=rate_limiter_config.get("hosts"),
+        state_dir=rate_limiter_config.get("state_dir", "./cache/rate_limit"),
+        default=rate_limiter_config.get("default"),
+    )
+
+
+def create_response_cache(config: dict):
+    if "response_cache" not in config:
+        raise ValueError("Missing 'response_cache' in resource config")
+    
+    response_cache_config = config.get("response_cache", {})
+    return ResponseCache(
+        rules=response_cache_config.get("rules"),
+        cache_dir=response_cache_config.get("cache_dir", "./cache/http"),
+        max_size_mb=response_cache_config.get("max_size_mb", 256),
+    )
+
+
+def create_embedding(config: dict):
+    if "embedding" not in config:
+        raise ValueError("Missing 'embedding' in resource config")
+    
+    embedding_config = config.get("embedding", {})
+    return EmbeddingService(
+        model_name=embedding_config.get("model_name", "sentence-transformers/all-MiniLM-L6-v2"),
+        dim=embedding_config.get("dim", 384),
+        cache_dir=embedding_config.get("cache_dir", "./cache/embedding"),
+        max_size_mb=embedding_config.get("max_size_mb", 128),
+        batch_size=embedding_config.get("batch_size", 64),
+        max_wait_ms=embedding_config.get("max_wait_ms", 0),
+        server_address=embedding_config.get("server_address") if embedding_config.get("server", False) else None,
+    )
+
+
+def create_llm_cache(config: dict):
+    if "llm_cache" not in config:
+        raise ValueError("Missing 'llm_cache' in resource config")
+    
+    llm_cache_config = config.get("llm_cache", {})
+    semantic = llm_cache_config.get("semantic", False)
+    # 语义缓存复用文本向量化服务（模型在进程内只加载一次，向量磁盘缓存与其他任务共享）
+    embedding = None
+    if semantic:
+        embedding = create_embedding(config) if "embedding" in config else get_default_service()
+    return LLMResponseCache(
+        path=llm_cache_config.get("path", "./cache/llm/responses.db"),
+        ttl=llm_cache_config.get("ttl", 86400),
+        max_entries=llm_cache_config.get("max_entries", 10000),
+        semantic=semantic,
+        semantic_threshold=llm_cache_config.get("semantic_threshold", 0.97),
+        semantic_max_tokens=llm_cache_config.get("semantic_max_tokens", 256),
+        embedding=embedding,
     )
 
 
 FACTORY_REGISTRY = {
     "postgres": create_postgres,
     "searcher": create_searcher,
+    "browser_pool": create_browser_pool,
     "LLM": create_agent,
     "LLMdatabase": create_LLMDatabase,
+    "rate_limiter": create_rate_limiter,
+    "response_cache": create_response_cache,
+    "embedding": create_embedding,
+    "llm_cache": create_llm_cache,
 }
 
+# 可在进程内缓存复用的资源（LLM 含短期记忆、单个浏览器含页面状态，不在此列；浏览器通过 browser_pool 借出与归还）
+CACHEABLE_RESOURCES = {"postgres", "LLMdatabase", "rate_limiter", "response_cache", "embedding", "llm_cache", "browser_pool"}
+
+# 资源配置中对应的字段名
+CONFIG_KEYS = {
+    "postgres": "postgres",
+    "searcher": "searcher",
+    "browser_pool": "searcher",
+    "LLM": "AILLM",
+    "LLMdatabase": "LLMMemoryManager",
+    "rate_limiter": "rate_limiter",
+    "response_cache": "response_cache",
+    "embedding": "embedding",
+    "llm_cache": "llm_cache",
+}
+
+# 健康检查的最小间隔（秒），避免每次获取资源都访问一次数据库
+HEALTH_CHECK_INTERVAL = 30
+
+
 class ResourceManager:
+    _config_cache = {}          # {配置文件路径: (mtime, 配置字典)}
+    _resource_cache = {}        # {(资源名, 配置哈希): [资源实例, 上次健康检查时间]}
+    _lock = threading.Lock()
+    _key_locks = {}             # {(资源名, 配置哈希): 创建与健康检查该资源时持有的锁}
+
+    @classmethod
+    def load_config(cls, full_config_dir: str) -> dict:
+        """读取资源配置文件，文件未修改时直接返回缓存内容"""
+        mtime = os.path.getmtime(full_config_dir)
+        cached = cls._config_cache.get(full_config_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        with open(full_config_dir, 'r', encoding='utf-8') as file:
+            full_config = json.load(file)
+        cls._config_cache[full_config_dir] = (mtime, full_config)
+        return full_config
 
     @classmethod
     def create(cls, name: str, full_config_dir: str):
+        """每次调用均创建新的资源实例"""
         if name not in FACTORY_REGISTRY:
             raise ValueError(f"No factory registered for resource '{name}'")
         
-        with open(full_config_dir, 'r', encoding='utf-8') as file:
-            full_config = json.load(file)
-            
+        full_config = cls.load_config(full_config_dir)
         return FACTORY_REGISTRY[name](full_config)
+
+    @classmethod
+    def get(cls, name: str, full_config_dir: str):
+        """获取进程级缓存的资源实例，不存在或健康检查失败时重新创建"""
+        if name not in CACHEABLE_RESOURCES:
+            return cls.create(name, full_config_dir)
+        
+        full_config = cls.load_config(full_config_dir)
+        sub_config = json.dumps(full_config.get(CONFIG_KEYS[name]), sort_keys=True)
+        key = (name, hashlib.md5(sub_config.encode("utf-8")).hexdigest())
+
+        # 类级锁只保护字典的读写；创建资源与健康检查（可能耗时数秒）在该资源自己的锁下进行，不阻塞获取其他资源的线程
+        with cls._lock:
+            entry = cls._resource_cache.get(key)
+            if entry is not None and time.time() - entry[1] < HEALTH_CHECK_INTERVAL:
+                return entry[0]
+            key_lock = cls._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 等待期间其他线程可能已创建资源或完成健康检查，重新检查
+            with cls._lock:
+                entry = cls._resource_cache.get(key)
+            if entry is not None:
+                resource, last_check = entry
+                if time.time() - last_check < HEALTH_CHECK_INTERVAL:
+                    return resource
+                if cls._is_healthy(resource):
+                    with cls._lock:
+                        entry[1] = time.time()
+                    return resource
+                logger.warning(f"Resource '{name}' failed health check, recreating.")
+                with cls._lock:
+                    if cls._resource_cache.get(key) is entry:
+                        del cls._resource_cache[key]
+                cls._dispose_resource(resource)
+
+            resource = FACTORY_REGISTRY[name](full_config)
+            with cls._lock:
+                cls._resource_cache[key] = [resource, time.time()]
+            logger.info(f"Resource '{name}' initialized in process {os.getpid()}.")
+            return resource
+
+    @staticmethod
+    def _is_healthy(resource) -> bool:
+        if not hasattr(resource, "ping"):
+            return True
+        try:
+            return bool(resource.ping())
+        except Exception as e:
+            logger.warning(f"Health check of {type(resource).__name__} raised: {e}")
+            return False
+
+    @staticmethod
+    def _dispose_resource(resource):
+        for method in ("dispose", "close_all", "close"):
+            if hasattr(resource, method):
+                try:
+                    getattr(resource, method)()
+                except Exception as e:
+                    logger.error(f"Failed to release resource {type(resource).__name__}: {e}")
+                return
+
+    @classmethod
+    def dispose_all(cls):
+        """释放当前进程中缓存的所有资源"""
+        with cls._lock:
+            for resource, _ in cls._resource_cache.values():
+                cls._dispose_resource(resource)
+            cls._resource_cache.clear()
+
+    @classmethod
+    def init_worker(cls):
+        """
+        进程池 worker 的初始化函数：
+        fork 得到的子进程会继承父进程的缓存，其中的连接不能跨进程使用，故直接丢弃（不关闭父进程的连接），
+        并注册进程退出时的资源释放
+        """
+        for resource, _ in cls._resource_cache.values():
+            if isinstance(resource, (PostgresDBManager, StockMemoryManager)):
+                resource.dispose(close=False)
+        cls._lock = threading.Lock()
+        cls._key_locks = {}
+        cls._resource_cache = {}
+        # 进程池的子进程通过 os._exit 退出，不会执行 atexit，需使用 multiprocessing 的 Finalize 注册
+        util.Finalize(None, cls.dispose_all, exitpriority=10)
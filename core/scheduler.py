@@ -1,13 +1,19 @@
 from queue import Empty, Queue
+import heapq
+import itertools
 import json
 import os
 import threading
 import multiprocessing
 import time
-from concurrent.futures import ProcessPoolExecutor
 
+from core.lane_executor import build_lane_executors
 from core.logger import get_logger
 from core.pipeline import Pipeline, PipelineExecutor
+from core.resource.embedding import EmbeddingServer
+from core.resource_manager import ResourceManager
+from core.shared_frame import SharedFrameStore
+from core.taskNode import next_state_version
      
         
 class DynamicTaskLoader:
@@ -118,19 +124,24 @@ class Scheduler:
     用于pipeline层面的调度，其将检测一个临时文件，用于pipeline的注册
     其同时将管理所有pipeline的生命周期
     我在scheduler与其启动的pipeline_exec.run()均为I/O密集任务，故将其作为主进程下子线程
-    pipeline中对于task为计算密集型任务，故使用使用进程池
+    pipeline中对于task为计算密集型任务，故使用使用进程池；I/O密集型task通过 execution_lane 指定在线程池或事件循环中执行
 
     pipeline 对象均被管理在主进程中，故其可以在主进程的不同子线程中共享状态
     '''
-    def __init__(self, resource_config, pipeline_configs, state_queue=None, command_queue=None, updates_data=None):
+    def __init__(self, resource_config, pipeline_configs, state_queue=None, command_queue=None, updates_data=None,
+                 result_request_queue=None, result_queue=None):
         self.resource_conf = resource_config
         self.pipeline_confs = pipeline_configs
         self.running = False
         self.pipelines = []
         self.pipeline_exec = {}
+        self.pipeline_by_name = {}
         # TODO: 用于与webapp间通信
         self.state_queue = state_queue
         self.command_queue = command_queue
+        # WebApp 按需获取task完整结果的请求与响应队列（状态快照中只包含结果摘要）
+        self.result_request_queue = result_request_queue
+        self.result_queue = result_queue
         # 新的task & pipeline队列，等待scheduler进行注册
         self.new_pipeline_queue = Queue()
         self.new_task_queue = Queue()
@@ -141,71 +152,132 @@ class Scheduler:
             new_pipeline_queue=self.new_pipeline_queue,
             new_task_queue=self.new_task_queue
         )
-        # 使用全局进程池并设置总进程数上限
-        self.global_executor = ProcessPoolExecutor(max_workers=16)  
+        # 全局共享的各执行通道（进程池 / 线程池 / 事件循环），大小由资源配置中的 "executor" 字段设置
+        # 进程池 worker 初始化时建立进程级资源缓存，数据库连接等资源在每个 worker 中仅创建一次
+        self.lane_executors = build_lane_executors(self.resource_conf)
+        self.global_executor = self.lane_executors["process"]
+        # 进程通道task之间传递 DataFrame 所用共享内存段的引用计数
+        self.frame_store = SharedFrameStore.from_config(self.resource_conf)
+        # 可选的独立向量化进程，所有进程池 worker 共用一份模型（资源配置 "embedding" 中 server 为 true 时启用）
+        self.embedding_server = EmbeddingServer.from_config(self.resource_conf)
         # 用于处理初始化时对配置的修改
         self.updates_data = updates_data
+        # 事件驱动调度：pipeline / task 状态变化时通知 runner，定时事件（启动间隔、每日启动时间、task重试）保存在最小堆中
+        self.event_cond = threading.Condition()
+        self.dirty_pipelines = set()            # 状态发生变化、等待 runner 处理的 pipeline
+        self.timer_heap = []                    # (唤醒时间戳, 序号, pipeline, task)，task 为 None 表示 pipeline 启动检查
+        self.timer_seq = itertools.count()
+        self.pipeline_deadlines = {}            # pipeline 已入堆的最早启动检查时间，避免重复入堆
         
     def start(self):
         """用于外部启动调度器"""
         self.running = True
+        if self.embedding_server is not None:
+            self.embedding_server.start()
         # 执行项目的初始化（同时实例化Pipeline与PipelineExecutor）
         for pipeline_conf_path in self.pipeline_confs:
             with open(pipeline_conf_path, 'r', encoding='utf-8') as file:
                 pipeline_conf = json.load(file)
                 
-            pipeline = Pipeline(pipeline_conf)
-            self.pipelines.append(pipeline)
-            self.pipeline_exec[pipeline] = PipelineExecutor(pipeline, self.resource_conf, self.dynamic_loader, executor=self.global_executor)
+            self._add_pipeline(Pipeline(pipeline_conf))
         
         # 如果初始化时对基础pipeline进行了修改
         if self.updates_data:
             self._apply_config_update(self.updates_data)
         
         threading.Thread(target=self._runner, daemon=True).start()
-        threading.Thread(target=self._queue_monitor, daemon=True).start()
+        threading.Thread(target=self._pipeline_queue_monitor, daemon=True).start()
+        threading.Thread(target=self._task_queue_monitor, daemon=True).start()
         threading.Thread(target=self._state_sender, daemon=True).start()
+        if self.result_request_queue is not None:
+            threading.Thread(target=self._result_server, daemon=True).start()
         # threading.Thread(target=self._command_listener, daemon=True).start()
         
     def stop(self):
         """用于外部终止调度器"""
         self.running = False
+        # 唤醒阻塞中的 runner 与队列监听线程
+        with self.event_cond:
+            self.event_cond.notify_all()
+        self.new_pipeline_queue.put(None)
+        self.new_task_queue.put(None)
+        # 关闭各执行通道（进程池 worker 退出时会释放其缓存的资源）
+        for lane_executor in self.lane_executors.values():
+            lane_executor.shutdown(wait=False, cancel_futures=True)
+        self.frame_store.release_all()
+        if self.embedding_server is not None:
+            self.embedding_server.stop()
+        ResourceManager.dispose_all()
         
-    def _queue_monitor(self):
+    def _add_pipeline(self, pipeline):
+        """实例化pipeline对应的执行器，并监听其状态变化"""
+        self.pipelines.append(pipeline)
+        self.pipeline_by_name[pipeline.name] = pipeline
+        self.pipeline_exec[pipeline] = PipelineExecutor(pipeline, self.resource_conf, self.dynamic_loader, executor=self.global_executor, lane_executors=self.lane_executors, frame_store=self.frame_store)
+        pipeline.add_status_listener(self._on_status_change)
+        with self.event_cond:
+            self.dirty_pipelines.add(pipeline)
+            self.event_cond.notify()
+
+    def _on_status_change(self, pipeline, task, old_status, new_status):
+        """pipeline 状态变化时标记其待处理；task 失败时按其重试间隔设置定时器"""
+        with self.event_cond:
+            if task is None:
+                self.dirty_pipelines.add(pipeline)
+            elif new_status == "failed":
+                retry_at = (task.last_failed_time or time.time()) + task.retry_interval
+                heapq.heappush(self.timer_heap, (retry_at, next(self.timer_seq), pipeline, task))
+            else:
+                return
+            self.event_cond.notify()
+
+    def _schedule_pipeline_check(self, pipeline, when):
+        """在 when（时间戳）重新检查 pipeline 是否可启动，已存在更早的检查时不重复入堆"""
+        with self.event_cond:
+            deadline = self.pipeline_deadlines.get(pipeline)
+            if deadline is not None and deadline <= when:
+                return
+            self.pipeline_deadlines[pipeline] = when
+            heapq.heappush(self.timer_heap, (when, next(self.timer_seq), pipeline, None))
+            self.event_cond.notify()
+
+    def _pipeline_queue_monitor(self):
         """
-        监听新的task && pipeline注册请求队列，并实例化pipelines与pipeline_exec，以便runner进行调度
+        监听新的pipeline注册请求队列（阻塞等待），并实例化pipelines与pipeline_exec，以便runner进行调度
         """
         while self.running:
-            # 先处理所有待添加的流水线
-            while not self.new_pipeline_queue.empty():
-                try:
-                    pipeline_conf = self.new_pipeline_queue.get_nowait()
-                    new_pipeline = Pipeline(pipeline_conf)
-                    self.pipelines.append(new_pipeline)
-                    self.pipeline_exec[new_pipeline] = PipelineExecutor(new_pipeline, self.resource_conf, self.dynamic_loader, executor=self.global_executor)
-                    self.logger.info(f"Registered new pipeline '{new_pipeline.name}' from queue.")
-                except Exception as e:
-                    self.logger.error(f"Failed to register new pipeline from queue: {e}")
+            pipeline_conf = self.new_pipeline_queue.get()
+            if pipeline_conf is None:
+                break
+            try:
+                new_pipeline = Pipeline(pipeline_conf)
+                self._add_pipeline(new_pipeline)
+                self.logger.info(f"Registered new pipeline '{new_pipeline.name}' from queue.")
+            except Exception as e:
+                self.logger.error(f"Failed to register new pipeline from queue: {e}")
 
-            # 然后处理所有待添加的任务
-            while not self.new_task_queue.empty():
-                try:
-                    task_conf = self.new_task_queue.get_nowait()
-                    task_name = task_conf.get("name")
-                    task_pipeline_name = task_conf.get("pipeline_name", "")
-                    
-                    pipeline = next((p for p in self.pipelines if p.name == task_pipeline_name), None)
-                    if pipeline is None:
-                        self.logger.error(f"Target pipeline '{task_pipeline_name}' not found for task '{task_name}'.")
-                        continue
-                    with pipeline.lock:
-                        if task_name not in pipeline.task_map:
-                            pipeline.set_new_task(task_conf)
-                            self.logger.info(f"New task '{task_name}' added to pipeline '{task_pipeline_name}'.")
-                except Exception as e:
-                    self.logger.error(f"Failed to add new task from queue: {e}")
-            
-            time.sleep(2) # 避免CPU空转
+    def _task_queue_monitor(self):
+        """
+        监听新的task注册请求队列（阻塞等待），并将其添加到对应的pipeline中
+        """
+        while self.running:
+            task_conf = self.new_task_queue.get()
+            if task_conf is None:
+                break
+            try:
+                task_name = task_conf.get("name")
+                task_pipeline_name = task_conf.get("pipeline_name", "")
+                
+                pipeline = self.pipeline_by_name.get(task_pipeline_name)
+                if pipeline is None:
+                    self.logger.error(f"Target pipeline '{task_pipeline_name}' not found for task '{task_name}'.")
+                    continue
+                with pipeline.lock:
+                    if task_name not in pipeline.task_map:
+                        pipeline.set_new_task(task_conf)
+                        self.logger.info(f"New task '{task_name}' added to pipeline '{task_pipeline_name}'.")
+            except Exception as e:
+                self.logger.error(f"Failed to add new task from queue: {e}")
           
     # TODO: 用于监听webapp部分的操作  
     def _command_listener(self):
@@ -265,7 +337,7 @@ class Scheduler:
 
             if item_type == "pipeline":
                 pipeline_name = item.get("name")
-                pipeline = next((p for p in self.pipelines if p.name == pipeline_name), None)
+                pipeline = self.pipeline_by_name.get(pipeline_name)
                 if pipeline:
                     # 调用 Pipeline 实例的 set_params 方法
                     pipeline.set_params(item_params)
@@ -275,7 +347,7 @@ class Scheduler:
             elif item_type == "task":
                 pipeline_name = item.get("pipeline_name")
                 task_name = item.get("task_name")
-                pipeline = next((p for p in self.pipelines if p.name == pipeline_name), None)
+                pipeline = self.pipeline_by_name.get(pipeline_name)
                 if pipeline:
                     task = pipeline.get_task(task_name)
                     if task:
@@ -294,86 +366,150 @@ class Scheduler:
             del self.pipeline_exec[pipeline]
         if pipeline in self.pipelines:
             self.pipelines.remove(pipeline)
+        if self.pipeline_by_name.get(pipeline.name) is pipeline:
+            del self.pipeline_by_name[pipeline.name]
+        with self.event_cond:
+            self.pipeline_deadlines.pop(pipeline, None)
+
+    def _process_pipeline(self, pipeline):
+        """根据pipeline当前状态执行状态迁移，暂不可启动的pipeline设置下一次启动检查的定时器"""
+        if pipeline not in self.pipeline_exec:
+            return
+        # Step 1: snapshot pipeline status（不加锁做“只读快照”）
+        try:
+            status = pipeline.status
+            can_start = pipeline.get_if_can_start_now()
+        except Exception as e:
+            self.logger.error(f"Failed to read pipeline '{pipeline.name}': {e}")
+            return
+
+        # Step 2: 写操作时加锁（只针对状态迁移或关键写操作）
+        if status == 'hanging' and can_start:
+            with pipeline.lock:
+                if pipeline.status == 'hanging':  # 二次判断，避免竞争冲突
+                    pipeline.status = 'executing'
+                    self.logger.info(f"execute workflow: {pipeline.name}")
+                    self.pipeline_exec[pipeline].run()
+
+        elif status == 'success':
+            if pipeline.multi_launch:
+                with pipeline.lock:
+                    pipeline.status = 'hanging'
+                    self.logger.info(f"hang workflow: {pipeline.name}")
+            elif pipeline.if_tmp:
+                self._remove_pipeline(pipeline)
+                self.logger.info(f"remove workflow: {pipeline.name}")
+
+        elif status == 'fail':
+            if pipeline.retry_times >= pipeline.max_retry_times:
+                self._remove_pipeline(pipeline)
+                self.logger.info(f"remove workflow: {pipeline.name}")
+            elif can_start:
+                with pipeline.lock:
+                    if pipeline.status == 'fail':
+                        pipeline.status = 'executing'
+                        self.logger.info(f"re-execute failed workflow: {pipeline.name}")
+                        self.pipeline_exec[pipeline].run()
+
+        if status in ('hanging', 'fail') and not can_start and pipeline in self.pipeline_exec:
+            self._schedule_pipeline_check(pipeline, pipeline.get_next_launch_time().timestamp())
+
+    def _retry_task(self, pipeline, task):
+        """task重试定时器到期：重置为pending或在超过最大重试次数后强制结束"""
+        with task.lock:
+            if task.status != "failed":
+                return
+            elapsed = time.time() - (task.last_failed_time or 0)
+            if elapsed < task.retry_interval:
+                # 定时器早于最近一次失败的重试时间（task 再次失败），重新入堆
+                with self.event_cond:
+                    heapq.heappush(self.timer_heap, (task.last_failed_time + task.retry_interval, next(self.timer_seq), pipeline, task))
+                return
+            if task.retry_times >= task.max_retry:
+                self.logger.info(f"{task.name_id} fails for maximum time {task.max_retry}, forced to terminate")
+                task.status = "success"  # 或标记为 abandoned
+            else:
+                self.logger.info(f"Retrying task: {task.name_id}")
+                task.status = "pending"
     
     def _runner(self):
-        """该函数用于执行可执行的pipeline,应当判断当前pipeline是否需要重启或注销"""
+        """
+        该函数用于执行可执行的pipeline,应当判断当前pipeline是否需要重启或注销
+        runner 阻塞在条件变量上，仅在 pipeline 状态变化或定时器到期时被唤醒，空闲时不占用CPU
+        """
         try: 
             while self.running:
-                for pipeline in self.pipelines:
-                    # Step 1: snapshot pipeline status（不加锁做“只读快照”）
-                    try:
-                        status = pipeline.status
-                        can_start = pipeline.get_if_can_start_now()
-                        all_tasks = pipeline.get_all_tasks()  # list 本身是浅拷贝
-                    except Exception as e:
-                        self.logger.error(f"Failed to read pipeline '{pipeline.name}': {e}")
-                        continue
-
-                    # Step 2: 写操作时加锁（只针对状态迁移或关键写操作）
-                    if status == 'hanging' and can_start:
-                        with pipeline.lock:
-                            if pipeline.status == 'hanging':  # 二次判断，避免竞争冲突
-                                pipeline.status = 'executing'
-                                self.logger.info(f"execute workflow: {pipeline.name}")
-                                self.pipeline_exec[pipeline].run()
-
-                    elif status == 'success':
-                        if pipeline.multi_launch:
-                            with pipeline.lock:
-                                pipeline.status = 'hanging'
-                                self.logger.info(f"hang workflow: {pipeline.name}")
-                        elif pipeline.if_tmp:
-                            self._remove_pipeline(pipeline)
-                            self.logger.info(f"remove workflow: {pipeline.name}")
-
-                    elif status == 'fail':
-                        if pipeline.retry_times >= pipeline.max_retry_times:
-                            self._remove_pipeline(pipeline)
-                            self.logger.info(f"remove workflow: {pipeline.name}")
-                        elif can_start:
-                            with pipeline.lock:
-                                if pipeline.status == 'fail':
-                                    pipeline.status = 'executing'
-                                    self.logger.info(f"re-execute failed workflow: {pipeline.name}")
-                                    self.pipeline_exec[pipeline].run()
-
-                    # Step 3: 对 task 状态处理采用“逐个加锁”
-                    for task in all_tasks:
-                        if task.status == "failed" and time.time() - task.last_failed_time >= task.retry_interval:
-                            with task.lock:
-                                if task.retry_times >= task.max_retry:
-                                    self.logger.info(f"{task.name_id} fails for maximum time {task.max_retry}, forced to terminate")
-                                    task.status = "success"  # 或标记为 abandoned
-                                else:
-                                    self.logger.info(f"Retrying task: {task.name_id}")
-                                    task.status = "pending"
-                time.sleep(2)
+                with self.event_cond:
+                    while self.running and not self.dirty_pipelines and not (self.timer_heap and self.timer_heap[0][0] <= time.time()):
+                        timeout = self.timer_heap[0][0] - time.time() if self.timer_heap else None
+                        self.event_cond.wait(timeout)
+                    dirty_pipelines = self.dirty_pipelines
+                    self.dirty_pipelines = set()
+                    due_timers = []
+                    now = time.time()
+                    while self.timer_heap and self.timer_heap[0][0] <= now:
+                        due_timers.append(heapq.heappop(self.timer_heap))
+                    for when, _, pipeline, task in due_timers:
+                        if task is None and self.pipeline_deadlines.get(pipeline) == when:
+                            del self.pipeline_deadlines[pipeline]
+
+                # 定时器到期的 task 进行重试，pipeline 则重新检查是否可启动
+                for _, _, pipeline, task in due_timers:
+                    if task is None:
+                        dirty_pipelines.add(pipeline)
+                    else:
+                        self._retry_task(pipeline, task)
+
+                for pipeline in dirty_pipelines:
+                    self._process_pipeline(pipeline)
         except Exception as e:
             self.logger.error(f"Error in monitor: {e}")
         finally:
             self.running = False
             # 删除缓存文件
-            if self.new_task_pipeline_path and os.path.exists(self.new_task_pipeline_path):
+            new_task_pipeline_path = getattr(self.dynamic_loader, "new_task_pipeline_json", None)
+            if new_task_pipeline_path and os.path.exists(new_task_pipeline_path):
                 try:
-                    os.remove(self.new_task_pipeline_path)
-                    self.logger.info(f"Deleted task cache file: {self.new_task_pipeline_path}")
+                    os.remove(new_task_pipeline_path)
+                    self.logger.info(f"Deleted task cache file: {new_task_pipeline_path}")
                 except Exception as e:
                     self.logger.error(f"Failed to delete task cache file: {e}")
             self.logger.info(f"terminate monitor")
             
+    def _build_state_delta(self, since, sent_names):
+        """
+        构建状态增量：只包含状态版本号大于 since 的 pipeline 与 task，以及上次发送后被移除的 pipeline
+        since 为 0 时为完整快照，格式如下（task 的 result 仅为摘要）
+        {"version": 版本号, "full": bool, "pipelines": {name: pipeline.get_state(since)}, "removed": [name]}
+        """
+        pipelines = list(self.pipelines)
+        current_names = {p.name for p in pipelines}
+        # 新出现的 pipeline 发送其完整状态
+        changed = {
+            p.name: p.get_state(since if p.name in sent_names else None)
+            for p in pipelines
+            if p.name not in sent_names or p.get_latest_version() > since
+        }
+        return {"full": since == 0, "pipelines": changed, "removed": sorted(sent_names - current_names)}, current_names
+
     def _state_sender(self):
-        """定期将调度器状态快照发送到 WebApp 队列。该线程不加锁，因为它只读取实例状态"""
+        """
+        定期将调度器状态增量发送到 WebApp 队列，首次发送完整快照，之后只发送发生变化的 pipeline 与 task，没有变化时不发送
+        发送失败（队列已满）时不推进版本号，下次发送的增量包含本次的变化。该线程不加锁，因为它只读取实例状态
+        """
+        since = 0
+        sent_names = set()
         while self.running:
             try:
-                # 构建一个包含所有pipeline和task状态的字典快照（scheduler单位）
-                scheduler_status = {
-                    p.name: p.get_state()
-                    for p in self.pipelines
-                }
-                
-                # 非阻塞地将状态快照放入队列
-                if self.state_queue:
-                    self.state_queue.put_nowait(scheduler_status)
+                # 先取得版本号再读取状态：读取期间发生的变化版本号更大，会包含在下一次增量中
+                version = next_state_version()
+                delta, current_names = self._build_state_delta(since, sent_names)
+                delta["version"] = version
+
+                # 非阻塞地将状态增量放入队列
+                if self.state_queue and (delta["full"] or delta["pipelines"] or delta["removed"]):
+                    self.state_queue.put_nowait(delta)
+                since, sent_names = version, current_names
 
             except multiprocessing.queues.Full:
                 self.logger.warning("State queue is full, skipping this status update.")
@@ -382,9 +518,34 @@ class Scheduler:
             
             # 控制发送频率，例如每秒更新一次
             time.sleep(1)
+
+    def _result_server(self):
+        """线程：响应 WebApp 获取task完整结果的请求，请求格式为 {"request_id", "pipeline", "task"}"""
+        while self.running:
+            try:
+                request = self.result_request_queue.get(timeout=1)
+            except Empty:
+                continue
+            except Exception as e:
+                self.logger.error(f"Error in result server thread: {e}")
+                time.sleep(1)
+                continue
+            response = {"request_id": request.get("request_id"), "result": None, "version": None, "error": None}
+            try:
+                pipeline = self.pipeline_by_name.get(request.get("pipeline"))
+                task = pipeline.get_task(request.get("task")) if pipeline else None
+                if task is None:
+                    response["error"] = f"Task '{request.get('pipeline')}.{request.get('task')}' not found."
+                else:
+                    response["version"] = task.state_version
+                    response["result"] = task.get_result_payload()
+            except Exception as e:
+                response["error"] = str(e)
+            self.result_queue.put(response)
             
 # TODO: scheduler启动函数，供WebApp调用
-def run_scheduler_process(scheduler_id, resource_conf, pipeline_json, state_queue, command_queue, updates_data):
+def run_scheduler_process(scheduler_id, resource_conf, pipeline_json, state_queue, command_queue, updates_data,
+                          result_request_queue=None, result_queue=None):
     """
     Scheduler进程的入口函数。
     """
@@ -394,7 +555,9 @@ def run_scheduler_process(scheduler_id, resource_conf, pipeline_json, state_queu
             pipeline_configs=[pipeline_json],
             state_queue=state_queue,
             command_queue=command_queue,
-            updates_data=updates_data
+            updates_data=updates_data,
+            result_request_queue=result_request_queue,
+            result_queue=result_queue
         )
         scheduler.start()
         
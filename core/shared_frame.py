@@ -0,0 +1,142 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from core.logger import get_logger
+from core.resource_manager import ResourceManager
+
+logger = get_logger("Scheduler")
+
+'''
+进程通道中 task 之间的 DataFrame 传递：
+worker 将较大的 DataFrame 结果写入共享内存（/dev/shm）中的 Arrow IPC 段文件，进程间只传递 SharedFrameHandle（段路径与行数），
+依赖该结果的 task 在 worker 中通过内存映射加载，避免 DataFrame 在 worker -> 主进程 -> worker 之间被反复 pickle
+段的生命周期由主进程中的 SharedFrameStore 引用计数管理：
+- 产出结果的 task 持有一个引用（task.result），结果被替换或临时 pipeline 的所有后继完成后释放
+- 每次提交使用该结果的后继 task 时增加一个引用，后继执行结束后释放
+引用数归零时删除段文件
+'''
+
+DEFAULT_MIN_MB = 1
+
+
+def _default_base_dir():
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedFrameHandle:
+    """跨进程传递的 DataFrame 句柄，仅包含段文件路径与行数"""
+    __slots__ = ("path", "nrows", "nbytes")
+
+    def __init__(self, path: str, nrows: int, nbytes: int):
+        self.path = path
+        self.nrows = nrows
+        self.nbytes = nbytes
+
+    def __len__(self):
+        return self.nrows
+
+    def __repr__(self):
+        return f"SharedFrameHandle({os.path.basename(self.path)}, rows={self.nrows}, {self.nbytes / 1024 / 1024:.1f} MB)"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> pd.DataFrame:
+        """通过内存映射读取段文件并转换为 DataFrame"""
+        with pa.memory_map(self.path, "r") as source:
+            return ipc.open_file(source).read_all().to_pandas()
+
+
+def export_frame(df: pd.DataFrame, segment_dir: str, min_bytes: int):
+    """将不小于 min_bytes 的 DataFrame 写入段文件并返回句柄，较小或无法转换为 Arrow 的 DataFrame 原样返回"""
+    if df.empty or df.memory_usage(index=True, deep=False).sum() < min_bytes:
+        return df
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        logger.warning(f"DataFrame can not be converted to Arrow, fallback to pickle: {e}")
+        return df
+    os.makedirs(segment_dir, exist_ok=True)
+    path = os.path.join(segment_dir, f"{uuid.uuid4().hex}.arrow")
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return SharedFrameHandle(path, len(df), os.path.getsize(path))
+
+
+def iter_frame_handles(params: dict):
+    """遍历参数中的句柄（参数值本身，或 dict 参数中依赖名对应的值）"""
+    for value in params.values():
+        if isinstance(value, SharedFrameHandle):
+            yield value
+        elif isinstance(value, dict):
+            yield from (v for v in value.values() if isinstance(v, SharedFrameHandle))
+
+
+def resolve_frames(params: dict) -> dict:
+    """将参数中的句柄替换为 DataFrame，参数中没有句柄时原样返回"""
+    if not any(True for _ in iter_frame_handles(params)):
+        return params
+    resolved = {}
+    for key, value in params.items():
+        if isinstance(value, SharedFrameHandle):
+            value = value.load()
+        elif isinstance(value, dict):
+            value = {k: v.load() if isinstance(v, SharedFrameHandle) else v for k, v in value.items()}
+        resolved[key] = value
+    return resolved
+
+
+class SharedFrameStore:
+    """主进程中的段文件引用计数，所有 PipelineExecutor 共享；段文件位于按主进程 pid 区分的目录，进程退出时整体删除"""
+    def __init__(self, min_mb: float = DEFAULT_MIN_MB, base_dir: str = None):
+        self.min_bytes = min_mb * 1024 * 1024
+        self.segment_dir = os.path.join(base_dir or _default_base_dir(), f"ashare_frames_{os.getpid()}")
+        self.refcounts = {}
+        self.lock = threading.Lock()
+        owner_pid = os.getpid()
+        atexit.register(lambda: os.getpid() == owner_pid and shutil.rmtree(self.segment_dir, ignore_errors=True))
+
+    @classmethod
+    def from_config(cls, resource_conf):
+        """读取资源配置 "executor" 字段中的 shared_frame_min_mb（小于该大小的 DataFrame 仍直接 pickle 传递）"""
+        try:
+            min_mb = ResourceManager.load_config(resource_conf).get("executor", {}).get("shared_frame_min_mb", DEFAULT_MIN_MB)
+        except Exception as e:
+            logger.warning(f"Failed to load executor config, using defaults: {e}")
+            min_mb = DEFAULT_MIN_MB
+        return cls(min_mb=min_mb)
+
+    def acquire(self, handle: SharedFrameHandle):
+        with self.lock:
+            self.refcounts[handle.path] = self.refcounts.get(handle.path, 0) + 1
+
+    def release(self, handle: SharedFrameHandle):
+        with self.lock:
+            count = self.refcounts.get(handle.path, 0) - 1
+            if count > 0:
+                self.refcounts[handle.path] = count
+                return
+            self.refcounts.pop(handle.path, None)
+        try:
+            os.remove(handle.path)
+        except FileNotFoundError:
+            pass
+
+    def release_all(self):
+        with self.lock:
+            paths = list(self.refcounts)
+            self.refcounts.clear()
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
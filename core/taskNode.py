@@ -1,12 +1,22 @@
+import asyncio
 import base64
+import hashlib
+import itertools
 import json
 import os
 import threading
 
 import pandas as pd
+from akshare.utils.context import config as akshare_config
 from core.logger import get_logger
 from core.resource_manager import ResourceManager
+from core.shared_frame import SharedFrameHandle, export_frame, resolve_frames
 from utils.database_utils import insert_dataframe_to_table
+from utils.parquet_store import write_parquet_store
+from utils.prompt_serializer import serialize_frame
+
+# 全局递增的状态版本号：pipeline / task 的状态或结果变化时取新版本号，状态发送方据此只发送变化的部分
+next_state_version = itertools.count(1).__next__
 
 
 class TaskNode:
@@ -18,7 +28,14 @@ class TaskNode:
     由于该项目较小，所以未使用开闭原则与单一职能原则设计tasknode
     如希望使用对应原则，则可创建command抽象类，并将如执行，存储，注册或是通信等command类子类
     在execute中，通过解析对应task的执行参数判断对于各个command的执行逻辑
+
+    execution_lane 指定task的执行通道，由 PipelineExecutor 据此选择执行器：
+    - "process": 进程池，适用于CPU密集型任务（默认）
+    - "thread": 线程池，适用于网络请求等I/O密集型任务，无需进程间序列化参数与结果
+    - "async": 事件循环，适用于 _custom_task 为协程函数（async def）的任务
     '''
+    execution_lane = "process"
+
     def __init__(self, name_id=None, params=None, glob_params=None, retry_interval=60, max_retry=2):
         # self.func_name = func_name              # 该变量保存了函数名
         self.name_id = name_id                  # 给定pipeline中task唯一的标识符
@@ -28,6 +45,9 @@ class TaskNode:
         
         self.dependencies = set()
         self.dep_map = None                     # 用于表示函数输入与其余函数输出之间的对应关系
+        self.status_listener = None             # 状态变化回调 listener(task, old_status, new_status)，由所属pipeline设置
+        self.state_version = next_state_version()
+        self._result_summary = (None, None)     # 结果摘要的缓存 (结果版本号, 摘要)
         self.status = "pending"
         self.retry_times = 0
         self.last_failed_time = None
@@ -38,6 +58,32 @@ class TaskNode:
         
         self.logger = get_logger("task logger")
      
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, new_status):
+        """状态变化时通知监听者（用于调度器的事件驱动唤醒）"""
+        old_status = getattr(self, "_status", None)
+        self._status = new_status
+        self.state_version = next_state_version()
+        if old_status != new_status and self.status_listener is not None:
+            self.status_listener(self, old_status, new_status)
+
+    @property
+    def result(self):
+        return self._result
+
+    @result.setter
+    def result(self, new_result):
+        self._result = new_result
+        self._result_version = self.state_version = next_state_version()
+
+    def mark_state_changed(self):
+        """状态字段以外的变化（如动态添加依赖）需要重新发送时调用"""
+        self.state_version = next_state_version()
+     
     def set_dependencies(self, dep_map, task_map):
         """用于从配置文件设置当前task的依赖关系"""
         self.dep_map = dep_map
@@ -60,6 +106,9 @@ class TaskNode:
                 continue
 
             dep_result = dep_task.result
+            # 共享内存中的结果以句柄传递，由执行 task 的 worker 加载；仅在需要拼接为字符串时于此处加载
+            if isinstance(dep_result, SharedFrameHandle) and isinstance(self.params.get(target_param), str):
+                dep_result = dep_result.load()
             # TODO: 以下有关task传入参数的更新方法覆盖并不完全，需要进行一定的更新
             if dep_result is None:
                 # 依赖任务已完成但结果为空，可能存在逻辑问题，或者依赖任务本身无返回值
@@ -69,9 +118,9 @@ class TaskNode:
             if isinstance(self.params.get(target_param), str) and isinstance(dep_result, str):
                 self.params[target_param] += dep_result
             elif isinstance(self.params.get(target_param), str) and isinstance(dep_result, pd.DataFrame):
-                # 如果 dep_result 是 DataFrame，将其转换为字符串
-                dep_result_str = dep_result.to_string()
-                self.params[target_param] += dep_result_str
+                # 如果 dep_result 是 DataFrame，将其转换为紧凑的文本（无对齐空格的 CSV），
+                # 设置了 data_token_budget 时按预算压缩（行情按周期汇总、财报保留最近的报告期等）
+                self.params[target_param] += serialize_frame(dep_result, self.params.get("data_token_budget"))
             elif isinstance(self.params.get(target_param), dict):
                 self.params[target_param][dep_task_name] = dep_result
             else:
@@ -130,6 +179,10 @@ class TaskNode:
         """
         根据result的类型，将其转换为前端友好的格式。
         """
+        if isinstance(result, SharedFrameHandle):
+            # 共享内存中的结果，加载后按 DataFrame 处理
+            result = result.load() if result.exists() else str(result)
+
         if isinstance(result, str):
             # 如果是字符串，直接返回
             return {"type": "text", "content": result}
@@ -152,42 +205,128 @@ class TaskNode:
             # 如果无法序列化，返回一个表示错误的字符串
             return {"type": "error", "content": "Result could not be serialized."}
         
+    @staticmethod
+    def _summarize_result(result):
+        """
+        结果摘要：类型、内容摘要（digest）与大小，状态快照中只包含摘要，完整结果通过 get_result_payload 按需获取
+        前端根据 digest 是否变化决定是否重新获取完整结果
+        """
+        if result is None:
+            return None
+        if isinstance(result, SharedFrameHandle):
+            # 段文件名唯一，无需读取内容
+            return {"type": "dataframe", "digest": os.path.basename(result.path).split(".")[0][:16], "size": result.nbytes, "shape": [len(result), None]}
+        if isinstance(result, pd.DataFrame):
+            try:
+                digest = hashlib.sha1(pd.util.hash_pandas_object(result, index=True).values.tobytes()
+                                      + ",".join(map(str, result.columns)).encode("utf-8")).hexdigest()[:16]
+            except TypeError:
+                # 含有不可哈希的列（如 list），以对象 id 区分
+                digest = f"id{id(result):x}"
+            return {"type": "dataframe", "digest": digest, "size": int(result.memory_usage(index=True).sum()), "shape": list(result.shape)}
+        if isinstance(result, str):
+            content, result_type = result.encode("utf-8"), "text"
+        elif isinstance(result, bytes):
+            content, result_type = result, "image"
+        else:
+            try:
+                content, result_type = json.dumps(result).encode("utf-8"), "json"
+            except (TypeError, OverflowError):
+                return {"type": "error", "digest": None, "size": 0}
+        return {"type": result_type, "digest": hashlib.sha1(content).hexdigest()[:16], "size": len(content)}
+
+    def get_result_payload(self):
+        """完整结果（转换为前端友好的格式），供 WebApp 按需获取"""
+        return self._process_result(self.result)
+
     def get_state(self):
-        """返回当前任务的状态字典，并进行必要的格式转换。"""
+        """返回当前任务的状态字典，结果仅包含摘要（类型、digest 与大小）"""
         # 将依赖关系（TaskNode对象）转换为其name_id列表
         dependencies_list = [dep.name_id for dep in self.dependencies]
-        # 调用辅助函数处理 task.result
-        processed_result = self._process_result(self.result)
-        
+        # 先读取版本号再读取结果，结果在此期间被替换时缓存的版本号较旧，下次调用会重新计算
+        result_version = self._result_version
+        if self._result_summary[0] != result_version:
+            self._result_summary = (result_version, self._summarize_result(self.result))
+
         return {
             "name_id": self.name_id,
             "status": self.status,
             "retry_times": self.retry_times,
-            "result": processed_result,
+            "version": self.state_version,
+            "result": self._result_summary[1],
             "dependencies": dependencies_list, 
         }
     
     # 使用静态方法的中介量，保证外部可序列化对应方法（即不传入类实例，而是类与其构造参数）
     @staticmethod
     def static_execute(task_class, resource_conf, name_id, params, glob_params):
-        task = task_class(name_id=name_id, params=params, glob_params=glob_params)
+        task = task_class(name_id=name_id, params=resolve_frames(params), glob_params=glob_params)
         return task._execute(resource_conf)
 
+    @staticmethod
+    def static_execute_shared(task_class, resource_conf, name_id, params, glob_params, segment_dir, min_bytes):
+        """进程通道的入口，不小于 min_bytes 的 DataFrame 结果写入共享内存段，仅将句柄返回主进程"""
+        result = TaskNode.static_execute(task_class, resource_conf, name_id, params, glob_params)
+        if isinstance(result.get("data"), pd.DataFrame):
+            result["data"] = export_frame(result["data"], segment_dir, min_bytes)
+        return result
+
+    @staticmethod
+    async def static_execute_async(task_class, resource_conf, name_id, params, glob_params):
+        """async 执行通道的入口，协程任务直接在事件循环中等待，其余步骤（存储、注册）放到线程中执行"""
+        task = task_class(name_id=name_id, params=resolve_frames(params), glob_params=glob_params)
+        task._apply_akshare_config(resource_conf)
+        try:
+            if asyncio.iscoroutinefunction(task._custom_task):
+                result = await task._custom_task(resource_conf, task.params)
+            else:
+                result = await asyncio.to_thread(task._custom_task, resource_conf, task.params)
+        except Exception as e:
+            result = {"status": "failed", "data": None, "error": str(e)}
+        return await asyncio.to_thread(task._post_process, resource_conf, result)
+
     def _execute(self, resource_conf):
+        self._apply_akshare_config(resource_conf)
         try:
             result = self._custom_task(resource_conf, self.params)
         except Exception as e:
             result = {"status": "failed", "data": None, "error": str(e)} 
-            
+        return self._post_process(resource_conf, result)
+
+    def _apply_akshare_config(self, resource_conf):
+        """
+        根据资源配置设置当前进程内 akshare 的网络请求：
+        - rate_limiter: 按域名的限流（跨进程共享令牌桶）
+        - response_cache: 参考数据等响应的磁盘缓存（按规则设置有效期）
+        - http_session: 共享 Session 的连接池大小，仅在配置变化时重建
+        """
+        if not resource_conf or not os.path.isfile(resource_conf):
+            return
+        try:
+            full_config = ResourceManager.load_config(resource_conf)
+            if "rate_limiter" in full_config:
+                akshare_config.set_rate_limiter(ResourceManager.get("rate_limiter", resource_conf))
+            if "response_cache" in full_config:
+                akshare_config.set_response_cache(ResourceManager.get("response_cache", resource_conf))
+            session_options = full_config.get("http_session")
+            if session_options and any(akshare_config.session_options.get(k) != v for k, v in session_options.items()):
+                akshare_config.set_session_options(**session_options)
+        except Exception as e:
+            self.logger.warning(f"Failed to apply akshare config: {e}")
+
+    def _post_process(self, resource_conf, result):
+        """task执行完成后的存储与动态注册逻辑"""
         if self.params.get("save", 0) > 0:
             save_type = self.params.get("save", 0)
             
             # 根据 save_type 的值执行不同的存储操作
             if save_type == 1:
                 # 添加 DB 存储的逻辑
-                self._save_to_db(resource_conf, result.get("data", None), self.params.get("target_db", ""))
+                self._save_to_db(resource_conf, result.get("data", None), self.params.get("target_db", ""), self.params.get("save_method", "copy"))
             elif save_type == 2:
                 self._save_to_file(result.get("data", None), self.glob_params.get("save_path", ""))
+            elif save_type == 3:
+                self._save_to_parquet(result.get("data", None), self.glob_params.get("parquet_path", "./data/parquet"))
             else:
                 # 处理其他未知 save_type 的情况
                 raise ValueError(f"Save type: {save_type} not recognized.")
@@ -204,11 +343,12 @@ class TaskNode:
     
     # ---------------------------- 以下为tasknode除核心执行逻辑以外可能附带的运行逻辑，可被重写 ----------------------------
     # ---------------------------- 数据存储部分 ----------------------------
-    def _save_to_db(self, resource_conf, result, target_db):
+    def _save_to_db(self, resource_conf, result, target_db, save_method="copy"):
+        """save_method 对应 insert_dataframe_to_table 的写入方式（row / values / copy），默认使用 COPY 批量写入"""
         if result is not None and not result.empty:
-            db_manager = ResourceManager.create("postgres", resource_conf)
-            session = db_manager.get_session()
-            insert_dataframe_to_table(result, target_db, session, True)
+            db_manager = ResourceManager.get("postgres", resource_conf)
+            with db_manager.get_session() as session:
+                insert_dataframe_to_table(result, target_db, session, True, method=save_method)
         else:
             self.logger.warning("No data to save.")
         
@@ -241,6 +381,26 @@ class TaskNode:
                 self.logger.info(f"Data saved to {output_path}")
             except Exception as e:
                 self.logger.error(f"Failed to save data to {output_path}: {e}")
+
+    def _save_to_parquet(self, result, parquet_path):
+        """
+        以 Parquet 格式追加写入按 task / symbol / 交易时间段分区的列式存储（见 utils.parquet_store），保留原始数据类型
+        task 参数 partition_freq 指定时间分区粒度（D / M / Y，默认 Y），max_files 指定分区合并前的 part 文件数上限
+        非 DataFrame 结果仍按 save 为 2 的方式保存到 save_path
+        """
+        if not isinstance(result, pd.DataFrame):
+            self._save_to_file(result, self.glob_params.get("save_path", "./cache/"))
+            return
+        if result.empty:
+            self.logger.warning("The DataFrame is empty, nothing to save.")
+            return
+        partitions = write_parquet_store(
+            result, parquet_path, self.__class__.__name__,
+            symbol=self.params.get("stock_code"),
+            freq=self.params.get("partition_freq", "Y"),
+            max_files=self.params.get("max_files", 16),
+        )
+        self.logger.info(f"DataFrame saved to {len(partitions)} parquet partitions under {parquet_path}")
     
     # ---------------------------- 动态注册部分（需重写） ----------------------------
     def _register_pipeline(self, result):
@@ -0,0 +1,131 @@
+"""consolidate vector memory
+
+将 StockMemoryManager 原先为每只股票创建的 <memory_type>_<stock_code> 向量表（列为 id, embedding, content, metadata, created_at）
+合并到按 memory_type 分区的 vector_record 表中，并删除原表；原 vector_record 表中的数据以 memory_type = 'stock' 迁移
+
+Revision ID: 3c9a7e51b2d4
+Revises: fd5afa315a50
+Create Date: 2026-10-18 02:10:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a7e51b2d4'
+down_revision: Union[str, None] = 'fd5afa315a50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 原先每只股票一张表时的表结构
+LEGACY_COLUMNS = {"id", "embedding", "content", "metadata", "created_at"}
+MEMORY_TYPE_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,29}$")
+
+
+def _quote(name: str) -> str:
+    return op.get_bind().dialect.identifier_preparer.quote(name)
+
+
+def _create_partition(memory_type: str):
+    op.execute(sa.text(
+        f"CREATE TABLE IF NOT EXISTS {_quote('vector_record_' + memory_type)} PARTITION OF vector_record FOR VALUES IN (:memory_type)"
+    ).bindparams(memory_type=memory_type))
+
+
+def _legacy_tables():
+    """查找列结构与旧版向量表一致的表"""
+    rows = op.get_bind().execute(sa.text("""
+        SELECT table_name, array_agg(column_name::text) FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        GROUP BY table_name
+    """)).fetchall()
+    return sorted(name for name, columns in rows if set(columns) == LEGACY_COLUMNS)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # 原 vector_record 表（id 为 SERIAL，外键指向 stock_info）先改名保留，数据迁移后删除
+    has_old_record = sa.inspect(bind).has_table("vector_record")
+    if has_old_record:
+        op.rename_table("vector_record", "vector_record_legacy")
+        op.execute("ALTER SEQUENCE IF EXISTS vector_record_id_seq RENAME TO vector_record_legacy_id_seq")
+
+    op.execute(sa.schema.CreateSequence(sa.Sequence("vector_record_id_seq")))
+    op.create_table('vector_record',
+    sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('vector_record_id_seq')"), nullable=False),
+    sa.Column('memory_type', sa.String(length=30), nullable=False),
+    sa.Column('stock_symbol', sa.String(length=20), nullable=False),
+    sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=384), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('memory_type', 'id', name='vector_record_pk'),
+    postgresql_partition_by='LIST (memory_type)'
+    )
+    op.create_index('ix_vector_record_stock', 'vector_record', ['memory_type', 'stock_symbol'], unique=False)
+    op.create_index('ix_vector_record_params', 'vector_record', ['params'], unique=False, postgresql_using='gin', postgresql_ops={'params': 'jsonb_path_ops'})
+
+    if has_old_record:
+        _create_partition("stock")
+        op.execute("""
+            INSERT INTO vector_record (memory_type, stock_symbol, embedding, content, params, created_at)
+            SELECT 'stock', stock_symbol, embedding, content, params::jsonb, created_at FROM vector_record_legacy ORDER BY id
+        """)
+        op.drop_table("vector_record_legacy")
+
+    for table_name in _legacy_tables():
+        memory_type, _, stock_code = table_name.partition("_")
+        if not stock_code or not MEMORY_TYPE_PATTERN.match(memory_type):
+            print(f"skip table {table_name}: cannot parse <memory_type>_<stock_code>")
+            continue
+        _create_partition(memory_type)
+        op.execute(sa.text(f"""
+            INSERT INTO vector_record (memory_type, stock_symbol, embedding, content, params, created_at)
+            SELECT :memory_type, :stock_code, embedding, content, metadata, created_at FROM {_quote(table_name)} ORDER BY id
+        """).bindparams(memory_type=memory_type, stock_code=stock_code))
+        op.drop_table(table_name)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    # 按 (memory_type, stock_symbol) 拆回每只股票一张表
+    groups = bind.execute(sa.text("SELECT DISTINCT memory_type, stock_symbol FROM vector_record")).fetchall()
+    for memory_type, stock_code in groups:
+        table_name = _quote(f"{memory_type}_{stock_code}")
+        op.execute(f"""
+            CREATE TABLE {table_name} (
+                id SERIAL PRIMARY KEY,
+                embedding VECTOR(384),
+                content TEXT,
+                metadata JSONB,
+                created_at TIMESTAMP DEFAULT now()
+            )
+        """)
+        op.execute(sa.text(f"""
+            INSERT INTO {table_name} (embedding, content, metadata, created_at)
+            SELECT embedding, content, params, created_at FROM vector_record
+            WHERE memory_type = :memory_type AND stock_symbol = :stock_code ORDER BY id
+        """).bindparams(memory_type=memory_type, stock_code=stock_code))
+
+    op.drop_table('vector_record')
+    op.execute(sa.schema.DropSequence(sa.Sequence("vector_record_id_seq")))
+    op.create_table('vector_record',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('stock_symbol', sa.String(length=20), nullable=False),
+    sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('params', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['stock_symbol'], ['stock_info.symbol'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
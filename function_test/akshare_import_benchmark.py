@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+'''
+该文件用于比较 akshare 按需导入前后的导入耗时（python -X importtime，每种情况在新进程中运行 rounds 次取最小值）：
+1. import akshare：按需导入后只导入 akshare/__init__.py 与名称索引
+2. import akshare 并访问全部接口：相当于原先 __init__.py 中逐个导入全部子模块
+3. import tasks：调度器 worker 进程的启动开销与内存（按需导入 / 预先访问全部接口以模拟原先的方式）
+并检查名称索引与 __init__.py 中的导入语句一致、索引中的每个接口均可访问
+使用方法（需在项目根目录下执行）:
+    python -m function_test.akshare_import_benchmark [rounds]
+'''
+
+EAGER = ("import akshare\n"
+         "from akshare._lazy_index import LAZY_IMPORTS, OPTIONAL_IMPORTS\n"
+         "for name in LAZY_IMPORTS:\n"
+         "    if name not in OPTIONAL_IMPORTS: getattr(akshare, name)\n")
+
+CASES = [
+    ("import akshare (lazy)", "import akshare"),
+    ("import akshare + all interfaces", EAGER),
+    ("import akshare + ak.stock_zh_a_daily", "import akshare; akshare.stock_zh_a_daily"),
+    ("import tasks (lazy)", "import core; import tasks"),
+    ("import tasks (all interfaces)", EAGER + "import core; import tasks"),
+]
+
+
+def import_time(code: str) -> tuple:
+    """在新进程中运行 code，返回 (顶层导入累计耗时 秒, 已导入的模块数, 已导入的 akshare 模块数, 峰值内存 MB)"""
+    code += ("\nimport sys, resource; print(len(sys.modules), sum(m == 'akshare' or m.startswith('akshare.') for m in sys.modules), "
+             "resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 缩进表示被其他模块导入，只累计顶层导入
+        if not name.startswith("  "):
+            total += int(cumulative)
+    modules, akshare_modules, max_rss = map(int, result.stdout.strip().splitlines()[-1].split())
+    return total / 1e6, modules, akshare_modules, max_rss / 1024
+
+
+def check_index():
+    import akshare
+    from akshare._lazy_index import LAZY_IMPORTS, OPTIONAL_IMPORTS
+    from akshare.utils.lazy_index import build_index
+
+    imports, optional = build_index()
+    assert imports == LAZY_IMPORTS and optional == set(OPTIONAL_IMPORTS), "索引已过期，请运行 python akshare/utils/lazy_index.py"
+    missing = []
+    for name in LAZY_IMPORTS:
+        try:
+            getattr(akshare, name)
+        except AttributeError:
+            missing.append(name)
+    assert set(missing) <= set(OPTIONAL_IMPORTS), f"无法访问的接口: {missing}"
+    print(f"index ok: {len(LAZY_IMPORTS)} names, unavailable optional names: {missing}")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    check_index()
+    for label, code in CASES:
+        cost, modules, akshare_modules, max_rss = min(import_time(code) for _ in range(rounds))
+        print(f"[{label:<38}] {cost:6.3f} s  {modules:>5} modules ({akshare_modules:>3} akshare)  max rss {max_rss:6.1f} MB")
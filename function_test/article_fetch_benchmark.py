@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from core.resource.searcher import BrowserPool, BingSearcher
+from function_test.browser_pool_test import HttpDriver
+from utils.html_parser import extract_article, fetch_articles
+
+'''
+该文件用于比较新闻正文获取的两种方式（本地 HTTP 服务模拟新闻站点，每个请求固定耗时 rtt 秒）：
+1. 原先的方式：浏览器逐个打开文章页面，每页等待 2 秒，再对同一 HTML 调用两次 trafilatura
+2. fetch_articles：HTTP 连接池并发获取，进程池中单次 trafilatura 提取，需要 JS 渲染的页面（js_pages 篇）使用浏览器池重新加载
+浏览器以 urllib 实现的简化 driver 代替（加载页面时附带渲染标记，服务端返回渲染后的正文），输出每个 URL 的获取方式与耗时
+使用方法（需在项目根目录下执行）:
+    python -m function_test.article_fetch_benchmark [articles] [rtt] [js_pages] [old_wait]
+'''
+
+PARAGRAPH = "公司发布公告称，受益于下游需求回暖与产品结构优化，前三季度营业收入同比增长百分之十二，净利润同比增长百分之十八。"
+
+
+def article_html(i, rendered=True):
+    body = "".join(f"<p>{PARAGRAPH}（第{i}篇第{j}段）</p>" for j in range(8)) if rendered else \
+        "<div id='app'></div><script>/* 正文由 JS 渲染 */</script>"
+    return (f"<html><head><title>新闻{i}</title><meta property='article:published_time' content='2025-01-{i % 28 + 1:02d}'></head>"
+            f"<body><article><h1>新闻{i}：公司业绩稳步增长</h1>{body}</article></body></html>").encode("utf-8")
+
+
+class NewsHandler(BaseHTTPRequestHandler):
+    rtt = 0.3
+    js_pages = set()
+
+    def do_GET(self):
+        time.sleep(self.rtt)
+        i = int(self.path.strip("/").split("/")[-1])
+        rendered = i not in self.js_pages or self.headers.get("X-Rendered") == "1"
+        body = article_html(i, rendered)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class NewsServer(ThreadingHTTPServer):
+    request_queue_size = 128        # 默认的监听队列为 5，并发连接较多时会因重传 SYN 多出约 1 秒
+
+
+class RenderingDriver(HttpDriver):
+    """模拟浏览器：请求时附带渲染标记，服务端返回 JS 渲染后的页面"""
+    def get(self, url):
+        if url == "about:blank":
+            self.page_source = ""
+            return
+        request = urllib.request.Request(url, headers={"X-Rendered": "1"})
+        self.page_source = urllib.request.urlopen(request).read().decode()
+
+    def execute_script(self, script):
+        return "complete"
+
+
+def old_fetch(urls, wait, launch_delay):
+    """原先的 FetchBingNews：每次启动浏览器，逐个加载页面并等待，对同一 HTML 调用两次 trafilatura"""
+    import trafilatura
+    browser = BingSearcher(driver=RenderingDriver(launch_delay))
+    results = []
+    for url in urls:
+        browser.get(url)
+        time.sleep(wait)
+        html = browser.page_source
+        trafilatura.extract(html, include_comments=False, include_tables=False, url=url)
+        results.append(extract_article(html, url))
+    return results
+
+
+if __name__ == "__main__":
+    article_num = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    NewsHandler.rtt = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    js_num = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    old_wait = float(sys.argv[4]) if len(sys.argv) > 4 else 2.0
+    launch_delay = 1.0
+    NewsHandler.js_pages = set(range(js_num))
+
+    server = NewsServer(("127.0.0.1", 0), NewsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/news/{i}" for i in range(article_num)]
+    state_dir = tempfile.mkdtemp(prefix="article_fetch_benchmark_")
+    try:
+        print(f"{os.cpu_count()} cpus, {article_num} articles ({js_num} need JS), rtt {NewsHandler.rtt}s, browser launch {launch_delay}s (simulated)")
+        start = time.perf_counter()
+        old = old_fetch(urls, old_wait, launch_delay)
+        print(f"[browser, one by one]  {time.perf_counter() - start:6.2f} s  {sum(len(r['content']) >= 200 for r in old)} full articles")
+
+        browser_pool = BrowserPool(None, max_browsers=2, state_dir=state_dir, driver_factory=lambda: RenderingDriver(launch_delay))
+        # 预热：首次调用建立连接、启动提取进程池（多核机器上，各 worker 导入时较慢），并启动一个浏览器；长期运行的调度进程中均已就绪
+        session = requests.Session()
+        start = time.perf_counter()
+        fetch_articles(urls, session=session, browser_pool=None)
+        print(f"[fetch_articles, first call    ] {time.perf_counter() - start:6.2f} s  (connection / extract pool startup)")
+        browser_pool.release(browser_pool.acquire())
+        for label, pool in [("http only", None), ("http + browser", browser_pool)]:
+            start = time.perf_counter()
+            records = fetch_articles(urls, session=session, browser_pool=pool)
+            cost = time.perf_counter() - start
+            print(f"[fetch_articles, {label:<14}] {cost:6.2f} s  {sum(len(r['content']) >= 200 for r in records)} full articles")
+        for r in records:
+            print(f"    {r['url'].rsplit('/', 1)[-1]:>3} {r['method']:<7} fetch {r['fetch_time']:.3f}s  extract {r['extract_time']:.3f}s  "
+                  f"total {r['total_time']:.3f}s  {len(r['content']):>4} chars  date {r['time']}  {r['error'] or ''}")
+        browser_pool.close_all()
+    finally:
+        server.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
@@ -0,0 +1,181 @@
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.common.exceptions import WebDriverException
+
+from core.resource.searcher import BrowserPool, create_chrome_driver
+
+'''
+该文件用于验证浏览器池（BrowserPool）的复用、回收与跨进程数量上限，使用本地静态 HTML 服务：
+1. 每个 task 启动一个新浏览器（原先的方式）与从浏览器池借出的耗时对比
+2. 达到 max_pages 后回收、task 中出现 WebDriverException 后回收、空闲超时后关闭
+3. 多个进程各自使用浏览器池，服务端统计同时存活的浏览器数不超过 max_browsers
+浏览器启动与关闭时会通知本地服务，以统计同时存活的浏览器数
+使用方法（需在项目根目录下执行）:
+    python -m function_test.browser_pool_test chrome [driver_path]   # 使用无头 Chrome
+    python -m function_test.browser_pool_test http [launch_delay]    # 无法运行 Chrome 的环境：以 urllib 实现的简化 driver 代替，启动耗时为 launch_delay 秒
+'''
+
+MAX_BROWSERS = 2
+PAGES = 30
+
+
+class StaticHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    alive = 0
+    max_alive = 0
+
+    def do_GET(self):
+        cls = StaticHandler
+        if self.path in ("/open", "/close"):
+            with cls.lock:
+                cls.alive += 1 if self.path == "/open" else -1
+                cls.max_alive = max(cls.max_alive, cls.alive)
+            body = b"ok"
+        else:
+            body = f"<html><head><title>page {self.path}</title></head><body><p id='content'>{self.path}</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpDriver:
+    """不依赖 Chrome 的简化 driver：get 以 urllib 获取页面，只有一个标签页"""
+    def __init__(self, launch_delay):
+        time.sleep(launch_delay)
+        self.page_source = ""
+        self.window_handles = ["main"]
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def get(self, url):
+        self.page_source = "" if url == "about:blank" else urllib.request.urlopen(url).read().decode()
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class TrackedDriver:
+    """启动与关闭时通知本地服务，其余方法转发给实际的 driver"""
+    def __init__(self, driver, base_url):
+        self._driver = driver
+        self._base_url = base_url
+        urllib.request.urlopen(base_url + "/open").read()
+
+    def quit(self):
+        try:
+            self._driver.quit()
+        finally:
+            urllib.request.urlopen(self._base_url + "/close").read()
+
+    def __getattr__(self, item):
+        return getattr(self._driver, item)
+
+
+class DriverFactory:
+    def __init__(self, mode, arg, base_url):
+        self.mode, self.arg, self.base_url = mode, arg, base_url
+
+    def __call__(self):
+        if self.mode == "chrome":
+            driver = create_chrome_driver(self.arg or "./tasks/news_data/chromedriver/chromedriver-linux64/chromedriver", 30)
+        else:
+            driver = HttpDriver(float(self.arg or 1.0))
+        return TrackedDriver(driver, self.base_url)
+
+
+def fetch(driver, base_url, i):
+    driver.get(f"{base_url}/page{i}")
+    assert f"/page{i}</p>" in driver.page_source
+
+
+def worker(args):
+    """在子进程中使用浏览器池完成若干页面的访问"""
+    factory, state_dir, base_url, pages = args
+    pool = BrowserPool(None, max_browsers=MAX_BROWSERS, idle_timeout=0.5, state_dir=state_dir, driver_factory=factory)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as threads:
+            list(threads.map(lambda i: pool_fetch(pool, base_url, i), range(pages)))
+        return pool.stats()
+    finally:
+        pool.close_all()
+
+
+def pool_fetch(pool, base_url, i):
+    with pool.browser() as driver:
+        fetch(driver, base_url, i)
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "http"
+    arg = sys.argv[2] if len(sys.argv) > 2 else None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StaticHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    factory = DriverFactory(mode, arg, base_url)
+    state_dir = tempfile.mkdtemp(prefix="browser_pool_test_")
+    try:
+        # 1. 原先的方式：每个 task 启动一个浏览器（且不关闭，此处在结束后统一关闭以免残留进程）
+        start = time.perf_counter()
+        drivers = []
+        for i in range(PAGES // 3):
+            drivers.append(factory())
+            fetch(drivers[-1], base_url, i)
+        per_task_cost = (time.perf_counter() - start) / (PAGES // 3)
+        leaked = StaticHandler.alive
+        for driver in drivers:
+            driver.quit()
+        print(f"[new browser per task] {per_task_cost * 1000:8.1f} ms/task, {leaked} browsers left running")
+
+        pool = BrowserPool(None, max_browsers=MAX_BROWSERS, idle_timeout=0.5, max_pages=10, state_dir=state_dir, driver_factory=factory)
+        start = time.perf_counter()
+        for i in range(PAGES):
+            pool_fetch(pool, base_url, i)
+        print(f"[pool, sequential]     {(time.perf_counter() - start) / PAGES * 1000:8.1f} ms/task  {pool.stats()}  (max_pages=10)")
+        assert pool.launched == PAGES // 10
+
+        # 2. task 中出现 WebDriverException 时回收
+        recycled = pool.recycled
+        try:
+            with pool.browser():
+                raise WebDriverException("simulated crash")
+        except WebDriverException:
+            pass
+        assert pool.recycled == recycled + 1
+        print(f"[pool, crash]          recycled after WebDriverException  {pool.stats()}")
+
+        # 空闲超时后关闭
+        time.sleep(1.0)
+        assert pool.stats()["idle"] == 0 and StaticHandler.alive == 0
+        print(f"[pool, idle timeout]   idle browsers closed  {pool.stats()}")
+        pool.close_all()
+
+        # 3. 多进程共享 max_browsers
+        StaticHandler.max_alive = 0
+        processes = 4
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            stats = list(executor.map(worker, [(factory, state_dir, base_url, PAGES)] * processes))
+        cost = time.perf_counter() - start
+        print(f"[{processes} processes x 4 threads] {processes * PAGES} pages in {cost:.2f} s, "
+              f"max browsers alive {StaticHandler.max_alive} (limit {MAX_BROWSERS}), launched {sum(s['launched'] for s in stats)}")
+        assert StaticHandler.max_alive <= MAX_BROWSERS
+    finally:
+        server.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
@@ -0,0 +1,69 @@
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from core.resource.database_table import RealtimeShare
+from utils.database_utils import insert_dataframe_to_table
+
+'''
+该文件用于比较 insert_dataframe_to_table 逐行写入与批量写入（VALUES / COPY）的速度
+使用方法（需在项目根目录下执行，默认读取 resource_conf.json 中的 db_url）:
+    python -m function_test.bulk_insert_benchmark [db_url] [rows]
+写入的测试数据 symbol 以 BENCH 开头，测试结束后会被删除
+'''
+
+
+def build_spot_frame(rows: int, update_time: str) -> pd.DataFrame:
+    """构造与 FetchAllAShareSpot 输出列一致的模拟数据"""
+    rng = np.random.default_rng(0)
+    float_columns = [
+        c.name for c in RealtimeShare.__table__.columns
+        if c.name not in ("symbol", "name", "update_time")
+    ]
+    df = pd.DataFrame(rng.random((rows, len(float_columns))) * 100, columns=float_columns)
+    df.insert(0, "symbol", [f"BENCH{i:06d}" for i in range(rows)])
+    df.insert(1, "name", [f"测试股票{i}" for i in range(rows)])
+    df["update_time"] = update_time
+    return df
+
+
+def run_once(session_factory, method: str, df: pd.DataFrame) -> float:
+    session = session_factory()
+    try:
+        start = time.perf_counter()
+        insert_dataframe_to_table(df.copy(), "RealtimeShare", session, True, method=method)
+        return time.perf_counter() - start
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        db_url = sys.argv[1]
+    else:
+        with open("./config/resource/resource_conf.json", "r", encoding="utf-8") as f:
+            db_url = json.load(f)["postgres"]["db_url"]
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5500
+
+    engine = create_engine(db_url)
+    RealtimeShare.__table__.create(bind=engine, checkfirst=True)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    # 第一轮为纯插入，第二轮为全部冲突后的更新
+    for method in ["row", "values", "copy"]:
+        df = build_spot_frame(rows, "2000-01-01 15:00:00")
+        insert_cost = run_once(session_factory, method, df)
+        df[["price", "volume"]] = df[["price", "volume"]] + 1
+        upsert_cost = run_once(session_factory, method, df)
+        print(f"[{method:>6}] insert: {rows / insert_cost:>10.0f} rows/s ({insert_cost:.2f}s)  "
+              f"upsert: {rows / upsert_cost:>10.0f} rows/s ({upsert_cost:.2f}s)")
+
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM ashare WHERE symbol LIKE 'BENCH%'"))
+
+    engine.dispose()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from core.resource.embedding import EmbeddingServer, EmbeddingService
+from utils.embedding_module import DEFAULT_MODEL_NAME, get_embedding_model
+
+'''
+该文件用于比较文本向量化的几种调用方式的耗时：
+1. 原先的逐条调用（每条文本调用一次 model.encode）
+2. EmbeddingService.embed_texts 批量编码（冷缓存 / 热缓存）
+3. 多个线程并发逐条调用 embed_text（由 MicroBatcher 合并为批次）
+4. 启用独立向量化进程后，多个进程同时请求（各进程不再各自加载模型）
+并验证各方式得到的向量一致
+使用方法（需在项目根目录下执行）:
+    python -m function_test.embedding_benchmark [text_num] [workers]
+'''
+
+
+def make_texts(text_num):
+    # 约 1/4 的重复文本，模拟新闻与分析结果中常见的重复段落
+    unique_num = max(1, text_num * 3 // 4)
+    return [f"第{i % unique_num}条新闻：公司公告营收同比增长{i % unique_num % 13}%，行业景气度持续回升" for i in range(text_num)]
+
+
+def per_text_loop(texts):
+    model = get_embedding_model(DEFAULT_MODEL_NAME)
+    return np.stack([model.encode(text, normalize_embeddings=True, show_progress_bar=False) for text in texts])
+
+
+def worker_embed(args):
+    texts, cache_dir, server_address = args
+    service = EmbeddingService(cache_dir=cache_dir, server_address=server_address)
+    start = time.perf_counter()
+    vectors = service.embed_texts(texts)
+    return vectors, time.perf_counter() - start
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    text_num = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    texts = make_texts(text_num)
+    tmp_dir = tempfile.mkdtemp(prefix="embedding_benchmark_")
+    try:
+        _, load_cost = timed(lambda: get_embedding_model(DEFAULT_MODEL_NAME))
+        print(f"{text_num} texts ({len(set(texts))} unique), model load {load_cost:.2f} s")
+
+        expected, cost = timed(lambda: per_text_loop(texts))
+        print(f"[per-text loop]          {cost:8.3f} s")
+
+        service = EmbeddingService(cache_dir=os.path.join(tmp_dir, "cache"))
+        vectors, cost = timed(lambda: service.embed_texts(texts))
+        np.testing.assert_allclose(vectors, expected, atol=1e-5)
+        print(f"[embed_texts cold cache] {cost:8.3f} s  same result")
+        vectors, cost = timed(lambda: service.embed_texts(texts))
+        np.testing.assert_allclose(vectors, expected, atol=1e-5)
+        print(f"[embed_texts warm cache] {cost:8.3f} s  same result  {service.stats()}")
+
+        service = EmbeddingService(cache_dir=None)
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            vectors, cost = timed(lambda: np.stack(list(pool.map(service.embed_text, texts))))
+        np.testing.assert_allclose(vectors, expected, atol=1e-5)
+        print(f"[32 threads embed_text]  {cost:8.3f} s  same result  ({service.batcher.batches} model calls)")
+
+        # 多进程：每个进程处理一部分文本，不使用缓存以比较编码本身
+        chunks = [(texts[i::workers], None, None) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results, cost = timed(lambda: list(pool.map(worker_embed, chunks)))
+        print(f"[{workers} processes, local model]  {cost:8.3f} s  (each process loads its own model)")
+
+        server = EmbeddingServer(os.path.join(tmp_dir, "server.sock"))
+        server.start()
+        try:
+            # 预热：等待向量化进程加载模型
+            EmbeddingService(cache_dir=None, server_address=server.address).embed_texts(texts[:1])
+            chunks = [(texts[i::workers], None, server.address) for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results, cost = timed(lambda: list(pool.map(worker_embed, chunks)))
+        finally:
+            server.stop()
+        for i, (vectors, _) in enumerate(results):
+            np.testing.assert_allclose(vectors, expected[i::workers], atol=1e-5)
+        print(f"[{workers} processes, server]       {cost:8.3f} s  same result  (one model in the server process)")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import akshare.utils.func as ak_func
+import akshare.utils.tqdm as ak_tqdm
+from akshare.utils.context import get_session
+
+'''
+该文件用于比较 fetch_paginated_data 每页重新建立连接（requests.get）与使用共享 Session 复用连接的单页耗时
+本地启动模拟东方财富分页接口的HTTP服务；若系统中有 openssl，则同时测试 HTTPS（自签名证书，握手开销更接近真实情况）
+使用方法（需在项目根目录下执行）:
+    python -m function_test.http_session_benchmark [pages] [rounds]
+'''
+
+PAGE_SIZE = 100
+
+
+class PagedHandler(BaseHTTPRequestHandler):
+    """模拟 push2.eastmoney.com/api/qt/clist/get 的分页返回格式"""
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，keep-alive 连接上需关闭 Nagle 算法，否则会触发 40ms 的延迟确认
+    disable_nagle_algorithm = True
+    total_pages = 60
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        page = int(query.get("pn", ["1"])[0])
+        diff = [{"f12": f"{page:03d}{i:03d}", "f3": (page * PAGE_SIZE + i) % 97} for i in range(PAGE_SIZE)]
+        body = json.dumps({"data": {"total": self.total_pages * PAGE_SIZE, "diff": diff}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(cert_dir=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PagedHandler)
+    scheme = "http"
+    if cert_dir:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(cert_dir, "cert.pem"), os.path.join(cert_dir, "key.pem"))
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_port}/api/qt/clist/get"
+
+
+def make_cert(cert_dir):
+    """生成 127.0.0.1 的自签名证书，并通过 REQUESTS_CA_BUNDLE 让 requests 信任该证书"""
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1",
+         "-keyout", os.path.join(cert_dir, "key.pem"), "-out", os.path.join(cert_dir, "cert.pem")],
+        check=True, capture_output=True,
+    )
+    os.environ["REQUESTS_CA_BUNDLE"] = os.path.join(cert_dir, "cert.pem")
+
+
+def run(url, pages, rounds, pooled):
+    # 未使用连接池时，以 requests 模块替代共享 Session（即原先每页调用 requests.get 的行为）
+    ak_func.get_session = get_session if pooled else (lambda: requests)
+    ak_func.get_tqdm = lambda: ak_tqdm.get_tqdm(enable=False)
+    params = {"pn": "1", "pz": str(PAGE_SIZE), "po": "1", "fid": "f3"}
+    costs = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        df = ak_func.fetch_paginated_data(url, params)
+        costs.append(time.perf_counter() - start)
+        assert len(df) == pages * PAGE_SIZE
+    return min(costs) / pages * 1000
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    PagedHandler.total_pages = pages
+
+    with tempfile.TemporaryDirectory() as cert_dir:
+        schemes = [None]
+        if shutil.which("openssl"):
+            make_cert(cert_dir)
+            schemes.append(cert_dir)
+        for scheme_cert in schemes:
+            server, url = start_server(scheme_cert)
+            bare = run(url, pages, rounds, pooled=False)
+            pooled = run(url, pages, rounds, pooled=True)
+            print(f"[{url.split(':')[0]:>5}] {pages} pages  requests.get: {bare:.2f} ms/page  "
+                  f"pooled session: {pooled:.2f} ms/page  ({bare / pooled:.1f}x)")
+            server.shutdown()
@@ -0,0 +1,77 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import tasks.market_data.fetch_share_data as fetch_share_data
+from core.resource.database_table import RealtimeShare
+from core.resource_manager import ResourceManager
+from core.taskNode import TaskNode
+
+'''
+该文件用于验证 FetchAShareHistory 的增量模式：以模拟的全量日线替代 ak.stock_zh_a_daily，
+首次运行写入全部历史，之后每新增一个交易日只写入一行；同时比较全量与增量模式每次运行写入数据库的行数与耗时
+使用方法（需在项目根目录下执行，使用给定资源配置中的数据库）:
+    python -m function_test.incremental_history_test [resource_conf] [history_days]
+测试数据 symbol 为 999999，测试结束后会被删除
+'''
+
+SYMBOL = "999999"
+
+
+def make_history(days: int, end: pd.Timestamp) -> pd.DataFrame:
+    """构造与 ak.stock_zh_a_daily 返回格式一致的日线（date 列 + 行情列）"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end=end, periods=days)
+    df = pd.DataFrame(rng.random((days, 8)) * 10, columns=["open", "high", "low", "close", "volume", "amount", "outstanding_share", "turnover"])
+    df.insert(0, "date", dates.date)
+    return df
+
+
+def run_task(resource_conf, incremental: bool) -> int:
+    params = {"stock_code": SYMBOL, "save": 1, "target_db": "RealtimeShare", "save_method": "copy", "incremental": incremental}
+    result = TaskNode.static_execute(fetch_share_data.FetchAShareHistory, resource_conf, "history_test", params, {})
+    assert result["status"] == "success", result["error"]
+    return len(result["data"])
+
+
+if __name__ == "__main__":
+    resource_conf = sys.argv[1] if len(sys.argv) > 1 else "./config/resource/resource_conf.json"
+    history_days = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    db_manager = ResourceManager.get("postgres", resource_conf)
+    RealtimeShare.__table__.create(bind=db_manager.engine, checkfirst=True)
+    # 以最近一个已收盘交易日作为模拟数据的最后一天
+    fetch_share_data.get_formatted_time = lambda: "2025-03-07 15:00:00"
+    last_day = pd.Timestamp("2025-03-07")
+
+    try:
+        for incremental in (False, True):
+            with db_manager.engine.begin() as conn:
+                conn.execute(text("DELETE FROM ashare WHERE symbol = :symbol"), {"symbol": SYMBOL})
+            written = []
+            costs = []
+            # 首次运行 + 之后连续 3 个交易日的日常运行
+            for day_offset in range(4):
+                end = last_day + pd.offsets.BDay(day_offset)
+                fetch_share_data.get_formatted_time = lambda end=end: end.strftime("%Y-%m-%d 15:00:00")
+                fetch_share_data.ak.stock_zh_a_daily = lambda symbol, start_date=None, end_date=None, end=end: (
+                    lambda df: df[df["date"] >= pd.Timestamp(start_date).date()] if start_date else df
+                )(make_history(history_days + day_offset, end))
+                start = time.perf_counter()
+                written.append(run_task(resource_conf, incremental))
+                costs.append(time.perf_counter() - start)
+            # 再次运行同一天：增量模式不再请求
+            written.append(run_task(resource_conf, incremental))
+
+            with db_manager.get_session() as session:
+                stored = session.execute(text("SELECT count(*) FROM ashare WHERE symbol = :symbol"), {"symbol": SYMBOL}).scalar()
+            assert stored == history_days + 3, stored
+            mode = "incremental" if incremental else "full"
+            print(f"[{mode:>11}] rows written per run: {written}  steady-state run: {np.mean(costs[1:]) * 1000:.0f} ms  stored: {stored}")
+    finally:
+        with db_manager.engine.begin() as conn:
+            conn.execute(text("DELETE FROM ashare WHERE symbol = :symbol"), {"symbol": SYMBOL})
+        ResourceManager.dispose_all()
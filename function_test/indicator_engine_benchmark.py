@@ -0,0 +1,108 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.indicator_engine import IndicatorEngine
+
+'''
+该文件用于比较逐只股票计算技术指标（MyTT 风格，每只股票一个 pandas Series）与 utils.indicator_engine 在二维面板上一次性计算的耗时：
+构造 symbol_num 只股票 × day_num 个交易日的随机日线面板（含停牌与上市较晚的股票），
+1. 逐只股票计算的耗时（抽样 sample_num 只后按股票数外推）与面板计算的耗时
+2. 抽样股票上两种方式结果一致
+3. 追加一根日线时增量更新的耗时，以及结果与完整重新计算一致
+使用方法（需在项目根目录下执行）:
+    python -m function_test.indicator_engine_benchmark [symbol_num] [day_num] [sample_num]
+'''
+
+
+def EMA(S, N):
+    return S.ewm(span=N, adjust=False, ignore_na=True).mean()
+
+
+def SMA(S, N, M=1):
+    return S.ewm(alpha=M / N, adjust=False, ignore_na=True).mean()
+
+
+def per_symbol_indicators(close: pd.Series, high: pd.Series, low: pd.Series) -> dict:
+    """逐只股票计算（停牌日已去除）"""
+    out = {f"ma{n}": close.rolling(n).mean() for n in (5, 10, 20, 60)}
+    out["dif"] = EMA(close, 12) - EMA(close, 26)
+    out["dea"] = EMA(out["dif"], 9)
+    out["macd"] = (out["dif"] - out["dea"]) * 2
+    rsv = (close - low.rolling(9).min()) / (high.rolling(9).max() - low.rolling(9).min()) * 100
+    out["k"] = EMA(rsv, 3 * 2 - 1)
+    out["d"] = EMA(out["k"], 3 * 2 - 1)
+    out["j"] = 3 * out["k"] - 2 * out["d"]
+    diff = close - close.shift(1)
+    out["rsi"] = SMA(diff.clip(lower=0), 24) / SMA(diff.abs(), 24) * 100
+    out["boll_mid"] = close.rolling(20).mean()
+    std = close.rolling(20).std(ddof=0)
+    out["boll_upper"] = out["boll_mid"] + 2 * std
+    out["boll_lower"] = out["boll_mid"] - 2 * std
+    prev = close.shift(1)
+    tr = pd.concat([high - low, (prev - high).abs(), (prev - low).abs()], axis=1).max(axis=1, skipna=False)
+    out["atr"] = tr.rolling(20).mean()
+    return out
+
+
+def make_panel(symbol_num, day_num, rng):
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (day_num, symbol_num)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.03, close.shape))
+    low = close * (1 - rng.uniform(0, 0.03, close.shape))
+    # 停牌与上市较晚的股票
+    missing = rng.random(close.shape) < 0.02
+    listing = rng.integers(0, day_num // 2, symbol_num) * (rng.random(symbol_num) < 0.3)
+    missing |= np.arange(day_num)[:, None] < listing
+    for x in (close, high, low):
+        x[missing] = np.nan
+    return close, high, low
+
+
+def max_diff(a, b):
+    both = ~(np.isnan(a) & np.isnan(b))
+    assert (np.isnan(a) == np.isnan(b)).all(), "NaN positions differ"
+    return np.nanmax(np.abs(a[both] - b[both]) / np.maximum(1, np.abs(b[both]))) if both.any() else 0.0
+
+
+if __name__ == "__main__":
+    symbol_num = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    day_num = int(sys.argv[2]) if len(sys.argv) > 2 else 2500
+    sample_num = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    rng = np.random.default_rng(0)
+    close, high, low = make_panel(symbol_num, day_num + 1, rng)
+    history = (close[:-1], high[:-1], low[:-1])
+
+    engine = IndicatorEngine()
+    start = time.perf_counter()
+    panel_result = engine.compute(*history)
+    panel_cost = time.perf_counter() - start
+
+    sample = rng.choice(symbol_num, sample_num, replace=False)
+    start = time.perf_counter()
+    worst = 0.0
+    for col in sample:
+        valid = ~np.isnan(history[0][:, col])
+        series = [pd.Series(x[valid, col]) for x in history]
+        expected = per_symbol_indicators(*series)
+        for name, values in expected.items():
+            worst = max(worst, max_diff(panel_result[name][valid, col], values.to_numpy()))
+    loop_cost = (time.perf_counter() - start) / sample_num * symbol_num
+    assert worst < 1e-8, f"panel result differs from per-symbol result: {worst}"
+
+    # 追加一根日线：增量更新 vs 完整重新计算
+    del panel_result
+    start = time.perf_counter()
+    updated = engine.update(close[-1], high[-1], low[-1])
+    update_cost = time.perf_counter() - start
+    start = time.perf_counter()
+    full = IndicatorEngine().compute(close, high, low)
+    recompute_cost = time.perf_counter() - start
+    update_worst = max(max_diff(updated[name], full[name][-1]) for name in full)
+    assert update_worst < 1e-8, f"incremental update differs from full recompute: {update_worst}"
+
+    print(f"{symbol_num} symbols x {day_num} days, {len(engine.columns)} indicators")
+    print(f"[per-symbol pandas] {loop_cost:8.2f} s (extrapolated from {sample_num} symbols)")
+    print(f"[panel compute]     {panel_cost:8.2f} s  max rel diff {worst:.1e}")
+    print(f"[append one bar]    full recompute {recompute_cost:.2f} s, incremental update {update_cost * 1000:.1f} ms  max rel diff {update_worst:.1e}")
@@ -0,0 +1,72 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+from core.resource.agent import AILLM
+from core.resource.llm_cache import LLMResponseCache
+from function_test.map_reduce_benchmark import FakeChatHandler, make_documents
+from utils.embedding_module import get_default_service
+
+'''
+该文件用于测试大模型回答缓存的效果（使用 map_reduce_benchmark 中的本地模拟接口，每次请求固定耗时 latency 秒）：
+1. 精确缓存：同一份资料连续分析两次（模拟上游数据未变化时的每日重跑），比较耗时、实际请求次数与 token 用量
+2. 修改其中一份资料后再次分析：只有受影响的 map 块与 reduce 重新请求
+3. 语义缓存：对措辞略有不同的短问题（标点、空格、语气词不同）统计命中率，需要真实的句向量模型
+使用方法（需在项目根目录下执行）:
+    python -m function_test.llm_cache_benchmark [doc_num] [latency]
+'''
+
+QUESTIONS = [
+    "贵州茅台最近一个季度的营业收入是多少？",
+    "宁德时代的毛利率变化趋势如何？",
+    "比亚迪今年的净利润同比增长了多少？",
+    "招商银行的不良贷款率是否有所上升？",
+    "中国平安的分红政策有什么变化？",
+]
+
+PARAPHRASES = [
+    "贵州茅台最近一个季度的营业收入是多少",
+    "宁德时代的毛利率变化趋势如何呢？",
+    "比亚迪今年的净利润同比增长了多少?",
+    "招商银行的不良贷款率是否有所上升呢",
+    "中国平安的分红政策有什么变化吗？",
+]
+
+
+def run(name, func):
+    report = func()["report"]
+    print(f"[{name:<26}] wall {report['wall_time']:6.2f} s  {report['calls'] - report['cache_hits']:>3} requests  "
+          f"{report['cache_hits']:>3} cache hits  {report['total_tokens']:>6} tokens used  {report['saved_tokens']:>6} tokens saved")
+
+
+if __name__ == "__main__":
+    doc_num = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    FakeChatHandler.latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    tmp_dir = tempfile.mkdtemp(prefix="llm_cache_benchmark_")
+    try:
+        llm = AILLM(api_key="fake", endpoint_url=f"http://127.0.0.1:{server.server_port}/v1", model_name="fake",
+                    temperature=0.7, max_tokens=1024, use_short_term_memory=False, context_tokens=8192, stock_code="600519")
+        cache = LLMResponseCache(os.path.join(tmp_dir, "responses.db"))
+        llm.set_response_cache(cache)
+        documents = make_documents(doc_num)
+        print(f"{doc_num} documents, {FakeChatHandler.latency}s per request")
+        run("map_reduce, cold cache", lambda: llm.map_reduce_chat("分析公司经营情况", documents))
+        run("map_reduce, unchanged", lambda: llm.map_reduce_chat("分析公司经营情况", documents))
+        documents[f"资料{doc_num - 1}"] += "\n新增公告：公司发布回购计划。"
+        run("map_reduce, 1 doc changed", lambda: llm.map_reduce_chat("分析公司经营情况", documents))
+        print(f"exact cache stats: {cache.stats()}")
+
+        semantic_cache = LLMResponseCache(os.path.join(tmp_dir, "semantic.db"), semantic=True, embedding=get_default_service())
+        llm.set_response_cache(semantic_cache)
+        llm.chat_batch(QUESTIONS)
+        llm.chat_batch(PARAPHRASES)
+        print(f"semantic cache stats after {len(QUESTIONS)} questions + {len(PARAPHRASES)} paraphrases: {semantic_cache.stats()}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
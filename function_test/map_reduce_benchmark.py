@@ -0,0 +1,72 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.resource.agent import AILLM
+from utils.token_utils import count_tokens
+
+'''
+该文件用于比较长文本分析的两种方式的耗时与请求次数：
+1. refine_chat: 每个文档依次调用一次模型
+2. map_reduce_chat: 各块并发分析（map）后逐层并发合并（reduce）
+使用本地模拟的 OpenAI 兼容接口，每次请求固定耗时 latency 秒并返回 usage，因此结果只反映请求的编排方式
+使用方法（需在项目根目录下执行）:
+    python -m function_test.map_reduce_benchmark [doc_num] [latency] [max_concurrency]
+'''
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        time.sleep(self.latency)
+        answer = f"分析结果：输入 {count_tokens(prompt)} tokens。" + "要点。" * 100
+        data = json.dumps({
+            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": count_tokens(prompt), "completion_tokens": count_tokens(answer),
+                      "total_tokens": count_tokens(prompt) + count_tokens(answer)},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_documents(doc_num):
+    # 每份资料约 1500 tokens，模拟财报、新闻等各项输入
+    return {f"资料{i}": "\n".join(f"第{i}份资料第{j}行：营业收入同比增长{j % 17}%，净利润率{j % 9}%。" for j in range(70))
+            for i in range(doc_num)}
+
+
+if __name__ == "__main__":
+    doc_num = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    FakeChatHandler.latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    max_concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        llm = AILLM(api_key="fake", endpoint_url=f"http://127.0.0.1:{server.server_port}/v1", model_name="fake",
+                    temperature=0.7, max_tokens=1024, use_short_term_memory=False,
+                    max_concurrency=max_concurrency, context_tokens=8192)
+        documents = make_documents(doc_num)
+        print(f"{doc_num} documents, {sum(count_tokens(d) for d in documents.values())} tokens, "
+              f"{FakeChatHandler.latency}s per request, max_concurrency={max_concurrency}")
+        for name, run in [("refine", lambda: llm.refine_chat("分析公司经营情况", documents)),
+                          ("map_reduce", lambda: llm.map_reduce_chat("分析公司经营情况", documents))]:
+            report = run()["report"]
+            print(f"[{name:<10}] wall {report['wall_time']:6.2f} s  {report['calls']:>3} calls  {report['rounds']:>2} rounds  "
+                  f"sum of call latency {report['call_latency_sum']:6.2f} s  {report['total_tokens']} tokens")
+            for call in report["details"]:
+                print(f"    {call}")
+    finally:
+        server.shutdown()
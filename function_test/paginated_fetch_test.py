@@ -0,0 +1,87 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import akshare.utils.func as ak_func
+import akshare.utils.tqdm as ak_tqdm
+
+'''
+该文件用于验证 fetch_paginated_data 并发获取分页的结果与顺序获取完全一致，并比较两者耗时
+本地模拟服务器为每页加入固定延迟，并让部分页面第一次请求时返回 500 或 data 为 null，以验证单页重试
+使用方法（需在项目根目录下执行）:
+    python -m function_test.paginated_fetch_test [pages] [workers]
+'''
+
+PAGE_SIZE = 100
+PAGE_LATENCY = 0.05
+FLAKY_PAGES = {3, 17, 42}
+
+
+class FlakyPagedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    total_pages = 55
+    lock = threading.Lock()
+    failed_pages = set()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        page = int(query.get("pn", ["1"])[0])
+        time.sleep(PAGE_LATENCY)
+        with self.lock:
+            flaky = page in FLAKY_PAGES and page not in self.failed_pages
+            if flaky:
+                self.failed_pages.add(page)
+        if flaky:
+            # 交替模拟服务端错误与被限流时返回的空数据
+            if page % 2:
+                self._send_json(500, {"error": "busy"})
+            else:
+                self._send_json(200, {"data": None})
+            return
+        diff = [{"f12": f"{page:03d}{i:03d}", "f3": round((page * 7919 + i * 104729) % 2000 / 100 - 10, 2)}
+                for i in range(PAGE_SIZE)]
+        self._send_json(200, {"data": {"total": self.total_pages * PAGE_SIZE - 37, "diff": diff}})
+
+    def log_message(self, *args):
+        pass
+
+
+def fetch(url, workers):
+    FlakyPagedHandler.failed_pages = set()
+    params = {"pn": "1", "pz": str(PAGE_SIZE), "po": "1", "fid": "f3"}
+    start = time.perf_counter()
+    df = ak_func.fetch_paginated_data(url, params, max_workers=workers)
+    return df, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 55
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    FlakyPagedHandler.total_pages = pages
+    ak_func.get_tqdm = lambda: ak_tqdm.get_tqdm(enable=False)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyPagedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/qt/clist/get"
+
+    sequential_df, sequential_cost = fetch(url, 1)
+    concurrent_df, concurrent_cost = fetch(url, workers)
+    server.shutdown()
+
+    pd.testing.assert_frame_equal(sequential_df, concurrent_df)
+    print(f"{pages} pages ({len(FLAKY_PAGES)} flaky), {len(concurrent_df)} rows: results identical")
+    print(f"sequential: {sequential_cost:.2f}s  concurrent ({workers} workers): {concurrent_cost:.2f}s")
@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.taskNode import TaskNode
+from utils.parquet_store import read_parquet_store
+
+'''
+该文件用于比较 TaskNode 的 CSV（save: 2）与 Parquet（save: 3）两种文件存储方式：
+以模拟的多只股票日线作为 task 结果，比较写入耗时、文件大小、读取单只股票一段时间内数据的耗时，
+并验证 Parquet 保留 update_time 等列的数据类型、多次追加写入后的分区合并与去重结果
+使用方法（需在项目根目录下执行）:
+    python -m function_test.parquet_store_benchmark [symbols] [days]
+'''
+
+
+class FakeHistoryTask(TaskNode):
+    def _custom_task(self, resource_conf, params):
+        return {"status": "success", "data": params["data"], "error": None}
+
+
+def make_history(symbols: int, days: int) -> pd.DataFrame:
+    """构造与 FetchAShareHistory 结果格式一致的日线（update_time 为 "YYYY-MM-DD 23:59:59" 字符串）"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end="2025-03-07", periods=days).strftime("%Y-%m-%d 23:59:59")
+    frames = []
+    for i in range(symbols):
+        df = pd.DataFrame(rng.random((days, 6)) * 100, columns=["open", "high", "low", "close", "volume", "amount"])
+        df.insert(0, "update_time", dates)
+        df.insert(0, "symbol", f"{i:06d}")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def save(data, save_type, save_path, parquet_path):
+    task = FakeHistoryTask(name_id="history", params={"save": save_type, "data": data, "max_files": 4},
+                           glob_params={"save_path": save_path, "parquet_path": parquet_path})
+    start = time.perf_counter()
+    task._post_process(None, {"status": "success", "data": data, "error": None})
+    return time.perf_counter() - start
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    workdir = tempfile.mkdtemp()
+    csv_path = os.path.join(workdir, "csv")
+    parquet_path = os.path.join(workdir, "parquet")
+    data = make_history(symbols, days)
+    target = "000007"
+    start, end = "2024-01-01", "2024-06-30"
+
+    try:
+        csv_write = save(data, 2, csv_path, parquet_path)
+        parquet_write = save(data, 3, csv_path, parquet_path)
+
+        begin = time.perf_counter()
+        csv_df = pd.read_csv(os.path.join(csv_path, "history.csv"), encoding="utf-8-sig", dtype={"symbol": str})
+        csv_df = csv_df[(csv_df["symbol"] == target) & (csv_df["update_time"] >= start) & (csv_df["update_time"] <= end + " 23:59:59")]
+        csv_read = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        parquet_df = read_parquet_store(parquet_path, "FakeHistoryTask", symbols=[target], start=start, end=end + " 23:59:59")
+        parquet_read = time.perf_counter() - begin
+
+        assert len(csv_df) == len(parquet_df) > 0, (len(csv_df), len(parquet_df))
+        assert parquet_df["symbol"].eq(target).all()
+        assert pd.api.types.is_datetime64_any_dtype(parquet_df["update_time"]), parquet_df.dtypes
+        assert np.allclose(csv_df["close"].to_numpy(), parquet_df.sort_values("update_time")["close"].to_numpy())
+
+        print(f"rows: {len(data)}  symbols: {symbols}  query: {target} {start} ~ {end} ({len(parquet_df)} rows)")
+        print(f"[    csv] write: {csv_write * 1000:7.0f} ms  size: {dir_size(csv_path) / 1024 / 1024:6.2f} MB  read: {csv_read * 1000:6.1f} ms")
+        print(f"[parquet] write: {parquet_write * 1000:7.0f} ms  size: {dir_size(parquet_path) / 1024 / 1024:6.2f} MB  read: {parquet_read * 1000:6.1f} ms")
+        print(f"parquet dtypes: {dict(parquet_df.dtypes.astype(str))}")
+
+        # 重复追加最近一个月的数据（含修正后的收盘价），超过 max_files 后分区被合并，且每根日线只保留最后写入的一行
+        last_month = data[data["update_time"] >= "2025-03-01"].copy()
+        for i in range(5):
+            last_month["close"] = float(i)
+            save(last_month, 3, csv_path, parquet_path)
+        partition_dir = os.path.join(parquet_path, "task=FakeHistoryTask", f"symbol={target}", "trade_year=2025")
+        part_files = [f for f in os.listdir(partition_dir) if f.endswith(".parquet")]
+        latest = read_parquet_store(parquet_path, "FakeHistoryTask", symbols=[target], start="2025-03-01")
+        print(f"after 6 appends: {len(part_files)} part files in {partition_dir}, rows: {len(latest)}, close: {sorted(latest['close'].unique())}")
+        assert len(part_files) <= 4
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,91 @@
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import tasks
+from core.pipeline import Pipeline, PipelineExecutor
+from core.taskNode import TaskNode
+
+'''
+该文件用于比较 PipelineExecutor 依赖计数调度与原先“按批次等待 + 1s 轮询”调度在合成 DAG 上的总耗时（makespan）
+使用方法（需在项目根目录下执行）:
+    python -m function_test.pipeline_executor_benchmark [task_num] [workers]
+'''
+
+
+class SleepTask(TaskNode):
+    """模拟耗时任务，耗时由 params["cost"] 指定"""
+    def _custom_task(self, resource_config, params=None):
+        time.sleep(params.get("cost", 0))
+        return {"status": "success", "data": "", "error": None}
+
+
+class WavePipelineExecutor(PipelineExecutor):
+    """原先的调度方式：每轮提交所有就绪task，等待整批完成后休眠1s再重新扫描"""
+    def _safe_run(self):
+        try:
+            while self.running:
+                futures = {}
+                for task in self.pipeline.get_ready_tasks():
+                    with task.lock:
+                        task.status = "running"
+                        if task.dep_map is not None:
+                            task.set_task_params_base_on_dep()
+                    task_class, name_id, params, glob_params = task.get_executor_args()
+                    future = self.executor.submit(TaskNode.static_execute, task_class, self.resource_conf, name_id, params, glob_params)
+                    futures[future] = task
+                for future in as_completed(futures):
+                    self._handle_result(futures[future], future)
+                if not self.pipeline.get_if_has_pending_tasks():
+                    self.running = False
+                time.sleep(1)
+        finally:
+            self.running = False
+            self.pipeline.status = "success"
+
+
+def build_dag_conf(task_num: int, seed: int = 0) -> dict:
+    """构建随机 DAG：每个task依赖0~3个编号更小的task，耗时服从对数正态分布（少量长尾任务）"""
+    rng = random.Random(seed)
+    task_confs = []
+    for i in range(task_num):
+        deps = rng.sample(range(max(0, i - 50), i), k=min(i, rng.randint(0, 3))) if i else []
+        task_confs.append({
+            "name": f"task_{i}",
+            "task_class": "SleepTask",
+            "params": {"cost": min(rng.lognormvariate(-2.5, 1.0), 2.0)},
+            "dependencies": {f"task_{d}": "" for d in deps},
+        })
+    return {"name": "executor_benchmark", "tasks": task_confs}
+
+
+def run(executor_class, conf: dict, pool) -> float:
+    pipeline = Pipeline(conf)
+    pipeline_exec = executor_class(pipeline, "", dynamic_loader=None, executor=pool, debug=False)
+    pipeline_exec.logger.disabled = True
+    done = threading.Event()
+    start = time.perf_counter()
+    pipeline_exec.running = True
+    thread = threading.Thread(target=lambda: (pipeline_exec._safe_run(), done.set()), daemon=True)
+    thread.start()
+    done.wait()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    task_num = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    tasks.TASK_CLASS_REGISTRY["SleepTask"] = SleepTask
+    conf = build_dag_conf(task_num)
+    total_cost = sum(t["params"]["cost"] for t in conf["tasks"])
+    print(f"{task_num} tasks, {workers} workers, total task cost {total_cost:.1f}s")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 预热进程池
+        list(pool.map(time.sleep, [0] * workers))
+        wave_cost = run(WavePipelineExecutor, conf, pool)
+        print(f"[wave + polling] makespan: {wave_cost:.2f}s")
+        event_cost = run(PipelineExecutor, conf, pool)
+        print(f"[dependency counting] makespan: {event_cost:.2f}s")
@@ -0,0 +1,74 @@
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from core.resource.agent import AILLM
+from function_test.map_reduce_benchmark import FakeChatHandler
+from utils.prompt_serializer import serialize_for_prompt
+from utils.token_utils import count_tokens
+
+'''
+该文件用于比较依赖结果放入 prompt 时的几种文本形式的 token 数，以及对长文本分析请求次数的影响：
+1. DataFrame.to_string()（TaskNode 原先的拼接方式）与 str(df)（FetchAILLMChat 原先的转换方式）
+2. 紧凑 CSV（serialize_for_prompt 不指定预算）
+3. 按单次请求的资料预算压缩后的文本
+数据为模拟的 years 年日线行情与 56 个报告期的财报；并比较 count_tokens 首次计数与重复计数（缓存）的耗时
+使用方法（需在项目根目录下执行）:
+    python -m function_test.prompt_serializer_benchmark [years] [latency]
+'''
+
+
+def make_history(years, rng):
+    dates = pd.bdate_range(end="2024-12-31", periods=years * 245)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({
+        "update_time": dates.strftime("%Y-%m-%d 23:59:59"), "open": close * 0.99, "high": close * 1.02, "low": close * 0.98,
+        "close": close, "volume": rng.integers(1e6, 1e8, len(dates)).astype(float), "amount": rng.random(len(dates)) * 1e9,
+        "turnover": rng.random(len(dates)), "symbol": "600519",
+    })
+
+
+def make_fin_report(rng):
+    report_dates = pd.date_range("2010-03-31", periods=56, freq="QE")
+    return pd.DataFrame({"REPORT_DATE": report_dates, **{f"ITEM_{i}": rng.random(56) * 1e10 for i in range(120)}})
+
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    FakeChatHandler.latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    rng = np.random.default_rng(0)
+    all_data = {"get_share_history": make_history(years, rng), "get_financial_report": make_fin_report(rng)}
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        llm = AILLM(api_key="fake", endpoint_url=f"http://127.0.0.1:{server.server_port}/v1", model_name="fake",
+                    temperature=0.7, max_tokens=1024, use_short_term_memory=False, context_tokens=8192)
+        budget = llm.input_budget("分析公司经营情况")
+        for name, data in all_data.items():
+            print(f"{name}: {data.shape}")
+            for label, func in [("to_string", lambda: data.to_string()), ("str", lambda: str(data)),
+                                ("compact csv", lambda: serialize_for_prompt(data)),
+                                (f"budget {budget}", lambda: serialize_for_prompt(data, budget))]:
+                start = time.perf_counter()
+                text = func()
+                cost = time.perf_counter() - start
+                print(f"    [{label:<12}] {len(text):>8} chars  {count_tokens(text):>7} tokens  {cost * 1000:7.1f} ms")
+
+        # 追加一个字符，避免命中前面已计数过的文本
+        text = all_data["get_share_history"].to_string() + "\n"
+        for label in ("cold", "cached"):
+            start = time.perf_counter()
+            count_tokens(text)
+            print(f"[count_tokens {label:<6}] {(time.perf_counter() - start) * 1000:7.2f} ms ({len(text)} chars)")
+
+        for label, convert in [("to_string", lambda d: d.to_string()), ("serializer", lambda d: serialize_for_prompt(d, budget))]:
+            report = llm.map_reduce_chat("分析公司经营情况", {name: convert(data) for name, data in all_data.items()})["report"]
+            print(f"[map_reduce, {label:<10}] {report['calls']:>3} requests  {report['rounds']} rounds  "
+                  f"{report['total_tokens']:>7} tokens  wall {report['wall_time']:.2f} s")
+    finally:
+        server.shutdown()
@@ -0,0 +1,72 @@
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from akshare.utils.context import config as akshare_config
+from core.resource.rate_limiter import HostRateLimiter
+
+'''
+该文件用于验证按域名限流在多个进程间共享：本地启动HTTP服务，多个进程同时请求，统计服务端观察到的请求速率与最大并发数
+使用方法（需在项目根目录下执行）:
+    python -m function_test.rate_limiter_test [processes] [requests_per_process]
+'''
+
+RATE = 10
+MAX_CONCURRENCY = 2
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    arrivals = []
+
+    def do_GET(self):
+        cls = CountingHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            cls.arrivals.append(time.time())
+        time.sleep(0.05)
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def worker(url, state_dir, n):
+    limiter = HostRateLimiter({"127.0.0.1": {"rate": RATE, "burst": 1, "max_concurrency": MAX_CONCURRENCY}}, state_dir=state_dir)
+    akshare_config.set_rate_limiter(limiter)
+    for _ in range(n):
+        requests.get(url, timeout=10)
+
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_process = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        start = time.time()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            list(pool.map(worker, [url] * processes, [state_dir] * processes, [per_process] * processes))
+        cost = time.time() - start
+    server.shutdown()
+
+    arrivals = sorted(CountingHandler.arrivals)
+    observed_rate = (len(arrivals) - 1) / (arrivals[-1] - arrivals[0])
+    print(f"{len(arrivals)} requests from {processes} processes in {cost:.2f}s")
+    print(f"observed rate: {observed_rate:.2f} req/s (limit {RATE})")
+    print(f"max in-flight: {CountingHandler.max_in_flight} (limit {MAX_CONCURRENCY})")
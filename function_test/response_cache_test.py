@@ -0,0 +1,86 @@
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from akshare.utils.context import config as akshare_config
+from core.resource.response_cache import ResponseCache
+
+'''
+该文件用于验证 akshare 响应缓存：按规则缓存、命中后不再访问服务器、"bar" 有效期在时间段切换后失效、超过容量后按 LRU 淘汰
+使用方法（需在项目根目录下执行）:
+    python -m function_test.response_cache_test
+'''
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self):
+        CountingHandler.requests_served += 1
+        body = (self.path * 200).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    # 时间段划分：开盘后每 30 分钟一段，午休为一段
+    bar_key = ResponseCache.bar_key
+    assert bar_key(datetime(2025, 1, 2, 9, 31)) == bar_key(datetime(2025, 1, 2, 9, 59)) == "2025-01-02 09:30"
+    assert bar_key(datetime(2025, 1, 2, 10, 0)) != bar_key(datetime(2025, 1, 2, 9, 59))
+    assert bar_key(datetime(2025, 1, 2, 11, 30)) == bar_key(datetime(2025, 1, 2, 12, 59)) == "2025-01-02 11:30"
+    assert bar_key(datetime(2025, 1, 2, 8, 0)) == bar_key(datetime(2025, 1, 1, 20, 0)) == "2025-01-01 15:00"
+
+    current_bar = ["2025-01-02 10:00"]
+    ResponseCache.bar_key = classmethod(lambda cls, now=None: current_bar[0])
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(
+            rules=[{"pattern": "/macro", "ttl": 86400}, {"pattern": "/quote", "ttl": "bar"}],
+            cache_dir=cache_dir,
+            max_size_mb=0.05,
+        )
+        akshare_config.set_response_cache(cache)
+
+        # 同一 URL + 参数只请求一次，参数不同则分别缓存
+        first = requests.get(f"{base}/macro", params={"report": "lpr"})
+        second = requests.get(f"{base}/macro", params={"report": "lpr"})
+        requests.get(f"{base}/macro", params={"report": "rrr"})
+        assert first.content == second.content and getattr(second, "from_cache", False)
+        assert CountingHandler.requests_served == 2, CountingHandler.requests_served
+
+        # 未匹配规则的请求不缓存
+        requests.get(f"{base}/other")
+        requests.get(f"{base}/other")
+        assert CountingHandler.requests_served == 4
+
+        # 行情在同一时间段内命中，进入下一时间段后重新请求
+        requests.get(f"{base}/quote")
+        requests.get(f"{base}/quote")
+        assert CountingHandler.requests_served == 5
+        current_bar[0] = "2025-01-02 10:30"
+        requests.get(f"{base}/quote")
+        assert CountingHandler.requests_served == 6
+        print("ttl checks passed:", cache.stats())
+
+        # 写入超过容量的数据后，最早访问的条目被淘汰
+        requests.get(f"{base}/macro", params={"report": "lpr"})
+        for i in range(40):
+            requests.get(f"{base}/macro", params={"page": i})
+        stats = cache.stats()
+        assert stats["evictions"] > 0 and stats["size_mb"] <= 0.05, stats
+        print("eviction checks passed:", stats)
+
+        akshare_config.set_response_cache(None)
+    server.shutdown()
@@ -0,0 +1,71 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.screening import compile_screen, run_screen
+
+'''
+该文件用于比较 FetchTargetShare（source 为 cache）原先使用的 pandasql 与 utils.screening 列式选股引擎的耗时：
+构造 symbol_num 只股票的全市场实时行情（列与 preprocess_all_a_share_spot 一致），对 config/tasks 模板中的 SQL 与若干常用筛选
+分别执行，比较单次耗时并验证两者结果一致（需安装 pandasql，未安装时只统计引擎耗时）
+使用方法（需在项目根目录下执行）:
+    python -m function_test.screening_benchmark [symbol_num] [rounds]
+'''
+
+QUERIES = [
+    # config/tasks/test_workflow.json
+    "SELECT r.* FROM ashare_data AS r WHERE r.update_time = (SELECT MAX(update_time) FROM ashare_data) ORDER BY r.turnover DESC LIMIT 3;",
+    "SELECT symbol, name, price FROM ashare_data WHERE pe_dynamic BETWEEN 0 AND 20 AND pb_ratio < 1.5 ORDER BY circulating_value DESC LIMIT 20",
+    "SELECT symbol, name, change_percent FROM ashare_data WHERE name NOT LIKE '%ST%' AND volume_ratio > 2 ORDER BY change_percent DESC, symbol LIMIT 10",
+    "SELECT industry, COUNT(*) AS num, AVG(change_percent) AS avg_change FROM ashare_data GROUP BY industry HAVING COUNT(*) > 100 ORDER BY avg_change DESC",
+]
+
+
+def make_spot(symbol_num, rng):
+    return pd.DataFrame({
+        "symbol": [f"{i:06d}" for i in range(symbol_num)],
+        "name": rng.choice(["平安银行", "*ST华夏", "贵州茅台", "宁德时代", "ST康美"], symbol_num),
+        "industry": rng.choice([f"行业{i}" for i in range(30)], symbol_num),
+        "price": rng.uniform(1, 200, symbol_num).round(2),
+        "change_percent": rng.normal(0, 3, symbol_num).round(2),
+        "volume_ratio": rng.lognormal(0, 0.5, symbol_num).round(2),
+        "turnover": rng.uniform(0, 20, symbol_num).round(2),
+        "pe_dynamic": np.where(rng.random(symbol_num) < 0.05, np.nan, rng.normal(30, 40, symbol_num).round(2)),
+        "pb_ratio": rng.lognormal(0.5, 0.6, symbol_num).round(2),
+        "circulating_value": rng.lognormal(23, 1, symbol_num).round(0),
+        "update_time": rng.choice(["2025-06-02 15:00:00", "2025-06-03 15:00:00"], symbol_num),
+    })
+
+
+def timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return result, (time.perf_counter() - start) / rounds
+
+
+if __name__ == "__main__":
+    symbol_num = int(sys.argv[1]) if len(sys.argv) > 1 else 5500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    try:
+        import pandasql
+    except ImportError:
+        pandasql = None
+    ashare_data = make_spot(symbol_num, np.random.default_rng(0))
+    tables = {"ashare_data": ashare_data}
+
+    print(f"{symbol_num} symbols, {rounds} rounds per query")
+    for sql in QUERIES:
+        start = time.perf_counter()
+        compile_screen(sql)
+        compile_cost = time.perf_counter() - start
+        result, engine_cost = timed(lambda: run_screen(sql, tables), rounds)
+        line = f"[engine] {engine_cost * 1000:6.2f} ms (compile {compile_cost * 1000:.2f} ms, cached afterwards)"
+        if pandasql is not None:
+            expected, pandasql_cost = timed(lambda: pandasql.sqldf(sql, tables), max(1, rounds // 10))
+            expected.columns = result.columns
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+            line += f"  [pandasql] {pandasql_cost * 1000:7.1f} ms  same result"
+        print(f"{line}\n    {sql}")
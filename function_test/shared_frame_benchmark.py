@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import tasks
+from core.pipeline import Pipeline, PipelineExecutor
+from core.shared_frame import SharedFrameStore
+from core.taskNode import TaskNode
+
+'''
+该文件用于比较进程通道中 task 之间传递大 DataFrame 的两种方式：
+pickle（worker -> 主进程 -> worker 多次序列化）与共享内存段句柄（只传递句柄，依赖 task 在 worker 中内存映射加载）
+测试 DAG 为一个产出 DataFrame 的 task，后接 chain_len 个逐个处理该 DataFrame 的 task，以及 fan_out 个读取最终结果的 task
+并验证临时 pipeline 结束后所有段文件均已释放
+使用方法（需在项目根目录下执行）:
+    python -m function_test.shared_frame_benchmark [rows] [chain_len] [fan_out]
+'''
+
+
+class ProduceFrameTask(TaskNode):
+    def _custom_task(self, resource_config, params=None):
+        rng = np.random.default_rng(0)
+        rows = params["rows"]
+        df = pd.DataFrame(rng.random((rows, 8)), columns=[f"f{i}" for i in range(8)])
+        df.insert(0, "symbol", pd.Series(rng.integers(0, 5000, rows)).map("{:06d}".format))
+        return {"status": "success", "data": df, "error": None}
+
+
+class TransformFrameTask(TaskNode):
+    def _custom_task(self, resource_config, params=None):
+        df = params["frame"]
+        df["f0"] = df["f0"] + 1
+        return {"status": "success", "data": df, "error": None}
+
+
+class SummarizeFrameTask(TaskNode):
+    def _custom_task(self, resource_config, params=None):
+        return {"status": "success", "data": f"{params['frame']['f0'].sum():.6f}", "error": None}
+
+
+def build_conf(rows: int, chain_len: int, fan_out: int) -> dict:
+    task_confs = [{"name": "produce", "task_class": "ProduceFrameTask", "params": {"rows": rows}, "dependencies": {}}]
+    prev = "produce"
+    for i in range(chain_len):
+        task_confs.append({"name": f"transform_{i}", "task_class": "TransformFrameTask", "params": {"frame": None}, "dependencies": {prev: "frame"}})
+        prev = f"transform_{i}"
+    for i in range(fan_out):
+        task_confs.append({"name": f"summarize_{i}", "task_class": "SummarizeFrameTask", "params": {"frame": None}, "dependencies": {prev: "frame"}})
+    return {"name": "shared_frame_benchmark", "if_tmp": True, "tasks": task_confs}
+
+
+def run(conf: dict, pool, frame_store: SharedFrameStore):
+    pipeline = Pipeline(conf)
+    pipeline_exec = PipelineExecutor(pipeline, "", dynamic_loader=None, executor=pool, debug=False, frame_store=frame_store)
+    pipeline_exec.logger.disabled = True
+    start = time.perf_counter()
+    pipeline_exec.running = True
+    pipeline_exec._safe_run()
+    cost = time.perf_counter() - start
+    assert all(task.status == "success" for task in pipeline.get_all_tasks())
+    return cost
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    chain_len = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    fan_out = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    for task_class in (ProduceFrameTask, TransformFrameTask, SummarizeFrameTask):
+        tasks.TASK_CLASS_REGISTRY[task_class.__name__] = task_class
+    conf = build_conf(rows, chain_len, fan_out)
+
+    with ProcessPoolExecutor(max_workers=fan_out) as pool:
+        list(pool.map(time.sleep, [0] * fan_out))
+        # min_mb 为无穷大时所有结果都直接 pickle 传递，即原先的方式
+        pickle_cost = run(conf, pool, SharedFrameStore(min_mb=float("inf")))
+        shared_store = SharedFrameStore(min_mb=1)
+        shared_cost = run(conf, pool, shared_store)
+
+    leaked = os.listdir(shared_store.segment_dir) if os.path.isdir(shared_store.segment_dir) else []
+    size_mb = ProduceFrameTask()._custom_task(None, {"rows": rows})["data"].memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{rows} rows (~{size_mb:.0f} MB), {chain_len} transform tasks, {fan_out} readers")
+    print(f"[pickle] makespan: {pickle_cost:.2f}s")
+    print(f"[shared] makespan: {shared_cost:.2f}s  segments left after run: {len(leaked)}  refcounts: {shared_store.refcounts}")
+    assert not leaked
@@ -0,0 +1,91 @@
+import os
+import pickle
+import sys
+import time
+from queue import Queue
+
+import numpy as np
+import pandas as pd
+
+import tasks
+from core.pipeline import Pipeline
+from core.scheduler import Scheduler
+from core.taskNode import TaskNode, next_state_version
+from web.util.state_hub import apply_state_delta
+
+'''
+该文件用于比较 Scheduler._state_sender 原先的完整快照（每个task结果都转换为 JSON / base64）与版本号增量快照的开销：
+构建 pipeline_num 个 pipeline，每个 pipeline 的 task 持有一个 DataFrame 结果，每秒只有少量 task 状态变化，
+比较每次发送的耗时与 pickle 后的大小，并验证 webapp 合并增量后的状态与完整快照一致
+使用方法（需在项目根目录下执行）:
+    python -m function_test.state_delta_benchmark [pipeline_num] [tasks_per_pipeline] [rows]
+'''
+
+
+class HoldResultTask(TaskNode):
+    def _custom_task(self, resource_config, params=None):
+        return {"status": "success", "data": None, "error": None}
+
+
+def legacy_snapshot(pipelines):
+    """原先的发送内容：所有 pipeline 的完整状态，结果为 _process_result 转换后的完整内容"""
+    snapshot = {}
+    for p in pipelines:
+        state = p.get_state()
+        for name, task in p.task_map.items():
+            state["tasks"][name]["result"] = task._process_result(task.result)
+        snapshot[p.name] = state
+    return snapshot
+
+
+if __name__ == "__main__":
+    pipeline_num = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tasks_per_pipeline = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    tasks.TASK_CLASS_REGISTRY["HoldResultTask"] = HoldResultTask
+    rng = np.random.default_rng(0)
+
+    # Scheduler 初始化时在 ./cache 下创建动态注册的缓存文件
+    os.makedirs("./cache", exist_ok=True)
+    scheduler = Scheduler(resource_config="", pipeline_configs=[], state_queue=Queue())
+    for i in range(pipeline_num):
+        pipeline = Pipeline({"name": f"pipeline_{i}", "tasks": [
+            {"name": f"task_{j}", "task_class": "HoldResultTask", "params": {}, "dependencies": {}} for j in range(tasks_per_pipeline)
+        ]})
+        for task in pipeline.get_all_tasks():
+            task.result = pd.DataFrame(rng.random((rows, 6)), columns=list("abcdef"))
+            task.status = "success"
+        scheduler.pipelines.append(pipeline)
+
+    rounds = 5
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy_size = len(pickle.dumps(legacy_snapshot(scheduler.pipelines)))
+    legacy_cost = (time.perf_counter() - start) / rounds
+
+    # 首次发送完整快照（仅摘要），之后每轮有 changes 个 task 状态变化
+    webapp_state = {}
+    since, sent_names = 0, set()
+    changes = 3
+    delta_costs, delta_sizes = [], []
+    for round_id in range(rounds + 1):
+        if round_id:
+            for k in range(changes):
+                task = scheduler.pipelines[(round_id * 7 + k) % pipeline_num].task_map["task_0"]
+                task.status = "running" if task.status == "success" else "success"
+        start = time.perf_counter()
+        version = next_state_version()
+        delta, sent_names = scheduler._build_state_delta(since, sent_names)
+        delta["version"] = version
+        payload = pickle.dumps(delta)
+        since = version
+        delta_costs.append(time.perf_counter() - start)
+        delta_sizes.append(len(payload))
+        webapp_state = apply_state_delta(webapp_state, pickle.loads(payload))
+
+    expected = {p.name: p.get_state() for p in scheduler.pipelines}
+    assert webapp_state == expected, "merged state differs from full snapshot"
+    print(f"{pipeline_num} pipelines x {tasks_per_pipeline} tasks, {rows}-row DataFrame results, {changes} task changes per update")
+    print(f"[legacy full snapshot] {legacy_cost * 1000:8.1f} ms  {legacy_size / 1024:10.1f} KB per update")
+    print(f"[summary full snapshot] {delta_costs[0] * 1000:7.1f} ms  {delta_sizes[0] / 1024:10.1f} KB (first update)")
+    print(f"[delta]                {np.mean(delta_costs[1:]) * 1000:8.2f} ms  {np.mean(delta_sizes[1:]) / 1024:10.1f} KB per update")
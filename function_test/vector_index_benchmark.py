@@ -0,0 +1,133 @@
+import json
+import sys
+import time
+
+import numpy as np
+
+from core.resource.LLMDatabase import VectorDatabaseManager
+
+'''
+该文件用于测试长期记忆向量库的写入速度与 ANN 索引的召回率 / 查询延迟：
+1. 逐条 INSERT（原先的写入方式）与 execute_values / 二进制 COPY 批量写入的速度
+2. 无索引（顺序扫描，精确结果）、HNSW（不同 ef_search）、IVFFlat（不同 probes）下 top_k 查询的平均延迟与 recall@top_k
+3. 按 stock_code 过滤（精确检索）与按 metadata 过滤（ANN 后过滤）的查询延迟与召回率
+召回率以 numpy 暴力计算的 L2 最近邻为准；测试数据为低维空间中成簇、随机投影到 384 维的归一化向量，
+写入 vector_record 表的 bench 分区（平均分布在 stock_num 只股票上），测试结束后删除该分区
+使用方法（需在项目根目录下执行，默认读取 resource_conf.json 中 LLMMemoryManager 的 db_params，数据库需安装 pgvector）:
+    python -m function_test.vector_index_benchmark [rows] [queries] [stock_num] [db_params_json]
+'''
+
+MEMORY_TYPE = "bench"
+DIM = 384
+TOP_K = 10
+
+
+def make_vectors(rows, rng, clusters=200, latent_dim=32):
+    # 句向量的有效维度远低于 384，此处在低维空间中生成簇后随机投影到 DIM 维，并叠加少量噪声
+    projection = np.random.default_rng(42).standard_normal((latent_dim, DIM)).astype(np.float32)
+    centers = np.random.default_rng(43).standard_normal((clusters, latent_dim)).astype(np.float32)
+    latent = centers[rng.integers(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, latent_dim)).astype(np.float32)
+    vectors = latent @ projection + 0.5 * rng.standard_normal((rows, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_neighbors(data, queries, mask=None):
+    # 归一化向量的 L2 距离排序与内积排序一致
+    scores = queries @ data.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    top = np.argpartition(-scores, TOP_K, axis=1)[:, :TOP_K]
+    return [set(row) for row in top]
+
+
+def insert_stock(manager, stock, vectors, ids, loop=False):
+    if not loop:
+        manager.insert(MEMORY_TYPE, stock, list(vectors), [str(i) for i in ids], [{"id": int(i), "even": int(i) % 2 == 0} for i in ids])
+        return
+    # 原先的写入方式：每条记录一次 execute，最后统一提交
+    sql = "INSERT INTO vector_record (memory_type, stock_symbol, embedding, content, params) VALUES (%s, %s, %s, %s, %s)"
+    with manager.cursor() as cursor:
+        for emb, i in zip(vectors, ids):
+            cursor.execute(sql, (MEMORY_TYPE, stock, emb.tolist(), str(i), json.dumps({"id": int(i), "even": int(i) % 2 == 0})))
+    manager.get_partition(MEMORY_TYPE).row_count += len(ids)
+
+
+def run_queries(manager, queries, truth, **kwargs):
+    recalls = []
+    start = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        found = {int(r["content"]) for r in manager.search(query, TOP_K, MEMORY_TYPE, **kwargs)}
+        recalls.append(len(found & expected) / TOP_K)
+    return (time.perf_counter() - start) / len(queries) * 1000, float(np.mean(recalls))
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    query_num = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    stock_num = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    if len(sys.argv) > 4:
+        db_params = json.loads(sys.argv[4])
+    else:
+        with open("./config/resource/resource_conf.json", "r", encoding="utf-8") as f:
+            db_params = json.load(f)["LLMMemoryManager"]["db_params"]
+
+    rng = np.random.default_rng(0)
+    data = make_vectors(rows, rng)
+    stocks = np.arange(rows) % stock_num
+    queries = make_vectors(query_num, np.random.default_rng(1))
+    truth = exact_neighbors(data, queries)
+
+    # 手动管理索引，写入阶段不自动建索引
+    manager = VectorDatabaseManager(DIM, db_params, {"type": "none"})
+    with manager.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS vector_record_{MEMORY_TYPE}")
+    manager.get_partition(MEMORY_TYPE)
+    try:
+        # 写入方式对比：前 2% 的股票逐条写入，之后 2% 每次写入 50 条（execute_values），其余每只股票一次写入（COPY）
+        groups = [np.flatnonzero(stocks == stock) for stock in range(stock_num)]
+        edges = [0, max(1, stock_num // 50), max(2, stock_num // 25), stock_num]
+        for name, loop, batch, (lo, hi) in [("row-by-row", True, None, edges[0:2]), ("execute_values", False, 50, edges[1:3]), ("COPY", False, None, edges[2:4])]:
+            start = time.perf_counter()
+            count = 0
+            for stock in range(lo, hi):
+                ids = groups[stock]
+                for begin in range(0, len(ids), batch or len(ids)):
+                    part = ids[begin:begin + (batch or len(ids))]
+                    insert_stock(manager, str(stock), data[part], part, loop)
+                count += len(ids)
+            cost = time.perf_counter() - start
+            print(f"[insert {name:<14}] {count / cost:>9.0f} rows/s ({count} rows)")
+        with manager.cursor() as cursor:
+            cursor.execute(f"ANALYZE vector_record_{MEMORY_TYPE}")
+
+        latency, recall = run_queries(manager, queries, truth)
+        print(f"[seq scan]             {latency:8.2f} ms/query  recall@{TOP_K} {recall:.3f}")
+
+        for index_config, knob, values in [
+            ({"type": "ivfflat"}, "probes", [1, 5, 10, 20, 50]),
+            ({"type": "hnsw", "m": 16, "ef_construction": 64}, "ef_search", [10, 20, 40, 80, 160]),
+        ]:
+            manager.index_config.update(index_config, maintenance_work_mem="512MB")
+            start = time.perf_counter()
+            manager.ensure_index(MEMORY_TYPE, force=True)
+            partition = manager.get_partition(MEMORY_TYPE)
+            print(f"[build {partition.index_type}] {time.perf_counter() - start:.1f} s  (lists={partition.index_lists})")
+            for value in values:
+                latency, recall = run_queries(manager, queries, truth, **{knob: value})
+                print(f"    {knob}={value:<4} {latency:8.2f} ms/query  recall@{TOP_K} {recall:.3f}")
+
+        # 过滤检索（HNSW 索引已建立）
+        stock = 7
+        stock_truth = exact_neighbors(data, queries, stocks == stock)
+        latency, recall = run_queries(manager, queries, stock_truth, stock_code=str(stock))
+        print(f"[stock filter, exact]  {latency:8.2f} ms/query  recall@{TOP_K} {recall:.3f}  ({len(groups[stock])} rows of {stock_num} stocks)")
+        even_truth = exact_neighbors(data, queries, np.arange(rows) % 2 == 0)
+        for ef_search in [40, 160]:
+            latency, recall = run_queries(manager, queries, even_truth, metadata={"even": True}, ef_search=ef_search)
+            print(f"[metadata filter, ANN ef_search={ef_search}] {latency:8.2f} ms/query  recall@{TOP_K} {recall:.3f}  (50% selectivity)")
+        latency, recall = run_queries(manager, queries, even_truth, metadata={"even": True}, exact=True)
+        print(f"[metadata filter, exact] {latency:8.2f} ms/query  recall@{TOP_K} {recall:.3f}")
+    finally:
+        with manager.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS vector_record_{MEMORY_TYPE}")
+        manager.close()
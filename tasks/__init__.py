@@ -1,11 +1,12 @@
 # tasks/__init__.py
+# 各task类通过类属性 execution_lane 声明执行通道（process / thread / async），网络请求类task使用 thread 通道，CPU密集型task（如财报转换、绘图）保持 process
 
 # market function
 from tasks.market_data.fetch_share_data import FetchAllAShareSpot, FetchTargetShare, FetchAShareHistory, FetchKCAShareSpot, FetchGoldPrice, FetchHKMainSpot, UpdataRealSector, FetchFinAbstract, FetchFinReport, FinanceStatement
 from tasks.market_data.fetch_Chinese_market_data import FetchCurrentMidPrice, FetchIntrestRate, FetchReserveRatio
 
 # news function
-from tasks.news_data.fetch_news import FetchDailyNews, FetchBingNews, FetchStockNews
+from tasks.news_data.fetch_news import FetchDailyNews, FetchBingNews, FetchStockNews, FetchArticles
 
 # AI agent
 from tasks.ai_agent_analysis.fetch_ali_llm_chat import FetchAILLMChat
@@ -13,6 +14,7 @@ from tasks.ai_agent_analysis.fetch_ali_llm_chat import FetchAILLMChat
 # data and traditional analyze
 from tasks.traditional_analysis.fetch_data import FetchCompanyData
 from tasks.traditional_analysis.visualize import DrawGraph
+from tasks.traditional_analysis.indicator import ComputeIndicators
 
 TASK_CLASS_REGISTRY = {
     # market function
@@ -35,6 +37,7 @@ TASK_CLASS_REGISTRY = {
     "FetchDailyNews": FetchDailyNews,
     "FetchBingNews": FetchBingNews,
     "FetchStockNews": FetchStockNews,
+    "FetchArticles": FetchArticles,
     
     # AI agent
     "FetchAILLMChat": FetchAILLMChat,
@@ -42,4 +45,5 @@ TASK_CLASS_REGISTRY = {
     # data and traditional analyze
     "FetchCompanyData": FetchCompanyData,
     "DrawGraph": DrawGraph,
+    "ComputeIndicators": ComputeIndicators,
 }
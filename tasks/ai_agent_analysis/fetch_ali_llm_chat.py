@@ -1,10 +1,14 @@
 # tasks/fetch_ali_llm_chat.py
 from core.resource_manager import ResourceManager
 from utils.embedding_module import *
+from utils.prompt_serializer import serialize_for_prompt
+from utils.token_utils import count_tokens
 from core.taskNode import TaskNode
 from langchain.prompts import PromptTemplate
 
 class FetchAILLMChat(TaskNode):
+    execution_lane = "thread"
+
     def _get_analyze_prompt(self):
         # 自定义 Refine 链的 Prompt
         initial_prompt_template = """
@@ -44,6 +48,10 @@ class FetchAILLMChat(TaskNode):
         - user_input: 用户输入内容（必填）
         - all_data: 模型需要的所有prompt，为一个字典，其中包含net_search_prompt + related_data
         - new_memory: 是否每次任务创建新短期记忆（默认False）
+        - use_cache: 是否使用回答缓存（resource_conf 中的 llm_cache，默认True），输入未变化时直接返回缓存的回答
+        - stock_code: 分析的股票代码（可选），语义缓存只在同一股票的请求之间匹配
+        - data_token_budget: all_data 中每个 DataFrame 转换为文本后的 token 上限（默认为单次请求可容纳的资料 token 数）
+        - chain_type: 长文本分析方式，"map_reduce"（默认，各部分并发分析后逐层合并）或 "refine"（逐个文档依次精炼）
         """
         try:
             if params is None:
@@ -52,6 +60,18 @@ class FetchAILLMChat(TaskNode):
             ali_llm = ResourceManager.create("LLM", resource_config)
             if ali_llm is None:
                 raise ValueError("AliLLM instance not found in resource_manager")
+            full_config = ResourceManager.load_config(resource_config)
+            if "rate_limiter" in full_config:
+                ali_llm.set_rate_limiter(ResourceManager.get("rate_limiter", resource_config))
+            if "llm_cache" in full_config and params.get("use_cache", True):
+                try:
+                    ali_llm.set_response_cache(ResourceManager.get("llm_cache", resource_config))
+                except Exception as e:
+                    self.logger.warning(f"LLM cache unavailable, running without cache: {e}")
+            ali_llm.stock_code = params.get("stock_code") or None
+            chain_type = params.get("chain_type", "map_reduce")
+            if chain_type not in ("map_reduce", "refine"):
+                raise ValueError(f"Unknown chain_type: {chain_type}")
             
             user_prompt = params.get("user_prompt")
             if not user_prompt:
@@ -59,7 +79,7 @@ class FetchAILLMChat(TaskNode):
             
             # 通过输入股票代码来初始化长期记忆数据库
             # TODO: 此处查询需要通过关键词在长期记忆中进行查询，可能需要在此处构建一个关键词库。
-            llmdb_manager = ResourceManager.create("LLMdatabase", resource_config)
+            llmdb_manager = ResourceManager.get("LLMdatabase", resource_config)
             long_term_memory = None
             vector_database_prompt = ""
             if params.get("use_long_term_memory"):
@@ -72,39 +92,36 @@ class FetchAILLMChat(TaskNode):
                 vector_database_prompt += history_text
                 
                 
+            # DataFrame 转换为紧凑文本，并压缩到单次请求可容纳的 token 数以内，减少分块与总结的请求次数
             all_data = params.get("all_data", {})
-            max_model_tokens = ali_llm.max_tokens / 2
-            processed_data_parts = {}
-            # 逐个检查 all_data 中的每一项，对过长项进行总结
-            for data_name, data in all_data.items():
-                if data_name is not None and data is not None:
-                    data_str = str(data)
-                    data_tokens = get_token_count(data_str)
-                    
-                    # 为确保总结时不会超出 token 限制，留出一定余量
-                    summary_threshold = max_model_tokens - 200
-                    
-                    if data_tokens > summary_threshold:
-                        # 阶段一：调用 LLM 对该部分内容进行总结
-                        summary_prompt = f"请作为专家，总结以下关于【{data_name}】的内容，提炼出关键信息和核心要点。"
-                        summary_response = ali_llm.chat(user_prompt=summary_prompt, context=data_str)
-                        
-                        if summary_response and summary_response.get("status") == "success":
-                            summary_text = summary_response.get("data")
-                            processed_data_parts[data_name] = summary_text
-                        else:
-                            raise RuntimeError(f"处理 {data_name} 的长文本摘要失败，无法进行后续分析。")
-                    else:
-                        # 如果内容长度正常，则直接保留
-                        processed_data_parts[data_name] = data_str
-            
-            init_prompt, refine_prompt = self._get_analyze_prompt()
-            response = ali_llm.refine_chat(user_prompt, processed_data_parts, init_prompt, refine_prompt)
+            data_token_budget = params.get("data_token_budget") or ali_llm.input_budget(user_prompt)
+            processed_data_parts = {data_name: serialize_for_prompt(data, data_token_budget) for data_name, data in all_data.items()
+                                    if data_name is not None and data is not None}
+
+            if chain_type == "map_reduce":
+                # map_reduce_chat 按 token 预算自行切分过长的部分，无需预先总结
+                response = ali_llm.map_reduce_chat(user_prompt, processed_data_parts)
+            else:
+                # refine 链逐个处理文档，先并发总结过长的部分（为确保总结时不会超出 token 限制，留出一定余量）
+                summary_threshold = ali_llm.max_tokens / 2 - 200
+                long_parts = [data_name for data_name, data_str in processed_data_parts.items()
+                              if count_tokens(data_str) > summary_threshold]
+                summary_prompts = [
+                    f"请作为专家，总结以下关于【{data_name}】的内容，提炼出关键信息和核心要点。\n\n{processed_data_parts[data_name]}"
+                    for data_name in long_parts
+                ]
+                for data_name, summary_text in zip(long_parts, ali_llm.chat_batch(summary_prompts, stage="summary")):
+                    if not summary_text:
+                        raise RuntimeError(f"处理 {data_name} 的长文本摘要失败，无法进行后续分析。")
+                    processed_data_parts[data_name] = summary_text
+
+                init_prompt, refine_prompt = self._get_analyze_prompt()
+                response = ali_llm.refine_chat(user_prompt, processed_data_parts, init_prompt, refine_prompt)
             # 保存到长期记忆
             # TODO: 需要修改插入语句逻辑
             if params.get("use_long_term_memory") and long_term_memory is not None and response.get("status") == "success":
-                input_embedding = embed_text(str(processed_data_parts))
-                output_embedding = embed_text(response.get("data"))
+                embedding_service = ResourceManager.get("embedding", resource_config)
+                input_embedding, output_embedding = embedding_service.embed_texts([str(processed_data_parts), response.get("data")])
 
                 long_term_memory.insert(
                     embeddings=[input_embedding, output_embedding],
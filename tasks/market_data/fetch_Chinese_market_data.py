@@ -13,6 +13,8 @@ This module encapsulates akshare package, which standardizes all functions.
 
 # fetch latest Chinese reserve ratio
 class FetchReserveRatio(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.macro_china_reserve_requirement_ratio()
@@ -22,6 +24,8 @@ class FetchReserveRatio(TaskNode):
 
 # fetch latest Chinese interest rates
 class FetchIntrestRate(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.macro_china_lpr()
@@ -31,6 +35,8 @@ class FetchIntrestRate(TaskNode):
 
 # fetch latest Chinese mid price
 class FetchCurrentMidPrice(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.currency_boc_safe()
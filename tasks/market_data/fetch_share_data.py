@@ -4,7 +4,8 @@ from core.resource_manager import ResourceManager
 from utils.database_utils import *
 from utils.dataframe_utils import *
 from core.taskNode import TaskNode
-import pandasql as ps
+from utils.watermark import WatermarkIndex
+from utils.screening import run_screen
 
 
 """
@@ -18,6 +19,8 @@ This module encapsulates akshare package, which standardizes all functions.
 # TODO: 以下task中最后的两个插入函数的正确性均未被验证
 # 用于更新股票的基础信息
 class UpdataRealSector(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, task_params=None):
         try:
             # 以下代码用于获取及时的板块信息
@@ -33,8 +36,7 @@ class UpdataRealSector(TaskNode):
             sector_df["update_time"] = formatted_time
             
             # postgre数据库操作
-            db_manager = ResourceManager.create("postgres", resource_config)
-            session = db_manager.get_session()
+            db_manager = ResourceManager.get("postgres", resource_config)
             
             # 以下代码用于数据库初始化与更新时
             init = task_params.get("init", False) if task_params else False
@@ -46,7 +48,8 @@ class UpdataRealSector(TaskNode):
                 
                 index_sector_list = fetch_index_sector_from_folder(index_folder="./data/index_data/index", sector_folder="./data/index_data/sector")
                 # 以下函数构建了sector_info, sector_components与两表间的映射关系
-                initialize_sector_and_stock(session, index_sector_list, sector_df)
+                with db_manager.get_session() as session:
+                    initialize_sector_and_stock(session, index_sector_list, sector_df)
                 
             # insert_dataframe_to_table(sector_df, "RealtimeSector", session)
             return {"status": "success", "data": sector_df, "error": None}
@@ -56,6 +59,8 @@ class UpdataRealSector(TaskNode):
 
 # fetch latest status of all A share stocks
 class FetchAllAShareSpot(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             kc_data = ak.stock_kc_a_spot_em()
@@ -69,6 +74,8 @@ class FetchAllAShareSpot(TaskNode):
 
 # fetch latest status of all KeChuang stocks 
 class FetchKCAShareSpot(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.stock_kc_a_spot_em()
@@ -78,6 +85,8 @@ class FetchKCAShareSpot(TaskNode):
 
 # fetch latest status of all HongKong stocks
 class FetchHKMainSpot(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.stock_hk_main_board_spot_em()
@@ -87,20 +96,91 @@ class FetchHKMainSpot(TaskNode):
 
 # fetch history status of a specific stock in A share
 class FetchAShareHistory(TaskNode):
+    """
+    params:
+        stock_code: 股票代码（不带市场前缀）
+        start_date / end_date: 日期范围（YYYYMMDD）
+        incremental: 增量模式，仅保留水位线（已保存的最新一根日线）之后、且已收盘的日线
+            save 为 1 时水位线取自数据库 ashare 表中该股票的最新日线，save 为 2 / 3 时取自本地水位线索引（CSV / Parquet 均以追加方式写入）
+            增量模式的结果只包含新增的日线（已是最新时为空），不能作为需要完整历史的 task（如 fetch_AI_LLM_chat）的依赖
+    """
+    execution_lane = "thread"
+    WATERMARK_PATH = "./cache/watermark/ashare_history.json"
+
+    def _get_watermark(self, resource_config, symbol):
+        save_type = self.params.get("save", 0)
+        if save_type == 1:
+            db_manager = ResourceManager.get("postgres", resource_config)
+            with db_manager.get_session() as session:
+                # 日线的 update_time 统一为当日 23:59:59，以此区分同表中的实时行情
+                watermark = session.execute(
+                    text("SELECT max(update_time) FROM ashare WHERE symbol = :symbol AND update_time::time = '23:59:59'"),
+                    {"symbol": symbol},
+                ).scalar()
+        elif save_type in (2, 3):
+            watermark = WatermarkIndex(self.WATERMARK_PATH).get(symbol)
+        else:
+            self.logger.warning("Incremental mode requires save = 1, 2 or 3, fetching full history.")
+            watermark = None
+        return pd.Timestamp(watermark) if watermark is not None else None
+
     def _custom_task(self, resource_config, params=None):
         try:   
             symbol = params.get("stock_code")
             symbol_with_prefix = add_prefix(params.get("stock_code"))     
-            data = ak.stock_zh_a_daily(symbol=symbol_with_prefix, start_date=params.get("start_date"), end_date=params.get("end_date"))
+            start_date = params.get("start_date")
+            watermark = None
+            if params.get("incremental", False):
+                # 最近一个已收盘交易日：收盘后为当天，盘中与开盘前为前一天
+                closed_time = pd.Timestamp(get_formatted_time())
+                last_closed_date = closed_time.date() if closed_time.hour == 15 else (closed_time - pd.Timedelta(days=1)).date()
+                watermark = self._get_watermark(resource_config, symbol)
+                if watermark is not None:
+                    if watermark.date() >= last_closed_date:
+                        self.logger.info(f"{symbol} history is up to date ({watermark}), skip fetching.")
+                        return {"status": "success", "data": pd.DataFrame(), "error": None}
+                    next_date = (watermark + pd.Timedelta(days=1)).strftime("%Y%m%d")
+                    start_date = max(start_date, next_date) if start_date else next_date
+
+            data = ak.stock_zh_a_daily(symbol=symbol_with_prefix, start_date=start_date, end_date=params.get("end_date"))
             data['symbol'] = symbol
             data = preprocess_a_share_history(data)
             data = clean_df(data)
+            if params.get("incremental", False):
+                bar_time = pd.to_datetime(data["update_time"])
+                keep = bar_time.dt.date <= last_closed_date
+                if watermark is not None:
+                    keep &= bar_time > watermark
+                data = data[keep].reset_index(drop=True)
             return {"status": "success", "data": data, "error": None}
         except Exception as e:
             return {"status": "failed", "data": None, "error": str(e)}
 
+    def _post_process(self, resource_conf, result):
+        result = super()._post_process(resource_conf, result)
+        # 数据写入文件后再推进本地水位线（写入数据库时水位线即数据库中的最新日线）
+        data = result.get("data")
+        if (self.params.get("incremental", False) and self.params.get("save", 0) in (2, 3) and result["status"] == "success"
+                and isinstance(data, pd.DataFrame) and not data.empty):
+            WatermarkIndex(self.WATERMARK_PATH).update(self.params.get("stock_code"), data["update_time"].max())
+        return result
+
+    def _save_to_file(self, result, save_path):
+        if not self.params.get("incremental", False) or not isinstance(result, pd.DataFrame):
+            return super()._save_to_file(result, save_path)
+        # 增量模式下追加到已有的 CSV
+        if result.empty:
+            self.logger.info("No new history rows to save.")
+            return
+        os.makedirs(save_path, exist_ok=True)
+        output_path = os.path.join(save_path, f"{self.name_id}.csv")
+        result.to_csv(output_path, mode="a", header=not os.path.exists(output_path), encoding="utf-8-sig", index=False)
+        self.logger.info(f"Appended {len(result)} rows to {output_path}")
+
 # fetch coarse history financial reports of a specific stock in A share
 class FetchFinAbstract(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             stock_code = params["stock_code"]
@@ -210,24 +290,23 @@ class FetchTargetShare(TaskNode):
         try:
             source = params.get("source", "")
             if source == "db":
-                db_manager = ResourceManager.create("postgres", resource_config)
-                db_session = db_manager.get_session()
+                db_manager = ResourceManager.get("postgres", resource_config)
                 sql = params.get("sql", "")
-                postgre_data = query_with_sqlalchemy_df(db_session, sql)
+                with db_manager.get_session() as db_session:
+                    postgre_data = query_with_sqlalchemy_df(db_session, sql)
                 return {"status": "success", "data": postgre_data, "error": None}
             elif source == "cache":
-                # 从 params 中获取 DataFrame ，其名称要与对应sql中的名称相同！！！
-                ashare_data = params.get("ashare_data", pd.DataFrame())
+                # params 中的 DataFrame（上游依赖的结果）作为表，表名即参数名，要与对应sql中的名称相同！！！
+                tables = {name: value for name, value in params.items() if isinstance(value, pd.DataFrame)}
                 # 从 params 中获取 SQL 语句
                 sql = params.get("sql", "")
                 
-                if ashare_data.empty or not sql:
+                if not any(not df.empty for df in tables.values()) or not sql:
                     return {"status": "failed", "data": None, "error": "No data or SQL query provided for cache source."}
                 
                 try:
-                    # 使用 pandasql 对 DataFrame 执行 SQL 查询
-                    # 注意：pandasql会通过locals()将当前作用域的变量转为db，并在执行sql时查找对应名称的db
-                    cache_data = ps.sqldf(sql, locals())
+                    # 使用列式选股引擎直接在 DataFrame 上执行 SQL（支持的 SQL 子集见 utils.screening）
+                    cache_data = run_screen(sql, tables)
                     return {"status": "success", "data": cache_data, "error": None}
                 except Exception as e:
                     return {"status": "failed", "data": None, "error": f"Failed to query cache data: {e}"}
@@ -255,10 +334,10 @@ class FetchTargetShare(TaskNode):
 class FetchTargetShareFromCache(TaskNode):
     def _custom_task(self, resource_config, params=None):
         try:
-            db_manager = ResourceManager.create("postgres", resource_config)
-            db_session = db_manager.get_session()
+            db_manager = ResourceManager.get("postgres", resource_config)
             sql = params.get("sql")
-            postgre_data = query_with_sqlalchemy_df(db_session, sql)
+            with db_manager.get_session() as db_session:
+                postgre_data = query_with_sqlalchemy_df(db_session, sql)
             return {"status": "success", "data": postgre_data, "error": None}
 
         except Exception as e:
@@ -280,6 +359,8 @@ class FetchTargetShareFromCache(TaskNode):
 
 # TODO:fetch all stocks in a specific share index
 class FetchGoldPrice(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
             data = ak.spot_hist_sge()
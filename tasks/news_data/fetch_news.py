@@ -9,13 +9,15 @@ from core.resource_manager import ResourceManager
 from selenium.common.exceptions import NoSuchElementException
 from core.taskNode import TaskNode
 
-from utils.html_parser import extract_main_content
+from utils.html_parser import fetch_articles
 from utils.database_utils import *
 from utils.dataframe_utils import *
 import akshare as ak
 
 
 class FetchStockNews(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         """
         获取个股新闻（通过 akshare）
@@ -29,7 +31,9 @@ class FetchStockNews(TaskNode):
             return {"status": "failed", "data": None, "error": str(e)}
 
 class FetchBingNews(TaskNode):
-    def custom_task(self, resource_config, params=None):
+    execution_lane = "thread"
+
+    def _custom_task(self, resource_config, params=None):
         """
         使用 Bing 搜索新闻，并根据 URL 白名单访问页面，保存 HTML 内容。
         params:
@@ -42,97 +46,123 @@ class FetchBingNews(TaskNode):
             max_results = params.get("max_results", 15)
             whitelist = params.get("whitelist", [])  # URL 白名单
 
-            driver = ResourceManager.create("searcher", resource_config)
-            if driver is None:
-                raise ValueError("Bing WebDriver is not initialized in resource_manager")
-
-            driver.get("https://www.bing.com")
-
-            # 最多等待10秒直到搜索框出现
-            search_box = WebDriverWait(driver.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "sb_form_q"))
-            )
-            
-            search_box.clear()
-            search_box.send_keys(query)
-            search_box.send_keys(Keys.RETURN)
-            time.sleep(2)
-            
-            # elements 是一组 WebElement 对象的引用，无法被复制，当driver重新执行搜索时其内容会被改变
-            elements = driver.driver.find_elements(By.CSS_SELECTOR, "li.b_algo")
-            news_links = []
-
-            for elem in elements[:max_results]:
-                try:
-                    title_elem = elem.find_element(By.CSS_SELECTOR, "h2 a")
-                    title = title_elem.text
-                    link = title_elem.get_attribute("href")
-
-                    snippet = ""
+            # 从进程内的浏览器池借出浏览器，task 结束后归还（不再每次启动 Chrome）
+            with ResourceManager.get("browser_pool", resource_config).browser() as driver:
+                driver.get("https://www.bing.com")
+
+                # 最多等待10秒直到搜索框出现
+                search_box = WebDriverWait(driver.driver, 10).until(
+                    EC.presence_of_element_located((By.ID, "sb_form_q"))
+                )
+                
+                search_box.clear()
+                search_box.send_keys(query)
+                search_box.send_keys(Keys.RETURN)
+                time.sleep(2)
+                
+                # elements 是一组 WebElement 对象的引用，无法被复制，当driver重新执行搜索时其内容会被改变
+                elements = driver.driver.find_elements(By.CSS_SELECTOR, "li.b_algo")
+                news_links = []
+
+                for elem in elements[:max_results]:
                     try:
-                        snippet_elem = elem.find_element(By.CSS_SELECTOR, "div.b_caption p")
-                        snippet = snippet_elem.text
-                    except NoSuchElementException:
-                        pass
+                        title_elem = elem.find_element(By.CSS_SELECTOR, "h2 a")
+                        title = title_elem.text
+                        link = title_elem.get_attribute("href")
 
-                    # 检查白名单
-                    if whitelist and not any(domain in link for domain in whitelist):
-                        continue
+                        snippet = ""
+                        try:
+                            snippet_elem = elem.find_element(By.CSS_SELECTOR, "div.b_caption p")
+                            snippet = snippet_elem.text
+                        except NoSuchElementException:
+                            pass
 
-                    news_links.append((title, link, snippet))
+                        # 检查白名单
+                        if whitelist and not any(domain in link for domain in whitelist):
+                            continue
 
-                except Exception as e:
-                    print(f"[跳过一条结果] Error (预处理): {e}")
-                    continue
+                        news_links.append((title, link, snippet))
+
+                    except Exception as e:
+                        print(f"[跳过一条结果] Error (预处理): {e}")
+                        continue
 
-            # 再逐一访问每个页面
+            # 浏览器只用于搜索结果页；文章页面通过 HTTP 连接池并发获取，需要 JS 渲染的页面再借出浏览器加载
+            browser_pool = ResourceManager.get("browser_pool", resource_config)
+            articles = fetch_articles([link for _, link, _ in news_links], browser_pool=browser_pool,
+                                      max_concurrency=params.get("max_concurrency", 16))
             results = []
-            for title, link, snippet in news_links:
-                try:
-                    driver.get(link)
-                    time.sleep(2)
-                    html = driver.driver.page_source
-                    content_info = extract_main_content(html, link)
-                    results.append({
-                        "title": content_info["title"] or title,
-                        "snippet": snippet,
-                        "content": content_info["content"],
-                        "time": content_info["time"],
-                    })
-
-                except Exception as e:
-                    print(f"[跳过一条结果] Error (访问页面): {e}")
+            for (title, link, snippet), article in zip(news_links, articles):
+                if article["error"]:
+                    self.logger.warning(f"[跳过一条结果] {link}: {article['error']}")
                     continue
-                
+                results.append({
+                    "title": article["title"] or title,
+                    "snippet": snippet,
+                    "content": article["content"],
+                    "time": article["time"],
+                })
+            self.logger.info(f"Fetched {len(results)}/{len(articles)} articles, "
+                             f"{sum(a['method'] == 'browser' for a in articles)} via browser, "
+                             f"slowest {max((a['total_time'] for a in articles), default=0):.2f}s")
+
             df = pd.DataFrame(results)
             return {"status": "success", "data": df, "error": None}
                 
         except Exception as e:
             return {"status": "failed", "data": None, "error": str(e)}
 
+class FetchArticles(TaskNode):
+    execution_lane = "thread"
+
+    def _custom_task(self, resource_config, params=None):
+        """
+        并发获取文章正文，需要 JS 渲染的页面使用浏览器池加载
+        params:
+            urls: 文章链接列表，或包含 url 列的 DataFrame（如 FetchStockNews 的结果）
+            max_concurrency: 同时进行的 HTTP 请求数（默认16）
+            use_browser: 正文提取失败时是否使用浏览器重新加载（默认True）
+        返回每篇文章的标题、正文、发布时间与获取方式、耗时（fetch_time / extract_time / total_time，秒）
+        """
+        try:
+            urls = params.get("urls")
+            if isinstance(urls, pd.DataFrame):
+                urls = urls["url"].dropna().tolist()
+            if not urls:
+                return {"status": "success", "data": pd.DataFrame(), "error": None}
+
+            browser_pool = ResourceManager.get("browser_pool", resource_config) if params.get("use_browser", True) else None
+            articles = fetch_articles(list(dict.fromkeys(urls)), browser_pool=browser_pool,
+                                      max_concurrency=params.get("max_concurrency", 16))
+            data = pd.DataFrame(articles)
+            self.logger.info(f"Fetched {int((data['error'].isna()).sum())}/{len(data)} articles, "
+                             f"{int((data['method'] == 'browser').sum())} via browser, slowest {data['total_time'].max():.2f}s")
+            return {"status": "success", "data": data, "error": None}
+        except Exception as e:
+            return {"status": "failed", "data": None, "error": str(e)}
+
 class FetchDailyNews(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         """
         获取东方财富财经日评
         """
         try:
-            driver = ResourceManager.create("searcher", resource_config)
-            if driver is None:
-                raise ValueError("WebDriver is not initialized in resource_manager")
-
-            url = "https://stock.eastmoney.com/a/czpnc.html"
-            driver.get(url)
-            time.sleep(1)
+            with ResourceManager.get("browser_pool", resource_config).browser() as driver:
+                url = "https://stock.eastmoney.com/a/czpnc.html"
+                driver.get(url)
+                time.sleep(1)
 
-            news_link_elem = driver.find_element(By.CSS_SELECTOR, "#newsTr1 > div.image > a")
-            news_url = news_link_elem.get_attribute('href')
-            driver.get(news_url)
+                news_link_elem = driver.find_element(By.CSS_SELECTOR, "#newsTr1 > div.image > a")
+                news_url = news_link_elem.get_attribute('href')
+                driver.get(news_url)
 
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "ContentBody"))
-            )
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.ID, "ContentBody"))
+                )
 
-            page_source = driver.page_source
+                page_source = driver.page_source
             soup = BeautifulSoup(page_source, 'html.parser')
             content_body = soup.select_one("#ContentBody")
 
@@ -5,9 +5,11 @@ from core.taskNode import TaskNode
 
 # TODO: 以下函数目前仅用于测试
 class FetchCompanyData(TaskNode):
+    execution_lane = "thread"
+
     def _custom_task(self, resource_config, params=None):
         try:
-            db_manager = ResourceManager.create("postgres", resource_config)
+            db_manager = ResourceManager.get("postgres", resource_config)
             session = db_manager.get_session()
             symbol = params.get("stock_code")
             all_info = {}
@@ -45,6 +47,7 @@ class FetchCompanyData(TaskNode):
             """
             report = query_with_sqlalchemy_df(session, sql)
             report.to_csv("./cache/tmp3.csv")
+            session.close()
             
             # 此处的写法不合理（仅测试），一个任务仅应当有一个返回值！！！
             all_info["news"] = news
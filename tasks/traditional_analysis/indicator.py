@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from core.resource_manager import ResourceManager
+from utils.database_utils import *
+from utils.dataframe_utils import *
+from utils.indicator_engine import IndicatorEngine, build_bar_panel, panel_to_frame
+from utils.parquet_store import read_parquet_store
+from core.taskNode import TaskNode
+
+'''
+全市场技术指标计算：将 ashare 表（或 FetchAShareHistory 写入的 Parquet 存储）中的日线构建为 (日期 × 股票) 面板，
+由 utils.indicator_engine 一次性计算所有股票的 MA / MACD / KDJ / RSI / BOLL / ATR
+增量模式下保存指标引擎的状态，之后的运行只读取上次之后的新日线并逐日更新，不重新计算历史
+'''
+
+
+class ComputeIndicators(TaskNode):
+    """
+    params:
+        symbols: 股票代码列表，为空时计算全部股票
+        start_date: 完整计算时读取日线的起始日期（YYYY-MM-DD），为空时读取全部历史
+        source: 日线来源，postgres（默认，ashare 表）或 parquet（glob_params 中 parquet_path 下 FetchAShareHistory 的数据）
+        indicator_params: IndicatorEngine 的参数（ma_windows / macd / kdj / rsi / boll / atr）
+        incremental: 增量模式，存在可用的引擎状态时只计算状态之后的新日线；出现状态中没有的股票时重新完整计算
+            （状态按 source、start_date 与 symbols 分别保存）
+        output: latest（默认，仅返回最后一个交易日的指标）或 full（返回计算的全部日期）
+    """
+    STATE_DIR = "./cache/indicator"
+    BAR_FIELDS = ("close", "high", "low")
+
+    def _load_bars(self, resource_config, symbols, after=None):
+        start_date = self.params.get("start_date")
+        if self.params.get("source", "postgres") == "parquet":
+            bars = read_parquet_store(
+                self.glob_params.get("parquet_path", "./data/parquet"), "FetchAShareHistory", symbols,
+                start=after if after is not None else start_date, columns=["symbol", "update_time", *self.BAR_FIELDS],
+            )
+            if after is not None and not bars.empty:
+                bars = bars[pd.to_datetime(bars["update_time"]) > after]
+        else:
+            # 日线的 update_time 统一为当日 23:59:59，以此区分同表中的实时行情
+            sql = f"SELECT symbol, update_time, {', '.join(self.BAR_FIELDS)} FROM ashare WHERE update_time::time = '23:59:59'"
+            query_params = {}
+            if after is not None:
+                sql += " AND update_time > :after"
+                query_params["after"] = after
+            elif start_date:
+                sql += " AND update_time >= :start_date"
+                query_params["start_date"] = pd.Timestamp(start_date)
+            if symbols:
+                sql += " AND symbol = ANY(:symbols)"
+                query_params["symbols"] = list(symbols)
+            db_manager = ResourceManager.get("postgres", resource_config)
+            with db_manager.get_session() as session:
+                rows = session.execute(text(sql + " ORDER BY update_time"), query_params)
+                bars = pd.DataFrame(rows.fetchall(), columns=list(rows.keys()))
+        if not bars.empty:
+            bars["update_time"] = pd.to_datetime(bars["update_time"])
+        return bars
+
+    def _state_path(self):
+        """引擎状态按日线来源、起始日期与股票列表区分，不同配置的运行互不覆盖"""
+        source = self.params.get("source", "postgres")
+        symbols = self.params.get("symbols")
+        key = json.dumps({
+            "source": source,
+            "parquet_path": self.glob_params.get("parquet_path", "./data/parquet") if source == "parquet" else None,
+            "start_date": self.params.get("start_date"),
+            "symbols": sorted(symbols) if symbols else None,
+        }, sort_keys=True)
+        return os.path.join(self.STATE_DIR, f"engine_state_{source}_{hashlib.sha1(key.encode()).hexdigest()[:16]}.pkl")
+
+    def _load_state(self, engine):
+        state_path = self._state_path()
+        if not self.params.get("incremental", False) or not os.path.exists(state_path):
+            return None
+        try:
+            meta = engine.load_state(state_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to load indicator state, recomputing: {e}")
+            return None
+        if meta is None:
+            self.logger.info("Indicator params changed, recomputing full history.")
+        return meta
+
+    def _save_state(self, engine, symbols, last_date):
+        os.makedirs(self.STATE_DIR, exist_ok=True)
+        engine.save_state(self._state_path(), {"symbols": list(symbols), "last_date": last_date})
+
+    def _compute_full(self, resource_config, engine, symbols):
+        bars = self._load_bars(resource_config, symbols)
+        if bars.empty:
+            return pd.DataFrame()
+        dates, symbols, panel = build_bar_panel(bars, self.BAR_FIELDS)
+        indicators = engine.compute(panel["close"], panel["high"], panel["low"])
+        self._save_state(engine, symbols, dates[-1])
+        valid = ~np.isnan(panel["close"])
+        rows = None if self.params.get("output", "latest") == "full" else len(dates) - 1
+        self.logger.info(f"Computed indicators for {len(symbols)} symbols x {len(dates)} days.")
+        return panel_to_frame(dates, symbols, indicators, valid, rows)
+
+    def _compute_incremental(self, resource_config, engine, meta, symbols):
+        # 状态中的所有股票共用一个最后日期，因此总是读取全部状态股票的新日线，输出时再按 symbols 过滤；
+        # symbols 为空时读取全部股票，以便发现新上市的股票
+        state_symbols = pd.Index(meta["symbols"])
+        bars = self._load_bars(resource_config, list(state_symbols) if symbols else None, after=meta["last_date"])
+        if bars.empty:
+            self.logger.info(f"Indicators are up to date ({meta['last_date']}).")
+            return pd.DataFrame()
+        if not bars["symbol"].isin(state_symbols).all():
+            self.logger.info("New symbols found, recomputing full history.")
+            return self._compute_full(resource_config, engine, symbols)
+        dates, _, panel = build_bar_panel(bars, self.BAR_FIELDS, symbols=state_symbols)
+        # 逐个新交易日更新引擎状态
+        updates = [engine.update(panel["close"][i], panel["high"][i], panel["low"][i]) for i in range(len(dates))]
+        self._save_state(engine, state_symbols, dates[-1])
+        indicators = {name: np.vstack([u[name] for u in updates]) for name in engine.columns}
+        valid = ~np.isnan(panel["close"])
+        rows = None if self.params.get("output", "latest") == "full" else len(dates) - 1
+        self.logger.info(f"Updated indicators with {len(dates)} new days for {len(state_symbols)} symbols.")
+        data = panel_to_frame(dates, state_symbols, indicators, valid, rows)
+        return data[data["symbol"].isin(symbols)].reset_index(drop=True) if symbols else data
+
+    def _custom_task(self, resource_config, params=None):
+        try:
+            symbols = params.get("symbols")
+            engine = IndicatorEngine(**params.get("indicator_params", {}))
+            meta = self._load_state(engine)
+            if meta is not None and set(symbols or []) <= set(meta["symbols"]):
+                data = self._compute_incremental(resource_config, engine, meta, symbols)
+            else:
+                data = self._compute_full(resource_config, engine, symbols)
+            return {"status": "success", "data": data, "error": None}
+        except Exception as e:
+            return {"status": "failed", "data": None, "error": str(e)}
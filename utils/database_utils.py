@@ -1,8 +1,10 @@
 # db_utils.py
 import csv
+import io
 from math import isinf, isnan
 import time
 from sqlalchemy import insert, select, update, text
+from sqlalchemy import table as sql_table, column as sql_column
 from sqlalchemy.inspection import inspect
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
@@ -38,12 +40,14 @@ def get_db_ER(session, save_path="./cache/er_diagram.png"):
     graph.write_png(save_path)
 
 # ---------------- 以下为postgre数据库相关的操作，包括数据增删改查等内容 ----------------- # 
-def insert_dataframe_to_table(df: pd.DataFrame, orm_class_name: str, session: Session, drop_column=False):
+def insert_dataframe_to_table(df: pd.DataFrame, orm_class_name: str, session: Session, drop_column=False, method="row", batch_size=5000):
     """
     通用函数：将 DataFrame 数据插入到任意 ORM 表中。
     - DataFrame 的列必须为 ORM 中字段的子集。
     - 自动使用主键作为 ON CONFLICT 更新条件。
     - 非主键字段将被更新。
+    - method: "row" 逐行插入；"values" 按批次使用多行 VALUES 插入；
+      "copy" 通过 COPY FROM STDIN 写入临时表后，每批次执行一条 INSERT ... SELECT ... ON CONFLICT
     """
     # 动态加载ORM(数据库table定义类)
     orm_class = getattr(resource, orm_class_name)
@@ -66,6 +70,15 @@ def insert_dataframe_to_table(df: pd.DataFrame, orm_class_name: str, session: Se
         if extra_columns:
             raise ValueError(f"DataFrame 包含 ORM 表中未定义的字段: {extra_columns}")
 
+    if method == "copy":
+        _bulk_copy_upsert(df, table, pk_columns, session, batch_size)
+        return
+    if method == "values":
+        _bulk_values_upsert(df, table, pk_columns, session, batch_size)
+        return
+    if method != "row":
+        raise ValueError(f"Insert method: {method} not recognized.")
+
     for _, row in tqdm(df.iterrows(), total=len(df), desc=f"insert {table.name}", unit="row"):
         row_dict = row.to_dict()
 
@@ -79,6 +92,77 @@ def insert_dataframe_to_table(df: pd.DataFrame, orm_class_name: str, session: Se
         session.execute(stmt)
 
     session.commit()
+
+def _build_upsert(stmt, pk_columns, columns):
+    """为 insert 语句补充 ON CONFLICT 子句（无非主键字段时仅跳过冲突行）"""
+    update_columns = [c for c in columns if c not in pk_columns]
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=pk_columns)
+    return stmt.on_conflict_do_update(
+        index_elements=pk_columns,
+        set_={k: stmt.excluded[k] for k in update_columns}
+    )
+
+def _prepare_bulk_df(df: pd.DataFrame, pk_columns):
+    """
+    批量写入前的数据整理：
+    同一条 INSERT 语句中主键重复会导致 ON CONFLICT DO UPDATE 报错，此处按主键去重并保留最后一条（与逐行写入的覆盖结果一致）
+    """
+    missing_pk = [c for c in pk_columns if c not in df.columns]
+    if missing_pk:
+        raise ValueError(f"DataFrame 缺少主键字段: {missing_pk}")
+    df = df.drop_duplicates(subset=pk_columns, keep="last")
+    return clean_df(df)
+
+def _bulk_values_upsert(df: pd.DataFrame, table, pk_columns, session: Session, batch_size=5000):
+    """按批次使用多行 VALUES 执行 upsert，适用于任意 postgre 驱动"""
+    df = _prepare_bulk_df(df, pk_columns)
+    columns = list(df.columns)
+    records = df.to_dict(orient="records")
+
+    for start in tqdm(range(0, len(records), batch_size), desc=f"insert {table.name}", unit="batch"):
+        stmt = pg_insert(table).values(records[start:start + batch_size])
+        session.execute(_build_upsert(stmt, pk_columns, columns))
+
+    session.commit()
+
+def _bulk_copy_upsert(df: pd.DataFrame, table, pk_columns, session: Session, batch_size=5000):
+    """
+    使用 COPY FROM STDIN 将数据写入临时表，再通过一条 INSERT ... SELECT ... ON CONFLICT 合并到目标表
+    当底层驱动不支持 copy_expert（非 psycopg2）时退化为多行 VALUES 写入
+    """
+    if session.bind.dialect.driver != "psycopg2":
+        _bulk_values_upsert(df, table, pk_columns, session, batch_size)
+        return
+
+    df = _prepare_bulk_df(df, pk_columns)
+    columns = list(df.columns)
+    preparer = session.bind.dialect.identifier_preparer
+    stage_name = f"_stage_{table.name}"
+    quoted_stage = preparer.quote(stage_name)
+    quoted_columns = ", ".join(preparer.quote(c) for c in columns)
+
+    # 临时表结构与目标表一致，并在事务提交时自动删除
+    session.execute(text(
+        f"CREATE TEMP TABLE {quoted_stage} (LIKE {preparer.format_table(table)} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    stage_table = sql_table(stage_name, *[sql_column(c) for c in columns])
+    stmt = pg_insert(table).from_select(columns, select(*stage_table.c))
+    merge_stmt = _build_upsert(stmt, pk_columns, columns)
+
+    cursor = session.connection().connection.driver_connection.cursor()
+    try:
+        for start in tqdm(range(0, len(df), batch_size), desc=f"copy {table.name}", unit="batch"):
+            buffer = io.StringIO()
+            df.iloc[start:start + batch_size].to_csv(buffer, index=False, header=False, na_rep="\\N")
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {quoted_stage} ({quoted_columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+            session.execute(merge_stmt)
+            session.execute(text(f"TRUNCATE {quoted_stage}"))
+    finally:
+        cursor.close()
+
+    session.commit()
     
 # 该函数将通过session执行一条sql查询语句
 def query_with_sqlalchemy_df(session: Session, sql: str) -> pd.DataFrame:
@@ -86,8 +170,8 @@ def query_with_sqlalchemy_df(session: Session, sql: str) -> pd.DataFrame:
     使用 SQLAlchemy 执行原始 SQL 并返回 pandas.DataFrame。
     """
     result = session.execute(text(sql))
-    rows = [dict(row._mapping) for row in result.fetchall()]
-    return pd.DataFrame(rows)
+    # 直接由行元组与列名构建，避免为每一行创建 dict
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
 
 # 以下函数用于初始化股票基础信息，板块信息与其之间的对应关系
 def initialize_sector_and_stock(session: Session, index_sector_list: dict, code_map):
@@ -220,6 +304,7 @@ def generate_ORM_from_csv_header(csv_file, output_file):
     print(f"ORM 类定义已写入 {output_file}")
     
 def save_sector_index_csv(task_params=None):
+    # 请求频率由 akshare 的按域名限流控制（resource_conf.json 中的 rate_limiter，由调用该函数的 task 启用），不再固定休眠
     index_sector_list = {}
     share_index_realtime_sina = task_params.get("share_index_realtime")
     share_index_info = task_params.get("share_index_info")
@@ -231,7 +316,6 @@ def save_sector_index_csv(task_params=None):
             data = preprocess_stock_index(data)
             data.to_csv("./cache/index/{}.csv".format(idx))
             index_sector_list[idx] = data                         # 股票指数的成份股目录
-            time.sleep(5) 
         except Exception as e:
             print(f"Error processing index {idx}: {e}")
             continue
@@ -245,7 +329,6 @@ def save_sector_index_csv(task_params=None):
             data = data[columns_to_keep]
             data.to_csv("./cache/sector/{}.csv".format(idx))
             index_sector_list[idx] = data                        # 获取东方财富板块最新成份股
-            time.sleep(5)
         except Exception as e:
             print(f"Error processing index {idx}: {e}")
             continue
@@ -1,18 +1,46 @@
 # embedding_module.py
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
-_model = None
+'''
+文本向量化：模型加载与批量编码
+embed_text / embed_texts 使用进程级默认的 EmbeddingService（磁盘缓存 + 微批次，见 core.resource.embedding），
+task 中应通过 ResourceManager.get("embedding", resource_config) 获取按资源配置创建的服务（可使用独立的向量化进程）
+'''
+
+DEFAULT_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384             # all-MiniLM-L6-v2 的输出维度
+
+_models = {}
+_default_service = None
+
+
+def get_embedding_model(model_name: str = DEFAULT_MODEL_NAME):
+    if model_name not in _models:
+        # 延迟导入：sentence_transformers 依赖 torch，导入耗时较长，仅在实际编码的进程中加载
+        from sentence_transformers import SentenceTransformer
+        _models[model_name] = SentenceTransformer(model_name)
+    return _models[model_name]
+
+
+def encode_texts(texts: list, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = 64) -> np.ndarray:
+    """一次调用模型编码多条文本（模型内部按 batch_size 分批），返回 (文本数, 维度) 的归一化向量"""
+    model = get_embedding_model(model_name)
+    embeddings = model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+
+def get_default_service():
+    global _default_service
+    if _default_service is None:
+        from core.resource.embedding import EmbeddingService
+        _default_service = EmbeddingService()
+    return _default_service
+
+
+def embed_texts(texts: list) -> np.ndarray:
+    """批量向量化，空文本为零向量"""
+    return get_default_service().embed_texts(texts)
 
-def get_embedding_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-    return _model
 
 def embed_text(text: str) -> np.ndarray:
-    if not text:
-        return np.zeros(384, dtype=np.float32)  # 假设模型输出维度为384
-    model = get_embedding_model()
-    embedding = model.encode(text, normalize_embeddings=True, show_progress_bar=False)
-    return embedding
\ No newline at end of file
+    return embed_texts([text])[0]
@@ -1,30 +1,133 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import trafilatura
 
+'''
+新闻正文的获取与提取：
+- extract_article: 一次 trafilatura 解析同时得到标题、正文与发布时间
+- fetch_articles: 通过共享的 HTTP 连接池（akshare 的 Session，受 resource_conf 中按域名的限流控制）并发获取文章页面，
+  每个页面下载完成后立即提交到进程池中提取正文；请求失败或提取到的正文过短（通常为需要执行 JS 才能渲染的页面）时，
+  若提供了 browser_pool，则借出浏览器重新加载该页面后再提取
+  返回每个 URL 的结果与耗时（获取 / 提取 / 总耗时，获取方式为 http 或 browser）
+'''
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0 Safari/537.36")
+EMPTY_ARTICLE = {"title": "", "content": "", "time": None}
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+
+def extract_article(html, url: str = "") -> dict:
+    """html 可为字符串或字节（字节时由 trafilatura 识别编码）"""
+    document = trafilatura.bare_extraction(html, url=url, include_comments=False, include_tables=False, with_metadata=True)
+    if document is None:
+        return dict(EMPTY_ARTICLE)
+    return {"title": document.title or "", "content": document.text or "", "time": document.date}
+
+
 def extract_main_content(html_str, url=""):
     try:
-        downloaded = trafilatura.extract(html_str, include_comments=False, include_tables=False, url=url)
-        if not downloaded:
+        result = extract_article(html_str, url)
+        if not result["content"]:
             raise ValueError("正文提取失败，内容为空")
-
-        result = trafilatura.extract(html_str, output_format='json', url=url)
-        if result:
-            import json
-            data = json.loads(result)
-            return {
-                "title": data.get("title", ""),
-                "content": data.get("text", ""),
-                "time": data.get("date", None)
-            }
-        else:
-            return {
-                "title": "",
-                "content": "",
-                "time": None
-            }
+        return result
     except Exception as e:
         print(f"[正文提取失败] {e}")
-        return {
-            "title": "",
-            "content": "",
-            "time": None
-        }
+        return dict(EMPTY_ARTICLE)
+
+
+def _timed_extract(html, url):
+    start = time.perf_counter()
+    try:
+        return extract_article(html, url), None, time.perf_counter() - start
+    except Exception as e:
+        return dict(EMPTY_ARTICLE), f"extract failed: {e}", time.perf_counter() - start
+
+
+def _get_extract_pool(workers: int) -> ProcessPoolExecutor:
+    """进程内共享的正文提取进程池，首次使用时创建；使用 spawn 启动，避免在多线程的调度进程中 fork"""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_extract_pool.shutdown, wait=False, cancel_futures=True)
+        return _extract_pool
+
+
+def _http_get(session, url: str, timeout: float):
+    start = time.perf_counter()
+    try:
+        response = session.get(url, timeout=timeout, headers={"User-Agent": USER_AGENT})
+        error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+        content = response.content if error is None else None
+    except Exception as e:
+        content, error = None, f"request failed: {e}"
+    return content, error, time.perf_counter() - start
+
+
+def _browser_get(browser_pool, url: str, wait: float):
+    """借出浏览器加载页面，等待页面加载完成（及 JS 渲染）后返回页面源码"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    start = time.perf_counter()
+    try:
+        with browser_pool.browser() as driver:
+            driver.get(url)
+            WebDriverWait(driver.driver, wait).until(lambda d: d.execute_script("return document.readyState") == "complete")
+            html = driver.page_source
+        return html, None, time.perf_counter() - start
+    except Exception as e:
+        return None, f"browser failed: {e}", time.perf_counter() - start
+
+
+def fetch_articles(urls: list, session=None, browser_pool=None, max_concurrency: int = 16, timeout: float = 10,
+                   extract_workers: int = 4, min_text_length: int = 200, browser_wait: float = 10) -> list:
+    """
+    并发获取并提取文章，按 urls 的顺序返回结果字典：
+    url, title, content, time, method, error, fetch_time, extract_time, total_time（秒）
+    提取进程数不超过 CPU 核数 - 1（保留一个核给获取线程）；extract_workers 为 0 或单核机器上在当前进程的线程中提取
+    """
+    if not urls:
+        return []
+    if session is None:
+        from akshare.utils.context import config as akshare_config
+        session = akshare_config.get_session()
+    extract_workers = min(extract_workers, (os.cpu_count() or 1) - 1)
+    extract_pool = _get_extract_pool(extract_workers) if extract_workers > 0 else None
+
+    def process(url):
+        url_start = time.perf_counter()
+        record = {"url": url, "method": "http", "fetch_time": 0.0, "extract_time": 0.0}
+        html, error, cost = _http_get(session, url, timeout)
+        record["fetch_time"] += cost
+        article = dict(EMPTY_ARTICLE)
+        if html is not None:
+            article, error, cost = (extract_pool.submit(_timed_extract, html, url).result() if extract_pool is not None
+                                    else _timed_extract(html, url))
+            record["extract_time"] += cost
+        # 请求失败或正文过短：页面可能需要执行 JS 才能渲染，使用浏览器重新加载
+        if browser_pool is not None and len(article["content"]) < min_text_length:
+            record["method"] = "browser"
+            html, browser_error, cost = _browser_get(browser_pool, url, browser_wait)
+            record["fetch_time"] += cost
+            if html is not None:
+                browser_article, browser_error, cost = (extract_pool.submit(_timed_extract, html, url).result() if extract_pool is not None
+                                                        else _timed_extract(html, url))
+                record["extract_time"] += cost
+                if len(browser_article["content"]) >= len(article["content"]):
+                    article = browser_article
+            error = browser_error if not article["content"] else None
+        if not article["content"] and error is None:
+            error = "正文提取失败，内容为空"
+        record.update(article, error=error, total_time=time.perf_counter() - url_start)
+        return record
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(urls)), thread_name_prefix="article_fetch") as pool:
+        return list(pool.map(process, urls))
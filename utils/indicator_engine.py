@@ -0,0 +1,317 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+'''
+向量化的技术指标引擎：在 (日期 × 股票) 的二维面板上一次性计算 MA / EMA / MACD / KDJ / RSI / BOLL / ATR，不按股票循环
+指标定义与 MyTT 一致（EMA 为 span=N 的指数平均，SMA(S, N, M) 为 alpha=M/N 的指数平均，BOLL 使用总体标准差）
+- 停牌、未上市等没有日线的位置为 NaN：计算前将每只股票的有效日线压缩到面板顶部（即各自连续的日线序列），
+  计算后再放回原位置，因此窗口均按“最近 N 根日线”计算，与逐只股票计算的结果一致
+- compute 计算完整历史的同时保存增量状态（各窗口最近的日线与各指数平均的最新值），
+  之后每新增一根日线调用 update 即可得到新日线的指标，无需重新计算历史
+'''
+
+INDICATOR_COLUMNS = ["dif", "dea", "macd", "k", "d", "j", "rsi", "boll_mid", "boll_upper", "boll_lower", "atr"]
+
+
+def rolling_sums(x: np.ndarray, windows) -> dict:
+    """
+    沿 axis 0 计算各窗口长度 n 的滚动求和（共用一次累加），不足 n 期时为 NaN，返回 n -> 数组
+    x 中的 NaN 只能出现在各列尾部（压缩面板的形式），NaN 之后的累加结果均为 NaN，因此无需单独统计窗口内的 NaN
+    """
+    cs = np.cumsum(x, axis=0)
+    out = {}
+    for n in windows:
+        out[n] = np.full(x.shape, np.nan)
+        if n > len(x):
+            continue
+        window_sum = out[n][n - 1:]
+        window_sum[:] = cs[n - 1:]
+        window_sum[1:] -= cs[:-n]
+    return out
+
+
+def rolling_means(x: np.ndarray, windows) -> dict:
+    return {n: values / n for n, values in rolling_sums(x, windows).items()}
+
+
+def rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    return rolling_means(x, [n])[n]
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """总体标准差（ddof=0），先减去各列均值以减小累加误差"""
+    centered = x - np.nanmean(x, axis=0)
+    mean = rolling_mean(centered, n)
+    var = rolling_mean(centered ** 2, n) - mean ** 2
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def _rolling_extreme(x: np.ndarray, n: int, func) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if n <= len(x):
+        out[n - 1:] = func(sliding_window_view(x, n, axis=0), axis=-1)
+    return out
+
+
+def rolling_max(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling_extreme(x, n, np.max)
+
+
+def rolling_min(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling_extreme(x, n, np.min)
+
+
+def ewm_step(state: np.ndarray, x: np.ndarray, alpha: float) -> np.ndarray:
+    """指数平均的单步更新 y_t = y_{t-1} + alpha * (x_t - y_{t-1})，从第一个有效值开始，x 为 NaN 时保持上一值"""
+    new = state + alpha * (x - state)
+    np.copyto(new, x, where=np.isnan(state))
+    np.copyto(new, state, where=np.isnan(x))
+    return new
+
+
+def ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    """沿 axis 0 逐行递推的指数平均（每行对所有股票向量化），等价于 pandas ewm(alpha, adjust=False, ignore_na=True)"""
+    out = np.empty_like(x)
+    state = np.full(x.shape[1:], np.nan)
+    for i in range(len(x)):
+        out[i] = state = ewm_step(state, x[i], alpha)
+    return out
+
+
+def shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def true_range(close: np.ndarray, high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    return np.maximum(np.maximum(high - low, np.abs(prev_close - high)), np.abs(prev_close - low))
+
+
+class IndicatorEngine:
+    def __init__(self, ma_windows=(5, 10, 20, 60), macd=(12, 26, 9), kdj=(9, 3, 3), rsi=24, boll=(20, 2), atr=20):
+        self.ma_windows = tuple(ma_windows)
+        self.macd = tuple(macd)
+        self.kdj = tuple(kdj)
+        self.rsi = rsi
+        self.boll = tuple(boll)
+        self.atr = atr
+        self.state = None
+
+    @property
+    def config(self) -> dict:
+        return {"ma_windows": self.ma_windows, "macd": self.macd, "kdj": self.kdj, "rsi": self.rsi, "boll": self.boll, "atr": self.atr}
+
+    @property
+    def columns(self) -> list:
+        return [f"ma{n}" for n in self.ma_windows] + INDICATOR_COLUMNS
+
+    # ---------------------------- 完整历史 ----------------------------
+    def compute(self, close: np.ndarray, high: np.ndarray, low: np.ndarray) -> dict:
+        """
+        计算 (日期 × 股票) 面板上的全部指标，返回 指标名 -> 与输入形状相同的数组（没有日线的位置为 NaN），并建立增量状态
+        close 为 NaN 的位置视为没有日线
+        """
+        valid = ~np.isnan(close)
+        counts = valid.sum(axis=0)
+        # 每只股票的有效日线依次放到压缩面板该列的第 0, 1, 2... 行，尾部为 NaN
+        # 压缩与还原均通过展平下标的 take 完成，下标 size 指向末尾追加的 NaN
+        size, width = close.size, close.shape[1]
+        rank = np.cumsum(valid, axis=0, dtype=np.int64) - 1
+        unpack_index = np.where(valid, rank * width + np.arange(width), size).reshape(-1)
+        del rank
+        pack_index = np.full(size, size, dtype=np.int64)
+        pack_index[unpack_index[unpack_index < size]] = np.flatnonzero(valid)
+
+        def take(x, index):
+            flat = np.empty(size + 1)
+            flat[:-1] = x.reshape(-1)
+            flat[-1] = np.nan
+            return flat.take(index).reshape(x.shape)
+
+        pack = lambda x: take(x, pack_index)
+        # 放回原位置；逐个指标转换并释放压缩面板上的结果，以降低峰值内存
+        unpack = lambda values: take(values, unpack_index)
+
+        c, h, l = pack(close), pack(high), pack(low)
+        result, self.state = self._compute_packed(c, h, l, counts, unpack)
+        return result
+
+    def _compute_packed(self, c, h, l, counts, unpack):
+        """在压缩面板上计算指标，返回 (原位置的指标, 增量状态)；中间结果只保留增量更新所需的最后一个值"""
+        short, long, signal = self.macd
+        kdj_n, m1, m2 = self.kdj
+        boll_n, boll_p = self.boll
+        last = lambda x: self._tail(x, counts, 1)[0]
+        close_window = max(max(self.ma_windows), self.boll[0], 1)
+        state = {
+            "close": self._tail(c, counts, close_window),
+            "high": self._tail(h, counts, kdj_n),
+            "low": self._tail(l, counts, kdj_n),
+        }
+        means = rolling_means(c, set(self.ma_windows) | {boll_n})
+        mid, std = means[boll_n], rolling_std(c, boll_n)
+        out = {"boll_mid": unpack(mid), "boll_upper": unpack(mid + boll_p * std), "boll_lower": unpack(mid - boll_p * std)}
+        del mid, std
+        for n in self.ma_windows:
+            out[f"ma{n}"] = unpack(means.pop(n))
+        del means
+
+        ema_short, ema_long = ewm(c, 2 / (short + 1)), ewm(c, 2 / (long + 1))
+        state["ema_short"], state["ema_long"] = last(ema_short), last(ema_long)
+        dif = ema_short - ema_long
+        del ema_short, ema_long
+        dea = ewm(dif, 2 / (signal + 1))
+        state["dea"] = last(dea)
+        out["macd"] = unpack((dif - dea) * 2)
+        out["dif"], out["dea"] = unpack(dif), unpack(dea)
+        del dif, dea
+
+        llv, hhv = rolling_min(l, kdj_n), rolling_max(h, kdj_n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsv = (c - llv) / (hhv - llv) * 100
+        del llv, hhv
+        rsv[~np.isfinite(rsv)] = np.nan
+        k = ewm(rsv, 1 / m1)
+        del rsv
+        d = ewm(k, 1 / m2)
+        state["k"], state["d"] = last(k), last(d)
+        out["j"] = unpack(3 * k - 2 * d)
+        out["k"], out["d"] = unpack(k), unpack(d)
+        del k, d
+
+        diff = c - shift(c)
+        rsi_up = ewm(np.maximum(diff, 0), 1 / self.rsi)
+        rsi_down = ewm(np.abs(diff), 1 / self.rsi)
+        del diff
+        state["rsi_up"], state["rsi_down"] = last(rsi_up), last(rsi_down)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["rsi"] = unpack(rsi_up / rsi_down * 100)
+        del rsi_up, rsi_down
+
+        tr = true_range(c, h, l, shift(c))
+        state["tr"] = self._tail(tr, counts, self.atr)
+        # 第一根日线没有前收盘价，TR 为 NaN，从第二行开始计算滚动均值
+        atr = np.full(tr.shape, np.nan)
+        atr[1:] = rolling_mean(tr[1:], self.atr)
+        del tr
+        out["atr"] = unpack(atr)
+        return {name: out[name] for name in self.columns}, state
+
+    # ---------------------------- 增量更新 ----------------------------
+    @staticmethod
+    def _tail(x: np.ndarray, counts: np.ndarray, n: int) -> np.ndarray:
+        """压缩面板中每列最近 n 个有效值，右对齐，不足 n 个时前面为 NaN"""
+        rows = counts[None, :] - n + np.arange(n)[:, None]
+        tail = np.take_along_axis(x, np.clip(rows, 0, None), axis=0) if len(x) else np.full((n, x.shape[1]), np.nan)
+        return np.where(rows >= 0, tail, np.nan)
+
+    @staticmethod
+    def _push(window: np.ndarray, x: np.ndarray, valid: np.ndarray):
+        """有新日线的列窗口左移一位并在末尾放入新值"""
+        window[:-1, valid] = window[1:, valid]
+        window[-1, valid] = x[valid]
+
+    def update(self, close: np.ndarray, high: np.ndarray, low: np.ndarray) -> dict:
+        """
+        追加一根日线（长度为股票数的一维数组，股票顺序与 compute 时一致），返回该日线的指标
+        close 为 NaN 的股票（停牌等）状态不变，指标为 NaN
+        """
+        if self.state is None:
+            raise ValueError("IndicatorEngine.update requires compute() or load_state() first.")
+        s = self.state
+        short, long, signal = self.macd
+        _, m1, m2 = self.kdj
+        boll_n, boll_p = self.boll
+        valid = ~np.isnan(close)
+
+        prev_close = s["close"][-1].copy()
+        self._push(s["close"], close, valid)
+        self._push(s["high"], high, valid)
+        self._push(s["low"], low, valid)
+        self._push(s["tr"], true_range(close, high, low, prev_close), valid)
+
+        def step(key, x, alpha):
+            new = ewm_step(s[key], x, alpha)
+            s[key] = np.where(valid, new, s[key])
+            return new
+
+        out = {f"ma{n}": s["close"][-n:].mean(axis=0) for n in self.ma_windows}
+        out["dif"] = step("ema_short", close, 2 / (short + 1)) - step("ema_long", close, 2 / (long + 1))
+        out["dea"] = step("dea", out["dif"], 2 / (signal + 1))
+        out["macd"] = (out["dif"] - out["dea"]) * 2
+
+        llv, hhv = s["low"].min(axis=0), s["high"].max(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsv = (close - llv) / (hhv - llv) * 100
+        rsv[~np.isfinite(rsv)] = np.nan
+        out["k"] = step("k", rsv, 1 / m1)
+        out["d"] = step("d", out["k"], 1 / m2)
+        out["j"] = 3 * out["k"] - 2 * out["d"]
+
+        diff = close - prev_close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["rsi"] = step("rsi_up", np.maximum(diff, 0), 1 / self.rsi) / step("rsi_down", np.abs(diff), 1 / self.rsi) * 100
+
+        window = s["close"][-boll_n:]
+        out["boll_mid"] = window.mean(axis=0)
+        std = window.std(axis=0)
+        out["boll_upper"] = out["boll_mid"] + boll_p * std
+        out["boll_lower"] = out["boll_mid"] - boll_p * std
+        out["atr"] = s["tr"].mean(axis=0)
+
+        for values in out.values():
+            values[~valid] = np.nan
+        return out
+
+    # ---------------------------- 状态持久化 ----------------------------
+    def save_state(self, path: str, meta: dict = None):
+        """保存增量状态与指标参数，meta 为调用方附带的信息（如股票列表、最后一根日线的日期）"""
+        # 先写入临时文件再替换，避免其他进程读到不完整的状态
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"config": self.config, "state": self.state, "meta": meta or {}}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load_state(self, path: str):
+        """载入增量状态，指标参数与当前引擎不一致时返回 None，否则返回保存时的 meta"""
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved["config"] != self.config:
+            return None
+        self.state = saved["state"]
+        return saved["meta"]
+
+
+def build_bar_panel(df: pd.DataFrame, fields=("close", "high", "low"), symbols=None):
+    """将 (symbol, update_time, 行情列) 的长表转换为 (日期 × 股票) 面板，返回 (日期, 股票, 行情列 -> 二维数组)"""
+    df = df.drop_duplicates(subset=["update_time", "symbol"], keep="last")
+    dates = pd.Index(sorted(df["update_time"].unique()))
+    symbols = pd.Index(sorted(df["symbol"].unique()) if symbols is None else symbols)
+    row = dates.get_indexer(df["update_time"])
+    col = symbols.get_indexer(df["symbol"])
+    keep = col >= 0
+    panel = {}
+    for field in fields:
+        values = np.full((len(dates), len(symbols)), np.nan)
+        values[row[keep], col[keep]] = df[field].to_numpy(dtype=float)[keep]
+        panel[field] = values
+    return dates, symbols, panel
+
+
+def panel_to_frame(dates, symbols, indicators: dict, valid: np.ndarray, rows=None) -> pd.DataFrame:
+    """将指标面板（可只取部分日期行）转换为 (symbol, update_time, 指标列) 的长表，valid 为有日线的位置"""
+    rows = np.arange(len(dates)) if rows is None else np.atleast_1d(rows)
+    keep = valid[rows].reshape(-1)
+    frame = pd.DataFrame({
+        "symbol": np.tile(np.asarray(symbols), len(rows))[keep],
+        "update_time": np.repeat(np.asarray(dates)[rows], len(symbols))[keep],
+    })
+    for name, values in indicators.items():
+        frame[name] = values[rows].reshape(-1)[keep]
+    return frame
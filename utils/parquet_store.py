@@ -0,0 +1,181 @@
+import glob
+import os
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from core.resource.rate_limiter import FileLock
+
+'''
+按 task / symbol / 交易时间段分区的 Parquet 结果存储（hive 分区目录），供 TaskNode 的 save: 3 模式使用
+    {root}/task=FetchAShareHistory/symbol=600000/trade_year=2025/part-xxx.parquet
+- 写入：每次写入在对应分区下新增 part 文件（追加），同一分区的 part 文件数超过 max_files 时合并为一个文件并按主键去重
+  part 文件名以纳秒时间戳开头，按文件名排序即为写入顺序
+  文件先以临时文件名（. 开头、.tmp 结尾，读取与合并时均忽略）写入分区目录，写完后再重命名，其他进程不会读到不完整的文件
+- 读取：read_parquet_store 通过分区裁剪与行组统计信息下推过滤条件，只加载所需的 symbol / 时间范围，
+  使用内存映射读取文件，并对尚未合并的重复数据按主键保留最后写入的一行
+'''
+
+# 交易时间分区粒度 -> (分区列名, strftime 格式)
+PARTITION_FREQS = {
+    "D": ("trade_date", "%Y-%m-%d"),
+    "M": ("trade_month", "%Y-%m"),
+    "Y": ("trade_year", "%Y"),
+}
+TIME_COLUMN = "update_time"
+DEDUP_KEYS = ["symbol", TIME_COLUMN]
+COMPRESSION = "zstd"
+TMP_PREFIX = "."
+TMP_SUFFIX = ".tmp"
+STALE_TMP_SECONDS = 3600
+READ_RETRIES = 5
+
+
+def _partition_schema(freq: str) -> pa.Schema:
+    """分区列统一为字符串类型，避免 000001 之类的代码被推断为整数"""
+    return pa.schema([("task", pa.string()), ("symbol", pa.string()), (PARTITION_FREQS[freq][0], pa.string())])
+
+
+def _prepare_frame(df: pd.DataFrame, task: str, symbol: str, freq: str, default_time: str) -> pd.DataFrame:
+    df = df.copy()
+    if TIME_COLUMN in df.columns:
+        df[TIME_COLUMN] = pd.to_datetime(df[TIME_COLUMN])
+        period = df[TIME_COLUMN].dt.strftime(PARTITION_FREQS[freq][1])
+    else:
+        period = pd.Timestamp(default_time).strftime(PARTITION_FREQS[freq][1])
+    df["task"] = task
+    if "symbol" in df.columns:
+        df["symbol"] = df["symbol"].astype(str)
+    else:
+        df["symbol"] = symbol or "_all"
+    df[PARTITION_FREQS[freq][0]] = period
+    # 混合类型的 object 列（如部分为数字的字符串列）统一转为字符串，保证 Arrow 可以推断出类型
+    for column in df.columns:
+        if df[column].dtype == object:
+            non_null = df[column].dropna()
+            if not non_null.map(type).eq(str).all():
+                df[column] = df[column].map(lambda v: v if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return df
+
+
+def _part_files(partition_dir: str) -> list:
+    """分区内已写完的 part 文件（按文件名即写入顺序排序），不包含正在写入的临时文件"""
+    return sorted(f for f in glob.glob(os.path.join(partition_dir, "*.parquet"))
+                  if not os.path.basename(f).startswith(TMP_PREFIX))
+
+
+def write_parquet_store(df: pd.DataFrame, root: str, task: str, symbol: str = None, freq: str = "Y",
+                        default_time: str = None, max_files: int = 16) -> list:
+    """
+    将 DataFrame 追加写入分区存储，返回写入的分区目录列表
+    :param symbol: DataFrame 中没有 symbol 列时使用的分区值
+    :param freq: 交易时间的分区粒度（D / M / Y），日线等低频数据按年分区即可，避免产生大量小文件
+    :param default_time: DataFrame 中没有 update_time 列时使用的时间（用于确定时间分区）
+    :param max_files: 单个分区内 part 文件数的上限，超过后触发合并
+    """
+    if df is None or df.empty:
+        return []
+    df = _prepare_frame(df, task, symbol, freq, default_time or time.strftime("%Y-%m-%d %H:%M:%S"))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partition_count = len(df[["symbol", PARTITION_FREQS[freq][0]]].drop_duplicates())
+    written_files, written_dirs = [], set()
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(_partition_schema(freq), flavor="hive"),
+        basename_template=f"{TMP_PREFIX}part-{time.time_ns()}-{uuid.uuid4().hex[:8]}-{{i}}.parquet{TMP_SUFFIX}",
+        existing_data_behavior="overwrite_or_ignore",
+        max_partitions=max(partition_count, 1024),
+        file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION),
+        file_visitor=lambda written_file: written_files.append(written_file.path),
+    )
+    # 全部写完后再重命名为正式的 part 文件名
+    for tmp_path in written_files:
+        partition_dir, name = os.path.split(tmp_path)
+        os.replace(tmp_path, os.path.join(partition_dir, name[len(TMP_PREFIX):-len(TMP_SUFFIX)]))
+        written_dirs.add(partition_dir)
+    for partition_dir in written_dirs:
+        if len(_part_files(partition_dir)) > max_files:
+            compact_partition(partition_dir)
+    return sorted(written_dirs)
+
+
+def compact_partition(partition_dir: str):
+    """将分区内所有 part 文件合并为一个文件，按 (symbol, update_time) 去重并保留最后写入的数据"""
+    with FileLock(os.path.join(partition_dir, ".compact.lock")).hold():
+        # 清理写入进程异常退出后残留的临时文件
+        for tmp_path in glob.glob(os.path.join(partition_dir, f"{TMP_PREFIX}*{TMP_SUFFIX}")):
+            try:
+                if time.time() - os.path.getmtime(tmp_path) > STALE_TMP_SECONDS:
+                    os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        files = _part_files(partition_dir)
+        if len(files) <= 1:
+            return
+        table = pa.concat_tables([pq.read_table(f, memory_map=True) for f in files], promote_options="permissive")
+        df = table.to_pandas()
+        keys = [k for k in DEDUP_KEYS if k in df.columns]
+        df = df.drop_duplicates(subset=keys or None, keep="last")
+        if TIME_COLUMN in df.columns:
+            df = df.sort_values(TIME_COLUMN, kind="stable")
+        # 合并后的文件沿用最后一个 part 文件的时间戳，合并期间其他进程新写入的 part 文件仍排在其后
+        # 先写入新文件再删除旧文件，读取方最多短暂看到重复数据而不会丢失数据
+        output_path = files[-1][:-len(".parquet")].removesuffix("-compact") + "-compact.parquet"
+        tmp_path = os.path.join(partition_dir, TMP_PREFIX + os.path.basename(output_path) + TMP_SUFFIX)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression=COMPRESSION)
+        os.replace(tmp_path, output_path)
+        for f in files:
+            if f != output_path:
+                os.remove(f)
+
+
+def read_parquet_store(root: str, task: str, symbols: list = None, start=None, end=None,
+                       columns: list = None, freq: str = "Y", dedup: bool = True) -> pd.DataFrame:
+    """
+    读取分区存储，仅加载指定 task / symbol / 时间范围内的数据
+    分区列（task / symbol / 交易时间段）用于目录裁剪，update_time 的范围条件下推到 Parquet 行组统计信息
+    """
+    partition_column, period_format = PARTITION_FREQS[freq]
+    task_dir = os.path.join(root, f"task={task}")
+    if not os.path.isdir(task_dir):
+        return pd.DataFrame()
+    filters = [("task", "=", task)]
+    if symbols:
+        symbols = [str(s) for s in symbols]
+        filters.append(("symbol", "in", symbols))
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters += [(partition_column, ">=", start.strftime(period_format)), (TIME_COLUMN, ">=", start)]
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters += [(partition_column, "<=", end.strftime(period_format)), (TIME_COLUMN, "<=", end)]
+    # 其他进程合并分区时会删除已列出的 part 文件（合并结果已先写入），此时重新列出文件后再读取
+    for attempt in range(READ_RETRIES):
+        if symbols:
+            # 指定 symbol 时只列出对应分区目录下的文件，避免遍历整个数据集
+            source = sorted(f for s in symbols for d in glob.glob(os.path.join(task_dir, f"symbol={s}", "*")) for f in _part_files(d))
+            if not source:
+                return pd.DataFrame()
+        else:
+            source = task_dir
+        try:
+            dataset = ds.dataset(source, format="parquet", filesystem=pafs.LocalFileSystem(use_mmap=True),
+                                 partitioning=ds.partitioning(_partition_schema(freq), flavor="hive"), partition_base_dir=root)
+            # 数据集按文件路径排序发现 part 文件，读取结果中的行与写入顺序一致
+            table = dataset.to_table(columns=columns, filter=pq.filters_to_expression(filters))
+            break
+        except FileNotFoundError:
+            if attempt == READ_RETRIES - 1:
+                raise
+    df = table.to_pandas()
+    keys = [k for k in DEDUP_KEYS if k in df.columns]
+    if dedup and len(keys) == len(DEDUP_KEYS):
+        df = df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+    return df
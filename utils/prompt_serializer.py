@@ -0,0 +1,199 @@
+import json
+from itertools import chain
+
+import pandas as pd
+
+from utils.token_utils import count_tokens, pack_by_tokens, split_by_tokens
+
+'''
+将 task 的结果（主要是 DataFrame）转换为放入大模型 prompt 的紧凑文本，并使其不超过调用方指定的 token 预算：
+- frame_to_csv: 无对齐空格的 CSV，浮点数保留 float_digits 位有效数字，全为空的列被丢弃，零点时刻的日期只保留日期
+- serialize_frame: 完整 CSV 超出预算时，按数据形态逐级压缩，直到放入预算：
+  - 行情（含 open / high / low / close 与时间列）：最近 recent_bars 个交易日的明细 + 更早数据按周 / 月 / 季 / 年汇总的 K 线 + 统计摘要
+  - 报告期数据（含 REPORT_DATE 列，或以日期为列名的财报透视表）：只保留最近 recent_periods 个报告期
+  - 其他：统计摘要 + 最近若干行
+  仍无法放入预算时按行截断
+- serialize_for_prompt: 对 DataFrame / Series / 字符串 / dict / list 统一处理，token 预算只作用于 DataFrame，
+  其他类型无损转换（长文本由 AILLM.map_reduce_chat 切分）
+'''
+
+TIME_KEYWORDS = ("date", "time", "日期", "时间")
+# K 线汇总方式，未列出的数值列取周期内最后一个值
+BAR_AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "amount": "sum"}
+# 更早数据的汇总周期，依次变粗
+BAR_FREQUENCIES = [("W", "周"), ("ME", "月"), ("QE", "季"), ("YE", "年")]
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    丢弃全为空的列；clean_df 处理后数值列可能为 object 类型（None 代替 NaN），转换回数值类型
+    只转换元素本身为数值的列，股票代码等数字字符串保持不变（避免丢失前导零）
+    """
+    df = df.dropna(axis=1, how="all")
+    converted = {}
+    for col in df.columns[df.dtypes.values == object]:
+        values = df[col]
+        if isinstance(values, pd.DataFrame):  # 重复列名（多张透视表拼接）时跳过
+            continue
+        if pd.api.types.infer_dtype(values, skipna=True) in ("integer", "floating", "mixed-integer-float", "decimal"):
+            converted[col] = pd.to_numeric(values, errors="coerce")
+    return _replace_columns(df, converted)
+
+
+def _replace_columns(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    # 列名可能不是字符串（如报告期 Timestamp），不能使用 assign
+    if not columns:
+        return df
+    df = df.copy()
+    for col, values in columns.items():
+        df[col] = values
+    return df
+
+
+def _format_dates(df: pd.DataFrame) -> pd.DataFrame:
+    converted = {}
+    for col in df.columns[[pd.api.types.is_datetime64_any_dtype(t) for t in df.dtypes]]:
+        values = df[col]
+        if (values.dropna().dt.normalize() == values.dropna()).all():
+            converted[col] = values.dt.strftime("%Y-%m-%d")
+    return _replace_columns(df, converted)
+
+
+def frame_to_csv(df: pd.DataFrame, float_digits: int = 6, index: bool = None) -> str:
+    """index 为 None 时，仅在索引不是默认的 RangeIndex 时输出索引"""
+    if index is None:
+        index = not isinstance(df.index, pd.RangeIndex)
+    df = _format_dates(df.dropna(axis=1, how="all"))
+    if index and isinstance(df.index, pd.DatetimeIndex) and (df.index.normalize() == df.index).all():
+        df = df.set_axis(df.index.strftime("%Y-%m-%d"))
+    return df.to_csv(index=index, float_format=f"%.{float_digits}g", lineterminator="\n").rstrip("\n")
+
+
+def _time_column(df: pd.DataFrame):
+    """返回可作为时间轴的列名（datetime 类型，或列名含日期 / 时间关键字且可解析为日期的列），没有时返回 None"""
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+            return col
+    for col in df.columns:
+        if isinstance(col, str) and any(k in col.lower() for k in TIME_KEYWORDS) and df[col].dtype == object:
+            parsed = pd.to_datetime(df[col], errors="coerce", format="mixed")
+            if parsed.notna().all():
+                return col
+    return None
+
+
+def _summary(df: pd.DataFrame, float_digits: int) -> str:
+    numeric = df.select_dtypes(include="number")
+    if numeric.empty:
+        return ""
+    stats = numeric.agg(["min", "max", "mean", "std"]).T
+    stats["last"] = numeric.iloc[-1]
+    return "统计摘要:\n" + frame_to_csv(stats, float_digits, index=True)
+
+
+def _bar_candidates(df: pd.DataFrame, time_col: str, recent_bars: int, float_digits: int):
+    """行情数据的压缩方案，按输出长度从大到小依次生成"""
+    bars = _replace_columns(df, {time_col: pd.to_datetime(df[time_col])}).sort_values(time_col).set_index(time_col)
+    numeric = bars.select_dtypes(include="number")
+    aggregations = {col: BAR_AGGREGATIONS.get(col, "last") for col in numeric.columns}
+    # 取值不变的非数值列（如 symbol）只在开头说明一次
+    constants = [col for col in bars.columns if col not in numeric.columns and bars[col].nunique(dropna=False) == 1]
+    header = "，".join([f"共 {len(bars)} 行，{bars.index[0]:%Y-%m-%d} 至 {bars.index[-1]:%Y-%m-%d}"] + [f"{col}={bars[col].iloc[0]}" for col in constants])
+    bars = bars.drop(columns=constants)
+    summary = _summary(numeric, float_digits)
+    recent_sizes = [n for n in (recent_bars, recent_bars // 2, 5) if 0 < n < len(bars)]
+    for recent in recent_sizes:
+        older = numeric.iloc[:-recent]
+        for freq, label in BAR_FREQUENCIES:
+            resampled = older.resample(freq).agg(aggregations).dropna(how="all")
+            yield "\n\n".join(part for part in [
+                f"{header}。以下为最近 {recent} 个交易日明细，更早的数据按{label}汇总（open 为期初、close 为期末、high / low 为期内极值、成交量额为期内合计）",
+                f"最近 {recent} 个交易日:\n" + frame_to_csv(bars.iloc[-recent:], float_digits, index=True),
+                f"按{label}汇总:\n" + frame_to_csv(resampled, float_digits, index=True),
+                summary,
+            ] if part)
+    yield "\n\n".join(part for part in [
+        f"{header}。以下为统计摘要与最近 {recent_sizes[-1] if recent_sizes else len(bars)} 个交易日明细",
+        summary,
+        frame_to_csv(bars.iloc[-(recent_sizes[-1] if recent_sizes else len(bars)):], float_digits, index=True),
+    ] if part)
+
+
+def _period_columns(df: pd.DataFrame) -> list:
+    """财报透视表（FetchFinReport convert=True）中以报告期为列名的列位置"""
+    positions = []
+    for i, col in enumerate(df.columns):
+        if isinstance(col, (str, pd.Timestamp)) and not pd.isna(pd.to_datetime(col, errors="coerce", format="mixed")):
+            positions.append(i)
+    return positions
+
+
+def _period_candidates(df: pd.DataFrame, recent_periods: int, float_digits: int):
+    """报告期数据的压缩方案：保留的报告期依次减半"""
+    if "REPORT_DATE" in df.columns:
+        ordered = df.assign(REPORT_DATE=pd.to_datetime(df["REPORT_DATE"])).sort_values("REPORT_DATE", ascending=False)
+        periods = len(ordered)
+        select = lambda n: ordered.head(n).reset_index(drop=True)
+    else:
+        positions = _period_columns(df)
+        dates = sorted({pd.to_datetime(df.columns[i]) for i in positions}, reverse=True)
+        if len(dates) < 2:
+            return
+        others = [i for i in range(df.shape[1]) if i not in set(positions)]
+        periods = len(dates)
+        select = lambda n: df.iloc[:, sorted(others + [i for i in positions if pd.to_datetime(df.columns[i]) >= dates[n - 1]])]
+    n = min(recent_periods, periods)
+    while n >= 1:
+        yield f"共 {periods} 个报告期，以下为最近 {n} 个报告期\n" + frame_to_csv(_prepare(select(n)), float_digits)
+        n //= 2
+
+
+def _generic_candidates(df: pd.DataFrame, float_digits: int):
+    summary = _summary(df, float_digits)
+    for rows in (50, 20, 5):
+        if rows < len(df):
+            yield "\n\n".join(part for part in [f"共 {len(df)} 行，以下为统计摘要与最后 {rows} 行", summary, frame_to_csv(df.tail(rows), float_digits)] if part)
+
+
+def serialize_frame(df: pd.DataFrame, max_tokens: int = None, recent_bars: int = 20, recent_periods: int = 8,
+                    float_digits: int = 6) -> str:
+    if df.empty:
+        return ""
+    df = _prepare(df)
+    text = frame_to_csv(df, float_digits)
+    if max_tokens is None or count_tokens(text) <= max_tokens:
+        return text
+
+    time_col = _time_column(df)
+    if time_col is not None and {"open", "high", "low", "close"} <= set(df.columns):
+        candidates = _bar_candidates(df, time_col, recent_bars, float_digits)
+    elif "REPORT_DATE" in df.columns or _period_columns(df):
+        candidates = _period_candidates(df, recent_periods, float_digits)
+    else:
+        candidates = iter(())
+    smallest = text
+    for candidate in chain(candidates, _generic_candidates(df, float_digits)):
+        if count_tokens(candidate) <= max_tokens:
+            return candidate
+        smallest = candidate
+    # 最小的方案仍超出预算（如列数过多），按行截断，保留开头的说明与尽可能多的行
+    lines = [piece for line in smallest.split("\n") for piece in split_by_tokens(line, max_tokens)]
+    return pack_by_tokens(lines, max_tokens, "\n")[0]
+
+
+def serialize_for_prompt(value, max_tokens: int = None, **kwargs) -> str:
+    """将任意 task 结果转换为 prompt 文本，DataFrame 的参数见 serialize_frame"""
+    if value is None:
+        return ""
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if isinstance(value, pd.DataFrame):
+        return serialize_frame(value, max_tokens, **kwargs)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        try:
+            return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+        except (TypeError, ValueError):
+            pass
+    return str(value)
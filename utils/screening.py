@@ -0,0 +1,550 @@
+import operator
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+'''
+进程内的列式选股引擎：将 FetchTargetShare 等使用的 SQL 子集编译为直接作用于 DataFrame 列的计算，
+不再像 pandasql 一样每次把整张表复制进 SQLite
+支持的 SQL 子集：
+    SELECT [DISTINCT] * | t.* | 表达式 [AS 别名], ...
+    FROM 表名 [[AS] 别名]                                   （单表，表名为 tables 中的键）
+    [WHERE 条件] [GROUP BY 列, ...] [HAVING 条件]
+    [ORDER BY 表达式 [ASC | DESC], ...] [LIMIT n [OFFSET m]]
+    条件：比较运算、AND / OR / NOT、[NOT] IN (列表 | 子查询)、[NOT] BETWEEN、[NOT] LIKE、IS [NOT] NULL
+    表达式：列、数字与字符串常量、+ - * / %、聚合函数 COUNT / SUM / AVG / MIN / MAX、ABS / ROUND / LOWER / UPPER / LENGTH、标量子查询
+- 编译结果按 SQL 字符串缓存（compile_screen），重复执行同一个筛选只需计算
+- 排序与 SQLite 一致：NULL 视为最小值；带 LIMIT 的单列数值排序使用 argpartition 只对前 k 行排序
+- 比较中的 NULL 视为不满足条件
+'''
+
+_TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<str>'(?:[^']|'')*')
+    |(?P<qid>"[^"]+")
+    |(?P<id>[^\W\d]\w*)
+    |(?P<op><=|>=|<>|!=|\|\||[=<>+\-*/%(),.;])
+)""", re.VERBOSE)
+
+KEYWORDS = {
+    "SELECT", "DISTINCT", "FROM", "AS", "WHERE", "GROUP", "BY", "HAVING", "ORDER", "ASC", "DESC", "LIMIT", "OFFSET",
+    "AND", "OR", "NOT", "IN", "BETWEEN", "LIKE", "IS", "NULL", "TRUE", "FALSE",
+}
+AGGREGATES = {"COUNT": "count", "SUM": "sum", "AVG": "mean", "MIN": "min", "MAX": "max"}
+SCALAR_FUNCTIONS = {
+    "ABS": lambda x, *a: abs(x),
+    "ROUND": lambda x, n=0: x.round(int(n)) if isinstance(x, pd.Series) else round(x, int(n)),
+    "LOWER": lambda x: x.str.lower() if isinstance(x, pd.Series) else x.lower(),
+    "UPPER": lambda x: x.str.upper() if isinstance(x, pd.Series) else x.upper(),
+    "LENGTH": lambda x: x.str.len() if isinstance(x, pd.Series) else len(x),
+}
+BINARY_OPERATORS = {
+    "=": operator.eq, "!=": operator.ne, "<>": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "%": operator.mod,
+    "AND": operator.and_, "OR": operator.or_,
+}
+
+
+def _tokenize(sql: str):
+    tokens, pos = [], 0
+    while pos < len(sql):
+        match = _TOKEN_RE.match(sql, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unsupported SQL near: {sql[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        value, start = match.group(kind), match.start(kind)
+        if kind == "id" and value.upper() in KEYWORDS:
+            kind, value = "kw", value.upper()
+        elif kind == "qid":
+            kind, value = "id", value[1:-1]
+        tokens.append((kind, value, start, match.end()))
+        pos = match.end()
+    return tokens
+
+
+class _Env:
+    """一次执行的上下文：表与非相关子查询的结果"""
+    def __init__(self, tables: dict):
+        self.tables = tables
+        self.subquery_results = {}
+
+
+# ---------------------------- 表达式节点 ----------------------------
+class _Literal:
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, frame, env):
+        return self.value
+
+
+class _Column:
+    def __init__(self, name):
+        self.name = name
+
+    def eval(self, frame, env):
+        if self.name not in frame.columns:
+            raise ValueError(f"Column {self.name!r} not found.")
+        return frame[self.name]
+
+
+class _Unary:
+    def __init__(self, op, operand):
+        self.op, self.operand = op, operand
+
+    def eval(self, frame, env):
+        value = self.operand.eval(frame, env)
+        if self.op == "NOT":
+            return ~_as_mask(value, frame)
+        return -value
+
+
+class _Binary:
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def eval(self, frame, env):
+        left, right = self.left.eval(frame, env), self.right.eval(frame, env)
+        if self.op in ("AND", "OR"):
+            return BINARY_OPERATORS[self.op](_as_mask(left, frame), _as_mask(right, frame))
+        if self.op == "||":
+            return (left.astype(str) if isinstance(left, pd.Series) else str(left)) + \
+                (right.astype(str) if isinstance(right, pd.Series) else str(right))
+        if left is None or right is None:
+            return False
+        return BINARY_OPERATORS[self.op](left, right)
+
+
+class _In:
+    def __init__(self, operand, values, negate):
+        self.operand, self.values, self.negate = operand, values, negate
+
+    def eval(self, frame, env):
+        if isinstance(self.values, _Subquery):
+            values = self.values.values(env)
+        else:
+            values = [v.eval(frame, env) for v in self.values]
+        mask = _as_series(self.operand.eval(frame, env), frame).isin(values)
+        return ~mask if self.negate else mask
+
+
+class _Between:
+    def __init__(self, operand, low, high, negate):
+        self.operand, self.low, self.high, self.negate = operand, low, high, negate
+
+    def eval(self, frame, env):
+        value = self.operand.eval(frame, env)
+        mask = (value >= self.low.eval(frame, env)) & (value <= self.high.eval(frame, env))
+        return ~mask if self.negate else mask
+
+
+class _Like:
+    def __init__(self, operand, pattern, negate):
+        self.operand, self.pattern, self.negate = operand, pattern, negate
+        # SQLite 的 LIKE 对 ASCII 字母不区分大小写
+        regex = "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+        self.regex = re.compile(regex, re.IGNORECASE | re.DOTALL)
+
+    def eval(self, frame, env):
+        values = _as_series(self.operand.eval(frame, env), frame)
+        try:
+            # 字符串列使用 Arrow 的向量化 LIKE
+            matched = pc.match_like(pa.array(values, from_pandas=True, type=pa.string()), self.pattern, ignore_case=True)
+            mask = matched.fill_null(False).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            match = self.regex.fullmatch
+            mask = np.fromiter((isinstance(v, str) and match(v) is not None for v in values.to_numpy(dtype=object)), dtype=bool, count=len(values))
+        mask = pd.Series(mask, index=values.index)
+        return ~mask if self.negate else mask
+
+
+class _IsNull:
+    def __init__(self, operand, negate):
+        self.operand, self.negate = operand, negate
+
+    def eval(self, frame, env):
+        mask = _as_series(self.operand.eval(frame, env), frame).isna()
+        return ~mask if self.negate else mask
+
+
+class _Function:
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+
+    def eval(self, frame, env):
+        return SCALAR_FUNCTIONS[self.name](*(a.eval(frame, env) for a in self.args))
+
+
+class _Aggregate:
+    """聚合函数，分组后以隐藏列 key 的形式出现在分组结果中"""
+    def __init__(self, name, arg, distinct):
+        self.name, self.arg, self.distinct = name, arg, distinct
+        self.key = None
+
+    def eval(self, frame, env):
+        return frame[self.key]
+
+
+class _Subquery:
+    def __init__(self, query):
+        self.query = query
+
+    def _run(self, env):
+        if id(self) not in env.subquery_results:
+            env.subquery_results[id(self)] = self.query.run(env.tables)
+        return env.subquery_results[id(self)]
+
+    def values(self, env):
+        result = self._run(env)
+        return result.iloc[:, 0].tolist() if not result.empty else []
+
+    def eval(self, frame, env):
+        result = self._run(env)
+        if result.empty:
+            return None
+        value = result.iat[0, 0]
+        return None if pd.isna(value) else value
+
+
+def _as_series(value, frame):
+    return value if isinstance(value, pd.Series) else pd.Series(value, index=frame.index)
+
+
+def _as_mask(value, frame):
+    if isinstance(value, pd.Series):
+        return value.fillna(False).astype(bool) if value.dtype != bool else value
+    return pd.Series(bool(value), index=frame.index)
+
+
+# ---------------------------- 解析 ----------------------------
+class _Parser:
+    def __init__(self, sql, tokens, pos=0):
+        self.sql, self.tokens, self.pos = sql, tokens, pos
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None, len(self.sql), len(self.sql))
+
+    def accept(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return token
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            found = self.peek()[1]
+            raise ValueError(f"Unsupported SQL: expected {value or kind}, found {found!r}")
+        return token
+
+    def parse_query(self):
+        self.expect("kw", "SELECT")
+        distinct = bool(self.accept("kw", "DISTINCT"))
+        items = [self.parse_select_item()]
+        while self.accept("op", ","):
+            items.append(self.parse_select_item())
+        self.expect("kw", "FROM")
+        table = self.expect("id")[1]
+        if self.accept("kw", "AS") or (self.peek()[0] == "id" and self.peek()[1].upper() not in ("JOIN", "INNER", "LEFT")):
+            self.expect("id")
+        if self.peek()[1] == "," or (self.peek()[0] == "id" and self.peek()[1].upper() in ("JOIN", "INNER", "LEFT")):
+            raise ValueError("Unsupported SQL: only single-table queries are supported.")
+        where = self.parse_expr() if self.accept("kw", "WHERE") else None
+        group_by = []
+        if self.accept("kw", "GROUP"):
+            self.expect("kw", "BY")
+            group_by = [self.parse_expr()]
+            while self.accept("op", ","):
+                group_by.append(self.parse_expr())
+        having = self.parse_expr() if self.accept("kw", "HAVING") else None
+        order_by = []
+        if self.accept("kw", "ORDER"):
+            self.expect("kw", "BY")
+            while True:
+                expr = self.parse_expr()
+                descending = bool(self.accept("kw", "DESC"))
+                if not descending:
+                    self.accept("kw", "ASC")
+                order_by.append((expr, descending))
+                if not self.accept("op", ","):
+                    break
+        limit, offset = None, 0
+        if self.accept("kw", "LIMIT"):
+            limit = int(self.expect("num")[1])
+            if self.accept("kw", "OFFSET"):
+                offset = int(self.expect("num")[1])
+        return ScreenQuery(table, items, where, group_by, having, order_by, limit, offset, distinct)
+
+    def parse_select_item(self):
+        if self.accept("op", "*"):
+            return ("*", None)
+        if self.peek()[0] == "id" and self.peek(1)[1] == "." and self.peek(2)[1] == "*":
+            self.pos += 3
+            return ("*", None)
+        start = self.peek()[2]
+        expr = self.parse_expr()
+        name = self.sql[start:self.tokens[self.pos - 1][3]].strip()
+        if self.accept("kw", "AS"):
+            name = self.expect("id")[1]
+        elif self.peek()[0] == "id":
+            name = self.expect("id")[1]
+        elif isinstance(expr, _Column):
+            name = expr.name
+        return (name, expr)
+
+    def parse_expr(self):
+        left = self.parse_and()
+        while self.accept("kw", "OR"):
+            left = _Binary("OR", left, self.parse_and())
+        return left
+
+    def parse_and(self):
+        left = self.parse_not()
+        while self.accept("kw", "AND"):
+            left = _Binary("AND", left, self.parse_not())
+        return left
+
+    def parse_not(self):
+        if self.accept("kw", "NOT"):
+            return _Unary("NOT", self.parse_not())
+        return self.parse_predicate()
+
+    def parse_predicate(self):
+        left = self.parse_additive()
+        token = self.peek()
+        if token[0] == "op" and token[1] in ("=", "!=", "<>", "<", "<=", ">", ">="):
+            self.pos += 1
+            return _Binary(token[1], left, self.parse_additive())
+        if self.accept("kw", "IS"):
+            negate = bool(self.accept("kw", "NOT"))
+            self.expect("kw", "NULL")
+            return _IsNull(left, negate)
+        negate = bool(self.accept("kw", "NOT"))
+        if self.accept("kw", "IN"):
+            self.expect("op", "(")
+            if self.peek()[1] == "SELECT":
+                values = _Subquery(self.parse_query())
+            else:
+                values = [self.parse_additive()]
+                while self.accept("op", ","):
+                    values.append(self.parse_additive())
+            self.expect("op", ")")
+            return _In(left, values, negate)
+        if self.accept("kw", "BETWEEN"):
+            low = self.parse_additive()
+            self.expect("kw", "AND")
+            return _Between(left, low, self.parse_additive(), negate)
+        if self.accept("kw", "LIKE"):
+            return _Like(left, self.expect("str")[1][1:-1].replace("''", "'"), negate)
+        if negate:
+            raise ValueError("Unsupported SQL: NOT must be followed by IN, BETWEEN or LIKE.")
+        return left
+
+    def parse_additive(self):
+        left = self.parse_multiplicative()
+        while self.peek()[0] == "op" and self.peek()[1] in ("+", "-", "||"):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            left = _Binary(op, left, self.parse_multiplicative())
+        return left
+
+    def parse_multiplicative(self):
+        left = self.parse_unary()
+        while self.peek()[0] == "op" and self.peek()[1] in ("*", "/", "%"):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            left = _Binary(op, left, self.parse_unary())
+        return left
+
+    def parse_unary(self):
+        if self.accept("op", "-"):
+            return _Unary("-", self.parse_unary())
+        self.accept("op", "+")
+        return self.parse_primary()
+
+    def parse_primary(self):
+        kind, value, _, _ = self.peek()
+        if kind == "num":
+            self.pos += 1
+            return _Literal(float(value) if any(c in value for c in ".eE") else int(value))
+        if kind == "str":
+            self.pos += 1
+            return _Literal(value[1:-1].replace("''", "'"))
+        if kind == "kw" and value in ("NULL", "TRUE", "FALSE"):
+            self.pos += 1
+            return _Literal({"NULL": None, "TRUE": True, "FALSE": False}[value])
+        if self.accept("op", "("):
+            node = _Subquery(self.parse_query()) if self.peek()[1] == "SELECT" else self.parse_expr()
+            self.expect("op", ")")
+            return node
+        if kind == "id":
+            self.pos += 1
+            if self.accept("op", "("):
+                return self.parse_function(value.upper())
+            if self.accept("op", "."):
+                # 带表别名的列（如 r.turnover），单表查询中直接忽略别名
+                return _Column(self.expect("id")[1])
+            return _Column(value)
+        raise ValueError(f"Unsupported SQL near: {value!r}")
+
+    def parse_function(self, name):
+        if name in AGGREGATES:
+            distinct = bool(self.accept("kw", "DISTINCT"))
+            arg = None if self.accept("op", "*") else self.parse_expr()
+            self.expect("op", ")")
+            return _Aggregate(name, arg, distinct)
+        if name not in SCALAR_FUNCTIONS:
+            raise ValueError(f"Unsupported SQL function: {name}")
+        args = [] if self.peek()[1] == ")" else [self.parse_expr()]
+        while self.accept("op", ","):
+            args.append(self.parse_expr())
+        self.expect("op", ")")
+        return _Function(name, args)
+
+
+def _walk(node):
+    """遍历表达式树（不进入子查询）"""
+    yield node
+    for attr in ("operand", "left", "right", "low", "high", "arg"):
+        child = getattr(node, attr, None)
+        if child is not None:
+            yield from _walk(child)
+    for child in getattr(node, "args", []) or []:
+        yield from _walk(child)
+    if isinstance(getattr(node, "values", None), list):
+        for child in node.values:
+            yield from _walk(child)
+
+
+# ---------------------------- 执行 ----------------------------
+def _sort_key(values: pd.Series, descending: bool) -> np.ndarray:
+    """将排序列转换为升序排序键，NULL 视为最小值（升序在前、降序在后）"""
+    if values.dtype.kind in "iufb":
+        key = values.to_numpy(dtype=float)
+        key = np.where(np.isnan(key), -np.inf, key)
+    else:
+        key = pd.factorize(values, sort=True)[0].astype(float)     # NULL 的编码为 -1
+    return -key if descending else key
+
+
+class ScreenQuery:
+    """编译后的查询，run(tables) 在 {表名: DataFrame} 上执行；通过 from_sql 从 SQL 字符串构建"""
+    def __init__(self, table, items, where=None, group_by=(), having=None, order_by=(), limit=None, offset=0, distinct=False):
+        self.table = table
+        self.items = items                      # [(输出列名, 表达式)]，表达式为 None 表示 *
+        self.where = where
+        self.group_by = list(group_by)
+        self.limit, self.offset = limit, offset
+        self.distinct = distinct
+        # ORDER BY / HAVING 中的别名替换为对应的表达式
+        aliases = {name: expr for name, expr in items if expr is not None}
+        resolve = lambda e: aliases[e.name] if isinstance(e, _Column) and e.name in aliases else e
+        self.order_by = [(resolve(e), desc) for e, desc in order_by]
+        self.having = resolve(having) if having is not None else None
+        # 收集聚合函数并分配分组结果中的隐藏列
+        exprs = [e for _, e in items if e is not None] + [e for e, _ in self.order_by] + ([self.having] if self.having else [])
+        self.aggregates = [n for e in exprs for n in _walk(e) if isinstance(n, _Aggregate)]
+        for i, agg in enumerate(self.aggregates):
+            agg.key = f"__agg_{i}"
+        for expr in self.group_by:
+            if not isinstance(expr, _Column):
+                raise ValueError("Unsupported SQL: GROUP BY only supports columns.")
+        self.grouped = bool(self.group_by or self.aggregates)
+
+    @classmethod
+    def from_sql(cls, sql: str):
+        sql = sql.strip()
+        parser = _Parser(sql, _tokenize(sql))
+        query = parser.parse_query()
+        parser.accept("op", ";")
+        if parser.pos != len(parser.tokens):
+            raise ValueError(f"Unsupported SQL near: {parser.peek()[1]!r}")
+        return query
+
+    def run(self, tables: dict) -> pd.DataFrame:
+        if self.table not in tables:
+            raise ValueError(f"Table {self.table!r} not found, available: {list(tables)}")
+        env = _Env(tables)
+        frame = tables[self.table]
+        if self.where is not None:
+            mask = _as_mask(self.where.eval(frame, env), frame)
+            frame = frame[mask.to_numpy()]
+        if self.grouped:
+            frame = self._group(frame, env)
+            if self.having is not None:
+                frame = frame[_as_mask(self.having.eval(frame, env), frame).to_numpy()]
+        rows = self._order(frame, env)
+        if rows is not None:
+            frame = frame.iloc[rows]
+        elif self.limit is not None or self.offset:
+            stop = None if self.limit is None else self.offset + self.limit
+            frame = frame.iloc[self.offset:stop]
+        result = self._project(frame, env)
+        if self.distinct:
+            result = result.drop_duplicates()
+        return result.reset_index(drop=True)
+
+    def _group(self, frame, env) -> pd.DataFrame:
+        keys = [expr.name for expr in self.group_by]
+        data = {key: frame[key] for key in keys}
+        spec = {}
+        for agg in self.aggregates:
+            if agg.arg is None:
+                data[agg.key] = pd.Series(1, index=frame.index)
+                spec[agg.key] = "size"
+            else:
+                data[agg.key] = _as_series(agg.arg.eval(frame, env), frame)
+                spec[agg.key] = "nunique" if agg.distinct else AGGREGATES[agg.name]
+        data = pd.DataFrame(data, index=frame.index)
+        if not keys:
+            # 没有 GROUP BY 时整张表为一组，空表上 COUNT 为 0、其余聚合为 NULL
+            return pd.DataFrame({k: [data[k].agg(f) if len(data) else (0 if f == "size" else None)] for k, f in spec.items()})
+        return data.groupby(keys, sort=False, dropna=False).agg(spec).reset_index()
+
+    def _order(self, frame, env):
+        """返回排序并应用 LIMIT / OFFSET 后的行位置，没有 ORDER BY 时返回 None"""
+        if not self.order_by or frame.empty:
+            return None
+        keys = [_sort_key(_as_series(expr.eval(frame, env), frame), desc) for expr, desc in self.order_by]
+        stop = len(frame) if self.limit is None else min(len(frame), self.offset + self.limit)
+        if len(keys) == 1 and stop < len(frame) // 4:
+            # top-k：只对前 k 个候选排序；与第 k 个排序键相同的行按原顺序补足，结果与完整稳定排序一致
+            key = keys[0]
+            if not stop:
+                return np.array([], dtype=int)
+            kth = np.partition(key, stop - 1)[stop - 1]
+            below = np.flatnonzero(key < kth)
+            candidates = np.concatenate([below, np.flatnonzero(key == kth)[:stop - len(below)]])
+            candidates.sort()
+            rows = candidates[np.argsort(key[candidates], kind="stable")]
+        else:
+            rows = np.lexsort(keys[::-1])
+        return rows[self.offset:stop]
+
+    def _project(self, frame, env) -> pd.DataFrame:
+        if all(expr is None for _, expr in self.items) and not self.grouped:
+            return frame
+        columns = {}
+        for name, expr in self.items:
+            if expr is None:
+                columns.update({c: frame[c] for c in frame.columns if not str(c).startswith("__agg_")})
+            else:
+                columns[name] = _as_series(expr.eval(frame, env), frame)
+        return pd.DataFrame(columns, index=frame.index)
+
+
+@lru_cache(maxsize=256)
+def compile_screen(sql: str) -> ScreenQuery:
+    """编译并缓存 SQL（按字符串缓存）"""
+    return ScreenQuery.from_sql(sql)
+
+
+def run_screen(sql: str, tables: dict) -> pd.DataFrame:
+    """在 {表名: DataFrame} 上执行 SQL 子集查询，返回新的 DataFrame"""
+    return compile_screen(sql).run(tables)
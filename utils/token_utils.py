@@ -0,0 +1,92 @@
+import math
+import re
+import string
+import threading
+from collections import OrderedDict
+
+'''
+大模型输入的 token 估算与按 token 预算切分文本：
+- count_tokens: 已安装 tiktoken 时使用 cl100k_base 编码计数，否则按字符估算（中文等全角字符每字约 1 个 token，数字约 3 位 1 个 token，
+  英文标点各 1 个 token，其余字符约 4 个 1 个 token），估算值偏保守，用于判断文本是否超出预算；
+  结果按 (文本哈希, 长度) 缓存，切分 / 合并 / 序列化过程中对同一文本的重复计数不再重新编码
+- split_by_tokens: 按段落 / 行 / 字符逐级切分，使每块不超过 max_tokens
+- pack_by_tokens: 将相邻的小段按顺序合并，使每块尽量接近且不超过 max_tokens
+'''
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # 未安装 tiktoken 或无法加载编码文件时使用估算
+    _encoding = None
+
+# CJK 统一表意文字、CJK 标点、全角字符
+_WIDE_CHAR = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+_DROP_DIGITS = str.maketrans("", "", string.digits)
+_DROP_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+# 短文本直接计数比查缓存更快；缓存条目只保存计数，不持有文本本身
+_CACHE_MIN_LENGTH = 256
+_CACHE_SIZE = 8192
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _count(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    wide = 0 if text.isascii() else len(_WIDE_CHAR.findall(text))
+    digits = len(text) - len(text.translate(_DROP_DIGITS))
+    punctuation = len(text) - len(text.translate(_DROP_PUNCTUATION))
+    return wide + math.ceil(digits / 3) + punctuation + math.ceil((len(text) - wide - digits - punctuation) / 4)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if len(text) < _CACHE_MIN_LENGTH:
+        return _count(text)
+    key = (hash(text), len(text))
+    with _cache_lock:
+        tokens = _cache.get(key)
+        if tokens is not None:
+            _cache.move_to_end(key)
+            return tokens
+    tokens = _count(text)
+    with _cache_lock:
+        _cache[key] = tokens
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return tokens
+
+
+def split_by_tokens(text: str, max_tokens: int) -> list:
+    """将文本切分为不超过 max_tokens 的若干块，优先在段落、换行处切分，相邻的小段落合并为一块"""
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    for separator in ("\n\n", "\n"):
+        parts = text.split(separator)
+        if len(parts) > 1:
+            return pack_by_tokens([piece for part in parts for piece in split_by_tokens(part, max_tokens)], max_tokens, separator)
+    # 单行过长：按字符数等比例切分
+    size = max(1, len(text) * max_tokens // count_tokens(text))
+    return [chunk for start in range(0, len(text), size) for chunk in split_by_tokens(text[start:start + size], max_tokens)]
+
+
+def truncate_by_tokens(text: str, max_tokens: int) -> str:
+    """保留不超过 max_tokens 的开头部分（在段落、换行处截断）"""
+    return split_by_tokens(text, max_tokens)[0] if count_tokens(text) > max_tokens else text
+
+
+def pack_by_tokens(pieces: list, max_tokens: int, separator: str = "\n\n") -> list:
+    chunks, current, current_tokens = [], [], 0
+    separator_tokens = count_tokens(separator)
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and current_tokens + separator_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current_tokens += tokens + (separator_tokens if current else 0)
+        current.append(piece)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
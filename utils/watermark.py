@@ -0,0 +1,39 @@
+import json
+import os
+
+from core.resource.rate_limiter import FileLock
+
+'''
+本地水位线（watermark）索引：记录每个键（如股票代码）已保存数据的最新时间，用于增量获取
+索引保存为 JSON 文件，读写通过文件锁在多个 worker 进程间互斥，写入时先写临时文件再替换
+'''
+
+
+class WatermarkIndex:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = FileLock(path + ".lock")
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key: str):
+        """返回 key 的水位线（"YYYY-MM-DD HH:MM:SS" 字符串），不存在时返回 None"""
+        return self._read().get(key)
+
+    def update(self, key: str, value: str):
+        """水位线只前进不后退"""
+        with self.lock.hold():
+            index = self._read()
+            if index.get(key) is not None and index[key] >= value:
+                return
+            index[key] = value
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -4,6 +4,7 @@ import multiprocessing
 import os
 from core.logger import get_logger
 from web.util.pipeline_conf_manager import PipelineConfigManager
+from web.util.state_hub import StateHub
 
 # --- 全局状态变量 ---
 # 存储所有Scheduler实例及其通信通道的共享字典
@@ -26,5 +27,8 @@ app_config = {}
 # --- app使用的logger ---
 logger = get_logger("Webapp")
 
+# --- 调度器状态的推送中心（SSE），每个Scheduler一个泵线程 ---
+state_hub = StateHub(logger)
+
 # --- app使用的配置管理器 ---
 config_manager = PipelineConfigManager(PIPELINE_CONFIG_FOLDER)
\ No newline at end of file
@@ -1,16 +1,19 @@
 import os
+import threading
 import uuid
 import multiprocessing
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from multiprocessing import Process
 
 # 假设这些全局变量和函数可以在其他文件中导入
-from web.glob_resource import scheduler_instances, instance_lock, manager, RESOURCE_CONFIG, logger
+from web.glob_resource import scheduler_instances, instance_lock, manager, state_hub, RESOURCE_CONFIG, logger
 from core.scheduler import run_scheduler_process
 
 # 创建一个名为 'scheduler_api' 的蓝图，蓝图可被统一的注册到webapp当中
 # 所有路由的URL前缀将为 /schedulers，用于处理用户端所有前缀为scheduler的请求
 scheduler_bp = Blueprint('scheduler_api', __name__, url_prefix='/schedulers')
+# 等待Scheduler返回task完整结果的超时时间（秒）
+RESULT_TIMEOUT = 10
 
 # 以下函数用于将scheduler的最新数据发送给前端
 # 当http GET请求访问/schedulers路径时，以下函数会被调用
@@ -20,12 +23,16 @@ def list_schedulers():
     列出所有正在运行的Scheduler实例及其状态（存储于scheduler实例字典中的latest_state）
     """
     with instance_lock:
-        response = {
-            sch_id: instance['latest_state']
-            for sch_id, instance in scheduler_instances.items()
-        }
-    return jsonify(response)
+        instances = dict(scheduler_instances)
+    # latest_state 由 StateHub 的泵线程在 hub 的锁下修改，需通过 hub 复制
+    return jsonify(state_hub.copy_states(instances))
     
+# 以 Server-Sent Events 推送所有Scheduler的状态：连接时发送完整快照，之后在增量到达时立即推送（格式见 web.util.state_hub）
+@scheduler_bp.route('/stream', methods=['GET'])
+def stream_schedulers():
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(state_hub.stream()), mimetype="text/event-stream", headers=headers)
+
 # 外部 HTTP POST 请求访问 /schedulers/create 时，该函数会被调用
 # TODO：判断request中是否包含所需信息
 @scheduler_bp.route('/create', methods=['POST'])
@@ -49,10 +56,12 @@ def create_scheduler():
     # 为新的Scheduler创建独立的通信队列
     state_queue = manager.Queue()
     command_queue = manager.Queue()
+    result_request_queue = manager.Queue()
+    result_queue = manager.Queue()
     
     proc = Process(
         target=run_scheduler_process,
-        args=(scheduler_id, resource_conf, pipeline_json, state_queue, command_queue, updates_data),
+        args=(scheduler_id, resource_conf, pipeline_json, state_queue, command_queue, updates_data, result_request_queue, result_queue),
         name=f"SchedulerProcess-{scheduler_id}"
     )
     
@@ -61,13 +70,44 @@ def create_scheduler():
             'process': proc,
             'state_queue': state_queue,
             'command_queue': command_queue,
+            'result_request_queue': result_request_queue,
+            'result_queue': result_queue,
+            'result_lock': threading.Lock(),
             'latest_state': {}
         }
         
     proc.start()
+    state_hub.attach(scheduler_id, scheduler_instances[scheduler_id])
     
     return jsonify({"message": f"Scheduler '{scheduler_id}' created and started."}), 201
 
+# 状态快照中task结果仅包含摘要（type / digest / size），前端在 digest 变化时通过该接口获取完整结果
+@scheduler_bp.route('/<string:scheduler_id>/pipelines/<string:pipeline_name>/tasks/<string:task_name>/result', methods=['GET'])
+def get_task_result(scheduler_id, pipeline_name, task_name):
+    """
+    向指定Scheduler请求task的完整结果（格式同 TaskNode._process_result）
+    """
+    with instance_lock:
+        instance = scheduler_instances.get(scheduler_id)
+    if instance is None:
+        return jsonify({"error": f"Scheduler '{scheduler_id}' not found."}), 404
+
+    request_id = str(uuid.uuid4())
+    # 同一Scheduler的结果请求串行处理，丢弃之前超时请求的迟到响应
+    with instance['result_lock']:
+        instance['result_request_queue'].put({"request_id": request_id, "pipeline": pipeline_name, "task": task_name})
+        try:
+            while True:
+                response = instance['result_queue'].get(timeout=RESULT_TIMEOUT)
+                if response.get("request_id") == request_id:
+                    break
+        except multiprocessing.queues.Empty:
+            return jsonify({"error": "Timed out waiting for task result."}), 504
+
+    if response.get("error"):
+        return jsonify({"error": response["error"]}), 404
+    return jsonify({"version": response["version"], "result": response["result"]})
+
 # TODO: 当 HTTP PUT 请求访问 /schedulers/<scheduler_id>/config 时，该请求会被调用(用于修改特定实例中的配置信息)
 @scheduler_bp.route('/<string:scheduler_id>/config', methods=['PUT'])
 def update_scheduler_config(scheduler_id):
@@ -103,6 +143,7 @@ def stop_scheduler(scheduler_id):
         proc.terminate()
         proc.join()
         del scheduler_instances[scheduler_id]
+        state_hub.detach(scheduler_id)
         logger.info(f"Scheduler '{scheduler_id}' removed.")
         
     return jsonify({"message": f"Scheduler '{scheduler_id}' stopped and removed."}), 200
\ No newline at end of file
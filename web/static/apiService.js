@@ -16,6 +16,38 @@ export async function fetchSchedulersApi() {
     }
 }
 
+// 订阅调度器状态推送（Server-Sent Events），handlers 为 事件名 -> 回调(解析后的数据)
+// 连接断开时浏览器会自动重连，服务端在每次连接时先推送完整快照
+export function openSchedulerStreamApi(handlers) {
+    const source = new EventSource(`${SCHEDULERS_API_URL}/stream`);
+    for (const [eventName, handler] of Object.entries(handlers)) {
+        source.addEventListener(eventName, (event) => {
+            try {
+                handler(JSON.parse(event.data));
+            } catch (error) {
+                console.error(`处理状态推送事件 ${eventName} 失败:`, error);
+            }
+        });
+    }
+    source.onerror = () => console.warn('状态推送连接中断，等待浏览器自动重连');
+    return source;
+}
+
+// 获取task的完整结果（状态快照中的结果仅包含摘要）
+export async function fetchTaskResultApi(schedulerId, pipelineName, taskName) {
+    const url = `${SCHEDULERS_API_URL}/${schedulerId}/pipelines/${encodeURIComponent(pipelineName)}/tasks/${encodeURIComponent(taskName)}/result`;
+    try {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`获取任务结果失败: ${response.statusText}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('获取任务结果失败:', error);
+        throw error;
+    }
+}
+
 export async function fetchConfigsApi() {
     try {
         const response = await fetch(CONFIGS_API_URL);
@@ -6,6 +6,9 @@ import {
     renderPipeline, 
     renderTaskDetails, 
     renderSchedulerList,
+    renderSchedulerItem,
+    renderRemoveSchedulerItem,
+    renderPipelineUpdate,
     renderHidePipelineTask,
     renderMermaidContainer,
     renderResetRightPanel
@@ -16,7 +19,10 @@ import {
     fetchConfigContentApi, 
     createSchedulerApi, 
     stopSchedulerApi,
+    fetchTaskResultApi,
+    openSchedulerStreamApi,
 } from './apiService.js'
+import { applyStateDelta } from './util.js'
 import {
     pipelineConfigSelect, configEditor
 } from './script.js';
@@ -29,8 +35,13 @@ let selectedTaskId = null;
 let expandedSchedulers = new Set();
 // 用于存储当前任务结果
 let currentTaskResult = null;
+// 已获取的完整任务结果缓存：`${schId}/${pipeline}/${task}` -> { digest, result }，摘要未变化时不重复请求
+const taskResultCache = new Map();
 // 用于存储当前选中的配置文件内容
 let currentConfigContent = null;
+// 所有调度器的状态（schId -> 流水线状态）与已应用的增量版本号，由状态推送流增量更新
+const schedulerState = {};
+const schedulerVersions = {};
 
 // 处理列表渲染
 export async function handleFetchAndRenderConfigs(configName=null) {
@@ -116,33 +127,110 @@ export async function handleStopScheduler(schedulerId) {
     }
 }
 
-// 获取所有调度器状态并渲染列表（也用于定期更新）
+// 获取所有调度器状态并渲染列表（用于手动刷新，以及浏览器不支持状态推送时的定期更新）
 export async function handleFetchAndRenderSchedulers() {
     try {
         // 调用 apiService 中的函数获取数据
         const schedulerData = await fetchSchedulersApi();
-        renderSchedulerList(schedulerData, selectedSchedulerId, expandedSchedulers, selectedPipelineName);
-        if (selectedSchedulerId && selectedPipelineName){
-            const selectSchedulerData = schedulerData[selectedSchedulerId];
-            console.info("schedulerData: ", selectSchedulerData);
-            if (selectSchedulerData && selectSchedulerData[selectedPipelineName]){
-                const pipelineData = selectSchedulerData[selectedPipelineName];
-                handleSelectPipeline(schedulerData, selectedPipelineName);
-                if (selectedTaskId){
-                    const taskDetails = pipelineData.tasks[selectedTaskId];
-                    if (taskDetails) {
-                        renderTaskDetails(taskDetails, currentTaskResult);
-                        handleRenderTaskDetails(taskDetails);
-                    }
+        replaceSchedulerState(schedulerData, {});
+        await renderAllSchedulers();
+    } catch (error) {
+        console.error('获取调度器数据失败:', error);
+    }
+}
+
+// 建立状态推送连接（SSE）：连接（或断线重连）时收到完整快照，之后只应用增量并局部更新页面
+export function handleStartStateStream() {
+    openSchedulerStreamApi({
+        snapshot: async (data) => {
+            const states = {};
+            const versions = {};
+            for (const [schId, entry] of Object.entries(data.schedulers)) {
+                states[schId] = entry.state;
+                versions[schId] = entry.version;
+            }
+            replaceSchedulerState(states, versions);
+            await renderAllSchedulers();
+        },
+        delta: (data) => handleStateDelta(data.scheduler_id, data.delta),
+        removed: (data) => handleSchedulerRemoved(data.scheduler_id),
+    });
+}
+
+function replaceSchedulerState(states, versions) {
+    // 原地替换，列表项的点击回调持有的是同一个对象
+    for (const key of Object.keys(schedulerState)) delete schedulerState[key];
+    for (const key of Object.keys(schedulerVersions)) delete schedulerVersions[key];
+    Object.assign(schedulerState, states);
+    Object.assign(schedulerVersions, versions);
+}
+
+// 全量渲染调度器列表与当前选中的流水线、任务
+async function renderAllSchedulers() {
+    renderSchedulerList(schedulerState, selectedSchedulerId, expandedSchedulers, selectedPipelineName);
+    if (selectedSchedulerId && selectedPipelineName){
+        const selectSchedulerData = schedulerState[selectedSchedulerId];
+        if (selectSchedulerData && selectSchedulerData[selectedPipelineName]){
+            const pipelineData = selectSchedulerData[selectedPipelineName];
+            handleSelectPipeline(schedulerState, selectedPipelineName);
+            if (selectedTaskId){
+                const taskDetails = pipelineData.tasks[selectedTaskId];
+                if (taskDetails) {
+                    await handleRenderTaskDetails(taskDetails);
                 }
-            } else{
-                selectedSchedulerId = null;
-                selectedPipelineName = null;
-                renderResetRightPanel();
             }
+        } else{
+            selectedSchedulerId = null;
+            selectedPipelineName = null;
+            renderResetRightPanel();
         }
-    } catch (error) {
-        console.error('获取调度器数据失败:', error);
+    }
+}
+
+// 应用单个调度器的状态增量，只更新发生变化的列表项、流程图节点与任务详情
+async function handleStateDelta(schId, delta) {
+    // 快照之前已包含的增量（重连或背压重同步时可能重复收到）直接忽略
+    if (schId in schedulerVersions && delta.version <= schedulerVersions[schId]) {
+        return;
+    }
+    const { state, changes } = applyStateDelta(schedulerState[schId] || {}, delta);
+    const isNewScheduler = !(schId in schedulerState);
+    schedulerState[schId] = state;
+    schedulerVersions[schId] = delta.version;
+
+    if (isNewScheduler || changes.listChanged) {
+        renderSchedulerItem(schId, schedulerState, selectedSchedulerId, expandedSchedulers, selectedPipelineName);
+    }
+    if (schId !== selectedSchedulerId || !selectedPipelineName || !changes.pipelines.has(selectedPipelineName)) {
+        return;
+    }
+    const pipelineData = state[selectedPipelineName];
+    if (!pipelineData) {
+        selectedSchedulerId = null;
+        selectedPipelineName = null;
+        renderResetRightPanel();
+        return;
+    }
+    const pipelineChange = changes.pipelines.get(selectedPipelineName);
+    if (pipelineChange.structural) {
+        handleSelectPipeline(schedulerState, selectedPipelineName);
+    } else {
+        renderPipelineUpdate(pipelineData, pipelineChange.tasks);
+    }
+    if (selectedTaskId && pipelineChange.tasks.has(selectedTaskId)) {
+        await handleRenderTaskDetails(pipelineData.tasks[selectedTaskId]);
+    }
+}
+
+function handleSchedulerRemoved(schId) {
+    delete schedulerState[schId];
+    delete schedulerVersions[schId];
+    expandedSchedulers.delete(schId);
+    renderRemoveSchedulerItem(schId);
+    if (selectedSchedulerId === schId) {
+        selectedSchedulerId = null;
+        selectedPipelineName = null;
+        renderResetRightPanel();
     }
 }
 
@@ -196,7 +284,6 @@ export function handleMermaidNodeClick(event, pipelineData) {
             if (pipelineData && pipelineData.tasks && pipelineData.tasks[originalTaskId]) {
                 const taskDetails = pipelineData.tasks[originalTaskId];
                 selectedTaskId = originalTaskId; 
-                renderTaskDetails(taskDetails, currentTaskResult);
                 handleRenderTaskDetails(taskDetails);
             } else {
                 console.warn('任务ID未在数据中找到:', originalTaskId);
@@ -207,13 +294,26 @@ export function handleMermaidNodeClick(event, pipelineData) {
     }
 }
 
-// 用于为currentTaskResult赋值，其作用为浜村对应信息
-function handleRenderTaskDetails(task){
-    // 检查 task.result 是否存在且结构正确
-    const result = task.result;
-    if (result && result.type && result.content !== undefined) {
-        currentTaskResult = task.result;
+// 根据结果摘要获取完整结果（摘要未变化时使用缓存），为currentTaskResult赋值后渲染任务详情
+async function handleRenderTaskDetails(task){
+    const summary = task.result;
+    currentTaskResult = null;
+    if (summary && summary.type) {
+        const cacheKey = `${selectedSchedulerId}/${selectedPipelineName}/${task.name_id}`;
+        const cached = taskResultCache.get(cacheKey);
+        if (cached && cached.digest === summary.digest) {
+            currentTaskResult = cached.result;
+        } else {
+            try {
+                const response = await fetchTaskResultApi(selectedSchedulerId, selectedPipelineName, task.name_id);
+                currentTaskResult = response.result;
+                taskResultCache.set(cacheKey, { digest: summary.digest, result: response.result });
+            } catch (error) {
+                currentTaskResult = { type: 'error', content: error.message };
+            }
+        }
     }
+    renderTaskDetails(task, currentTaskResult);
 }
 
 export function bindTaskClickEvents(pipelineData) {
@@ -52,62 +52,82 @@ export function renderConfigEditorContent(conf_json) {
 // 渲染调度器列表
 export function renderSchedulerList(currentData, selectedSchedulerId, expandedSchedulers, selectedPipelineName) {
     schedulerList.innerHTML = '';
-    console.info("currentData: ", currentData);
     for (const schId in currentData) {
-        const schedulerItem = document.createElement('li');
-        schedulerItem.className = `scheduler-item ${schId === selectedSchedulerId ? 'active' : ''}`;
-        schedulerItem.setAttribute('data-scheduler-id', schId);
-
-        const schedulerHeader = document.createElement('div');
-        schedulerHeader.className = 'scheduler-header';
-
-        const schedulerIdSpan = document.createElement('span');
-        schedulerIdSpan.textContent = `Scheduler ID: ${schId}`;
-        schedulerIdSpan.onclick = () => {
-            // 点击时，切换展开状态
-            handleTogglePipelineList(schId, currentData);
-        };
-        
-        const stopBtn = document.createElement('button');
-        stopBtn.textContent = '终止';
-        stopBtn.className = 'stop-btn';
-        stopBtn.onclick = (event) => {
-            event.stopPropagation();
-            if (confirm(`确定要终止调度器 ${schId} 吗？`)) {
-                handleStopScheduler(schId);
-            }
-        };
-
-        schedulerHeader.appendChild(schedulerIdSpan);
-        schedulerHeader.appendChild(stopBtn);
-        schedulerItem.appendChild(schedulerHeader);
-
-        const pipelineList = document.createElement('ul');
-        pipelineList.className = 'pipeline-list';
-        // 关键修改：检查 Set 中是否有该调度器ID，以决定是否展开
-        if (expandedSchedulers.has(schId)) {
-            pipelineList.classList.add('visible');
-        }
+        schedulerList.appendChild(buildSchedulerItem(schId, currentData, selectedSchedulerId, expandedSchedulers, selectedPipelineName));
+    }
+}
+
+// 增量更新：仅重建某个调度器的列表项（不存在时追加）
+export function renderSchedulerItem(schId, currentData, selectedSchedulerId, expandedSchedulers, selectedPipelineName) {
+    const schedulerItem = buildSchedulerItem(schId, currentData, selectedSchedulerId, expandedSchedulers, selectedPipelineName);
+    const existing = schedulerList.querySelector(`[data-scheduler-id="${CSS.escape(schId)}"]`);
+    if (existing) {
+        existing.replaceWith(schedulerItem);
+    } else {
+        schedulerList.appendChild(schedulerItem);
+    }
+}
+
+// 增量更新：移除某个调度器的列表项
+export function renderRemoveSchedulerItem(schId) {
+    const existing = schedulerList.querySelector(`[data-scheduler-id="${CSS.escape(schId)}"]`);
+    if (existing) {
+        existing.remove();
+    }
+}
 
-        const schedulerData = currentData[schId];
-        console.info("schedulerData: ", schedulerData);
-        if (schedulerData) {
-            console.info("pipelineName in schedulerData");
-            for (const pipelineName in schedulerData) {
-                const pipelineItem = document.createElement('li');
-                pipelineItem.textContent = pipelineName;
-                pipelineItem.className = `pipeline-item ${pipelineName === selectedPipelineName && schId === selectedSchedulerId ? 'active' : ''}`;
-                pipelineItem.onclick = () => {
-                    handleSelectPipelineAndScheduler(schId, pipelineName, currentData);
-                };
-                console.info("pipelineItem.onclick added!");
-                pipelineList.appendChild(pipelineItem);
-            }
+// 构建单个调度器的列表项（含其流水线列表）
+function buildSchedulerItem(schId, currentData, selectedSchedulerId, expandedSchedulers, selectedPipelineName) {
+    const schedulerItem = document.createElement('li');
+    schedulerItem.className = `scheduler-item ${schId === selectedSchedulerId ? 'active' : ''}`;
+    schedulerItem.setAttribute('data-scheduler-id', schId);
+
+    const schedulerHeader = document.createElement('div');
+    schedulerHeader.className = 'scheduler-header';
+
+    const schedulerIdSpan = document.createElement('span');
+    schedulerIdSpan.textContent = `Scheduler ID: ${schId}`;
+    schedulerIdSpan.onclick = () => {
+        // 点击时，切换展开状态
+        handleTogglePipelineList(schId, currentData);
+    };
+    
+    const stopBtn = document.createElement('button');
+    stopBtn.textContent = '终止';
+    stopBtn.className = 'stop-btn';
+    stopBtn.onclick = (event) => {
+        event.stopPropagation();
+        if (confirm(`确定要终止调度器 ${schId} 吗？`)) {
+            handleStopScheduler(schId);
         }
+    };
 
-        schedulerItem.appendChild(pipelineList);
-        schedulerList.appendChild(schedulerItem);
+    schedulerHeader.appendChild(schedulerIdSpan);
+    schedulerHeader.appendChild(stopBtn);
+    schedulerItem.appendChild(schedulerHeader);
+
+    const pipelineList = document.createElement('ul');
+    pipelineList.className = 'pipeline-list';
+    // 检查 Set 中是否有该调度器ID，以决定是否展开
+    if (expandedSchedulers.has(schId)) {
+        pipelineList.classList.add('visible');
+    }
+
+    const schedulerData = currentData[schId];
+    if (schedulerData) {
+        for (const pipelineName in schedulerData) {
+            const pipelineItem = document.createElement('li');
+            pipelineItem.textContent = pipelineName;
+            pipelineItem.className = `pipeline-item ${pipelineName === selectedPipelineName && schId === selectedSchedulerId ? 'active' : ''}`;
+            pipelineItem.onclick = () => {
+                handleSelectPipelineAndScheduler(schId, pipelineName, currentData);
+            };
+            pipelineList.appendChild(pipelineItem);
+        }
     }
+
+    schedulerItem.appendChild(pipelineList);
+    return schedulerItem;
 }
 
 // 用于渲染选中的pipeline mermaid流程图
@@ -137,6 +157,22 @@ export function renderPipeline(pipelineName, pipelineData) {
     console.log('pipline selected:', pipelineName);
 }
 
+// 增量更新：task 集合未变化时只更新流水线状态与发生变化的节点样式，不重新生成 Mermaid 图
+export function renderPipelineUpdate(pipelineData, changedTaskIds) {
+    pipelineStatusDiv.textContent = pipelineData.status;
+    pipelineStatusDiv.className = `status-badge status-${pipelineData.status}`;
+    const statusClasses = ['success', 'failed', 'running', 'pending'];
+    document.querySelectorAll('.mermaid g.node').forEach(node => {
+        const match = node.id.match(/^flowchart-(.+)-\d+$/);
+        if (!match || !changedTaskIds.has(match[1])) {
+            return;
+        }
+        const status = pipelineData.tasks[match[1]].status;
+        node.classList.remove(...statusClasses);
+        node.classList.add(statusClasses.includes(status) ? status : 'pending');
+    });
+}
+
 // 渲染（绑定） Mermaid 图中task节点的点击事件 (使用事件委托)
 export function renderMermaidContainer(pipelineData){
     const mermaidContainer = document.querySelector('.mermaid');
@@ -156,8 +192,8 @@ export function renderTaskDetails(task, currentTaskResult) {
         <h4>任务结果:</h4>
     `;
 
-    // 检查 task.result 是否存在且结构正确
-    const result = task.result;
+    // task.result 仅为摘要，完整结果由 currentTaskResult 传入
+    const result = currentTaskResult;
     if (result && result.type && result.content !== undefined) {
         htmlContent = renderHtmlContent(htmlContent, result);
         // 添加保存按钮
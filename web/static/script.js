@@ -5,6 +5,7 @@ import {
     handleStartButtonClick, 
     handleFetchAndRenderConfigs, 
     handleFetchAndRenderSchedulers,
+    handleStartStateStream,
     handleConfigSelectChange
 } from './eventHandlers.js';
 
@@ -31,8 +32,13 @@ document.addEventListener('DOMContentLoaded', () => {
     configEditor = document.getElementById('config-editor');
 
     handleFetchAndRenderConfigs();
-    handleFetchAndRenderSchedulers();
-    setInterval(handleFetchAndRenderSchedulers, REFRESH_INTERVAL);
+    // 优先使用服务端推送的状态增量，浏览器不支持 EventSource 时退回定时轮询
+    if (window.EventSource) {
+        handleStartStateStream();
+    } else {
+        handleFetchAndRenderSchedulers();
+        setInterval(handleFetchAndRenderSchedulers, REFRESH_INTERVAL);
+    }
 
     refreshBtn.addEventListener('click', handleFetchAndRenderSchedulers);
 
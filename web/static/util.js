@@ -100,4 +100,32 @@ function createTableFromJSON(data) {
     });
     tableHtml += '</tbody></table>';
     return tableHtml;
-}
\ No newline at end of file
+}
+// 将调度器推送的状态增量合并到本地状态（与后端 web/util/state_hub.apply_state_delta 一致）
+// 返回合并后的状态与变化信息：listChanged 表示流水线列表有增删，pipelines 为 流水线名 -> { structural, tasks: 变化的task名集合 }
+export function applyStateDelta(state, delta) {
+    const changes = { listChanged: false, pipelines: new Map() };
+    if (delta.full) {
+        state = {};
+        changes.listChanged = true;
+    }
+    for (const [name, pipelineState] of Object.entries(delta.pipelines || {})) {
+        const existing = state[name];
+        changes.listChanged = changes.listChanged || !existing;
+        const tasks = existing ? existing.tasks : {};
+        const changedTasks = new Set(Object.keys(pipelineState.tasks || {}));
+        // 新增task时依赖图发生变化，需要重新生成流程图
+        const structural = !existing || [...changedTasks].some(taskName => !(taskName in tasks));
+        Object.assign(tasks, pipelineState.tasks || {});
+        state[name] = { ...pipelineState, tasks: tasks };
+        changes.pipelines.set(name, { structural: structural, tasks: changedTasks });
+    }
+    for (const name of delta.removed || []) {
+        if (name in state) {
+            delete state[name];
+            changes.listChanged = true;
+            changes.pipelines.set(name, { structural: true, tasks: new Set() });
+        }
+    }
+    return { state, changes };
+}
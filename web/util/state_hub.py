@@ -0,0 +1,152 @@
+import copy
+import json
+import threading
+from queue import Empty, Full, Queue
+
+'''
+调度器状态的推送中心（Server-Sent Events）：
+- 每个Scheduler一个泵线程，阻塞读取其状态队列中的增量（格式见 Scheduler._build_state_delta），合并到 latest_state 后立即分发，
+  不再由单个线程每秒轮询所有队列
+- 每个增量只序列化一次，由所有连接的客户端共享
+- 每个客户端有一个有界队列，客户端过慢导致队列已满时丢弃其积压的事件，改为推送一次完整快照（背压）
+推送的事件：
+    snapshot: {"schedulers": {scheduler_id: {"version": 版本号, "state": 完整状态}}}
+    delta:    {"scheduler_id": id, "delta": 增量}
+    removed:  {"scheduler_id": id}
+'''
+
+CLIENT_QUEUE_SIZE = 64
+KEEPALIVE_INTERVAL = 15
+RESYNC = object()
+
+
+def apply_state_delta(latest_state, delta):
+    """
+    将Scheduler发送的状态增量合并到webapp保存的状态中（格式见 Scheduler._build_state_delta）
+    完整快照直接替换，增量中的pipeline字段覆盖、task按名称覆盖，被移除的pipeline删除
+    """
+    if delta.get("full"):
+        latest_state = {}
+    for name, pipeline_state in delta.get("pipelines", {}).items():
+        merged = latest_state.setdefault(name, {})
+        tasks = merged.get("tasks", {})
+        tasks.update(pipeline_state.get("tasks", {}))
+        merged.update(pipeline_state)
+        merged["tasks"] = tasks
+    for name in delta.get("removed", []):
+        latest_state.pop(name, None)
+    return latest_state
+
+
+def format_sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class StreamClient:
+    """单个SSE连接的有界事件队列"""
+    def __init__(self, maxsize: int = CLIENT_QUEUE_SIZE):
+        self.queue = Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except Full:
+            # 丢弃积压的事件，由推送线程在取到 RESYNC 时发送完整快照
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except Empty:
+                    break
+            self.queue.put_nowait(RESYNC)
+
+
+class StateHub:
+    def __init__(self, logger, client_queue_size: int = CLIENT_QUEUE_SIZE):
+        self.logger = logger
+        self.client_queue_size = client_queue_size
+        # 保证“合并增量 + 分发”与“生成快照 + 订阅”互斥，客户端收到的增量总是晚于其快照
+        self.lock = threading.Lock()
+        self.instances = {}                     # scheduler_id -> scheduler实例字典（含 state_queue / latest_state）
+        self.versions = {}                      # scheduler_id -> 已合并的最新增量版本号
+        self.clients = set()
+
+    def attach(self, scheduler_id, instance):
+        """开始推送某个Scheduler的状态"""
+        with self.lock:
+            self.instances[scheduler_id] = instance
+            self.versions[scheduler_id] = 0
+            self._broadcast("delta", {"scheduler_id": scheduler_id, "delta": {"full": True, "version": 0, "pipelines": {}, "removed": []}})
+        threading.Thread(target=self._pump, args=(scheduler_id, instance), daemon=True, name=f"StatePump-{scheduler_id}").start()
+
+    def detach(self, scheduler_id):
+        """Scheduler被终止后停止推送，并通知客户端移除"""
+        with self.lock:
+            if self.instances.pop(scheduler_id, None) is None:
+                return
+            self.versions.pop(scheduler_id, None)
+            self._broadcast("removed", {"scheduler_id": scheduler_id})
+
+    def _pump(self, scheduler_id, instance):
+        """泵线程：阻塞读取状态队列，收到增量后立即合并并分发"""
+        state_queue = instance['state_queue']
+        while self.instances.get(scheduler_id) is instance:
+            try:
+                delta = state_queue.get(timeout=1)
+            except Empty:
+                continue
+            except (EOFError, OSError) as e:
+                # manager 进程已退出
+                self.logger.error(f"State queue of scheduler {scheduler_id} closed: {e}")
+                break
+            with self.lock:
+                if self.instances.get(scheduler_id) is not instance:
+                    break
+                instance['latest_state'] = apply_state_delta(instance['latest_state'], delta)
+                self.versions[scheduler_id] = delta.get("version", 0)
+                self._broadcast("delta", {"scheduler_id": scheduler_id, "delta": delta})
+
+    def copy_states(self, instances: dict) -> dict:
+        """复制各Scheduler的 latest_state（泵线程在 self.lock 下原地合并增量），供调用方在锁外序列化"""
+        with self.lock:
+            return {scheduler_id: copy.deepcopy(instance['latest_state']) for scheduler_id, instance in instances.items()}
+
+    def _broadcast(self, event, data):
+        """需持有 self.lock 调用；事件只序列化一次"""
+        if not self.clients:
+            return
+        message = format_sse(event, json.dumps(data, ensure_ascii=False))
+        for client in self.clients:
+            client.push(message)
+
+    def _snapshot_message(self):
+        """需持有 self.lock 调用"""
+        schedulers = {
+            scheduler_id: {"version": self.versions.get(scheduler_id, 0), "state": instance['latest_state']}
+            for scheduler_id, instance in self.instances.items()
+        }
+        return format_sse("snapshot", json.dumps({"schedulers": schedulers}, ensure_ascii=False))
+
+    def stream(self):
+        """SSE 生成器：先发送完整快照，之后发送增量；空闲时发送注释行保持连接，客户端断开时取消订阅"""
+        client = StreamClient(self.client_queue_size)
+        with self.lock:
+            self.clients.add(client)
+            snapshot = self._snapshot_message()
+        try:
+            yield snapshot
+            while True:
+                try:
+                    message = client.queue.get(timeout=KEEPALIVE_INTERVAL)
+                except Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is RESYNC:
+                    self.logger.warning(f"State stream client too slow, dropped {client.dropped} events, resyncing.")
+                    with self.lock:
+                        message = self._snapshot_message()
+                yield message
+        finally:
+            with self.lock:
+                self.clients.discard(client)
@@ -1,34 +1,14 @@
 import os
 import signal
 import sys
-import threading
-import time
 from flask import Flask, render_template
-import multiprocessing
 
 from core.logger import get_logger
 # 从 routes 文件夹导入蓝图
-from web.glob_resource import scheduler_instances, instance_lock, logger
+from web.glob_resource import scheduler_instances, instance_lock, state_hub, logger
 from web.scheduler_api import scheduler_bp
 from web.config_api import config_bp
 
-# 定义主 WebApp 线程，用于获取状态
-def update_all_states():
-    """
-    线程：持续从所有Scheduler实例的队列中获取最新的状态并将其赋值给webapp管理的scheduler实例字典
-    """
-    while True:
-        with instance_lock:
-            for sch_id, instance in scheduler_instances.items():
-                try:
-                    latest_state = instance['state_queue'].get_nowait()
-                    instance['latest_state'] = latest_state
-                except multiprocessing.queues.Empty:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error updating state for scheduler {sch_id}: {e}")
-        time.sleep(1)
-
 def cleanup_schedulers(signum, frame):
     """SIGINT 信号处理器，用于终止所有子进程。"""
     logger.info("SIGINT received. Terminating all scheduler processes...")
@@ -56,6 +36,7 @@ def cleanup_schedulers(signum, frame):
             finally:
                 # 无论如何，都从字典中移除该实例
                 del scheduler_instances[sch_id]
+                state_hub.detach(sch_id)
 
     logger.info("All schedulers terminated. Exiting WebApp.")
     sys.exit(0)
@@ -66,10 +47,6 @@ def create_app():
     # 注册 SIGINT 信号处理器
     signal.signal(signal.SIGINT, cleanup_schedulers)
     
-    # 创建一个后台线程来定期从所有Scheduler获取状态
-    state_updater_thread = threading.Thread(target=update_all_states, daemon=True)
-    state_updater_thread.start()
-
     # 在主应用中注册蓝图
     # url_prefix='/schedulers' 将蓝图中所有路由的URL前面都加上 /schedulers
     app.register_blueprint(scheduler_bp)